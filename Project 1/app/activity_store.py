@@ -0,0 +1,335 @@
+"""
+Local SQLite ledger of Alpaca account activities.
+
+Activities are synced incrementally: each sync asks Alpaca only for
+activities after the newest stored one and follows page tokens to the last
+page, so upstream cost depends on new activity rather than account age.
+Reads use keyset (cursor) pagination on an index, so a page costs the same
+whether the ledger holds a hundred fills or a million.
+"""
+
+import base64
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Tuple
+
+from config import get_config
+from alpaca_clients import get_client_manager
+from utils import get_logger, utc_now
+
+logger = get_logger("activity_store")
+
+DB_FILENAME = "activities.db"
+PAGE_SIZE = 100  # Alpaca maximum for /v2/account/activities
+# Re-request this much before the newest stored activity (duplicates are ignored)
+SYNC_OVERLAP = timedelta(seconds=1)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS activities (
+    id TEXT PRIMARY KEY,
+    activity_type TEXT NOT NULL,
+    transaction_time TEXT NOT NULL,
+    symbol TEXT,
+    side TEXT,
+    qty REAL,
+    price REAL,
+    order_id TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_activities_type_time
+    ON activities (activity_type, transaction_time, id);
+CREATE TABLE IF NOT EXISTS sync_state (
+    activity_type TEXT PRIMARY KEY,
+    last_time TEXT NOT NULL,
+    last_id TEXT NOT NULL,
+    synced_at TEXT NOT NULL
+);
+"""
+
+COLUMNS = "id, activity_type, transaction_time, symbol, side, qty, price, order_id"
+
+
+def normalize_time(value: Any) -> str:
+    """
+    Format a timestamp as UTC ISO-8601 with fixed microseconds.
+    
+    Alpaca returns a variable number of fractional digits; a fixed width
+    makes text order equal time order, which the index relies on.
+    
+    Args:
+        value: datetime or ISO string (date-only allowed).
+    
+    Returns:
+        str: e.g. "2026-01-22T14:30:05.421684Z".
+    """
+    if isinstance(value, datetime):
+        dt = value
+    else:
+        dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def encode_cursor(transaction_time: str, activity_id: str) -> str:
+    """Encode a page position as an opaque URL-safe cursor."""
+    raw = f"{transaction_time}|{activity_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """
+    Decode a cursor produced by encode_cursor.
+    
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        transaction_time, activity_id = raw.split("|", 1)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    return transaction_time, activity_id
+
+
+class ActivityStore:
+    """
+    SQLite-backed activity ledger with incremental Alpaca sync.
+    
+    Thread-safe: each thread gets its own connection (WAL mode), and syncs
+    are serialized so concurrent requests trigger at most one upstream sync.
+    """
+    
+    def __init__(
+        self,
+        db_path: Optional[Path] = None,
+        sync_interval_sec: Optional[float] = None,
+        backfill_days: Optional[int] = None
+    ):
+        """
+        Initialize store (creates the database if needed).
+        
+        Args:
+            db_path: SQLite file (default: data/activities.db).
+            sync_interval_sec: Minimum seconds between upstream syncs.
+            backfill_days: History fetched on the first sync of an empty store.
+        """
+        config = get_config()
+        self._db_path = db_path or config.paths.data_dir / DB_FILENAME
+        self._sync_interval = (
+            config.api.activity_sync_sec if sync_interval_sec is None else sync_interval_sec
+        )
+        self._backfill_days = backfill_days or config.api.activity_backfill_days
+        self._local = threading.local()
+        self._sync_lock = threading.Lock()
+        self._last_sync: Dict[str, float] = {}
+        
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._db_path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+    
+    @staticmethod
+    def _to_row(activity: Dict[str, Any], activity_type: str) -> tuple:
+        """Convert an API activity dict to a table row."""
+        qty = activity.get("qty")
+        price = activity.get("price")
+        return (
+            str(activity["id"]),
+            activity.get("activity_type", activity_type),
+            normalize_time(activity.get("transaction_time") or activity.get("date")),
+            activity.get("symbol"),
+            activity.get("side"),
+            float(qty) if qty is not None else None,
+            float(price) if price is not None else None,
+            activity.get("order_id"),
+        )
+    
+    def sync(self, activity_type: str = "FILL", force: bool = False) -> int:
+        """
+        Fetch activities newer than the newest stored one.
+        
+        Skipped if the last sync of this type is younger than the sync
+        interval (unless forced). Progress is committed page by page, so an
+        interrupted sync resumes where it stopped.
+        
+        Args:
+            activity_type: Alpaca activity type.
+            force: Sync even if the interval has not elapsed.
+        
+        Returns:
+            int: Number of new activities stored.
+        """
+        with self._sync_lock:
+            last = self._last_sync.get(activity_type)
+            if not force and last is not None and time.monotonic() - last < self._sync_interval:
+                return 0
+            
+            conn = self._connect()
+            state = conn.execute(
+                "SELECT last_time FROM sync_state WHERE activity_type = ?",
+                (activity_type,)
+            ).fetchone()
+            if state is not None:
+                after = datetime.fromisoformat(state["last_time"].replace("Z", "+00:00")) - SYNC_OVERLAP
+            else:
+                after = utc_now() - timedelta(days=self._backfill_days)
+            
+            client_manager = get_client_manager()
+            started = time.perf_counter()
+            page_token = None
+            inserted = 0
+            pages = 0
+            
+            while True:
+                page = client_manager.get_account_activities(
+                    activity_types=[activity_type],
+                    after=after,
+                    direction="asc",
+                    page_size=PAGE_SIZE,
+                    page_token=page_token
+                )
+                pages += 1
+                
+                if page:
+                    rows = [self._to_row(a, activity_type) for a in page]
+                    newest = max(rows, key=lambda r: (r[2], r[0]))
+                    with conn:
+                        inserted += conn.executemany(
+                            f"INSERT OR IGNORE INTO activities ({COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                            rows
+                        ).rowcount
+                        conn.execute(
+                            "INSERT INTO sync_state (activity_type, last_time, last_id, synced_at) "
+                            "VALUES (?, ?, ?, ?) "
+                            "ON CONFLICT(activity_type) DO UPDATE SET "
+                            "last_time = MAX(last_time, excluded.last_time), "
+                            "last_id = excluded.last_id, synced_at = excluded.synced_at",
+                            (activity_type, newest[2], newest[0], normalize_time(utc_now()))
+                        )
+                
+                if len(page) < PAGE_SIZE:
+                    break
+                page_token = page[-1]["id"]
+            
+            self._last_sync[activity_type] = time.monotonic()
+            logger.debug(
+                f"Activity sync ({activity_type}): {inserted} new in {pages} page(s), "
+                f"{time.perf_counter() - started:.2f}s"
+            )
+            return inserted
+    
+    def page(
+        self,
+        activity_type: str = "FILL",
+        limit: int = 25,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Read one page of activities, newest first.
+        
+        Args:
+            activity_type: Alpaca activity type.
+            limit: Page size.
+            cursor: nextCursor from the previous page (None for the first).
+        
+        Returns:
+            Tuple of (activity dicts, cursor for the next page or None).
+        
+        Raises:
+            ValueError: If the cursor is malformed.
+        """
+        sql = f"SELECT {COLUMNS} FROM activities WHERE activity_type = ?"
+        params: List[Any] = [activity_type]
+        if cursor:
+            params.extend(decode_cursor(cursor))
+            sql += " AND (transaction_time, id) < (?, ?)"
+        sql += " ORDER BY transaction_time DESC, id DESC LIMIT ?"
+        params.append(limit + 1)
+        
+        rows = [dict(r) for r in self._connect().execute(sql, params)]
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["transaction_time"], rows[-1]["id"])
+        return rows, next_cursor
+    
+    def recent(
+        self,
+        after: datetime,
+        activity_type: str = "FILL",
+        limit: int = 500
+    ) -> List[Dict[str, Any]]:
+        """
+        Read activities after a time, newest first.
+        
+        Args:
+            after: Lower time bound (exclusive).
+            activity_type: Alpaca activity type.
+            limit: Maximum rows.
+        
+        Returns:
+            List of activity dicts.
+        """
+        rows = self._connect().execute(
+            f"SELECT {COLUMNS} FROM activities "
+            "WHERE activity_type = ? AND transaction_time > ? "
+            "ORDER BY transaction_time DESC, id DESC LIMIT ?",
+            (activity_type, normalize_time(after), limit)
+        )
+        return [dict(r) for r in rows]
+    
+    def newer_than(
+        self,
+        mark: Tuple[str, str],
+        activity_type: str = "FILL",
+        limit: int = 500
+    ) -> List[Dict[str, Any]]:
+        """
+        Read activities after a (transaction_time, id) position, oldest first.
+        
+        Pass the last row's (transaction_time, id) as the next mark to page
+        forward until fewer than limit rows come back.
+        
+        Args:
+            mark: (transaction_time, id) of the last activity already seen.
+            activity_type: Alpaca activity type.
+            limit: Maximum rows.
+        
+        Returns:
+            List of activity dicts.
+        """
+        rows = self._connect().execute(
+            f"SELECT {COLUMNS} FROM activities "
+            "WHERE activity_type = ? AND (transaction_time, id) > (?, ?) "
+            "ORDER BY transaction_time, id LIMIT ?",
+            (activity_type, mark[0], mark[1], limit)
+        )
+        return [dict(r) for r in rows]
+
+
+# Global store instance
+_activity_store: Optional[ActivityStore] = None
+
+
+def get_activity_store() -> ActivityStore:
+    """
+    Get or create the global activity store.
+    
+    Returns:
+        ActivityStore: Global instance.
+    """
+    global _activity_store
+    if _activity_store is None:
+        _activity_store = ActivityStore()
+    return _activity_store
@@ -2,10 +2,25 @@
 Alpaca API client factory module.
 
 Creates and manages Alpaca SDK clients for trading, market data, and news.
+
+Every REST call goes through the manager's RequestScheduler:
+- one token bucket per endpoint class (trading API, data API)
+- priority lanes within a class: orders before account reads, market data
+  before news
+- HTTP 429 pauses the whole endpoint class for Retry-After (or the
+  X-RateLimit-Reset time, or exponential backoff) and the call is retried
 """
 
-from typing import Optional, Tuple
+from dataclasses import dataclass
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from enum import Enum
+from typing import Optional, Tuple, Dict, List, Callable, Any
+import heapq
+import itertools
 import logging
+import threading
+import time
 
 from alpaca.trading.client import TradingClient
 from alpaca.data.historical import StockHistoricalDataClient
@@ -15,6 +30,283 @@ from config import AlpacaConfig, get_config
 
 logger = logging.getLogger("tradingbot.alpaca_clients")
 
+# Longest pause honored from a rate-limit response
+MAX_RETRY_AFTER_SEC = 60.0
+
+
+class RequestLane(Enum):
+    """
+    Priority lane for a REST call: (priority, endpoint class).
+    
+    Lower priority is served first. Lanes only compete with lanes of the same
+    endpoint class, since each class has its own rate limit.
+    """
+    ORDERS = (0, "trading")
+    ACCOUNT = (1, "trading")
+    MARKET_DATA = (2, "data")
+    NEWS = (3, "data")
+    
+    @property
+    def priority(self) -> int:
+        """Queue priority (lower first)."""
+        return self.value[0]
+    
+    @property
+    def endpoint(self) -> str:
+        """Endpoint class (rate-limit bucket)."""
+        return self.value[1]
+
+
+@dataclass
+class LaneStats:
+    """Counters for one lane."""
+    calls: int = 0
+    queued: int = 0
+    throttled: int = 0
+    retried: int = 0
+    wait_sec: float = 0.0
+
+
+class TokenBucket:
+    """Token bucket for one endpoint class (callers hold the scheduler lock)."""
+    
+    def __init__(self, rate_per_sec: float, capacity: int):
+        """
+        Initialize a full bucket.
+        
+        Args:
+            rate_per_sec: Refill rate.
+            capacity: Maximum burst.
+        """
+        self.rate = rate_per_sec
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.waiters: List[Tuple[int, int]] = []
+    
+    def wait_time(self, now: float) -> float:
+        """Seconds until a token is available (0 if one is available now)."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.tokens >= 1.0:
+            return 0.0
+        return (1.0 - self.tokens) / self.rate
+    
+    def block(self, until: float) -> None:
+        """Stop handing out tokens until the given monotonic time."""
+        self.blocked_until = max(self.blocked_until, until)
+        self.tokens = 0.0
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    """HTTP status of an SDK/requests error, if any."""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        response = getattr(error, "response", None)
+        status = getattr(response, "status_code", None)
+    return status
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """
+    Seconds to wait according to a rate-limit response.
+    
+    Honors Retry-After (seconds or HTTP date), then Alpaca's
+    X-RateLimit-Reset (epoch seconds).
+    
+    Args:
+        error: Exception raised for a 429 response.
+    
+    Returns:
+        Delay in seconds, or None if the response carries no hint.
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    
+    value = headers.get("Retry-After")
+    if value:
+        try:
+            return min(MAX_RETRY_AFTER_SEC, max(0.0, float(value)))
+        except ValueError:
+            try:
+                retry_at = parsedate_to_datetime(value)
+                delay = (retry_at - datetime.now(retry_at.tzinfo)).total_seconds()
+                return min(MAX_RETRY_AFTER_SEC, max(0.0, delay))
+            except (TypeError, ValueError):
+                pass
+    
+    reset = headers.get("X-RateLimit-Reset")
+    if reset:
+        try:
+            return min(MAX_RETRY_AFTER_SEC, max(0.0, float(reset) - time.time()))
+        except ValueError:
+            pass
+    return None
+
+
+class RequestScheduler:
+    """
+    Rate-limit-aware scheduler for Alpaca REST calls.
+    
+    Callers block in execute() until their endpoint class has a token and no
+    higher-priority call is waiting for it. Thread-safe.
+    """
+    
+    def __init__(self, config: AlpacaConfig):
+        """
+        Initialize scheduler.
+        
+        Args:
+            config: Alpaca configuration (rates, burst, retry policy).
+        """
+        self._buckets: Dict[str, TokenBucket] = {
+            "trading": TokenBucket(config.trading_rate_per_min / 60.0, config.rate_burst),
+            "data": TokenBucket(config.data_rate_per_min / 60.0, config.rate_burst),
+        }
+        self._max_retries = config.max_retries
+        self._backoff = config.retry_backoff_sec
+        self._stats: Dict[RequestLane, LaneStats] = {lane: LaneStats() for lane in RequestLane}
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+    
+    def _acquire(self, lane: RequestLane) -> None:
+        """Block until the lane may make one call."""
+        bucket = self._buckets[lane.endpoint]
+        stats = self._stats[lane]
+        started = time.monotonic()
+        
+        with self._cond:
+            ticket = (lane.priority, next(self._seq))
+            heapq.heappush(bucket.waiters, ticket)
+            queued = False
+            try:
+                while True:
+                    delay = None
+                    if bucket.waiters[0] == ticket:
+                        delay = bucket.wait_time(time.monotonic())
+                        if delay <= 0:
+                            bucket.tokens -= 1.0
+                            break
+                    if not queued:
+                        queued = True
+                        stats.queued += 1
+                    self._cond.wait(timeout=delay)
+            finally:
+                bucket.waiters.remove(ticket)
+                heapq.heapify(bucket.waiters)
+                stats.calls += 1
+                stats.wait_sec += time.monotonic() - started
+                self._cond.notify_all()
+    
+    def execute(self, lane: RequestLane, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run one REST call under the rate limit, retrying on HTTP 429 and 504.
+        
+        429s are retried on every lane: the request was rejected before
+        processing, so retrying is safe even for order submission. 504s
+        (gateway timeouts, which the SDK's own retry used to cover) are
+        retried with backoff on every lane except ORDERS, where the order
+        may already have been accepted and a retry could submit it twice.
+        
+        Args:
+            lane: Priority lane of the call.
+            fn: SDK method to call.
+            *args: Positional arguments for fn.
+            **kwargs: Keyword arguments for fn.
+        
+        Returns:
+            Whatever fn returns.
+        
+        Raises:
+            Exception: The SDK error once retries are exhausted, or any
+                other error immediately.
+        """
+        bucket = self._buckets[lane.endpoint]
+        stats = self._stats[lane]
+        attempt = 0
+        
+        while True:
+            self._acquire(lane)
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                status = _status_code(e)
+                if status == 504 and lane is not RequestLane.ORDERS and attempt < self._max_retries:
+                    # Gateway timeout: back off this call only (not a rate limit)
+                    delay = self._backoff * (2 ** attempt)
+                    attempt += 1
+                    with self._cond:
+                        stats.retried += 1
+                    logger.warning(
+                        f"Alpaca {lane.name.lower()} request timed out at the gateway (504); "
+                        f"retrying in {delay:.1f}s (retry {attempt}/{self._max_retries})"
+                    )
+                    time.sleep(delay)
+                    continue
+                if status != 429:
+                    raise
+                
+                delay = _retry_after(e)
+                if delay is None:
+                    delay = self._backoff * (2 ** attempt)
+                
+                with self._cond:
+                    stats.throttled += 1
+                    # Rate limits are per endpoint class: pause every lane on it
+                    bucket.block(time.monotonic() + delay)
+                    if attempt < self._max_retries:
+                        stats.retried += 1
+                    self._cond.notify_all()
+                
+                if attempt >= self._max_retries:
+                    logger.error(f"Alpaca {lane.name.lower()} request still rate limited after {attempt} retries")
+                    raise
+                
+                attempt += 1
+                logger.warning(
+                    f"Alpaca {lane.name.lower()} request rate limited (429); "
+                    f"pausing {lane.endpoint} calls for {delay:.1f}s (retry {attempt}/{self._max_retries})"
+                )
+    
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Snapshot of per-lane counters.
+        
+        Returns:
+            Dict of lane name -> calls, queued, throttled, retried, wait_sec.
+        """
+        with self._cond:
+            return {
+                lane.name.lower(): {
+                    'calls': s.calls,
+                    'queued': s.queued,
+                    'throttled': s.throttled,
+                    'retried': s.retried,
+                    'wait_sec': round(s.wait_sec, 3),
+                }
+                for lane, s in self._stats.items()
+            }
+    
+    def summary(self) -> str:
+        """One-line totals for logging."""
+        totals = LaneStats()
+        with self._cond:
+            for s in self._stats.values():
+                totals.calls += s.calls
+                totals.queued += s.queued
+                totals.throttled += s.throttled
+                totals.retried += s.retried
+                totals.wait_sec += s.wait_sec
+        return (
+            f"Alpaca API: calls={totals.calls}, queued={totals.queued}, "
+            f"throttled={totals.throttled}, retried={totals.retried}, wait={totals.wait_sec:.1f}s"
+        )
+
 
 class AlpacaClientManager:
     """
@@ -37,6 +329,7 @@ class AlpacaClientManager:
         self._trading_client: Optional[TradingClient] = None
         self._data_client: Optional[StockHistoricalDataClient] = None
         self._data_stream: Optional[StockDataStream] = None
+        self._scheduler = RequestScheduler(self._config)
         
     @property
     def trading_client(self) -> TradingClient:
@@ -53,6 +346,8 @@ class AlpacaClientManager:
                 paper=self._config.paper,
                 url_override=self._config.base_url_trading
             )
+            # Let 429s and 504s reach the scheduler instead of the SDK's fixed-wait retry
+            self._trading_client._retry = 0
             mode = "paper" if self._config.paper else "live"
             logger.info(f"Initialized TradingClient in {mode} mode")
         return self._trading_client
@@ -71,6 +366,7 @@ class AlpacaClientManager:
                 secret_key=self._config.secret_key,
                 url_override=self._config.base_url_data
             )
+            self._data_client._retry = 0
             logger.info(f"Initialized StockHistoricalDataClient (feed: {self._config.data_feed})")
         return self._data_client
     
@@ -112,6 +408,31 @@ class AlpacaClientManager:
         """
         return self._config.paper
     
+    @property
+    def scheduler(self) -> RequestScheduler:
+        """
+        Get the request scheduler.
+        
+        Returns:
+            RequestScheduler: Scheduler shared by all REST calls.
+        """
+        return self._scheduler
+    
+    def request(self, lane: RequestLane, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run an SDK call through the request scheduler.
+        
+        Args:
+            lane: Priority lane of the call.
+            fn: SDK method (e.g. self.trading_client.get_clock).
+            *args: Positional arguments for fn.
+            **kwargs: Keyword arguments for fn.
+        
+        Returns:
+            Whatever fn returns.
+        """
+        return self._scheduler.execute(lane, fn, *args, **kwargs)
+    
     def get_account(self):
         """
         Get account information.
@@ -119,7 +440,7 @@ class AlpacaClientManager:
         Returns:
             TradeAccount: Account details including equity, buying power, etc.
         """
-        return self.trading_client.get_account()
+        return self.request(RequestLane.ACCOUNT, self.trading_client.get_account)
     
     def get_positions(self):
         """
@@ -128,7 +449,7 @@ class AlpacaClientManager:
         Returns:
             List[Position]: List of open positions.
         """
-        return self.trading_client.get_all_positions()
+        return self.request(RequestLane.ACCOUNT, self.trading_client.get_all_positions)
     
     def get_asset(self, symbol: str):
         """
@@ -140,7 +461,94 @@ class AlpacaClientManager:
         Returns:
             Asset: Asset details including tradability, shortability.
         """
-        return self.trading_client.get_asset(symbol)
+        return self.request(RequestLane.ACCOUNT, self.trading_client.get_asset, symbol)
+    
+    def submit_order(self, order_request):
+        """
+        Submit an order (highest-priority lane).
+        
+        Args:
+            order_request: alpaca-py order request.
+        
+        Returns:
+            Order: Submitted order.
+        """
+        return self.request(RequestLane.ORDERS, self.trading_client.submit_order, order_request)
+    
+    def close_position(self, symbol: str):
+        """
+        Close an open position (highest-priority lane).
+        
+        Args:
+            symbol: Stock ticker symbol.
+        
+        Returns:
+            Order: Closing order.
+        """
+        return self.request(RequestLane.ORDERS, self.trading_client.close_position, symbol)
+    
+    def get_portfolio_history(self, **kwargs):
+        """
+        Get account portfolio history.
+        
+        Args:
+            **kwargs: Passed to TradingClient.get_portfolio_history.
+        
+        Returns:
+            PortfolioHistory: Equity time series.
+        """
+        return self.request(RequestLane.ACCOUNT, self.trading_client.get_portfolio_history, **kwargs)
+    
+    def get_account_activities(
+        self,
+        activity_types: Optional[List[str]] = None,
+        after: Optional[datetime] = None,
+        direction: str = "desc",
+        page_size: int = 100,
+        page_token: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get one page of account activities (fills, etc.).
+        
+        alpaca-py's TradingClient has no wrapper for this endpoint, so it is
+        called as raw REST (GET /v2/account/activities).
+        
+        Args:
+            activity_types: Filter by activity type (e.g., ["FILL"]).
+            after: Only activities after this time.
+            direction: "asc" or "desc" by time.
+            page_size: Activities per page (max 100).
+            page_token: Id of the last activity of the previous page.
+        
+        Returns:
+            List of activity dicts as returned by the API.
+        """
+        params: Dict[str, Any] = {"direction": direction, "page_size": page_size}
+        if activity_types:
+            params["activity_types"] = ",".join(activity_types)
+        if after is not None:
+            params["after"] = after.isoformat()
+        if page_token:
+            params["page_token"] = page_token
+        
+        return self.request(
+            RequestLane.ACCOUNT,
+            self.trading_client.get,
+            "/account/activities",
+            params
+        ) or []
+    
+    def get_stock_bars(self, request):
+        """
+        Get historical bars.
+        
+        Args:
+            request: StockBarsRequest.
+        
+        Returns:
+            BarSet: Bars keyed by symbol.
+        """
+        return self.request(RequestLane.MARKET_DATA, self.data_client.get_stock_bars, request)
     
     def is_shortable(self, symbol: str) -> bool:
         """
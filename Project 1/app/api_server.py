@@ -5,17 +5,22 @@ Provides endpoints for portfolio data, performance metrics, and transactions.
 Uses Alpaca account data for live/paper trading dashboard.
 """
 
+import asyncio
+import json
 import logging
+import time
 from datetime import datetime, timezone, timedelta
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable, Awaitable, Tuple, Set
 from enum import Enum
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 from config import get_config, APIConfig
 from alpaca_clients import get_client_manager
+from activity_store import get_activity_store, normalize_time
 from utils import get_logger, utc_now
 
 logger = get_logger("api_server")
@@ -73,6 +78,7 @@ class Transaction(BaseModel):
 class TransactionsResponse(BaseModel):
     """Transactions list response model."""
     transactions: List[Transaction]
+    nextCursor: Optional[str] = None
 
 
 class BotStatus(BaseModel):
@@ -97,13 +103,239 @@ class BotState:
 bot_state = BotState()
 
 
+class SnapshotCache:
+    """
+    Short-TTL cache for upstream snapshots with single-flight loading.
+    
+    Concurrent requests for a missing or expired key await one shared load
+    instead of each calling Alpaca. Runs on the event loop (no locking).
+    """
+    
+    def __init__(self, ttl_sec: float):
+        """
+        Initialize cache.
+        
+        Args:
+            ttl_sec: Seconds a loaded value is served before reloading.
+        """
+        self._ttl = ttl_sec
+        self._entries: Dict[str, Tuple[float, Any]] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.joined = 0
+    
+    async def get(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Get a cached value, loading it at most once per TTL.
+        
+        Args:
+            key: Cache key.
+            loader: Coroutine function producing the value.
+        
+        Returns:
+            Cached or freshly loaded value.
+        """
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry[0] < self._ttl:
+            self.hits += 1
+            return entry[1]
+        
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.ensure_future(self._load(key, loader))
+            self._inflight[key] = task
+        else:
+            self.joined += 1
+        
+        # Shield: a client disconnecting must not cancel the shared load
+        return await asyncio.shield(task)
+    
+    async def _load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Run the loader and store its result (failures are not cached)."""
+        try:
+            value = await loader()
+            self._entries[key] = (time.monotonic(), value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+
+summary_cache = SnapshotCache(get_config().api.summary_cache_ttl_sec)
+
+
+class LiveFeed:
+    """
+    Shared background poller that pushes live updates to stream clients.
+    
+    A single poll loop runs while at least one client is connected, however
+    many there are: each tick reads the account and positions once and checks
+    the activity ledger for new fills, then fans the results out to every
+    subscriber queue. Upstream load therefore depends on the poll interval,
+    not on the number of viewers.
+    
+    Events:
+        bot: BotStatus, sent when it changes.
+        positions: Position list (as /api/positions), sent when it changes.
+        equity: Equity tick, sent every poll.
+        fill: One new Transaction per fill, oldest first.
+    
+    A new subscriber first receives the latest bot, positions and equity
+    events. Runs on the event loop (no locking).
+    """
+    
+    # Per-client backlog; a client this far behind loses its oldest events
+    QUEUE_SIZE = 256
+    # Events replayed to new subscribers
+    RETAINED = ("bot", "positions", "equity")
+    # Fills read from the activity ledger per query
+    FILL_PAGE_SIZE = 500
+    
+    def __init__(self, interval_sec: float):
+        """
+        Initialize feed.
+        
+        Args:
+            interval_sec: Seconds between upstream polls.
+        """
+        self._interval = interval_sec
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._latest: Dict[str, Any] = {}
+        # (transaction_time, id) of the newest fill already announced
+        self._fill_mark: Optional[Tuple[str, str]] = None
+        self._task: Optional[asyncio.Task] = None
+    
+    @property
+    def subscriber_count(self) -> int:
+        """Number of connected stream clients."""
+        return len(self._subscribers)
+    
+    def subscribe(self) -> asyncio.Queue:
+        """
+        Register a client, starting the poller if it is the first.
+        
+        Returns:
+            asyncio.Queue of (event, data) tuples.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.QUEUE_SIZE)
+        for event, data in self._latest.items():
+            queue.put_nowait((event, data))
+        self._subscribers.add(queue)
+        
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+        return queue
+    
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        """Remove a client, stopping the poller after the last one leaves."""
+        self._subscribers.discard(queue)
+        if not self._subscribers and self._task is not None:
+            self._task.cancel()
+            self._task = None
+            # Fills made while nobody is watching are not replayed later
+            self._fill_mark = None
+    
+    def _publish(self, event: str, data: Any) -> None:
+        """Send an event to every subscriber (retained events only on change)."""
+        if event in self.RETAINED:
+            if self._latest.get(event) == data:
+                return
+            self._latest[event] = data
+        
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait((event, data))
+    
+    async def _run(self) -> None:
+        """Poll loop; runs until cancelled by unsubscribe()."""
+        logger.info("Live feed poller started")
+        try:
+            while True:
+                started = time.monotonic()
+                try:
+                    await self._tick()
+                except Exception as e:
+                    logger.warning(f"Live feed poll failed: {e}")
+                await asyncio.sleep(max(0.0, self._interval - (time.monotonic() - started)))
+        finally:
+            logger.info("Live feed poller stopped")
+    
+    async def _tick(self) -> None:
+        """Read upstream state once and publish what changed."""
+        client_manager = get_client_manager()
+        account, positions, fills = await asyncio.gather(
+            asyncio.to_thread(client_manager.get_account),
+            asyncio.to_thread(client_manager.get_positions),
+            asyncio.to_thread(self._new_fills),
+        )
+        
+        equity = float(account.equity)
+        last_equity = float(account.last_equity)
+        day_return_pct = (equity - last_equity) / last_equity * 100 if last_equity > 0 else 0
+        
+        self._publish("bot", build_bot_status(len(positions)).model_dump())
+        self._publish("positions", [position_to_dict(p) for p in positions])
+        self._publish("equity", {
+            "t": utc_now().isoformat(),
+            "equity": round(equity, 2),
+            "dayReturnPct": round(day_return_pct, 2),
+        })
+        for fill in fills:
+            self._publish("fill", fill)
+    
+    def _new_fills(self) -> List[Dict[str, Any]]:
+        """
+        Sync the activity ledger and return fills newer than the mark.
+        
+        The first call of a poller run only sets the mark, so clients are
+        sent fills that happen while they are connected.
+        """
+        store = get_activity_store()
+        try:
+            store.sync("FILL")
+        except Exception as e:
+            logger.warning(f"Activity sync failed: {e}")
+        
+        if self._fill_mark is None:
+            newest, _ = store.page(activity_type="FILL", limit=1)
+            if newest:
+                self._fill_mark = (newest[0]["transaction_time"], newest[0]["id"])
+            else:
+                self._fill_mark = (normalize_time(utc_now()), "")
+            return []
+        
+        # Page forward from the (time, id) mark until exhausted, so a burst of
+        # fills larger than one page is not skipped when the mark advances
+        activities = []
+        while True:
+            page = store.newer_than(self._fill_mark, activity_type="FILL", limit=self.FILL_PAGE_SIZE)
+            activities.extend(page)
+            if page:
+                self._fill_mark = (page[-1]["transaction_time"], page[-1]["id"])
+            if len(page) < self.FILL_PAGE_SIZE:
+                break
+        
+        fills = []
+        for activity in activities:
+            transaction = activity_to_transaction(activity)
+            if transaction is not None:
+                fills.append(transaction.model_dump())
+        return fills
+
+
+live_feed = LiveFeed(get_config().api.stream_interval_sec)
+
+
 # ============================================================
 # Helper Functions
 # ============================================================
 
 def get_portfolio_history(
     period: str = "1D",
-    timeframe: str = "1D"
+    timeframe: str = "1D",
+    strict: bool = False
 ) -> List[Dict[str, Any]]:
     """
     Get portfolio history from Alpaca.
@@ -111,15 +343,15 @@ def get_portfolio_history(
     Args:
         period: History period (e.g., "1D", "1W", "1M", "3M", "1A", "all").
         timeframe: Data resolution ("1D" for daily).
+        strict: Raise on failure instead of returning an empty list.
     
     Returns:
         List of equity data points.
     """
     try:
         client_manager = get_client_manager()
-        client = client_manager.trading_client
         
-        history = client.get_portfolio_history(
+        history = client_manager.get_portfolio_history(
             period=period,
             timeframe=timeframe
         )
@@ -138,51 +370,49 @@ def get_portfolio_history(
         
     except Exception as e:
         logger.error(f"Failed to get portfolio history: {e}")
+        if strict:
+            raise
         return []
 
 
 def get_account_activities(
     activity_types: Optional[List[str]] = None,
     after: Optional[datetime] = None,
-    limit: int = 100
+    limit: int = 100,
+    strict: bool = False
 ) -> List[Dict[str, Any]]:
     """
-    Get account activities (fills) from Alpaca.
+    Get recent account activities (fills) from the local ledger.
+    
+    Syncs new activities from Alpaca first (at most every ACTIVITY_SYNC_SEC);
+    if the sync fails, stored activities are served.
     
     Args:
-        activity_types: Filter by activity type (e.g., ["FILL"]).
+        activity_types: Filter by activity type (first type is used, default FILL).
         after: Only activities after this time.
         limit: Maximum activities to return.
+        strict: Raise if stored activities cannot be read instead of
+            returning an empty list.
     
     Returns:
-        List of activity records.
+        List of activity records, newest first.
     """
+    activity_type = (activity_types or ["FILL"])[0]
+    store = get_activity_store()
+    
     try:
-        client_manager = get_client_manager()
-        client = client_manager.trading_client
-        
-        # Get account activities
-        activities = client.get_account_activities(
-            activity_types=activity_types or ["FILL"],
-            after=after,
-        )
-        
-        records = []
-        for activity in activities[:limit]:
-            records.append({
-                "id": activity.id,
-                "activity_type": activity.activity_type,
-                "symbol": getattr(activity, 'symbol', None),
-                "side": getattr(activity, 'side', None),
-                "qty": float(getattr(activity, 'qty', 0) or 0),
-                "price": float(getattr(activity, 'price', 0) or 0),
-                "transaction_time": getattr(activity, 'transaction_time', None)
-            })
-        
-        return records
-        
+        store.sync(activity_type)
+    except Exception as e:
+        logger.warning(f"Activity sync failed, serving stored activities: {e}")
+    
+    try:
+        if after is not None:
+            return store.recent(after, activity_type=activity_type, limit=limit)
+        return store.page(activity_type=activity_type, limit=limit)[0]
     except Exception as e:
         logger.error(f"Failed to get account activities: {e}")
+        if strict:
+            raise
         return []
 
 
@@ -200,6 +430,219 @@ def period_to_alpaca_format(range_str: str) -> str:
     return mapping.get(range_str.lower(), "1M")
 
 
+def activity_to_transaction(activity: Dict[str, Any]) -> Optional[Transaction]:
+    """
+    Convert a ledger activity row to a Transaction.
+    
+    Returns:
+        Transaction, or None for activities without symbol or side.
+    """
+    if not (activity.get("symbol") and activity.get("side")):
+        return None
+    
+    action = "BUY" if activity["side"].lower() == "buy" else "SELL"
+    t_str = datetime.fromisoformat(
+        activity["transaction_time"].replace("Z", "+00:00")
+    ).isoformat()
+    
+    return Transaction(
+        symbol=activity["symbol"],
+        action=action,
+        qty=int(activity.get("qty") or 0),
+        price=round(float(activity.get("price") or 0), 2),
+        t=t_str
+    )
+
+
+def position_to_dict(p) -> Dict[str, Any]:
+    """Convert an Alpaca position to the dashboard position format."""
+    return {
+        "symbol": p.symbol,
+        "qty": int(p.qty),
+        "side": "long" if int(p.qty) > 0 else "short",
+        "avgEntryPrice": float(p.avg_entry_price),
+        "marketValue": float(p.market_value),
+        "currentPrice": float(p.current_price),
+        "unrealizedPL": float(p.unrealized_pl),
+        "unrealizedPLPct": float(p.unrealized_plpc) * 100,
+        "changeToday": float(p.change_today) * 100 if p.change_today else 0
+    }
+
+
+def build_bot_status(open_positions: int) -> BotStatus:
+    """
+    Build the bot status from tracked state.
+    
+    Args:
+        open_positions: Number of open positions.
+    
+    Returns:
+        BotStatus.
+    """
+    client_manager = get_client_manager()
+    
+    # Determine mode
+    mode = "paper" if client_manager.is_paper else "live"
+    
+    # Get universe size
+    from universe import get_universe
+    universe_size = len(get_universe())
+    
+    # Format timestamps
+    last_scan = None
+    if bot_state.last_scan_at:
+        last_scan = bot_state.last_scan_at.isoformat()
+    
+    last_decision = None
+    if bot_state.last_decision_at:
+        last_decision = bot_state.last_decision_at.isoformat()
+    
+    return BotStatus(
+        mode=mode,
+        universeSize=universe_size,
+        lastScanAt=last_scan,
+        lastDecisionAt=last_decision,
+        openPositions=open_positions
+    )
+
+
+async def fetch_summary_snapshot() -> Dict[str, Any]:
+    """
+    Fetch everything the dashboard summary needs, concurrently.
+    
+    The blocking SDK calls run in worker threads (the request scheduler
+    still paces them), so the event loop keeps serving other clients.
+    Failures are raised (not turned into empty lists) so the summary cache
+    never stores a failed load as "no history / no fills".
+    
+    Returns:
+        Dict with account, week/month/3m history, positions and activities.
+    """
+    client_manager = get_client_manager()
+    (
+        account,
+        week_history,
+        month_history,
+        all_history,
+        positions,
+        activities,
+    ) = await asyncio.gather(
+        asyncio.to_thread(client_manager.get_account),
+        asyncio.to_thread(get_portfolio_history, period="1W", timeframe="1D", strict=True),
+        asyncio.to_thread(get_portfolio_history, period="1M", timeframe="1D", strict=True),
+        # Total P&L (using all-time or 3M as proxy)
+        asyncio.to_thread(get_portfolio_history, period="3M", timeframe="1D", strict=True),
+        asyncio.to_thread(client_manager.get_positions),
+        # Last 90 days of fills
+        asyncio.to_thread(
+            get_account_activities,
+            activity_types=["FILL"],
+            after=utc_now() - timedelta(days=90),
+            limit=500,
+            strict=True
+        ),
+    )
+    return {
+        "account": account,
+        "week_history": week_history,
+        "month_history": month_history,
+        "all_history": all_history,
+        "positions": positions,
+        "activities": activities,
+    }
+
+
+def build_dashboard_summary(snapshot: Dict[str, Any]) -> DashboardSummary:
+    """
+    Compute dashboard metrics from an upstream snapshot.
+    
+    Time-relative fields (trades today, seconds since last trade) are
+    computed at call time, so they stay exact while the snapshot is cached.
+    
+    Args:
+        snapshot: Result of fetch_summary_snapshot().
+    
+    Returns:
+        DashboardSummary.
+    """
+    account = snapshot["account"]
+    equity = float(account.equity)
+    last_equity = float(account.last_equity)
+    
+    # Day return
+    day_return = equity - last_equity
+    day_return_pct = (day_return / last_equity * 100) if last_equity > 0 else 0
+    
+    # P&L over each history window
+    week_history = snapshot["week_history"]
+    pnl_week = 0.0
+    if week_history and len(week_history) > 1:
+        pnl_week = equity - week_history[0]["equity"]
+    
+    month_history = snapshot["month_history"]
+    pnl_month = 0.0
+    if month_history and len(month_history) > 1:
+        pnl_month = equity - month_history[0]["equity"]
+    
+    all_history = snapshot["all_history"]
+    total_pnl = 0.0
+    if all_history and len(all_history) > 1:
+        total_pnl = equity - all_history[0]["equity"]
+    
+    # Invested percentage
+    total_position_value = sum(
+        abs(float(p.market_value))
+        for p in snapshot["positions"]
+    )
+    invested_pct = total_position_value / equity if equity > 0 else 0
+    
+    # Trade statistics
+    activities = snapshot["activities"]
+    total_trades = len(activities)
+    
+    # Trades today
+    today_start = utc_now().replace(hour=0, minute=0, second=0, microsecond=0)
+    trades_today = sum(
+        1 for a in activities
+        if a.get("transaction_time") and
+        datetime.fromisoformat(str(a["transaction_time"]).replace("Z", "+00:00")) >= today_start
+    )
+    
+    # Last trade info
+    last_trade_at = None
+    last_trade_ago_seconds = None
+    if activities:
+        last_activity = activities[0]
+        if last_activity.get("transaction_time"):
+            last_trade_time = datetime.fromisoformat(
+                str(last_activity["transaction_time"]).replace("Z", "+00:00")
+            )
+            last_trade_at = last_trade_time.isoformat()
+            last_trade_ago_seconds = int((utc_now() - last_trade_time).total_seconds())
+    
+    # Win/loss calculation (simplified - would need closed position tracking for accuracy)
+    # For now, return null as we can't easily compute this from fills alone
+    win_rate = None
+    avg_return = None
+    closed_wl = {"wins": 0, "losses": 0}
+    
+    return DashboardSummary(
+        portfolioValue=round(equity, 2),
+        dayReturnPct=round(day_return_pct, 2),
+        totalPnL=round(total_pnl, 2),
+        pnlWeek=round(pnl_week, 2),
+        pnlMonth=round(pnl_month, 2),
+        winRate=win_rate,
+        avgReturn=avg_return,
+        closedWL=closed_wl,
+        totalTrades=total_trades,
+        tradesToday=trades_today,
+        lastTradeAt=last_trade_at,
+        lastTradeAgoSeconds=last_trade_ago_seconds,
+        investedPct=round(invested_pct, 4)
+    )
+
+
 # ============================================================
 # API Endpoints
 # ============================================================
@@ -217,97 +660,12 @@ async def get_dashboard_summary():
     
     Returns portfolio value, P&L metrics, trade statistics,
     and invested percentage based on live/paper Alpaca account.
+    Upstream data is fetched concurrently and shared between clients for
+    API_SUMMARY_TTL seconds.
     """
     try:
-        client_manager = get_client_manager()
-        
-        # Get account info
-        account = client_manager.get_account()
-        equity = float(account.equity)
-        last_equity = float(account.last_equity)
-        
-        # Day return
-        day_return = equity - last_equity
-        day_return_pct = (day_return / last_equity * 100) if last_equity > 0 else 0
-        
-        # Get portfolio history for P&L calculations
-        # Week P&L
-        week_history = get_portfolio_history(period="1W", timeframe="1D")
-        pnl_week = 0.0
-        if week_history and len(week_history) > 1:
-            pnl_week = equity - week_history[0]["equity"]
-        
-        # Month P&L
-        month_history = get_portfolio_history(period="1M", timeframe="1D")
-        pnl_month = 0.0
-        if month_history and len(month_history) > 1:
-            pnl_month = equity - month_history[0]["equity"]
-        
-        # Total P&L (using all-time or 3M as proxy)
-        all_history = get_portfolio_history(period="3M", timeframe="1D")
-        total_pnl = 0.0
-        if all_history and len(all_history) > 1:
-            total_pnl = equity - all_history[0]["equity"]
-        
-        # Get positions for invested percentage
-        positions = client_manager.get_positions()
-        total_position_value = sum(
-            abs(float(p.market_value))
-            for p in positions
-        )
-        invested_pct = total_position_value / equity if equity > 0 else 0
-        
-        # Get fills for trade statistics
-        # Last 90 days of fills
-        activities = get_account_activities(
-            activity_types=["FILL"],
-            after=utc_now() - timedelta(days=90),
-            limit=500
-        )
-        
-        total_trades = len(activities)
-        
-        # Trades today
-        today_start = utc_now().replace(hour=0, minute=0, second=0, microsecond=0)
-        trades_today = sum(
-            1 for a in activities
-            if a.get("transaction_time") and
-            datetime.fromisoformat(str(a["transaction_time"]).replace("Z", "+00:00")) >= today_start
-        )
-        
-        # Last trade info
-        last_trade_at = None
-        last_trade_ago_seconds = None
-        if activities:
-            last_activity = activities[0]
-            if last_activity.get("transaction_time"):
-                last_trade_time = datetime.fromisoformat(
-                    str(last_activity["transaction_time"]).replace("Z", "+00:00")
-                )
-                last_trade_at = last_trade_time.isoformat()
-                last_trade_ago_seconds = int((utc_now() - last_trade_time).total_seconds())
-        
-        # Win/loss calculation (simplified - would need closed position tracking for accuracy)
-        # For now, return null as we can't easily compute this from fills alone
-        win_rate = None
-        avg_return = None
-        closed_wl = {"wins": 0, "losses": 0}
-        
-        return DashboardSummary(
-            portfolioValue=round(equity, 2),
-            dayReturnPct=round(day_return_pct, 2),
-            totalPnL=round(total_pnl, 2),
-            pnlWeek=round(pnl_week, 2),
-            pnlMonth=round(pnl_month, 2),
-            winRate=win_rate,
-            avgReturn=avg_return,
-            closedWL=closed_wl,
-            totalTrades=total_trades,
-            tradesToday=trades_today,
-            lastTradeAt=last_trade_at,
-            lastTradeAgoSeconds=last_trade_ago_seconds,
-            investedPct=round(invested_pct, 4)
-        )
+        snapshot = await summary_cache.get("summary", fetch_summary_snapshot)
+        return build_dashboard_summary(snapshot)
         
     except Exception as e:
         logger.error(f"Error in dashboard summary: {e}")
@@ -344,41 +702,37 @@ async def get_performance(
 
 @app.get("/api/dashboard/transactions", response_model=TransactionsResponse)
 async def get_transactions(
-    limit: int = Query(25, description="Maximum transactions to return")
+    limit: int = Query(25, ge=1, le=500, description="Maximum transactions to return"),
+    cursor: Optional[str] = Query(None, description="nextCursor from the previous page")
 ):
     """
-    Get recent transactions (fills).
+    Get recent transactions (fills), newest first.
     
-    Returns most recent trades with symbol, action, quantity, price, and timestamp.
+    Returns trades with symbol, action, quantity, price, and timestamp.
+    Served from the local activity ledger with cursor pagination; pass the
+    returned nextCursor to get the following page.
     """
+    def load_page():
+        store = get_activity_store()
+        try:
+            store.sync("FILL")
+        except Exception as e:
+            logger.warning(f"Activity sync failed, serving stored activities: {e}")
+        return store.page(activity_type="FILL", limit=limit, cursor=cursor)
+    
     try:
-        activities = get_account_activities(
-            activity_types=["FILL"],
-            limit=limit
-        )
+        activities, next_cursor = await asyncio.to_thread(load_page)
         
         transactions = []
         for activity in activities:
-            if activity.get("symbol") and activity.get("side"):
-                action = "BUY" if activity["side"].lower() == "buy" else "SELL"
-                t_time = activity.get("transaction_time")
-                if t_time:
-                    t_str = datetime.fromisoformat(
-                        str(t_time).replace("Z", "+00:00")
-                    ).isoformat()
-                else:
-                    t_str = utc_now().isoformat()
-                
-                transactions.append(Transaction(
-                    symbol=activity["symbol"],
-                    action=action,
-                    qty=int(activity.get("qty", 0)),
-                    price=round(float(activity.get("price", 0)), 2),
-                    t=t_str
-                ))
-        
-        return TransactionsResponse(transactions=transactions)
+            transaction = activity_to_transaction(activity)
+            if transaction is not None:
+                transactions.append(transaction)
+        
+        return TransactionsResponse(transactions=transactions, nextCursor=next_cursor)
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error in transactions: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -394,39 +748,60 @@ async def get_bot_status():
     try:
         client_manager = get_client_manager()
         
-        # Determine mode
-        mode = "paper" if client_manager.is_paper else "live"
-        
-        # Get universe size
-        from universe import get_universe
-        universe_size = len(get_universe())
-        
         # Get open positions count
         positions = client_manager.get_positions()
-        open_positions = len(positions)
-        
-        # Format timestamps
-        last_scan = None
-        if bot_state.last_scan_at:
-            last_scan = bot_state.last_scan_at.isoformat()
-        
-        last_decision = None
-        if bot_state.last_decision_at:
-            last_decision = bot_state.last_decision_at.isoformat()
-        
-        return BotStatus(
-            mode=mode,
-            universeSize=universe_size,
-            lastScanAt=last_scan,
-            lastDecisionAt=last_decision,
-            openPositions=open_positions
-        )
+        return build_bot_status(len(positions))
         
     except Exception as e:
         logger.error(f"Error in bot status: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/bot/rate-limits")
+async def get_rate_limits():
+    """
+    Get Alpaca request scheduler counters for this process.
+    
+    Returns per-lane calls, queued, throttled (HTTP 429) and retried counts.
+    """
+    client_manager = get_client_manager()
+    return {"lanes": client_manager.scheduler.stats()}
+
+
+@app.get("/api/stream")
+async def stream_updates(request: Request):
+    """
+    Server-Sent Events feed of live updates.
+    
+    Streams bot, positions, equity and fill events from the shared live
+    feed poller, so connected viewers add no upstream Alpaca calls. A
+    comment line is sent every API_STREAM_HEARTBEAT seconds when idle.
+    """
+    heartbeat = get_config().api.stream_heartbeat_sec
+    
+    async def events():
+        # Subscribe inside the generator so unsubscribe always runs with it
+        queue = live_feed.subscribe()
+        try:
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        finally:
+            live_feed.unsubscribe(queue)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @app.get("/api/positions")
 async def get_positions():
     """
@@ -438,21 +813,7 @@ async def get_positions():
         client_manager = get_client_manager()
         positions = client_manager.get_positions()
         
-        result = []
-        for p in positions:
-            result.append({
-                "symbol": p.symbol,
-                "qty": int(p.qty),
-                "side": "long" if int(p.qty) > 0 else "short",
-                "avgEntryPrice": float(p.avg_entry_price),
-                "marketValue": float(p.market_value),
-                "currentPrice": float(p.current_price),
-                "unrealizedPL": float(p.unrealized_pl),
-                "unrealizedPLPct": float(p.unrealized_plpc) * 100,
-                "changeToday": float(p.change_today) * 100 if p.change_today else 0
-            })
-        
-        return {"positions": result}
+        return {"positions": [position_to_dict(p) for p in positions]}
         
     except Exception as e:
         logger.error(f"Error getting positions: {e}")
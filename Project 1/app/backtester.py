@@ -19,7 +19,8 @@ from portfolio import PortfolioManager, PositionSide
 from indicators import compute_indicators_for_df
 from regime_hmm import get_regime_detector, MarketRegime
 from universe import get_universe_with_proxy
-from utils import get_logger, utc_now, ensure_utc
+from profiling import get_profiler, ProfileReport
+from utils import get_logger, utc_now, ensure_utc, downcast_floats, chunk_list
 
 logger = get_logger("backtester")
 
@@ -45,6 +46,7 @@ class BacktestResult:
     profit_factor: float
     equity_curve: pd.DataFrame
     trades: pd.DataFrame
+    profile: Optional[ProfileReport] = None
     
     def to_dict(self) -> dict:
         """Convert to dictionary (excludes DataFrames)."""
@@ -83,7 +85,8 @@ class Backtester:
         self,
         initial_capital: Optional[float] = None,
         fee_rate: Optional[float] = None,
-        config: Optional[BacktestConfig] = None
+        config: Optional[BacktestConfig] = None,
+        profile: bool = False
     ):
         """
         Initialize backtester.
@@ -92,15 +95,20 @@ class Backtester:
             initial_capital: Starting capital.
             fee_rate: Fee rate per side.
             config: Backtest configuration.
+            profile: Run cProfile and tracemalloc in addition to stage timings.
         """
         self._config = config or get_config().backtest
         self._initial_capital = initial_capital or self._config.initial_capital
         self._fee_rate = fee_rate or self._config.fee_rate
         self._min_bars = self._config.min_symbol_bars
+        self._profile = profile
+        self._profiler = get_profiler()
         
         self._portfolio: Optional[PortfolioManager] = None
         self._strategy: Optional[TradingStrategy] = None
         self._symbol_data: Dict[str, pd.DataFrame] = {}
+        # Per-symbol bar dates (datetime64[D], sorted) for positional lookups
+        self._bar_dates: Dict[str, np.ndarray] = {}
         self._result: Optional[BacktestResult] = None
         
     def _prepare_data(
@@ -112,6 +120,10 @@ class Backtester:
         """
         Prepare data for backtesting.
         
+        In compact memory mode symbols are fetched and prepared in chunks, the
+        provider's in-memory copy is released after each chunk and price/indicator
+        columns are stored as float32 (the market proxy stays float64 for the HMM).
+        
         Args:
             symbols: List of symbols to include.
             start: Backtest start date.
@@ -127,24 +139,34 @@ class Backtester:
         end = ensure_utc(end)
         
         # Fetch bars with extra history for indicator warmup
-        lookback_days = int(self._min_bars * 1.5) + (end - start).days
         provider = get_data_provider()
-        
-        bars = provider.fetch_bars(
-            symbols,
-            start - timedelta(days=int(self._min_bars * 1.5)),
-            end
-        )
+        compact = self._config.compact_memory
+        chunks = chunk_list(symbols, max(1, self._config.prep_chunk_size)) if compact else [symbols]
+        proxy = get_config().hmm.market_proxy
         
         result = {}
-        for symbol, df in bars.items():
-            if df.empty or len(df) < self._min_bars:
-                logger.debug(f"Skipping {symbol}: insufficient data ({len(df)} bars)")
-                continue
+        for chunk in chunks:
+            bars = provider.fetch_bars(
+                chunk,
+                start - timedelta(days=int(self._min_bars * 1.5)),
+                end
+            )
             
-            # Compute indicators
-            df = compute_indicators_for_df(df)
-            result[symbol] = df.sort_values('timestamp').reset_index(drop=True)
+            for symbol in list(bars.keys()):
+                df = bars.pop(symbol)
+                if df.empty or len(df) < self._min_bars:
+                    logger.debug(f"Skipping {symbol}: insufficient data ({len(df)} bars)")
+                    continue
+                
+                # Compute indicators
+                df = compute_indicators_for_df(df)
+                df = df.sort_values('timestamp').reset_index(drop=True)
+                if compact and symbol != proxy:
+                    downcast_floats(df)
+                result[symbol] = df
+            
+            if compact:
+                provider.release(chunk)
         
         logger.info(f"Prepared {len(result)} symbols with sufficient data")
         return result
@@ -164,11 +186,13 @@ class Backtester:
         Returns:
             Dict mapping symbol to price.
         """
+        day = np.datetime64(date.date())
         prices = {}
         for symbol, df in self._symbol_data.items():
-            mask = df['timestamp'].dt.date == date.date()
-            if mask.any():
-                prices[symbol] = float(df.loc[mask, price_type].iloc[0])
+            dates = self._bar_dates[symbol]
+            i = dates.searchsorted(day, side='left')
+            if i < len(dates) and dates[i] == day:
+                prices[symbol] = float(df[price_type].iat[i])
         return prices
     
     def _get_data_through_date(
@@ -184,14 +208,15 @@ class Backtester:
             date: Cutoff date.
         
         Returns:
-            DataFrame with data through date (inclusive).
+            DataFrame with data through date (inclusive). This is a read-only
+            view of the prepared data (Copy-on-Write), not a copy.
         """
         df = self._symbol_data.get(symbol)
         if df is None:
             return pd.DataFrame()
         
-        mask = df['timestamp'].dt.date <= date.date()
-        return df[mask].copy()
+        n = self._bar_dates[symbol].searchsorted(np.datetime64(date.date()), side='right')
+        return df.iloc[:n]
     
     def _process_exits(
         self,
@@ -318,8 +343,27 @@ class Backtester:
             end: Backtest end date.
         
         Returns:
-            BacktestResult with metrics and data.
+            BacktestResult with metrics and data (including stage profile).
         """
+        self._profiler.start(detailed=self._profile)
+        try:
+            result = self._run_simulation(symbols, start, end)
+        finally:
+            report = self._profiler.stop()
+        
+        result.profile = report
+        logger.info(f"Backtest wall time: {report.total_sec:.1f}s")
+        return result
+    
+    def _run_simulation(
+        self,
+        symbols: Optional[List[str]],
+        start: Optional[datetime],
+        end: Optional[datetime]
+    ) -> BacktestResult:
+        """Run the simulation loop (see run())."""
+        profiler = self._profiler
+        
         # Defaults
         if symbols is None:
             symbols = get_universe_with_proxy()
@@ -346,11 +390,23 @@ class Backtester:
         self._strategy.initialize()
         
         # Prepare data
-        self._symbol_data = self._prepare_data(symbols, start, end)
-        
-        # Update regime detector with SPY data from backtest period
-        if "SPY" in self._symbol_data:
-            self._strategy._regime_detector.update_proxy_data(self._symbol_data["SPY"])
+        with profiler.stage("data_prep"):
+            self._symbol_data = self._prepare_data(symbols, start, end)
+            self._bar_dates = {
+                symbol: df['timestamp'].values.astype('datetime64[D]')
+                for symbol, df in self._symbol_data.items()
+            }
+        
+        with profiler.stage("regime_timeline"):
+            # Update regime detector with SPY data from backtest period
+            if "SPY" in self._symbol_data:
+                self._strategy._regime_detector.update_proxy_data(self._symbol_data["SPY"])
+            
+            # Walk-forward regimes: refit on data available at each decision date
+            if get_config().hmm.walk_forward:
+                self._strategy._regime_detector.build_walk_forward_timeline(start, end)
+            else:
+                self._strategy._regime_detector.clear_walk_forward_timeline()
         
         if not self._symbol_data:
             raise ValueError("No valid data for backtest")
@@ -371,14 +427,15 @@ class Backtester:
             date_dt = datetime.combine(date, datetime.min.time())
             
             # Get prices
-            open_prices = self._get_prices_at_date(date_dt, "open")
-            close_prices = self._get_prices_at_date(date_dt, "close")
+            with profiler.stage("prices"):
+                close_prices = self._get_prices_at_date(date_dt, "close")
             
             if not close_prices:
                 continue
             
             # 1) Process exits at close (stops use close prices)
-            self._process_exits(date_dt, close_prices, day_index=i)
+            with profiler.stage("exits"):
+                self._process_exits(date_dt, close_prices, day_index=i)
             
             # 2) Record equity at close
             self._portfolio.record_equity(date_dt, close_prices)
@@ -387,32 +444,37 @@ class Backtester:
             #    (In practice, signals computed end-of-day for next open)
             if i < len(trading_dates) - 1:
                 # Prepare data through today for signal generation
-                symbol_data_through_today = {
-                    sym: self._get_data_through_date(sym, date_dt)
-                    for sym in self._symbol_data.keys()
-                }
+                with profiler.stage("slicing"):
+                    symbol_data_through_today = {
+                        sym: self._get_data_through_date(sym, date_dt)
+                        for sym in self._symbol_data.keys()
+                    }
                 
                 # Update regime detector with latest SPY data
                 if "SPY" in symbol_data_through_today:
-                    self._strategy._regime_detector.update_proxy_data(
-                        symbol_data_through_today["SPY"]
-                    )
+                    with profiler.stage("regime"):
+                        self._strategy._regime_detector.update_proxy_data(
+                            symbol_data_through_today["SPY"]
+                        )
                 
                 # Generate signals (use pre_filter_sentiment=True to avoid RSS spam)
                 # Only fetch sentiment for candidates that pass regime+technical+trend
                 next_date = datetime.combine(trading_dates[i + 1], datetime.min.time())
-                signals = self._strategy.get_actionable_signals(
-                    symbol_data_through_today,
-                    next_date,
-                    pre_filter_sentiment=True
-                )
+                with profiler.stage("signals"):
+                    signals = self._strategy.get_actionable_signals(
+                        symbol_data_through_today,
+                        next_date,
+                        pre_filter_sentiment=True
+                    )
                 
                 # Get next day's prices for entries
-                next_open = self._get_prices_at_date(next_date, "open")
-                next_close = self._get_prices_at_date(next_date, "close")
+                with profiler.stage("prices"):
+                    next_open = self._get_prices_at_date(next_date, "open")
+                    next_close = self._get_prices_at_date(next_date, "close")
                 
                 # 4) Process entries at next open (pass day_index for time stop tracking)
-                self._process_entries(signals, next_date, next_open, next_close, day_index=i + 1)
+                with profiler.stage("entries"):
+                    self._process_entries(signals, next_date, next_open, next_close, day_index=i + 1)
             
             # Progress logging every 50 days
             if (i + 1) % 50 == 0:
@@ -0,0 +1,478 @@
+"""
+Benchmark suite for strategy hot paths on synthetic data.
+
+Generates deterministic synthetic OHLCV for a configurable universe and times:
+- prepare_data: Backtester data preparation for the whole universe (peak RSS)
+- indicators: TechnicalIndicators over every symbol's full history
+- regime_fit / regime_predict: HMM fit and posterior inference on the proxy
+- universe_scan: one TradingStrategy.scan_universe call
+- backtest: a full Backtester.run on a sub-universe
+
+Everything runs against an isolated temporary workspace (no Alpaca calls, no
+writes to the real data directory). Results are written as JSON with machine
+info and can be compared against a stored baseline.
+"""
+
+import json
+import os
+import platform
+import resource
+import statistics
+import tempfile
+import time
+import tracemalloc
+import zlib
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional, Dict, List, Any, Callable
+
+import numpy as np
+import pandas as pd
+
+from config import get_config
+from data_provider import DataProvider, set_data_provider
+from utils import get_logger, utc_now
+
+logger = get_logger("benchmark")
+
+BENCHMARK_VERSION = 1
+DEFAULT_BASELINE_PATH = Path(__file__).parent / "benchmarks" / "baseline.json"
+DEFAULT_THRESHOLD = 0.20  # 20% slower than baseline = regression
+
+# Market factor regimes: (daily drift, daily vol) for bull, bear, sideways
+REGIME_PARAMS = np.array([[0.0008, 0.008], [-0.0012, 0.022], [0.0, 0.012]])
+REGIME_TRANSITIONS = np.array([
+    [0.985, 0.005, 0.010],
+    [0.020, 0.960, 0.020],
+    [0.015, 0.010, 0.975],
+])
+
+
+@dataclass
+class BenchmarkParams:
+    """Benchmark dimensions (part of the result so baselines are comparable)."""
+    n_symbols: int = 50
+    years: int = 5
+    backtest_symbols: int = 10
+    backtest_years: int = 1
+    repeat: int = 3
+    predict_calls: int = 50
+    seed: int = 42
+    compact: bool = False
+    # tracemalloc high-water mark per case (slows every case; timings not comparable)
+    trace_memory: bool = False
+    # Fixed last bar date so every run sees identical data and calendars
+    end_date: str = "2025-12-31"
+
+
+class SyntheticMarket:
+    """
+    Deterministic synthetic daily OHLCV.
+    
+    A regime-switching market factor drives every symbol (SPY is the factor
+    itself); each symbol adds its own beta and idiosyncratic noise. The same
+    symbol and seed always produce the same bars.
+    """
+    
+    def __init__(self, end: datetime, years: int, seed: int = 42):
+        """
+        Initialize market.
+        
+        Args:
+            end: Last bar date.
+            years: Years of history to generate.
+            seed: Random seed.
+        """
+        self._seed = seed
+        n_days = int(years * 252)
+        self._timestamps = pd.date_range(
+            end=pd.Timestamp(end.date()), periods=n_days, freq="B", tz="UTC"
+        ) + pd.Timedelta(hours=5)
+        self._market_returns = self._market_factor(n_days)
+    
+    @property
+    def timestamps(self) -> pd.DatetimeIndex:
+        """Bar timestamps."""
+        return self._timestamps
+    
+    def _market_factor(self, n_days: int) -> np.ndarray:
+        """Simulate regime-switching market log returns."""
+        rng = np.random.default_rng(self._seed)
+        uniforms = rng.random(n_days)
+        cumulative = REGIME_TRANSITIONS.cumsum(axis=1)
+        states = np.empty(n_days, dtype=np.int64)
+        state = 0
+        for i in range(n_days):
+            state = min(int(np.searchsorted(cumulative[state], uniforms[i])), 2)
+            states[i] = state
+        drift, vol = REGIME_PARAMS[states, 0], REGIME_PARAMS[states, 1]
+        return drift + vol * rng.standard_normal(n_days)
+    
+    @staticmethod
+    def symbols(n: int) -> List[str]:
+        """Synthetic ticker names (SPY is added separately as the proxy)."""
+        return [f"SYN{i:04d}" for i in range(n)]
+    
+    def bars(self, symbol: str) -> pd.DataFrame:
+        """
+        Generate the full bar history for a symbol.
+        
+        Args:
+            symbol: Ticker.
+        
+        Returns:
+            DataFrame with timestamp, open, high, low, close, volume, vwap, trade_count.
+        """
+        n = len(self._timestamps)
+        if symbol == "SPY":
+            rng = np.random.default_rng([self._seed, 0])
+            log_returns = self._market_returns
+            start_price = 400.0
+        else:
+            rng = np.random.default_rng([self._seed, zlib.crc32(symbol.encode())])
+            beta = rng.uniform(0.5, 1.8)
+            idio = rng.uniform(0.005, 0.025)
+            log_returns = beta * self._market_returns + idio * rng.standard_normal(n)
+            start_price = rng.uniform(10.0, 500.0)
+        
+        close = start_price * np.exp(np.cumsum(log_returns))
+        prev_close = np.concatenate([[start_price], close[:-1]])
+        open_ = prev_close * np.exp(0.003 * rng.standard_normal(n))
+        spread = np.abs(rng.standard_normal((2, n))) * 0.006
+        high = np.maximum(open_, close) * (1 + spread[0])
+        low = np.minimum(open_, close) * (1 - spread[1])
+        volume = rng.lognormal(14.0, 0.5, n).astype(np.int64)
+        
+        return pd.DataFrame({
+            'timestamp': self._timestamps,
+            'open': open_,
+            'high': high,
+            'low': low,
+            'close': close,
+            'volume': volume,
+            'vwap': (high + low + close) / 3,
+            'trade_count': volume // 100,
+        })
+
+
+class SyntheticDataProvider(DataProvider):
+    """DataProvider serving SyntheticMarket bars from memory (no API, no disk)."""
+    
+    def __init__(self, market: SyntheticMarket, cache_dir: Path):
+        """
+        Initialize provider.
+        
+        Args:
+            market: Bar source.
+            cache_dir: Unused cache directory (required by DataProvider).
+        """
+        super().__init__(cache_dir=cache_dir, data_feed="iex")
+        self._market = market
+    
+    def _load_cached(self, symbol: str) -> Optional[pd.DataFrame]:
+        """Return previously generated bars."""
+        return self._cache.get(symbol)
+    
+    def _save_to_cache(self, symbol: str, df: pd.DataFrame) -> None:
+        """Bars are kept in memory by fetch_bars."""
+        return
+    
+    def _fetch_from_alpaca(self, symbols, start, end, timeframe) -> Dict[str, pd.DataFrame]:
+        """Generate bars instead of calling Alpaca."""
+        result = {}
+        for symbol in symbols:
+            df = self._market.bars(symbol)
+            mask = (df['timestamp'] >= start) & (df['timestamp'] <= end)
+            result[symbol] = df[mask].reset_index(drop=True)
+        return result
+
+
+def isolate_workspace(workdir: Path, market: SyntheticMarket) -> None:
+    """
+    Point data/report paths at workdir and install the synthetic provider.
+    
+    Must run before any strategy/regime singletons are created.
+    
+    Args:
+        workdir: Temporary directory.
+        market: Synthetic market to serve.
+    """
+    config = get_config()
+    paths = config.paths
+    paths.data_dir = workdir / "data"
+    paths.reports_dir = workdir / "reports"
+    paths.bars_cache_dir = paths.data_dir / "bars"
+    paths.news_cache_dir = paths.data_dir / "news"
+    for path in (paths.data_dir, paths.reports_dir, paths.bars_cache_dir, paths.news_cache_dir):
+        path.mkdir(parents=True, exist_ok=True)
+    
+    # Sentiment needs network/model downloads and is not a hot path here
+    config.sentiment.mode = "off"
+    
+    set_data_provider(SyntheticDataProvider(market, paths.bars_cache_dir))
+
+
+def machine_info() -> Dict[str, Any]:
+    """Describe the machine and library versions."""
+    import sklearn
+    import hmmlearn
+    
+    return {
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'scikit-learn': sklearn.__version__,
+        'hmmlearn': hmmlearn.__version__,
+    }
+
+
+def _peak_rss_mb() -> float:
+    """Peak resident set size of this process (MB)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _time_case(
+    fn: Callable[[], Any],
+    repeat: int,
+    items: int,
+    trace_memory: bool = False
+) -> Dict[str, Any]:
+    """
+    Time a callable.
+    
+    Args:
+        fn: Work to time.
+        repeat: Number of runs.
+        items: Units of work per run (symbols, calls, ...).
+        trace_memory: Record the tracemalloc high-water mark above the
+            memory in use when the run started (transient allocations).
+    
+    Returns:
+        Dict with per-run seconds, min, median, per-item milliseconds,
+        process peak RSS so far and (if traced) allocation peak. The last
+        run's return value is kept under '_value' for the caller.
+    """
+    runs = []
+    alloc_peak = 0
+    value = None
+    for _ in range(repeat):
+        if trace_memory:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        value = fn()
+        runs.append(time.perf_counter() - start)
+        if trace_memory:
+            alloc_peak = max(alloc_peak, tracemalloc.get_traced_memory()[1] - base)
+    
+    best = min(runs)
+    return {
+        'runs': runs,
+        'seconds_min': best,
+        'seconds_median': statistics.median(runs),
+        'items': items,
+        'per_item_ms': best / items * 1000 if items else None,
+        'peak_rss_mb': _peak_rss_mb(),
+        'alloc_peak_mb': alloc_peak / 1024 / 1024 if trace_memory else None,
+        '_value': value,
+    }
+
+
+def run_benchmarks(params: BenchmarkParams) -> Dict[str, Any]:
+    """
+    Run all benchmark cases in an isolated workspace.
+    
+    Args:
+        params: Benchmark dimensions.
+    
+    Returns:
+        Result document (params, machine info, per-case timings).
+    """
+    # Imported here so isolate_workspace() runs before their singletons exist
+    from indicators import compute_indicators_for_df
+    from regime_hmm import RegimeModel
+    from strategy import TradingStrategy
+    from backtester import Backtester
+    
+    end = datetime.strptime(params.end_date, "%Y-%m-%d")
+    hmm_years = get_config().hmm.lookback_years
+    # Extra history for indicator warmup / HMM lookback
+    market = SyntheticMarket(end, max(params.years, hmm_years) + 2, params.seed)
+    symbols = SyntheticMarket.symbols(params.n_symbols)
+    
+    results: Dict[str, Any] = {}
+    trace = params.trace_memory
+    if trace:
+        tracemalloc.start()
+    
+    with tempfile.TemporaryDirectory(prefix="tradingbot_bench_") as tmp:
+        isolate_workspace(Path(tmp), market)
+        get_config().backtest.compact_memory = params.compact
+        
+        # Data preparation first, so its peak RSS is not masked by later cases
+        prep_end = end - timedelta(days=1)
+        prep_start = prep_end - timedelta(days=int(params.years * 365.25))
+        
+        def prepare_case():
+            Backtester(initial_capital=100000.0)._prepare_data(symbols + ["SPY"], prep_start, prep_end)
+        
+        results['prepare_data'] = _time_case(prepare_case, 1, len(symbols) + 1, trace)
+        # Fresh provider so later cases do not inherit its in-memory bars
+        set_data_provider(SyntheticDataProvider(market, get_config().paths.bars_cache_dir))
+        
+        start = pd.Timestamp(end - timedelta(days=int(params.years * 365.25)), tz="UTC")
+        gen_start = time.perf_counter()
+        raw = {}
+        for symbol in symbols:
+            df = market.bars(symbol)
+            raw[symbol] = df[df['timestamp'] >= start].reset_index(drop=True)
+        spy = market.bars("SPY")
+        logger.info(
+            f"Generated {len(symbols)} symbols x {len(raw[symbols[0]])} bars "
+            f"in {time.perf_counter() - gen_start:.1f}s"
+        )
+        
+        # Indicators over every full history
+        prepared: Dict[str, pd.DataFrame] = {}
+        
+        def indicators_case():
+            for symbol, df in raw.items():
+                prepared[symbol] = compute_indicators_for_df(df)
+        
+        results['indicators'] = _time_case(indicators_case, params.repeat, len(raw), trace)
+        
+        # Regime fit + prediction on the proxy
+        model = RegimeModel()
+        results['regime_fit'] = _time_case(lambda: model.fit(spy), 1, 1, trace)
+        
+        def predict_case():
+            for _ in range(params.predict_calls):
+                model.predict(spy)
+        
+        results['regime_predict'] = _time_case(predict_case, params.repeat, params.predict_calls, trace)
+        
+        # One universe scan on the last bar
+        strategy = TradingStrategy()
+        strategy.initialize()
+        scan_date = prepared[symbols[0]]['timestamp'].iloc[-1].to_pydatetime()
+        results['universe_scan'] = _time_case(
+            lambda: strategy.scan_universe(prepared, scan_date),
+            params.repeat,
+            len(prepared),
+            trace
+        )
+        
+        # Full backtest on a sub-universe
+        bt_symbols = symbols[:params.backtest_symbols]
+        bt_end = end - timedelta(days=1)
+        bt_start = bt_end - timedelta(days=int(params.backtest_years * 365.25))
+        
+        def backtest_case():
+            return Backtester(initial_capital=100000.0).run(bt_symbols, bt_start, bt_end)
+        
+        results['backtest'] = _time_case(backtest_case, 1, len(bt_symbols) + 1, trace)
+        profile = results['backtest']['_value'].profile
+        results['backtest']['stages'] = dict(zip(profile.stages['stage'], profile.stages['total_sec']))
+    
+    if trace:
+        tracemalloc.stop()
+    for result in results.values():
+        result.pop('_value', None)
+    
+    return {
+        'version': BENCHMARK_VERSION,
+        'created': utc_now().isoformat(),
+        'params': asdict(params),
+        'machine': machine_info(),
+        'peak_rss_mb': _peak_rss_mb(),
+        'results': results,
+    }
+
+
+def compare_to_baseline(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD
+) -> List[Dict[str, Any]]:
+    """
+    Compare best-of-N timings against a baseline.
+    
+    Args:
+        current: Result document from run_benchmarks.
+        baseline: Stored result document.
+        threshold: Allowed slowdown fraction before flagging a regression.
+    
+    Returns:
+        List of per-case rows with ratio and regression flag.
+    """
+    cur_params = {k: v for k, v in current['params'].items() if k not in ('end_date', 'repeat')}
+    base_params = {k: v for k, v in baseline.get('params', {}).items() if k not in ('end_date', 'repeat')}
+    if cur_params != base_params:
+        logger.warning(f"Benchmark params differ from baseline: {base_params} vs {cur_params}")
+    
+    rows = []
+    for name, result in current['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if base is None:
+            continue
+        ratio = result['seconds_min'] / base['seconds_min'] if base['seconds_min'] > 0 else float('inf')
+        rows.append({
+            'case': name,
+            'baseline_sec': base['seconds_min'],
+            'current_sec': result['seconds_min'],
+            'ratio': ratio,
+            'regression': ratio > 1 + threshold,
+        })
+    return rows
+
+
+def print_benchmark(current: Dict[str, Any], comparison: Optional[List[Dict[str, Any]]] = None) -> None:
+    """
+    Print benchmark results (and baseline comparison) to console.
+    
+    Args:
+        current: Result document.
+        comparison: Optional output of compare_to_baseline.
+    """
+    params = current['params']
+    print("\n" + "=" * 72)
+    mode = ", compact" if params.get('compact') else ""
+    print(f"BENCHMARK ({params['n_symbols']} symbols x {params['years']}y, "
+          f"backtest {params['backtest_symbols']} x {params['backtest_years']}y{mode})")
+    print("=" * 72)
+    print(f"{'Case':<16} {'Best (s)':>10} {'Median (s)':>11} {'Items':>7} {'ms/item':>10} {'RSS (MB)':>10}")
+    print("-" * 72)
+    for name, r in current['results'].items():
+        per_item = f"{r['per_item_ms']:.3f}" if r['per_item_ms'] is not None else "-"
+        rss = f"{r['peak_rss_mb']:,.0f}" if r.get('peak_rss_mb') is not None else "-"
+        alloc = f"  alloc peak {r['alloc_peak_mb']:,.1f} MB" if r.get('alloc_peak_mb') is not None else ""
+        print(f"{name:<16} {r['seconds_min']:>10.3f} {r['seconds_median']:>11.3f} {r['items']:>7} {per_item:>10} {rss:>10}{alloc}")
+        for stage, seconds in r.get('stages', {}).items():
+            print(f"  {stage:<14} {seconds:>10.3f}")
+    print(f"Peak RSS: {current['peak_rss_mb']:,.0f} MB")
+    
+    if comparison:
+        print("-" * 72)
+        print(f"{'Case':<16} {'Baseline (s)':>12} {'Current (s)':>12} {'Ratio':>8}")
+        for row in comparison:
+            flag = "  REGRESSION" if row['regression'] else ""
+            print(f"{row['case']:<16} {row['baseline_sec']:>12.3f} {row['current_sec']:>12.3f} {row['ratio']:>8.2f}{flag}")
+    print("=" * 72 + "\n")
+
+
+def load_results(path: Path) -> Dict[str, Any]:
+    """Load a benchmark result document."""
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_results(results: Dict[str, Any], path: Path) -> None:
+    """Write a benchmark result document."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
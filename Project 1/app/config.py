@@ -44,6 +44,12 @@ class AlpacaConfig:
     base_url_data: Optional[str] = field(
         default_factory=lambda: os.getenv("BASE_URL_DATA")
     )
+    # Request scheduler: token bucket per endpoint class (trading API / data API)
+    trading_rate_per_min: int = field(default_factory=lambda: _get_int_env("ALPACA_TRADING_RATE_PER_MIN", 200))
+    data_rate_per_min: int = field(default_factory=lambda: _get_int_env("ALPACA_DATA_RATE_PER_MIN", 200))
+    rate_burst: int = field(default_factory=lambda: _get_int_env("ALPACA_RATE_BURST", 10))
+    max_retries: int = field(default_factory=lambda: _get_int_env("ALPACA_MAX_RETRIES", 3))
+    retry_backoff_sec: float = field(default_factory=lambda: _get_float_env("ALPACA_RETRY_BACKOFF", 1.0))
     
     def __post_init__(self) -> None:
         """Validate configuration."""
@@ -64,6 +70,11 @@ class HMMConfig:
     use_rolling_window: bool = field(default_factory=lambda: _get_bool_env("HMM_ROLLING_WINDOW", False))
     rolling_window_days: int = field(default_factory=lambda: _get_int_env("HMM_ROLLING_WINDOW_DAYS", 504))
     market_proxy: str = "SPY"
+    # Random restarts per fit (plus one warm start from the persisted model)
+    n_restarts: int = field(default_factory=lambda: _get_int_env("HMM_RESTARTS", 4))
+    # Walk-forward refitting in backtests (no lookahead in regime labels)
+    walk_forward: bool = field(default_factory=lambda: _get_bool_env("HMM_WALK_FORWARD", True))
+    refit_workers: int = field(default_factory=lambda: _get_int_env("HMM_REFIT_WORKERS", 0))  # 0 = CPU count (fits and refits)
     # Probability thresholds for regime confirmation
     bull_prob_threshold: float = field(default_factory=lambda: _get_float_env("BULL_PROB_THRESHOLD", 0.60))
     bear_prob_threshold: float = field(default_factory=lambda: _get_float_env("BEAR_PROB_THRESHOLD", 0.60))
@@ -142,6 +153,17 @@ class BacktestConfig:
     initial_capital: float = field(default_factory=lambda: _get_float_env("INITIAL_CAPITAL", 100000.0))
     fee_rate: float = field(default_factory=lambda: _get_float_env("FEE_RATE", 0.001))  # 0.1% per side
     min_symbol_bars: int = field(default_factory=lambda: _get_int_env("MIN_SYMBOL_BARS", 400))
+    # Large-universe memory mode: float32 panels, chunked data preparation
+    compact_memory: bool = field(default_factory=lambda: _get_bool_env("BACKTEST_COMPACT_MEMORY", False))
+    prep_chunk_size: int = field(default_factory=lambda: _get_int_env("BACKTEST_PREP_CHUNK", 250))
+    # Monte Carlo robustness analysis
+    mc_resamples: int = field(default_factory=lambda: _get_int_env("MC_RESAMPLES", 10000))
+    mc_block_days: int = field(default_factory=lambda: _get_int_env("MC_BLOCK_DAYS", 20))
+    mc_skip_prob: float = field(default_factory=lambda: _get_float_env("MC_SKIP_PROB", 0.10))
+    mc_confidence: float = field(default_factory=lambda: _get_float_env("MC_CONFIDENCE", 0.95))
+    # Report outputs: equity/trades as "csv", "parquet" or "both"; plot "sync", "background" or "off"
+    report_format: str = field(default_factory=lambda: os.getenv("REPORT_FORMAT", "csv").lower())
+    report_plot: str = field(default_factory=lambda: os.getenv("REPORT_PLOT", "sync").lower())
 
 
 @dataclass
@@ -153,6 +175,14 @@ class APIConfig:
         default_factory=lambda: os.getenv("CORS_ORIGINS", "http://localhost:3000,http://localhost:5173").split(",")
     )
     reload: bool = field(default_factory=lambda: _get_bool_env("API_RELOAD", False))
+    # Upstream snapshot behind /api/dashboard/summary is shared for this long
+    summary_cache_ttl_sec: float = field(default_factory=lambda: _get_float_env("API_SUMMARY_TTL", 5.0))
+    # Local activity ledger (data/activities.db) behind the transactions endpoint
+    activity_sync_sec: float = field(default_factory=lambda: _get_float_env("ACTIVITY_SYNC_SEC", 15.0))
+    activity_backfill_days: int = field(default_factory=lambda: _get_int_env("ACTIVITY_BACKFILL_DAYS", 365))
+    # Shared poller behind the /api/stream live feed (runs only while clients are connected)
+    stream_interval_sec: float = field(default_factory=lambda: _get_float_env("API_STREAM_INTERVAL", 3.0))
+    stream_heartbeat_sec: float = field(default_factory=lambda: _get_float_env("API_STREAM_HEARTBEAT", 15.0))
 
 
 @dataclass
@@ -201,6 +231,10 @@ class LiveConfig:
     daily_run_time: str = field(default_factory=lambda: os.getenv("LIVE_RUN_TIME", "09:35"))
     mode: str = field(default_factory=lambda: os.getenv("LIVE_MODE", "interval"))  # "scheduled" or "interval"
     run_once_default: bool = field(default_factory=lambda: _get_bool_env("LIVE_RUN_ONCE_DEFAULT", False))
+    # Scan pipeline: news/sentiment overlaps the technical scan, orders go through a small pool
+    sentiment_workers: int = field(default_factory=lambda: _get_int_env("LIVE_SENTIMENT_WORKERS", 4))
+    order_workers: int = field(default_factory=lambda: _get_int_env("LIVE_ORDER_WORKERS", 2))
+    order_rate_per_sec: float = field(default_factory=lambda: _get_float_env("LIVE_ORDER_RATE", 3.0))
 
 
 @dataclass
@@ -14,12 +14,40 @@ from alpaca.data.requests import StockBarsRequest
 from alpaca.data.timeframe import TimeFrame
 
 from config import get_config, PathConfig
-from alpaca_clients import get_data_client, get_data_feed
+from alpaca_clients import get_client_manager, get_data_feed
 from utils import utc_now, years_ago, ensure_tz_aware, ensure_utc
 
 logger = logging.getLogger("tradingbot.data_provider")
 
 
+def slice_date_range(
+    df: pd.DataFrame,
+    start: datetime,
+    end: datetime
+) -> pd.DataFrame:
+    """
+    Rows with start <= timestamp <= end, without copying.
+    
+    Sorted frames are sliced positionally (a Copy-on-Write view of the
+    input); unsorted frames fall back to a boolean mask.
+    
+    Args:
+        df: Bar DataFrame with a UTC timestamp column.
+        start: Range start (UTC-aware).
+        end: Range end (UTC-aware).
+    
+    Returns:
+        DataFrame with rows in range. Treat as read-only.
+    """
+    ts = df["timestamp"]
+    if not ts.is_monotonic_increasing:
+        return df[(ts >= start) & (ts <= end)]
+    
+    lo = ts.searchsorted(pd.Timestamp(start), side="left")
+    hi = ts.searchsorted(pd.Timestamp(end), side="right")
+    return df.iloc[lo:hi]
+
+
 class DataProvider:
     """
     Provider for historical stock bar data with local caching.
@@ -140,9 +168,8 @@ class DataProvider:
             if use_cache:
                 cached = self._load_cached(symbol)
                 if cached is not None and not cached.empty:
-                    # Filter to requested date range
-                    mask = (cached["timestamp"] >= start) & (cached["timestamp"] <= end)
-                    filtered = cached[mask].copy()
+                    # Filter to requested date range (view, shared read-only)
+                    filtered = slice_date_range(cached, start, end)
                     
                     # Check if we need to fetch more recent data
                     if not filtered.empty:
@@ -176,8 +203,7 @@ class DataProvider:
                     self._cache[symbol] = combined
                     
                     # Filter to requested range for result (start/end already UTC-aware)
-                    mask = (combined["timestamp"] >= start) & (combined["timestamp"] <= end)
-                    result[symbol] = combined[mask].copy()
+                    result[symbol] = slice_date_range(combined, start, end)
                 else:
                     result[symbol] = pd.DataFrame()
         
@@ -203,7 +229,7 @@ class DataProvider:
             Dict mapping symbol to DataFrame.
         """
         result: Dict[str, pd.DataFrame] = {}
-        client = get_data_client()
+        client_manager = get_client_manager()
         
         # Batch symbols for efficiency (Alpaca allows multiple symbols per request)
         batch_size = 100  # Alpaca limit
@@ -219,7 +245,7 @@ class DataProvider:
                     feed=self._data_feed
                 )
                 
-                bars = client.get_stock_bars(request)
+                bars = client_manager.get_stock_bars(request)
                 
                 # Convert to DataFrames
                 for symbol in batch:
@@ -257,7 +283,7 @@ class DataProvider:
                             timeframe=timeframe,
                             feed=self._data_feed
                         )
-                        single_bars = client.get_stock_bars(single_request)
+                        single_bars = client_manager.get_stock_bars(single_request)
                         
                         if symbol in single_bars.data and single_bars.data[symbol]:
                             records = []
@@ -350,6 +376,16 @@ class DataProvider:
         
         return df
     
+    def release(self, symbols: List[str]) -> None:
+        """
+        Drop in-memory bars for symbols (parquet cache is kept).
+        
+        Args:
+            symbols: Symbols to evict.
+        """
+        for symbol in symbols:
+            self._cache.pop(symbol, None)
+    
     def clear_cache(self, symbol: Optional[str] = None) -> None:
         """
         Clear cached data.
@@ -387,6 +423,17 @@ def get_data_provider() -> DataProvider:
     return _provider
 
 
+def set_data_provider(provider: Optional[DataProvider]) -> None:
+    """
+    Replace the global data provider (e.g. synthetic data for benchmarks).
+    
+    Args:
+        provider: Provider to install (None = recreate default on next use).
+    """
+    global _provider
+    _provider = provider
+
+
 def fetch_universe_bars(
     symbols: List[str],
     lookback_days: int = 600
@@ -273,8 +273,11 @@ class TechnicalIndicators:
             DataFrame with added indicator columns:
             rsi, macd, macd_signal, macd_hist, atr, macd_bullish_cross, macd_bearish_cross,
             sma_fast, sma_slow
+        
+        The input is never modified; the result shares its OHLCV columns
+        (shallow copy, Copy-on-Write).
         """
-        result = df.copy()
+        result = df.copy(deep=False)
         
         # RSI
         result['rsi'] = calculate_rsi(df['close'], self._config.rsi_period)
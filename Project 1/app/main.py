@@ -6,6 +6,8 @@ Provides commands for:
 - Running backtests
 - Starting the API server
 - Running the live trading bot
+- Converting a legacy pickled HMM model
+- Benchmarking hot paths on synthetic data
 """
 
 import argparse
@@ -29,7 +31,7 @@ def run_backtest(args) -> None:
         args: Parsed command line arguments.
     """
     from backtester import Backtester
-    from reporting import print_summary, generate_reports
+    from reporting import print_summary, print_profile, print_robustness, generate_reports
     from universe import get_universe_with_proxy
     
     logger = logging.getLogger("tradingbot.main")
@@ -54,15 +56,29 @@ def run_backtest(args) -> None:
     logger.info(f"Initial capital: ${args.capital:,.2f}")
     
     # Run backtest
-    backtester = Backtester(initial_capital=args.capital)
+    backtester = Backtester(initial_capital=args.capital, profile=args.profile)
     result = backtester.run(symbols, start_date, end_date)
     
     # Print summary
     print_summary(result)
+    print_profile(result)
+    
+    # Monte Carlo robustness
+    robustness = None
+    if args.monte_carlo:
+        from robustness import run_robustness
+        robustness = run_robustness(result, n_resamples=args.mc_resamples)
+        print_robustness(robustness)
     
     # Generate reports
     if not args.no_reports:
-        files = generate_reports(result, prefix=args.prefix or "backtest")
+        files = generate_reports(
+            result,
+            prefix=args.prefix or "backtest",
+            robustness=robustness,
+            report_format=args.report_format,
+            plot=args.plot
+        )
         logger.info(f"Reports saved to: {list(files.values())}")
 
 
@@ -97,6 +113,7 @@ def run_live(args) -> None:
     from portfolio import LivePortfolioManager
     from alpaca_clients import get_client_manager
     from universe import get_universe_with_proxy
+    from scan_pipeline import ScanPipeline
     from api_server import update_bot_state
     
     logger = logging.getLogger("tradingbot.main")
@@ -137,104 +154,128 @@ def run_live(args) -> None:
     
     logger.info(f"Bot initialized with {len(symbols)} symbols (took {init_duration:.1f}s)")
     
+    pipeline = ScanPipeline(
+        strategy,
+        data_provider,
+        portfolio_manager,
+        symbols,
+        dry_run=args.dry_run
+    )
+    
     def run_scan():
-        """Execute one scan cycle with timing."""
-        tick_start = time.time()
+        """Execute one scan cycle (staged pipeline, per-stage latency logged)."""
         logger.info("=" * 60)
         logger.info(f"LIVE TICK start at {datetime.now().strftime('%H:%M:%S')}")
         update_bot_state(scan_time=utc_now())
         
         try:
-            # Step 1: Fetch latest data
-            step_start = time.time()
-            symbol_data = data_provider.get_latest_bars(symbols)
-            bars_duration = time.time() - step_start
-            logger.info(f"Fetched {len(symbol_data)} symbols ({bars_duration:.1f}s)")
-            
-            # Step 2: Get regime
-            step_start = time.time()
-            regime, bull, bear, side = strategy._regime_detector.get_current_regime()
-            regime_duration = time.time() - step_start
-            logger.info(f"Regime: {regime.value} (bull={bull:.2f}, bear={bear:.2f}, side={side:.2f}) ({regime_duration:.1f}s)")
-            
-            # Step 3: Generate signals
-            step_start = time.time()
-            signals = strategy.get_actionable_signals(symbol_data, utc_now())
-            signals_duration = time.time() - step_start
-            logger.info(f"Generated {len(signals)} signals ({signals_duration:.1f}s)")
-            
+            pipeline.run()
             update_bot_state(decision_time=utc_now())
-            
-            # Step 4: Execute signals
-            step_start = time.time()
-            orders_placed = 0
-            for signal in signals:
-                logger.info(
-                    f"Signal: {signal.signal_type.value.upper()} {signal.symbol} | "
-                    f"RSI={signal.rsi:.1f if signal.rsi else 0} | "
-                    f"Sentiment={signal.sentiment_str}"
-                )
-                
-                if not args.dry_run:
-                    side = "buy" if signal.signal_type.value == "long" else "sell"
-                    
-                    # Calculate position size
-                    equity = portfolio_manager.get_account_equity()
-                    position_value = equity * (config.risk.max_position_pct / 100) * 0.5
-                    
-                    # Get current price
-                    df = symbol_data.get(signal.symbol)
-                    if df is not None and not df.empty:
-                        price = float(df['close'].iloc[-1])
-                        qty = int(position_value / price)
-                        
-                        if qty > 0:
-                            success, msg, order_id = portfolio_manager.place_order(
-                                signal.symbol, side, qty
-                            )
-                            if success:
-                                logger.info(f"Order placed: {side} {qty} {signal.symbol}")
-                                orders_placed += 1
-                            else:
-                                logger.error(f"Order failed: {msg}")
-                else:
-                    logger.info(f"DRY RUN: Would {signal.signal_type.value} {signal.symbol}")
-            
-            orders_duration = time.time() - step_start
-            
-            # Summary
-            tick_duration = time.time() - tick_start
-            logger.info(
-                f"LIVE TICK complete | "
-                f"signals={len(signals)}, orders={orders_placed} | "
-                f"total={tick_duration:.1f}s (bars={bars_duration:.1f}s, regime={regime_duration:.1f}s, "
-                f"signals={signals_duration:.1f}s, orders={orders_duration:.1f}s)"
-            )
-            
+            logger.info(client_manager.scheduler.summary())
         except Exception as e:
             logger.error(f"Error in scan cycle: {e}", exc_info=True)
     
     # Run mode
-    if run_once:
-        # Single run
-        logger.info("Running single scan (--once mode)")
-        run_scan()
-        logger.info("Single scan complete, exiting")
+    try:
+        if run_once:
+            # Single run
+            logger.info("Running single scan (--once mode)")
+            run_scan()
+            logger.info("Single scan complete, exiting")
+        else:
+            # Continuous loop
+            logger.info(f"Starting continuous loop (interval: {interval_seconds} seconds)")
+            
+            while True:
+                try:
+                    run_scan()
+                    logger.info(f"Sleeping for {interval_seconds} seconds...")
+                    time.sleep(interval_seconds)
+                except KeyboardInterrupt:
+                    logger.info("Interrupted by user")
+                    break
+                except Exception as e:
+                    logger.error(f"Error in main loop: {e}", exc_info=True)
+                    time.sleep(60)  # Wait before retry
+    finally:
+        pipeline.close()
+
+
+def run_convert_hmm(args) -> None:
+    """
+    Convert a legacy pickled HMM model to the .npz format.
+    
+    Args:
+        args: Parsed command line arguments.
+    """
+    from pathlib import Path
+    from regime_hmm import convert_pickle_model
+    
+    logger = logging.getLogger("tradingbot.main")
+    
+    npz_path = convert_pickle_model(
+        Path(args.input) if args.input else None,
+        Path(args.output) if args.output else None
+    )
+    logger.info(f"HMM model written to: {npz_path}")
+
+
+def run_bench(args) -> None:
+    """
+    Run benchmark command.
+    
+    Args:
+        args: Parsed command line arguments.
+    """
+    from pathlib import Path
+    
+    # Benchmarks never call Alpaca; placeholders satisfy config validation
+    os.environ.setdefault("ALPACA_API_KEY", "benchmark")
+    os.environ.setdefault("ALPACA_SECRET_KEY", "benchmark")
+    
+    from config import get_config
+    from benchmark import (
+        BenchmarkParams, DEFAULT_BASELINE_PATH, run_benchmarks, compare_to_baseline,
+        print_benchmark, load_results, save_results
+    )
+    
+    logger = logging.getLogger("tradingbot.main")
+    
+    output = Path(args.output) if args.output else (
+        get_config().paths.reports_dir / f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    baseline_path = Path(args.baseline) if args.baseline else DEFAULT_BASELINE_PATH
+    
+    params = BenchmarkParams(
+        n_symbols=args.symbols,
+        years=args.years,
+        backtest_symbols=min(args.backtest_symbols, args.symbols),
+        backtest_years=args.backtest_years,
+        repeat=args.repeat,
+        compact=args.compact,
+        trace_memory=args.trace_memory
+    )
+    results = run_benchmarks(params)
+    save_results(results, output)
+    logger.info(f"Benchmark results saved to: {output}")
+    
+    if args.save_baseline:
+        save_results(results, baseline_path)
+        logger.info(f"Baseline updated: {baseline_path}")
+        print_benchmark(results)
+        return
+    
+    comparison = None
+    if baseline_path.exists():
+        comparison = compare_to_baseline(results, load_results(baseline_path), args.threshold)
     else:
-        # Continuous loop
-        logger.info(f"Starting continuous loop (interval: {interval_seconds} seconds)")
-        
-        while True:
-            try:
-                run_scan()
-                logger.info(f"Sleeping for {interval_seconds} seconds...")
-                time.sleep(interval_seconds)
-            except KeyboardInterrupt:
-                logger.info("Interrupted by user")
-                break
-            except Exception as e:
-                logger.error(f"Error in main loop: {e}", exc_info=True)
-                time.sleep(60)  # Wait before retry
+        logger.warning(f"No baseline at {baseline_path} (use --save-baseline)")
+    
+    print_benchmark(results, comparison)
+    
+    if comparison and any(row['regression'] for row in comparison):
+        logger.error(f"Performance regression beyond {args.threshold:.0%} of baseline")
+        sys.exit(2)
 
 
 def main():
@@ -258,6 +299,12 @@ Examples:
   
   # Run live bot continuously
   python main.py live
+  
+  # Convert data/hmm_model.pkl to data/hmm_model.npz
+  python main.py convert-hmm
+  
+  # Benchmark hot paths on synthetic data and compare to the stored baseline
+  python main.py bench --symbols 500 --years 10
         """
     )
     
@@ -302,6 +349,31 @@ Examples:
         action="store_true",
         help="Skip report generation"
     )
+    bt_parser.add_argument(
+        "--report-format",
+        choices=["csv", "parquet", "both"],
+        help="Equity curve / trades format (default: REPORT_FORMAT or csv)"
+    )
+    bt_parser.add_argument(
+        "--plot",
+        choices=["sync", "background", "off"],
+        help="Equity plot: render inline, in a background process, or skip (default: REPORT_PLOT or sync)"
+    )
+    bt_parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Collect cProfile stats and peak memory (slower)"
+    )
+    bt_parser.add_argument(
+        "--monte-carlo",
+        action="store_true",
+        help="Run Monte Carlo robustness analysis on the result"
+    )
+    bt_parser.add_argument(
+        "--mc-resamples",
+        type=int,
+        help="Resamples per scenario (default: MC_RESAMPLES or 10000)"
+    )
     bt_parser.set_defaults(func=run_backtest)
     
     # API command
@@ -334,6 +406,85 @@ Examples:
     )
     live_parser.set_defaults(func=run_live)
     
+    # Convert HMM command
+    convert_parser = subparsers.add_parser("convert-hmm", help="Convert pickled HMM model to .npz")
+    convert_parser.add_argument(
+        "--input", "-i",
+        type=str,
+        help="Pickled model path (default: data/hmm_model.pkl)"
+    )
+    convert_parser.add_argument(
+        "--output", "-o",
+        type=str,
+        help="Output .npz path (default: data/hmm_model.npz)"
+    )
+    convert_parser.set_defaults(func=run_convert_hmm)
+    
+    # Benchmark command
+    bench_parser = subparsers.add_parser("bench", help="Benchmark hot paths on synthetic data")
+    bench_parser.add_argument(
+        "--symbols",
+        type=int,
+        default=50,
+        help="Synthetic universe size, 50-5000 (default: 50)"
+    )
+    bench_parser.add_argument(
+        "--years",
+        type=int,
+        default=5,
+        help="Years of history per symbol, 1-20 (default: 5)"
+    )
+    bench_parser.add_argument(
+        "--backtest-symbols",
+        type=int,
+        default=10,
+        help="Symbols in the full backtest case (default: 10)"
+    )
+    bench_parser.add_argument(
+        "--backtest-years",
+        type=int,
+        default=1,
+        help="Years simulated in the full backtest case (default: 1)"
+    )
+    bench_parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Runs per case, best is reported (default: 3)"
+    )
+    bench_parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Use the large-universe memory mode (float32, chunked preparation)"
+    )
+    bench_parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="Record per-case allocation peaks with tracemalloc (slower)"
+    )
+    bench_parser.add_argument(
+        "--output", "-o",
+        type=str,
+        help="Result JSON path (default: reports/benchmark_<timestamp>.json)"
+    )
+    bench_parser.add_argument(
+        "--baseline",
+        type=str,
+        help="Baseline JSON path (default: benchmarks/baseline.json)"
+    )
+    bench_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.20,
+        help="Allowed slowdown vs baseline before failing (default: 0.20)"
+    )
+    bench_parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Store this run as the new baseline"
+    )
+    bench_parser.set_defaults(func=run_bench)
+    
     # Parse args
     args = parser.parse_args()
     
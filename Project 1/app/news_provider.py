@@ -16,6 +16,8 @@ and the strategy handles this via sentiment mode configuration.
 
 import logging
 import socket
+import threading
+from contextlib import contextmanager
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional, Any
@@ -34,6 +36,37 @@ logger = logging.getLogger("tradingbot.news_provider")
 # Track if we've shown the RSS historical notice
 _rss_notice_shown = False
 
+# The socket default timeout is process-wide; concurrent RSS fetches share it
+_timeout_lock = threading.Lock()
+_timeout_users = 0
+_timeout_saved: Optional[float] = None
+
+
+@contextmanager
+def _socket_timeout(seconds: float):
+    """
+    Apply a default socket timeout while any RSS fetch is in flight.
+    
+    The first fetch sets it and the last one restores the previous value, so
+    overlapping fetches from worker threads never reset each other's timeout.
+    
+    Args:
+        seconds: Timeout in seconds.
+    """
+    global _timeout_users, _timeout_saved
+    with _timeout_lock:
+        if _timeout_users == 0:
+            _timeout_saved = socket.getdefaulttimeout()
+            socket.setdefaulttimeout(seconds)
+        _timeout_users += 1
+    try:
+        yield
+    finally:
+        with _timeout_lock:
+            _timeout_users -= 1
+            if _timeout_users == 0:
+                socket.setdefaulttimeout(_timeout_saved)
+
 
 @dataclass
 class NewsArticle:
@@ -230,73 +263,65 @@ class RSSNewsProvider:
             logger.warning("feedparser not installed - run: pip install feedparser")
             return []
         
-        # Set socket timeout
-        timeout_sec = self._config.timeout_sec
-        old_timeout = socket.getdefaulttimeout()
-        socket.setdefaulttimeout(timeout_sec)
-        
         articles: List[NewsArticle] = []
         keywords = self._get_symbol_keywords(symbol)
         
         try:
-            for feed_url in self._config.feeds:
-                try:
-                    # Some feeds support symbol substitution
-                    url = feed_url.format(symbol=symbol)
-                    feed = feedparser.parse(url)
-                    
-                    if not feed.entries:
-                        continue
-                    
-                    for entry in feed.entries[:limit * 2]:  # Fetch extra, filter later
-                        # Parse date
-                        published = None
-                        if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                            try:
-                                published = datetime(*entry.published_parsed[:6], tzinfo=timezone.utc)
-                            except:
-                                continue
-                        elif hasattr(entry, 'updated_parsed') and entry.updated_parsed:
-                            try:
-                                published = datetime(*entry.updated_parsed[:6], tzinfo=timezone.utc)
-                            except:
-                                continue
-                        else:
-                            # Use current time if no date
-                            published = utc_now()
-                        
-                        # Filter by keywords
-                        title = entry.get('title', '')
-                        summary = entry.get('summary', entry.get('description', ''))
-                        text = f"{title} {summary}".lower()
+            with _socket_timeout(self._config.timeout_sec):
+                for feed_url in self._config.feeds:
+                    try:
+                        # Some feeds support symbol substitution
+                        url = feed_url.format(symbol=symbol)
+                        feed = feedparser.parse(url)
                         
-                        # Check if any keyword matches
-                        if not any(kw.lower() in text for kw in keywords):
+                        if not feed.entries:
                             continue
                         
-                        article = NewsArticle(
-                            id=hashlib.md5(entry.get('link', title).encode()).hexdigest()[:16],
-                            symbol=symbol,
-                            created_at=published,
-                            headline=title[:200] if title else "",
-                            summary=summary[:500] if summary else "",
-                            url=entry.get('link', ''),
-                            source='rss'
-                        )
-                        articles.append(article)
-                        
-                except Exception as e:
-                    logger.debug(f"RSS feed error for {feed_url}: {e}")
-                    continue
+                        for entry in feed.entries[:limit * 2]:  # Fetch extra, filter later
+                            # Parse date
+                            published = None
+                            if hasattr(entry, 'published_parsed') and entry.published_parsed:
+                                try:
+                                    published = datetime(*entry.published_parsed[:6], tzinfo=timezone.utc)
+                                except:
+                                    continue
+                            elif hasattr(entry, 'updated_parsed') and entry.updated_parsed:
+                                try:
+                                    published = datetime(*entry.updated_parsed[:6], tzinfo=timezone.utc)
+                                except:
+                                    continue
+                            else:
+                                # Use current time if no date
+                                published = utc_now()
+                            
+                            # Filter by keywords
+                            title = entry.get('title', '')
+                            summary = entry.get('summary', entry.get('description', ''))
+                            text = f"{title} {summary}".lower()
+                            
+                            # Check if any keyword matches
+                            if not any(kw.lower() in text for kw in keywords):
+                                continue
+                            
+                            article = NewsArticle(
+                                id=hashlib.md5(entry.get('link', title).encode()).hexdigest()[:16],
+                                symbol=symbol,
+                                created_at=published,
+                                headline=title[:200] if title else "",
+                                summary=summary[:500] if summary else "",
+                                url=entry.get('link', ''),
+                                source='rss'
+                            )
+                            articles.append(article)
+                    
+                    except Exception as e:
+                        logger.debug(f"RSS feed error for {feed_url}: {e}")
+                        continue
         
         except Exception as e:
             logger.warning(f"RSS fetch failed for {symbol}: {e}")
             return []
         
-        finally:
-            # Restore original timeout
-            socket.setdefaulttimeout(old_timeout)
-        
         # Deduplicate by headline hash
         seen = set()
         unique_articles = []
@@ -15,7 +15,7 @@ from alpaca.trading.requests import MarketOrderRequest, LimitOrderRequest
 from alpaca.trading.enums import OrderSide, TimeInForce
 
 from config import get_config, RiskConfig
-from alpaca_clients import get_client_manager, get_trading_client
+from alpaca_clients import get_client_manager
 from utils import get_logger, round_shares, safe_divide, clamp
 
 logger = get_logger("portfolio")
@@ -666,8 +666,6 @@ class LivePortfolioManager:
             Tuple of (success, message, order_id).
         """
         try:
-            client = self._client_manager.trading_client
-            
             # Check shortability for sells
             if side == "sell":
                 positions = self.get_positions()
@@ -685,7 +683,7 @@ class LivePortfolioManager:
                 time_in_force=TimeInForce.DAY
             )
             
-            order = client.submit_order(order_request)
+            order = self._client_manager.submit_order(order_request)
             
             logger.info(f"Order placed: {side.upper()} {qty} {symbol}, order_id={order.id}")
             return True, f"Order submitted: {order.id}", str(order.id)
@@ -705,8 +703,7 @@ class LivePortfolioManager:
             Tuple of (success, message).
         """
         try:
-            client = self._client_manager.trading_client
-            client.close_position(symbol)
+            self._client_manager.close_position(symbol)
             logger.info(f"Closed position: {symbol}")
             return True, f"Position closed: {symbol}"
         except Exception as e:
@@ -0,0 +1,214 @@
+"""
+Stage-level profiling for backtests.
+
+Collects wall time and call counts per named stage (cheap enough to stay on
+for every run). Detailed mode additionally runs cProfile and tracemalloc for
+function-level hot spots and peak Python memory.
+
+Stages are inclusive: 'signals' contains the 'indicators', 'regime' and
+'sentiment' time spent while scanning.
+"""
+
+import cProfile
+import io
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Dict, List, Iterator
+
+import pandas as pd
+
+from utils import get_logger
+
+logger = get_logger("profiling")
+
+# Report order (unknown stages are appended after these)
+STAGE_ORDER = [
+    "data_prep",
+    "regime_timeline",
+    "prices",
+    "slicing",
+    "signals",
+    "indicators",
+    "regime",
+    "sentiment",
+    "exits",
+    "entries",
+]
+
+
+@dataclass
+class ProfileReport:
+    """Result of a profiled run."""
+    total_sec: float
+    stages: pd.DataFrame
+    peak_memory_mb: Optional[float] = None
+    cprofile: Optional[cProfile.Profile] = None
+    
+    def top_functions(self, limit: int = 40, sort: str = "cumulative") -> str:
+        """
+        Format the hottest functions from cProfile.
+        
+        Args:
+            limit: Number of rows.
+            sort: pstats sort key.
+        
+        Returns:
+            str: pstats listing (empty if cProfile was not enabled).
+        """
+        if self.cprofile is None:
+            return ""
+        stream = io.StringIO()
+        pstats.Stats(self.cprofile, stream=stream).sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
+    
+    def dump(self, path: Path) -> List[Path]:
+        """
+        Write the stage table (CSV) and, if collected, cProfile stats.
+        
+        Args:
+            path: CSV path; cProfile output uses the same stem (.prof, .txt).
+        
+        Returns:
+            List of written files.
+        """
+        stages = self.stages.copy()
+        stages.loc[len(stages)] = ["total", 1, self.total_sec, self.total_sec * 1000, 100.0]
+        if self.peak_memory_mb is not None:
+            stages['peak_memory_mb'] = self.peak_memory_mb
+        stages.to_csv(path, index=False)
+        files = [path]
+        
+        if self.cprofile is not None:
+            prof_path = path.with_suffix(".prof")
+            self.cprofile.dump_stats(str(prof_path))
+            txt_path = path.with_suffix(".txt")
+            txt_path.write_text(self.top_functions())
+            files.extend([prof_path, txt_path])
+        
+        return files
+
+
+class StageProfiler:
+    """
+    Accumulates wall time per stage between start() and stop().
+    
+    stage() is a no-op when the profiler is not running, so instrumented code
+    pays almost nothing outside backtests.
+    """
+    
+    def __init__(self):
+        """Initialize profiler (inactive)."""
+        self._active = False
+        self._totals: Dict[str, float] = {}
+        self._calls: Dict[str, int] = {}
+        self._started: float = 0.0
+        self._cprofile: Optional[cProfile.Profile] = None
+        self._trace_memory = False
+    
+    @property
+    def active(self) -> bool:
+        """Whether a profiled run is in progress."""
+        return self._active
+    
+    def start(self, detailed: bool = False) -> None:
+        """
+        Begin collecting stage timings.
+        
+        Args:
+            detailed: Also run cProfile and tracemalloc (slows the run).
+        """
+        self._totals = {}
+        self._calls = {}
+        self._active = True
+        self._cprofile = None
+        self._trace_memory = False
+        
+        if detailed:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._trace_memory = True
+            tracemalloc.reset_peak()
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        
+        self._started = time.perf_counter()
+    
+    def stop(self) -> ProfileReport:
+        """
+        Stop collecting and build the report.
+        
+        Returns:
+            ProfileReport with per-stage timings.
+        """
+        total = time.perf_counter() - self._started
+        self._active = False
+        
+        peak_mb = None
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            peak_mb = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+            if self._trace_memory:
+                tracemalloc.stop()
+        
+        names = [s for s in STAGE_ORDER if s in self._totals]
+        names += sorted(s for s in self._totals if s not in STAGE_ORDER)
+        stages = pd.DataFrame(
+            [
+                {
+                    'stage': name,
+                    'calls': self._calls[name],
+                    'total_sec': self._totals[name],
+                    'mean_ms': self._totals[name] / self._calls[name] * 1000,
+                    'pct_of_run': self._totals[name] / total * 100 if total > 0 else 0.0,
+                }
+                for name in names
+            ],
+            columns=['stage', 'calls', 'total_sec', 'mean_ms', 'pct_of_run']
+        )
+        
+        return ProfileReport(
+            total_sec=total,
+            stages=stages,
+            peak_memory_mb=peak_mb,
+            cprofile=self._cprofile
+        )
+    
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Time a block under a stage name.
+        
+        Args:
+            name: Stage name.
+        """
+        if not self._active:
+            yield
+            return
+        
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._totals[name] = self._totals.get(name, 0.0) + time.perf_counter() - start
+            self._calls[name] = self._calls.get(name, 0) + 1
+
+
+# Global profiler instance
+_profiler: Optional[StageProfiler] = None
+
+
+def get_profiler() -> StageProfiler:
+    """
+    Get or create the global stage profiler.
+    
+    Returns:
+        StageProfiler: Global instance.
+    """
+    global _profiler
+    if _profiler is None:
+        _profiler = StageProfiler()
+    return _profiler
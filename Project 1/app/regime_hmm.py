@@ -4,17 +4,19 @@ Hidden Markov Model for market regime identification.
 Uses 3-state GaussianHMM to classify market conditions as Bull, Bear, or Sideways.
 """
 
+import json
 import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Tuple, Dict, List
+from typing import Optional, Tuple, Dict, List, Any
 from enum import Enum
 import pickle
 from pathlib import Path
 
 import numpy as np
 import pandas as pd
-from sklearn.preprocessing import StandardScaler
-from hmmlearn.hmm import GaussianHMM
 
 from config import get_config, HMMConfig
 from data_provider import get_data_provider
@@ -22,6 +24,18 @@ from utils import utc_now
 
 logger = logging.getLogger("tradingbot.regime_hmm")
 
+# Bars dropped from the start of the feature matrix (rolling window warmup)
+FEATURE_WARMUP = 20
+
+# EM settings shared by every HMM fit
+HMM_N_ITER = 200
+HMM_BASE_SEED = 42
+
+# On-disk model format (NumPy .npz, no pickled objects)
+MODEL_FORMAT_VERSION = 1
+MODEL_FILENAME = "hmm_model.npz"
+LEGACY_MODEL_FILENAME = "hmm_model.pkl"
+
 
 class MarketRegime(Enum):
     """Market regime classification."""
@@ -30,6 +44,321 @@ class MarketRegime(Enum):
     SIDEWAYS = "Sideways"
 
 
+def compute_regime_features(df: pd.DataFrame) -> np.ndarray:
+    """
+    Compute HMM features from price data.
+    
+    Every feature is causal (rolling windows over past returns only), so the
+    features of a prefix of ``df`` equal the prefix of the features of ``df``.
+    
+    Args:
+        df: DataFrame with 'close' column.
+    
+    Returns:
+        numpy array of features (n_samples, 3).
+    """
+    close = df['close'].values
+    
+    # Log returns
+    log_returns = np.diff(np.log(close))
+    log_returns = np.insert(log_returns, 0, 0)  # Pad first value
+    
+    # Rolling volatility (20-day)
+    rolling_vol = pd.Series(log_returns).rolling(20).std().fillna(0).values
+    
+    # Rolling mean (10-day)
+    rolling_mean = pd.Series(log_returns).rolling(10).mean().fillna(0).values
+    
+    # Stack features
+    features = np.column_stack([log_returns, rolling_vol, rolling_mean])
+    
+    # Remove initial NaN rows
+    return features[FEATURE_WARMUP:]
+
+
+def label_states_by_return(
+    returns: np.ndarray,
+    states: np.ndarray,
+    n_states: int
+) -> Tuple[Dict[int, MarketRegime], Dict[int, float]]:
+    """
+    Label HMM states based on mean returns.
+    
+    Args:
+        returns: Log return per observation (first feature column).
+        states: Hidden state sequence.
+        n_states: Number of HMM states.
+    
+    Returns:
+        Tuple of (state -> regime map, state -> mean return map).
+    """
+    # Compute mean return for each state
+    state_returns = {}
+    for state in range(n_states):
+        mask = states == state
+        if mask.sum() > 0:
+            state_returns[state] = float(returns[mask].mean())
+        else:
+            state_returns[state] = 0.0
+    
+    # Sort states by return
+    sorted_states = sorted(state_returns.items(), key=lambda x: x[1])
+    
+    # Label states
+    labels = {
+        sorted_states[0][0]: MarketRegime.BEAR,      # Lowest return
+        sorted_states[-1][0]: MarketRegime.BULL,     # Highest return
+    }
+    
+    # Middle state(s) are sideways
+    for state, _ in sorted_states[1:-1]:
+        labels[state] = MarketRegime.SIDEWAYS
+    
+    return labels, state_returns
+
+
+def filtered_state_probabilities(
+    startprob: np.ndarray,
+    transmat: np.ndarray,
+    means: np.ndarray,
+    covars: np.ndarray,
+    features_scaled: np.ndarray
+) -> np.ndarray:
+    """
+    Forward-filtered state probabilities for a full-covariance Gaussian HMM.
+    
+    Row t is P(state_t | x_0..x_t). For the last row this equals the
+    forward-backward posterior, so a single pass yields the "posterior of the
+    last observation" for every prefix of the sequence at once.
+    
+    Args:
+        startprob: Initial state distribution (n_states,).
+        transmat: Transition matrix (n_states, n_states).
+        means: State means (n_states, n_features).
+        covars: Full covariances (n_states, n_features, n_features).
+        features_scaled: Scaled observations (n_samples, n_features).
+    
+    Returns:
+        numpy array of filtered probabilities (n_samples, n_states).
+    """
+    n_samples, n_features = features_scaled.shape
+    n_states = len(startprob)
+    
+    # Gaussian log-likelihood per state via Cholesky factors
+    log_lik = np.empty((n_samples, n_states))
+    for k in range(n_states):
+        chol = np.linalg.cholesky(covars[k])
+        diff = features_scaled - means[k]
+        solved = np.linalg.solve(chol, diff.T)
+        log_det = 2.0 * np.log(np.diag(chol)).sum()
+        log_lik[:, k] = -0.5 * (
+            n_features * np.log(2 * np.pi) + log_det + (solved ** 2).sum(axis=0)
+        )
+    
+    # Scaled forward recursion
+    lik = np.exp(log_lik - log_lik.max(axis=1, keepdims=True))
+    filtered = np.empty((n_samples, n_states))
+    alpha = startprob * lik[0]
+    filtered[0] = alpha / alpha.sum()
+    for t in range(1, n_samples):
+        alpha = (filtered[t - 1] @ transmat) * lik[t]
+        filtered[t] = alpha / alpha.sum()
+    
+    return filtered
+
+
+def fit_hmm_candidate(task: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Fit one GaussianHMM candidate and order its states by mean return.
+    
+    Module-level so it can run in a worker process. After fitting, states are
+    permuted so state 0 has the lowest mean log return and the last state the
+    highest; labels are then identical across restarts and refits.
+    
+    Args:
+        task: Dict with 'features_scaled', 'returns', 'n_states', 'seed',
+            'source' and optional 'warm_params' (startprob/transmat/means/covars).
+    
+    Returns:
+        Dict with 'model', 'source', 'log_likelihood', 'n_iter', 'converged'
+        and 'seconds'.
+    """
+    from hmmlearn.hmm import GaussianHMM
+    
+    start = time.perf_counter()
+    features_scaled = task['features_scaled']
+    warm_params = task.get('warm_params')
+    
+    model = GaussianHMM(
+        n_components=task['n_states'],
+        covariance_type="full",
+        n_iter=HMM_N_ITER,
+        random_state=task['seed'],
+        init_params="" if warm_params else "stmc",
+        verbose=False
+    )
+    if warm_params:
+        model.startprob_ = warm_params['startprob']
+        model.transmat_ = warm_params['transmat']
+        model.means_ = warm_params['means']
+        model.covars_ = warm_params['covars']
+    
+    model.fit(features_scaled)
+    
+    # Relabel: sort states by empirical mean return of their Viterbi path
+    _, state_returns = label_states_by_return(
+        task['returns'], model.predict(features_scaled), task['n_states']
+    )
+    order = np.array(sorted(state_returns, key=state_returns.get))
+    covars = model.covars_[order]
+    model.startprob_ = model.startprob_[order]
+    model.transmat_ = model.transmat_[order][:, order]
+    model.means_ = model.means_[order]
+    model.covars_ = covars
+    
+    return {
+        'model': model,
+        'source': task['source'],
+        'log_likelihood': float(model.score(features_scaled)),
+        'n_iter': int(model.monitor_.iter),
+        'converged': bool(model.monitor_.converged),
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def model_params(model: "GaussianHMM") -> Dict[str, np.ndarray]:
+    """
+    Extract the parameters needed to warm-start another fit.
+    
+    Args:
+        model: Fitted GaussianHMM.
+    
+    Returns:
+        Dict with startprob, transmat, means and full covars.
+    """
+    return {
+        'startprob': model.startprob_.copy(),
+        'transmat': model.transmat_.copy(),
+        'means': model.means_.copy(),
+        'covars': model.covars_.copy(),
+    }
+
+
+def save_model_npz(
+    path: Path,
+    params: Dict[str, np.ndarray],
+    state_labels: Dict[int, MarketRegime],
+    last_fit_date: Optional[datetime],
+    fit_count: int,
+    fit_stats: Optional[Dict[str, Any]] = None
+) -> None:
+    """
+    Write a regime model in the versioned .npz format.
+    
+    Stores plain arrays only (uncompressed, so members are read straight from
+    disk) and is written atomically via a temp file.
+    
+    Args:
+        path: Destination file.
+        params: startprob, transmat, means, covars, scaler_mean, scaler_scale.
+        state_labels: State index -> regime map.
+        last_fit_date: Time of the fit.
+        fit_count: Number of fits so far.
+        fit_stats: Optional fit statistics (stored as JSON text).
+    """
+    n_states = len(params['startprob'])
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'wb') as f:
+        np.savez(
+            f,
+            format_version=np.int64(MODEL_FORMAT_VERSION),
+            startprob=params['startprob'],
+            transmat=params['transmat'],
+            means=params['means'],
+            covars=params['covars'],
+            scaler_mean=params['scaler_mean'],
+            scaler_scale=params['scaler_scale'],
+            state_labels=np.array([state_labels[i].value for i in range(n_states)]),
+            last_fit_date=np.array(last_fit_date.isoformat() if last_fit_date else ""),
+            fit_count=np.int64(fit_count),
+            fit_stats=np.array(json.dumps(fit_stats or {})),
+        )
+    os.replace(tmp_path, path)
+
+
+def load_model_npz(path: Path) -> Dict[str, Any]:
+    """
+    Read a regime model written by `save_model_npz`.
+    
+    Never unpickles (allow_pickle=False), so untrusted files cannot run code.
+    
+    Args:
+        path: Model file.
+    
+    Returns:
+        Dict with 'params', 'state_labels', 'last_fit_date', 'fit_count', 'fit_stats'.
+    
+    Raises:
+        ValueError: If the file has an unsupported format version.
+    """
+    with np.load(path, allow_pickle=False) as data:
+        version = int(data['format_version'])
+        if version != MODEL_FORMAT_VERSION:
+            raise ValueError(f"Unsupported HMM model format version: {version}")
+        
+        params = {
+            key: data[key]
+            for key in ('startprob', 'transmat', 'means', 'covars', 'scaler_mean', 'scaler_scale')
+        }
+        last_fit = str(data['last_fit_date'])
+        return {
+            'params': params,
+            'state_labels': {i: MarketRegime(v) for i, v in enumerate(data['state_labels'].tolist())},
+            'last_fit_date': datetime.fromisoformat(last_fit) if last_fit else None,
+            'fit_count': int(data['fit_count']),
+            'fit_stats': json.loads(str(data['fit_stats'])),
+        }
+
+
+def convert_pickle_model(
+    pickle_path: Optional[Path] = None,
+    npz_path: Optional[Path] = None
+) -> Path:
+    """
+    Convert a legacy pickled model (GaussianHMM + StandardScaler) to .npz.
+    
+    Unpickling runs arbitrary code - only convert files you created.
+    
+    Args:
+        pickle_path: Legacy model file (default: data/hmm_model.pkl).
+        npz_path: Output file (default: data/hmm_model.npz).
+    
+    Returns:
+        Path: Written .npz file.
+    """
+    data_dir = get_config().paths.data_dir
+    pickle_path = pickle_path or data_dir / LEGACY_MODEL_FILENAME
+    npz_path = npz_path or data_dir / MODEL_FILENAME
+    
+    with open(pickle_path, 'rb') as f:
+        data = pickle.load(f)
+    
+    params = model_params(data['model'])
+    params['scaler_mean'] = np.asarray(data['scaler'].mean_, dtype=np.float64)
+    params['scaler_scale'] = np.asarray(data['scaler'].scale_, dtype=np.float64)
+    
+    save_model_npz(
+        npz_path,
+        params,
+        data['state_labels'],
+        data.get('last_fit_date'),
+        data.get('fit_count', 0),
+        data.get('fit_stats')
+    )
+    logger.info(f"Converted {pickle_path} -> {npz_path}")
+    return npz_path
+
+
 class RegimeModel:
     """
     Hidden Markov Model for market regime detection.
@@ -53,12 +382,13 @@ class RegimeModel:
             config: HMM configuration.
         """
         self._config = config or get_config().hmm
-        self._model: Optional[GaussianHMM] = None
-        self._scaler: Optional[StandardScaler] = None
+        # startprob, transmat, means, covars, scaler_mean, scaler_scale
+        self._params: Optional[Dict[str, np.ndarray]] = None
         self._state_labels: Dict[int, MarketRegime] = {}
         self._last_fit_date: Optional[datetime] = None
         self._fit_count: int = 0
-        self._model_path = get_config().paths.data_dir / "hmm_model.pkl"
+        self._fit_stats: Dict[str, Any] = {}
+        self._model_path = get_config().paths.data_dir / MODEL_FILENAME
         
     def _compute_features(self, df: pd.DataFrame) -> np.ndarray:
         """
@@ -70,24 +400,7 @@ class RegimeModel:
         Returns:
             numpy array of features (n_samples, 3).
         """
-        close = df['close'].values
-        
-        # Log returns
-        log_returns = np.diff(np.log(close))
-        log_returns = np.insert(log_returns, 0, 0)  # Pad first value
-        
-        # Rolling volatility (20-day)
-        rolling_vol = pd.Series(log_returns).rolling(20).std().fillna(0).values
-        
-        # Rolling mean (10-day)
-        rolling_mean = pd.Series(log_returns).rolling(10).mean().fillna(0).values
-        
-        # Stack features
-        features = np.column_stack([log_returns, rolling_vol, rolling_mean])
-        
-        # Remove initial NaN rows
-        valid_start = max(20, 10)  # Start after warmup
-        return features[valid_start:]
+        return compute_regime_features(df)
     
     def _label_states(self, features: np.ndarray, states: np.ndarray) -> None:
         """
@@ -97,31 +410,9 @@ class RegimeModel:
             features: Feature matrix (log_return is first column).
             states: Hidden state sequence.
         """
-        # Compute mean return for each state
-        state_returns = {}
-        for state in range(self._config.n_states):
-            mask = states == state
-            if mask.sum() > 0:
-                state_returns[state] = features[mask, 0].mean()
-            else:
-                state_returns[state] = 0
-        
-        # Sort states by return
-        sorted_states = sorted(state_returns.items(), key=lambda x: x[1])
-        
-        # Label states
-        self._state_labels = {
-            sorted_states[0][0]: MarketRegime.BEAR,      # Lowest return
-            sorted_states[-1][0]: MarketRegime.BULL,     # Highest return
-        }
-        
-        # Middle state(s) are sideways
-        for state, _ in sorted_states[1:-1]:
-            self._state_labels[state] = MarketRegime.SIDEWAYS
-        
-        # Handle 3-state case
-        if self._config.n_states == 3:
-            self._state_labels[sorted_states[1][0]] = MarketRegime.SIDEWAYS
+        self._state_labels, state_returns = label_states_by_return(
+            features[:, 0], states, self._config.n_states
+        )
         
         logger.info(f"State labels: {self._state_labels}")
         for state, regime in self._state_labels.items():
@@ -131,10 +422,15 @@ class RegimeModel:
         """
         Fit the HMM model on historical data.
         
+        Runs `n_restarts` random restarts plus one warm start from the current
+        (persisted) model in parallel worker processes and keeps the candidate
+        with the best log-likelihood.
+        
         Args:
             df: DataFrame with 'close' column and sufficient history.
         """
         logger.info(f"Fitting HMM on {len(df)} bars")
+        fit_start = time.perf_counter()
         
         # Compute features
         features = self._compute_features(df)
@@ -142,32 +438,88 @@ class RegimeModel:
         if len(features) < 100:
             raise ValueError(f"Insufficient data for HMM fitting: {len(features)} samples")
         
+        from sklearn.preprocessing import StandardScaler
+        
         # Scale features
-        self._scaler = StandardScaler()
-        features_scaled = self._scaler.fit_transform(features)
-        
-        # Initialize and fit HMM
-        self._model = GaussianHMM(
-            n_components=self._config.n_states,
-            covariance_type="full",
-            n_iter=200,
-            random_state=42,
-            verbose=False
-        )
+        scaler = StandardScaler()
+        features_scaled = scaler.fit_transform(features)
+        
+        # Candidate fits: random restarts + warm start from the current model
+        tasks = [
+            {
+                'features_scaled': features_scaled,
+                'returns': features[:, 0],
+                'n_states': self._config.n_states,
+                'seed': HMM_BASE_SEED + i,
+                'source': f"seed={HMM_BASE_SEED + i}",
+            }
+            for i in range(max(1, self._config.n_restarts))
+        ]
+        if self._params is not None and len(self._params['startprob']) == self._config.n_states:
+            tasks.append({
+                'features_scaled': features_scaled,
+                'returns': features[:, 0],
+                'n_states': self._config.n_states,
+                'seed': HMM_BASE_SEED,
+                'source': "warm",
+                'warm_params': {
+                    key: self._params[key] for key in ('startprob', 'transmat', 'means', 'covars')
+                },
+            })
+        
+        n_workers = min(len(tasks), self._config.refit_workers or os.cpu_count() or 1)
+        if n_workers > 1:
+            with ProcessPoolExecutor(max_workers=n_workers) as pool:
+                candidates = list(pool.map(fit_hmm_candidate, tasks))
+        else:
+            candidates = [fit_hmm_candidate(task) for task in tasks]
         
-        self._model.fit(features_scaled)
+        best = max(candidates, key=lambda c: c['log_likelihood'])
+        self._params = model_params(best['model'])
+        self._params['scaler_mean'] = scaler.mean_.copy()
+        self._params['scaler_scale'] = scaler.scale_.copy()
         
         # Get hidden states and label them
-        states = self._model.predict(features_scaled)
+        states = best['model'].predict(features_scaled)
         self._label_states(features, states)
         
         self._last_fit_date = utc_now()
         self._fit_count += 1
+        self._fit_stats = {
+            'fit_seconds': time.perf_counter() - fit_start,
+            'n_samples': len(features),
+            'best': best['source'],
+            'candidates': [
+                {key: c[key] for key in ('source', 'log_likelihood', 'n_iter', 'converged', 'seconds')}
+                for c in candidates
+            ],
+        }
+        
+        for c in candidates:
+            logger.info(
+                f"  Candidate {c['source']}: loglik={c['log_likelihood']:.2f}, "
+                f"iters={c['n_iter']}, converged={c['converged']}, {c['seconds']:.2f}s"
+            )
         
         # Save model
         self._save_model()
         
-        logger.info(f"HMM fitted successfully (fit #{self._fit_count})")
+        logger.info(
+            f"HMM fitted successfully (fit #{self._fit_count}, best={best['source']}, "
+            f"{len(candidates)} candidates on {n_workers} workers, "
+            f"{self._fit_stats['fit_seconds']:.2f}s)"
+        )
+    
+    @property
+    def fit_stats(self) -> Dict[str, Any]:
+        """
+        Statistics from the last fit.
+        
+        Returns:
+            Dict with fit_seconds, best candidate, and per-candidate
+            log-likelihoods, EM iteration counts and convergence flags.
+        """
+        return self._fit_stats
     
     def predict(self, df: pd.DataFrame) -> Tuple[MarketRegime, Dict[MarketRegime, float]]:
         """
@@ -181,7 +533,7 @@ class RegimeModel:
         Returns:
             Tuple of (regime, probabilities dict).
         """
-        if self._model is None or self._scaler is None:
+        if self._params is None:
             raise ValueError("Model not fitted. Call fit() first.")
         
         # Compute features
@@ -191,13 +543,15 @@ class RegimeModel:
             raise ValueError("Insufficient data for prediction")
         
         # Scale
-        features_scaled = self._scaler.transform(features)
-        
-        # Get posterior probabilities for the last observation
-        log_prob, posteriors = self._model.score_samples(features_scaled)
+        params = self._params
+        features_scaled = (features - params['scaler_mean']) / params['scaler_scale']
         
-        # Last observation's posteriors
-        last_posteriors = posteriors[-1]
+        # Posterior of the last observation (= last forward-filtered row)
+        filtered = filtered_state_probabilities(
+            params['startprob'], params['transmat'], params['means'], params['covars'],
+            features_scaled
+        )
+        last_posteriors = filtered[-1]
         
         # Map to regime probabilities
         probs = {regime: 0.0 for regime in MarketRegime}
@@ -239,7 +593,7 @@ class RegimeModel:
         Returns:
             bool: True if refit needed.
         """
-        if self._model is None or self._last_fit_date is None:
+        if self._params is None or self._last_fit_date is None:
             return True
         
         days_since_fit = (utc_now() - self._last_fit_date).days
@@ -248,15 +602,14 @@ class RegimeModel:
     def _save_model(self) -> None:
         """Save model to disk."""
         try:
-            data = {
-                'model': self._model,
-                'scaler': self._scaler,
-                'state_labels': self._state_labels,
-                'last_fit_date': self._last_fit_date,
-                'fit_count': self._fit_count
-            }
-            with open(self._model_path, 'wb') as f:
-                pickle.dump(data, f)
+            save_model_npz(
+                self._model_path,
+                self._params,
+                self._state_labels,
+                self._last_fit_date,
+                self._fit_count,
+                self._fit_stats
+            )
             logger.debug("Saved HMM model to disk")
         except Exception as e:
             logger.warning(f"Failed to save HMM model: {e}")
@@ -265,21 +618,29 @@ class RegimeModel:
         """
         Load model from disk.
         
+        Reads the .npz format only; legacy pickles must be converted with
+        `python main.py convert-hmm` first.
+        
         Returns:
             bool: True if loaded successfully.
         """
         if not self._model_path.exists():
+            legacy_path = self._model_path.with_name(LEGACY_MODEL_FILENAME)
+            if legacy_path.exists():
+                logger.warning(
+                    f"Found legacy pickled model {legacy_path.name}; it is no longer loaded. "
+                    f"Run 'python main.py convert-hmm' to convert it"
+                )
             return False
         
         try:
-            with open(self._model_path, 'rb') as f:
-                data = pickle.load(f)
+            data = load_model_npz(self._model_path)
             
-            self._model = data['model']
-            self._scaler = data['scaler']
+            self._params = data['params']
             self._state_labels = data['state_labels']
             self._last_fit_date = data['last_fit_date']
             self._fit_count = data['fit_count']
+            self._fit_stats = data['fit_stats']
             
             logger.info(f"Loaded HMM model (fit #{self._fit_count}, last fit: {self._last_fit_date})")
             return True
@@ -307,6 +668,7 @@ class RegimeDetector:
         self._model = RegimeModel(self._config)
         self._initialized = False
         self._proxy_data: Optional[pd.DataFrame] = None
+        self._timeline = None  # Walk-forward RegimeTimeline (backtests only)
         
     def initialize(self) -> None:
         """
@@ -374,6 +736,14 @@ class RegimeDetector:
                 from datetime import timezone
                 as_of_date = as_of_date.replace(tzinfo=timezone.utc)
             
+            # Walk-forward timeline: model fitted only on bars before as_of_date
+            if self._timeline is not None and self._timeline.covers(as_of_date):
+                result = self._timeline.lookup(as_of_date)
+                if result is None:
+                    logger.warning(f"No walk-forward model available as of {as_of_date}")
+                    return MarketRegime.SIDEWAYS, 0.33, 0.33, 0.34
+                return result
+            
             # Make sure proxy data timestamps are comparable
             proxy_ts = pd.to_datetime(self._proxy_data['timestamp'])
             if proxy_ts.dt.tz is None:
@@ -382,7 +752,7 @@ class RegimeDetector:
             # Use only data up to (but not including) as_of_date
             # This ensures we're using t-1 close for day t decision
             mask = proxy_ts < as_of_date
-            data_for_regime = self._proxy_data[mask].copy()
+            data_for_regime = self._proxy_data[mask]
             
             if data_for_regime.empty or len(data_for_regime) < 50:
                 # Fallback to sideways if insufficient data
@@ -406,6 +776,40 @@ class RegimeDetector:
         
         return self._model.get_regime_with_confidence(data_for_regime)
     
+    def build_walk_forward_timeline(
+        self,
+        start: datetime,
+        end: datetime,
+        n_workers: Optional[int] = None
+    ) -> None:
+        """
+        Precompute walk-forward regimes for a backtest range.
+        
+        Refits every `refit_days` bars on data available at that point, so
+        `get_current_regime(as_of_date=...)` inside [start, end] never uses a
+        model trained on future bars.
+        
+        Args:
+            start: First decision date.
+            end: Last decision date.
+            n_workers: Worker processes for refits (default: config).
+        """
+        from regime_timeline import build_regime_timeline
+        
+        if not self._initialized:
+            self.initialize()
+        
+        if self._proxy_data is None or self._proxy_data.empty:
+            raise ValueError("No proxy data available")
+        
+        self._timeline = build_regime_timeline(
+            self._proxy_data, start, end, self._config, n_workers=n_workers
+        )
+    
+    def clear_walk_forward_timeline(self) -> None:
+        """Drop the walk-forward timeline (regime lookups use the fitted model again)."""
+        self._timeline = None
+    
     def update_proxy_data(self, new_data: pd.DataFrame) -> None:
         """
         Update proxy data with new bars.
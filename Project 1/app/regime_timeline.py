@@ -0,0 +1,393 @@
+"""
+Walk-forward regime timeline for backtesting.
+
+Refits the HMM every N trading days on data available at that point
+(expanding or sliding window), so regime labels in a backtest never see
+future bars. Refits are warm-started from the previous window's parameters,
+fanned out to a process pool in contiguous chains, and the finished timeline
+is cached to disk keyed by its window parameters.
+"""
+
+import hashlib
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional, Dict, List, Tuple, Any
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+
+from config import get_config, HMMConfig
+from regime_hmm import (
+    MarketRegime,
+    FEATURE_WARMUP,
+    HMM_N_ITER,
+    HMM_BASE_SEED,
+    compute_regime_features,
+    label_states_by_return,
+    filtered_state_probabilities,
+    fit_hmm_candidate,
+    model_params,
+)
+
+logger = logging.getLogger("tradingbot.regime_timeline")
+
+# Bump when the timeline layout or fitting procedure changes (invalidates cache)
+TIMELINE_VERSION = 1
+
+# Same minimums as RegimeModel.fit / RegimeDetector.get_current_regime
+MIN_TRAIN_SAMPLES = 100
+MIN_PREDICT_BARS = 50
+
+
+@dataclass
+class RegimeTimeline:
+    """
+    Precomputed regime probabilities for every decision date in a range.
+    
+    Each row holds the regime as seen after the close of ``timestamp``, using
+    a model fitted only on bars up to ``fit_end``.
+    """
+    frame: pd.DataFrame
+    start: datetime
+    end: datetime
+    
+    def __post_init__(self) -> None:
+        """Build the sorted timestamp index used for lookups."""
+        ts = pd.to_datetime(self.frame['timestamp'], utc=True)
+        self._ts = ts.values.astype('datetime64[ns]')
+    
+    def covers(self, as_of_date: datetime) -> bool:
+        """
+        Check if a decision date falls inside the timeline range.
+        
+        Args:
+            as_of_date: Decision date.
+        
+        Returns:
+            bool: True if the timeline should answer for this date.
+        """
+        return self.start.date() <= as_of_date.date() <= self.end.date()
+    
+    def lookup(
+        self,
+        as_of_date: datetime
+    ) -> Optional[Tuple[MarketRegime, float, float, float]]:
+        """
+        Get the regime for a decision date (bars strictly before it).
+        
+        Args:
+            as_of_date: Decision date (timezone-aware).
+        
+        Returns:
+            Tuple of (regime, bull_prob, bear_prob, side_prob), or None if no
+            model was available yet for that date.
+        """
+        key = np.datetime64(pd.Timestamp(as_of_date).tz_convert('UTC').tz_localize(None), 'ns')
+        pos = int(np.searchsorted(self._ts, key, side='left')) - 1
+        if pos < 0:
+            return None
+        
+        row = self.frame.iloc[pos]
+        return (
+            MarketRegime(row['regime']),
+            float(row['bull_prob']),
+            float(row['bear_prob']),
+            float(row['side_prob'])
+        )
+
+
+def _fit_window(
+    features: np.ndarray,
+    train_start: int,
+    train_end: int,
+    n_states: int,
+    warm_params: Optional[Dict[str, np.ndarray]]
+) -> Tuple[Dict[str, np.ndarray], StandardScaler, Dict[int, MarketRegime]]:
+    """
+    Fit one HMM on a slice of the feature matrix.
+    
+    Args:
+        features: Unscaled feature matrix for the whole proxy history.
+        train_start: First feature row of the training window.
+        train_end: End (exclusive) feature row of the training window.
+        n_states: Number of HMM states.
+        warm_params: Previous window's parameters to start from (None = cold).
+    
+    Returns:
+        Tuple of (fitted parameters, scaler, state labels).
+    """
+    train = features[train_start:train_end]
+    scaler = StandardScaler()
+    train_scaled = scaler.fit_transform(train)
+    
+    candidate = fit_hmm_candidate({
+        'features_scaled': train_scaled,
+        'returns': train[:, 0],
+        'n_states': n_states,
+        'seed': HMM_BASE_SEED,
+        'source': "warm" if warm_params else "cold",
+        'warm_params': warm_params,
+    })
+    model = candidate['model']
+    states = model.predict(train_scaled)
+    labels, _ = label_states_by_return(train[:, 0], states, n_states)
+    
+    return model_params(model), scaler, labels
+
+
+def _fit_chain(task: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, np.ndarray]]]:
+    """
+    Fit a contiguous chain of refit windows, each warm-started from the last.
+    
+    Module-level so it can be shipped to a worker process.
+    
+    Args:
+        task: Dict with 'features', 'windows', 'n_states' and 'warm_params'.
+            Each window is (refit_bar, train_start_bar, decision_bars).
+    
+    Returns:
+        Tuple of (timeline row blocks, parameters of the last fit).
+    """
+    features = task['features']
+    n_states = task['n_states']
+    warm_params = task['warm_params']
+    blocks: List[Dict[str, Any]] = []
+    
+    for refit_bar, train_start_bar, decision_bars in task['windows']:
+        # Bar b maps to feature row b - FEATURE_WARMUP (see compute_regime_features)
+        params, scaler, labels = _fit_window(
+            features,
+            train_start_bar,
+            refit_bar - FEATURE_WARMUP,
+            n_states,
+            warm_params
+        )
+        warm_params = params
+        
+        # One forward pass yields the last-observation posterior for every
+        # decision in this segment (decision bar d sees bars < d)
+        last_row = decision_bars[-1] - FEATURE_WARMUP
+        filtered = filtered_state_probabilities(
+            params['startprob'], params['transmat'], params['means'], params['covars'],
+            scaler.transform(features[:last_row])
+        )
+        posteriors = filtered[decision_bars - FEATURE_WARMUP - 1]
+        
+        regime_probs = {regime: np.zeros(len(decision_bars)) for regime in MarketRegime}
+        for state in range(n_states):
+            regime_probs[labels[state]] += posteriors[:, state]
+        best = posteriors.argmax(axis=1)
+        
+        blocks.append({
+            'obs_bar': decision_bars - 1,
+            'fit_end_bar': np.full(len(decision_bars), refit_bar - 1),
+            'regime': [labels[int(s)].value for s in best],
+            'bull_prob': regime_probs[MarketRegime.BULL],
+            'bear_prob': regime_probs[MarketRegime.BEAR],
+            'side_prob': regime_probs[MarketRegime.SIDEWAYS],
+        })
+    
+    return blocks, warm_params
+
+
+def _refit_schedule(
+    n_bars: int,
+    start_bar: int,
+    refit_days: int,
+    use_rolling_window: bool,
+    rolling_window_days: int
+) -> List[Tuple[int, int, np.ndarray]]:
+    """
+    Build refit windows over decision bars [start_bar, n_bars].
+    
+    Decision bar d means "decide on the day of bar d using bars < d";
+    d == n_bars is the day after the last bar.
+    
+    Args:
+        n_bars: Number of proxy bars.
+        start_bar: First decision bar of the backtest.
+        refit_days: Trading days between refits.
+        use_rolling_window: Slide the training window instead of expanding it.
+        rolling_window_days: Sliding window length in bars.
+    
+    Returns:
+        List of (refit_bar, train_start_bar, decision_bars) tuples.
+    """
+    # First refit needs enough bars for a fit and for prediction
+    min_bar = max(FEATURE_WARMUP + MIN_TRAIN_SAMPLES, MIN_PREDICT_BARS)
+    first = max(start_bar, min_bar)
+    
+    windows = []
+    refit_bars = list(range(first, n_bars + 1, refit_days))
+    for j, refit_bar in enumerate(refit_bars):
+        next_refit = refit_bars[j + 1] if j + 1 < len(refit_bars) else n_bars + 1
+        train_start = max(0, refit_bar - rolling_window_days) if use_rolling_window else 0
+        decision_bars = np.arange(refit_bar, next_refit)
+        windows.append((refit_bar, train_start, decision_bars))
+    return windows
+
+
+def _cache_key(
+    proxy_df: pd.DataFrame,
+    start: datetime,
+    end: datetime,
+    config: HMMConfig
+) -> str:
+    """
+    Hash the inputs that determine a timeline.
+    
+    Args:
+        proxy_df: Proxy bar data used for fitting.
+        start: Backtest start.
+        end: Backtest end.
+        config: HMM configuration.
+    
+    Returns:
+        str: Hex digest used as the cache filename.
+    """
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(proxy_df['close'].values, dtype=np.float64).tobytes())
+    digest.update(str(pd.to_datetime(proxy_df['timestamp']).iloc[0]).encode())
+    params = (
+        TIMELINE_VERSION,
+        config.market_proxy,
+        config.n_states,
+        config.refit_days,
+        config.use_rolling_window,
+        config.rolling_window_days if config.use_rolling_window else 0,
+        HMM_N_ITER,
+        start.date().isoformat(),
+        end.date().isoformat(),
+    )
+    digest.update(repr(params).encode())
+    return digest.hexdigest()[:24]
+
+
+def _cache_path(key: str) -> Path:
+    """Get cache file path for a timeline key."""
+    cache_dir = get_config().paths.data_dir / "regime_timelines"
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir / f"timeline_{key}.parquet"
+
+
+def build_regime_timeline(
+    proxy_df: pd.DataFrame,
+    start: datetime,
+    end: datetime,
+    config: Optional[HMMConfig] = None,
+    n_workers: Optional[int] = None,
+    use_cache: bool = True
+) -> RegimeTimeline:
+    """
+    Build a walk-forward regime timeline for a backtest range.
+    
+    Args:
+        proxy_df: Proxy (SPY) bars with 'timestamp' and 'close', any history length.
+        start: First decision date.
+        end: Last decision date.
+        config: HMM configuration (refit cadence, window mode).
+        n_workers: Worker processes for refits (default: config, 0 = CPU count).
+        use_cache: Whether to read/write the on-disk cache.
+    
+    Returns:
+        RegimeTimeline covering [start, end].
+    """
+    config = config or get_config().hmm
+    start = start if start.tzinfo else start.replace(tzinfo=timezone.utc)
+    end = end if end.tzinfo else end.replace(tzinfo=timezone.utc)
+    
+    proxy_df = proxy_df.sort_values('timestamp').reset_index(drop=True)
+    timestamps = pd.to_datetime(proxy_df['timestamp'], utc=True)
+    
+    # Only bars before the day after `end` can influence decisions in range
+    proxy_df = proxy_df[timestamps.dt.date <= end.date()].reset_index(drop=True)
+    timestamps = timestamps[timestamps.dt.date <= end.date()].reset_index(drop=True)
+    
+    key = _cache_key(proxy_df, start, end, config)
+    path = _cache_path(key)
+    if use_cache and path.exists():
+        try:
+            frame = pd.read_parquet(path)
+            logger.info(f"Loaded cached regime timeline ({len(frame)} rows) from {path.name}")
+            return RegimeTimeline(frame=frame, start=start, end=end)
+        except Exception as e:
+            logger.warning(f"Failed to load cached regime timeline: {e}")
+    
+    n_bars = len(proxy_df)
+    start_bar = int(np.searchsorted(timestamps.dt.date.values, start.date(), side='left'))
+    windows = _refit_schedule(
+        n_bars, start_bar, config.refit_days,
+        config.use_rolling_window, config.rolling_window_days
+    )
+    
+    features = compute_regime_features(proxy_df)
+    blocks: List[Dict[str, Any]] = []
+    
+    if windows:
+        n_workers = n_workers if n_workers is not None else config.refit_workers
+        n_workers = n_workers or os.cpu_count() or 1
+        mode = f"rolling {config.rolling_window_days}" if config.use_rolling_window else "expanding"
+        logger.info(
+            f"Building walk-forward regime timeline: {len(windows)} refits every "
+            f"{config.refit_days} bars ({mode} window, {n_workers} workers)"
+        )
+        
+        # Cold-fit the first window in-process; it seeds every chain
+        anchor_blocks, anchor_params = _fit_chain({
+            'features': features,
+            'windows': windows[:1],
+            'n_states': config.n_states,
+            'warm_params': None,
+        })
+        blocks.extend(anchor_blocks)
+        
+        remaining = windows[1:]
+        n_chains = min(n_workers, len(remaining))
+        if n_chains > 0:
+            chunks = np.array_split(np.arange(len(remaining)), n_chains)
+            tasks = [
+                {
+                    'features': features,
+                    'windows': [remaining[i] for i in chunk],
+                    'n_states': config.n_states,
+                    'warm_params': anchor_params,
+                }
+                for chunk in chunks
+            ]
+            if n_chains == 1:
+                results = [_fit_chain(tasks[0])]
+            else:
+                with ProcessPoolExecutor(max_workers=n_chains) as pool:
+                    results = list(pool.map(_fit_chain, tasks))
+            for chain_blocks, _ in results:
+                blocks.extend(chain_blocks)
+    else:
+        logger.warning("Not enough proxy history for any walk-forward refit in backtest range")
+    
+    if blocks:
+        obs_bar = np.concatenate([b['obs_bar'] for b in blocks])
+        fit_end_bar = np.concatenate([b['fit_end_bar'] for b in blocks])
+        frame = pd.DataFrame({
+            'timestamp': timestamps.values[obs_bar],
+            'regime': [r for b in blocks for r in b['regime']],
+            'bull_prob': np.concatenate([b['bull_prob'] for b in blocks]),
+            'bear_prob': np.concatenate([b['bear_prob'] for b in blocks]),
+            'side_prob': np.concatenate([b['side_prob'] for b in blocks]),
+            'fit_end': timestamps.values[fit_end_bar],
+        }).sort_values('timestamp').reset_index(drop=True)
+    else:
+        frame = pd.DataFrame(columns=['timestamp', 'regime', 'bull_prob', 'bear_prob', 'side_prob', 'fit_end'])
+    
+    if use_cache and not frame.empty:
+        try:
+            frame.to_parquet(path, index=False)
+            logger.debug(f"Cached regime timeline to {path}")
+        except Exception as e:
+            logger.warning(f"Failed to cache regime timeline: {e}")
+    
+    return RegimeTimeline(frame=frame, start=start, end=end)
@@ -1,13 +1,15 @@
 """
 Reporting module for backtest results.
 
-Generates metrics, CSVs, and visualizations.
+Generates metrics, CSV/Parquet outputs, visualizations and a run index.
 """
 
 import logging
+import multiprocessing
+import sqlite3
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Optional, List, TYPE_CHECKING
 
 import pandas as pd
 import numpy as np
@@ -16,8 +18,43 @@ from config import get_config
 from backtester import BacktestResult
 from utils import get_logger, format_pct, format_currency
 
+if TYPE_CHECKING:
+    from robustness import RobustnessReport
+
 logger = get_logger("reporting")
 
+REPORT_FORMATS = ("csv", "parquet", "both")
+PLOT_MODES = ("sync", "background", "off")
+
+RUN_INDEX_FILENAME = "run_index.db"
+
+RUN_INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL,
+    prefix TEXT,
+    start_date TEXT,
+    end_date TEXT,
+    initial_capital REAL,
+    final_equity REAL,
+    total_return REAL,
+    total_return_pct REAL,
+    max_drawdown REAL,
+    max_drawdown_pct REAL,
+    sharpe_ratio REAL,
+    total_trades INTEGER,
+    winning_trades INTEGER,
+    losing_trades INTEGER,
+    win_rate REAL,
+    avg_win REAL,
+    avg_loss REAL,
+    profit_factor REAL,
+    summary_path TEXT,
+    equity_path TEXT,
+    trades_path TEXT
+);
+"""
+
 
 class ReportGenerator:
     """
@@ -25,25 +62,49 @@ class ReportGenerator:
     
     Outputs:
     - summary.csv: Key metrics
-    - equity_curve.csv: Daily equity values
-    - trades.csv: All trade records
-    - equity_curve.png: Equity visualization
+    - equity_curve.csv / .parquet: Daily equity values
+    - trades.csv / .parquet: All trade records
+    - equity_curve.png: Equity visualization (sync, background process, or off)
+    - robustness.csv: Monte Carlo confidence intervals (when provided)
+    - profile.csv: Stage timings (plus .prof/.txt with --profile)
+    - run_index.db: One row of summary metrics per run (appended)
     """
     
-    def __init__(self, output_dir: Optional[Path] = None):
+    def __init__(
+        self,
+        output_dir: Optional[Path] = None,
+        report_format: Optional[str] = None,
+        plot: Optional[str] = None
+    ):
         """
         Initialize report generator.
         
         Args:
             output_dir: Directory for output files.
+            report_format: Equity/trades format: "csv", "parquet" or "both"
+                (default: REPORT_FORMAT).
+            plot: Equity plot mode: "sync", "background" or "off"
+                (default: REPORT_PLOT).
+        
+        Raises:
+            ValueError: If report_format or plot is not recognized.
         """
-        self._output_dir = output_dir or get_config().paths.reports_dir
+        config = get_config()
+        self._output_dir = output_dir or config.paths.reports_dir
         self._output_dir.mkdir(parents=True, exist_ok=True)
-        
+        self._format = report_format or config.backtest.report_format
+        self._plot = plot or config.backtest.report_plot
+        if self._format not in REPORT_FORMATS:
+            raise ValueError(f"Unknown report format: {self._format} (expected one of {REPORT_FORMATS})")
+        if self._plot not in PLOT_MODES:
+            raise ValueError(f"Unknown plot mode: {self._plot} (expected one of {PLOT_MODES})")
+        self._plot_processes: List[multiprocessing.Process] = []
+    
     def generate(
         self,
         result: BacktestResult,
-        prefix: str = ""
+        prefix: str = "",
+        robustness: Optional["RobustnessReport"] = None
     ) -> dict:
         """
         Generate all reports from backtest result.
@@ -51,6 +112,7 @@ class ReportGenerator:
         Args:
             result: BacktestResult object.
             prefix: Optional filename prefix.
+            robustness: Optional Monte Carlo report to write alongside.
         
         Returns:
             Dict of generated file paths.
@@ -66,24 +128,120 @@ class ReportGenerator:
         self._write_summary(result, summary_path)
         files['summary'] = summary_path
         
-        # Equity curve CSV
-        equity_path = self._output_dir / f"{prefix}equity_curve_{timestamp}.csv"
-        self._write_equity_curve(result, equity_path)
-        files['equity_curve'] = equity_path
+        # Equity curve and trades (Parquet keeps native dtypes, no string formatting)
+        if self._format in ("csv", "both"):
+            equity_path = self._output_dir / f"{prefix}equity_curve_{timestamp}.csv"
+            self._write_equity_curve(result, equity_path)
+            files['equity_curve'] = equity_path
+            
+            trades_path = self._output_dir / f"{prefix}trades_{timestamp}.csv"
+            self._write_trades(result, trades_path)
+            files['trades'] = trades_path
         
-        # Trades CSV
-        trades_path = self._output_dir / f"{prefix}trades_{timestamp}.csv"
-        self._write_trades(result, trades_path)
-        files['trades'] = trades_path
+        if self._format in ("parquet", "both"):
+            equity_path = self._output_dir / f"{prefix}equity_curve_{timestamp}.parquet"
+            result.equity_curve.to_parquet(equity_path, index=False)
+            files['equity_curve_parquet'] = equity_path
+            
+            trades_path = self._output_dir / f"{prefix}trades_{timestamp}.parquet"
+            result.trades.to_parquet(trades_path, index=False)
+            files['trades_parquet'] = trades_path
         
         # Equity plot
-        plot_path = self._output_dir / f"{prefix}equity_curve_{timestamp}.png"
-        self._plot_equity_curve(result, plot_path)
-        files['plot'] = plot_path
+        if self._plot != "off":
+            plot_path = self._output_dir / f"{prefix}equity_curve_{timestamp}.png"
+            self._plot_equity_curve(result, plot_path)
+            files['plot'] = plot_path
+        
+        # Stage profile
+        if result.profile is not None:
+            profile_path = self._output_dir / f"{prefix}profile_{timestamp}.csv"
+            profile_keys = {'.csv': 'profile', '.prof': 'profile_stats', '.txt': 'profile_top'}
+            for path in result.profile.dump(profile_path):
+                files[profile_keys[path.suffix]] = path
+        
+        # Robustness CSV
+        if robustness is not None:
+            robustness_path = self._output_dir / f"{prefix}robustness_{timestamp}.csv"
+            robustness.summary().to_csv(robustness_path, index=False)
+            files['robustness'] = robustness_path
+        
+        # Run index (queryable across runs without reading report files)
+        files['run_index'] = self._append_run_index(result, prefix.rstrip("_"), files)
         
         logger.info(f"Reports generated in {self._output_dir}")
         return files
     
+    def wait_for_plots(self, timeout: Optional[float] = None) -> None:
+        """
+        Wait for background plot processes started by this generator.
+        
+        Not required before exit: the interpreter joins them at shutdown.
+        
+        Args:
+            timeout: Seconds to wait per process (None = no limit).
+        """
+        for process in self._plot_processes:
+            process.join(timeout)
+        self._plot_processes = [p for p in self._plot_processes if p.is_alive()]
+    
+    def _append_run_index(
+        self,
+        result: BacktestResult,
+        prefix: str,
+        files: dict
+    ) -> Path:
+        """Append this run's summary metrics to the run index."""
+        path = self._output_dir / RUN_INDEX_FILENAME
+        
+        def file_path(*keys: str) -> Optional[str]:
+            for key in keys:
+                if key in files:
+                    return str(files[key])
+            return None
+        
+        row = (
+            datetime.now().isoformat(timespec='seconds'),
+            prefix or None,
+            result.start_date.strftime('%Y-%m-%d'),
+            result.end_date.strftime('%Y-%m-%d'),
+            float(result.initial_capital),
+            float(result.final_equity),
+            float(result.total_return),
+            float(result.total_return_pct),
+            float(result.max_drawdown),
+            float(result.max_drawdown_pct),
+            float(result.sharpe_ratio),
+            int(result.total_trades),
+            int(result.winning_trades),
+            int(result.losing_trades),
+            float(result.win_rate),
+            float(result.avg_win),
+            float(result.avg_loss),
+            float(result.profit_factor),
+            file_path('summary'),
+            file_path('equity_curve_parquet', 'equity_curve'),
+            file_path('trades_parquet', 'trades'),
+        )
+        
+        conn = sqlite3.connect(path, timeout=30)
+        try:
+            with conn:
+                conn.executescript(RUN_INDEX_SCHEMA)
+                conn.execute(
+                    "INSERT INTO runs (created_at, prefix, start_date, end_date, initial_capital, "
+                    "final_equity, total_return, total_return_pct, max_drawdown, max_drawdown_pct, "
+                    "sharpe_ratio, total_trades, winning_trades, losing_trades, win_rate, avg_win, "
+                    "avg_loss, profit_factor, summary_path, equity_path, trades_path) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    row
+                )
+        finally:
+            conn.close()
+        
+        logger.debug(f"Appended run to {path}")
+        return path
+    
     def _write_summary(
         self,
         result: BacktestResult,
@@ -161,58 +319,114 @@ class ReportGenerator:
         result: BacktestResult,
         path: Path
     ) -> None:
-        """Generate equity curve plot."""
-        try:
-            import matplotlib
-            matplotlib.use('Agg')  # Non-interactive backend
-            import matplotlib.pyplot as plt
-            import matplotlib.dates as mdates
-            
-            fig, axes = plt.subplots(2, 1, figsize=(12, 8), height_ratios=[3, 1])
-            
-            # Equity curve
-            ax1 = axes[0]
-            df = result.equity_curve
-            ax1.plot(df['timestamp'], df['equity'], color='#2E86AB', linewidth=1.5, label='Equity')
-            ax1.fill_between(df['timestamp'], result.initial_capital, df['equity'],
-                           alpha=0.3, color='#2E86AB')
-            ax1.axhline(y=result.initial_capital, color='gray', linestyle='--', alpha=0.5, label='Initial')
-            
-            ax1.set_title(f'Backtest Equity Curve\n'
-                         f'Return: {result.total_return_pct:.2f}% | '
-                         f'Sharpe: {result.sharpe_ratio:.2f} | '
-                         f'Max DD: {result.max_drawdown_pct:.2f}%',
-                         fontsize=12, fontweight='bold')
-            ax1.set_ylabel('Equity ($)')
-            ax1.legend(loc='upper left')
-            ax1.grid(True, alpha=0.3)
-            ax1.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m'))
-            ax1.xaxis.set_major_locator(mdates.MonthLocator(interval=2))
-            
-            # Drawdown
-            ax2 = axes[1]
-            equity = df['equity']
-            peak = equity.expanding().max()
-            drawdown = ((equity - peak) / peak) * 100
-            
-            ax2.fill_between(df['timestamp'], 0, drawdown, color='#E74C3C', alpha=0.5)
-            ax2.plot(df['timestamp'], drawdown, color='#E74C3C', linewidth=1)
-            ax2.set_ylabel('Drawdown (%)')
-            ax2.set_xlabel('Date')
-            ax2.grid(True, alpha=0.3)
-            ax2.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m'))
-            ax2.xaxis.set_major_locator(mdates.MonthLocator(interval=2))
-            
-            plt.tight_layout()
-            plt.savefig(path, dpi=150, bbox_inches='tight')
-            plt.close()
-            
-            logger.debug(f"Wrote plot to {path}")
-            
-        except ImportError as e:
-            logger.warning(f"Could not generate plot (matplotlib not available): {e}")
-        except Exception as e:
-            logger.error(f"Failed to generate plot: {e}")
+        """Generate equity curve plot, in a child process in background mode."""
+        equity_curve = result.equity_curve[['timestamp', 'equity']]
+        title = (
+            f'Backtest Equity Curve\n'
+            f'Return: {result.total_return_pct:.2f}% | '
+            f'Sharpe: {result.sharpe_ratio:.2f} | '
+            f'Max DD: {result.max_drawdown_pct:.2f}%'
+        )
+        
+        if self._plot == "background":
+            # spawn: the child must not inherit locks held by this process's threads
+            process = multiprocessing.get_context("spawn").Process(
+                target=plot_equity_curve,
+                args=(equity_curve, result.initial_capital, title, path),
+                name="equity-plot"
+            )
+            process.start()
+            self._plot_processes.append(process)
+            logger.debug(f"Rendering plot to {path} in background (pid {process.pid})")
+        else:
+            plot_equity_curve(equity_curve, result.initial_capital, title, path)
+
+
+def plot_equity_curve(
+    equity_curve: pd.DataFrame,
+    initial_capital: float,
+    title: str,
+    path: Path
+) -> None:
+    """
+    Render an equity curve and drawdown plot to a PNG.
+    
+    Module-level so it can run in a child process.
+    
+    Args:
+        equity_curve: DataFrame with timestamp and equity columns.
+        initial_capital: Starting capital (reference line).
+        title: Plot title.
+        path: Output file.
+    """
+    try:
+        import matplotlib
+        matplotlib.use('Agg')  # Non-interactive backend
+        import matplotlib.pyplot as plt
+        import matplotlib.dates as mdates
+        
+        fig, axes = plt.subplots(2, 1, figsize=(12, 8), height_ratios=[3, 1])
+        
+        # Equity curve
+        ax1 = axes[0]
+        df = equity_curve
+        ax1.plot(df['timestamp'], df['equity'], color='#2E86AB', linewidth=1.5, label='Equity')
+        ax1.fill_between(df['timestamp'], initial_capital, df['equity'],
+                       alpha=0.3, color='#2E86AB')
+        ax1.axhline(y=initial_capital, color='gray', linestyle='--', alpha=0.5, label='Initial')
+        
+        ax1.set_title(title, fontsize=12, fontweight='bold')
+        ax1.set_ylabel('Equity ($)')
+        ax1.legend(loc='upper left')
+        ax1.grid(True, alpha=0.3)
+        ax1.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m'))
+        ax1.xaxis.set_major_locator(mdates.MonthLocator(interval=2))
+        
+        # Drawdown
+        ax2 = axes[1]
+        equity = df['equity']
+        peak = equity.expanding().max()
+        drawdown = ((equity - peak) / peak) * 100
+        
+        ax2.fill_between(df['timestamp'], 0, drawdown, color='#E74C3C', alpha=0.5)
+        ax2.plot(df['timestamp'], drawdown, color='#E74C3C', linewidth=1)
+        ax2.set_ylabel('Drawdown (%)')
+        ax2.set_xlabel('Date')
+        ax2.grid(True, alpha=0.3)
+        ax2.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m'))
+        ax2.xaxis.set_major_locator(mdates.MonthLocator(interval=2))
+        
+        plt.tight_layout()
+        plt.savefig(path, dpi=150, bbox_inches='tight')
+        plt.close()
+        
+        logger.debug(f"Wrote plot to {path}")
+        
+    except ImportError as e:
+        logger.warning(f"Could not generate plot (matplotlib not available): {e}")
+    except Exception as e:
+        logger.error(f"Failed to generate plot: {e}")
+
+
+def load_run_index(output_dir: Optional[Path] = None) -> pd.DataFrame:
+    """
+    Load the run index as a DataFrame (one row per generated report).
+    
+    Args:
+        output_dir: Reports directory (default: configured reports dir).
+    
+    Returns:
+        pd.DataFrame: Runs in insertion order (empty if none recorded).
+    """
+    path = (output_dir or get_config().paths.reports_dir) / RUN_INDEX_FILENAME
+    if not path.exists():
+        return pd.DataFrame()
+    
+    conn = sqlite3.connect(path)
+    try:
+        return pd.read_sql_query("SELECT * FROM runs ORDER BY id", conn)
+    finally:
+        conn.close()
 
 
 def print_summary(result: BacktestResult) -> None:
@@ -244,10 +458,56 @@ def print_summary(result: BacktestResult) -> None:
     print("=" * 60 + "\n")
 
 
+def print_profile(result: BacktestResult) -> None:
+    """
+    Print per-stage timing table to console.
+    
+    Args:
+        result: BacktestResult with a stage profile.
+    """
+    report = result.profile
+    if report is None:
+        return
+    
+    print("\n" + "=" * 60)
+    print(f"PROFILE (wall time {report.total_sec:.2f}s)")
+    print("=" * 60)
+    print(f"{'Stage':<18} {'Calls':>9} {'Total (s)':>10} {'Mean (ms)':>10} {'% run':>8}")
+    print("-" * 60)
+    for row in report.stages.itertuples(index=False):
+        print(f"{row.stage:<18} {row.calls:>9,} {row.total_sec:>10.2f} {row.mean_ms:>10.3f} {row.pct_of_run:>7.1f}%")
+    if report.peak_memory_mb is not None:
+        print("-" * 60)
+        print(f"Peak traced memory:  {report.peak_memory_mb:,.1f} MB")
+    print("=" * 60 + "\n")
+
+
+def print_robustness(report: "RobustnessReport") -> None:
+    """
+    Print Monte Carlo confidence intervals to console.
+    
+    Args:
+        report: RobustnessReport object.
+    """
+    ci = f"{report.confidence * 100:.0f}% CI"
+    print("\n" + "=" * 78)
+    print(f"ROBUSTNESS ({report.n_resamples:,} resamples, {report.elapsed_sec:.1f}s)")
+    print("=" * 78)
+    print(f"{'Scenario':<16} {'Metric':<22} {'Observed':>10} {'Median':>10} {ci:>16}")
+    print("-" * 78)
+    for row in report.summary().itertuples(index=False):
+        interval = f"{row.ci_low:.2f} .. {row.ci_high:.2f}"
+        print(f"{row.scenario:<16} {row.metric:<22} {row.observed:>10.2f} {row.median:>10.2f} {interval:>16}")
+    print("=" * 78 + "\n")
+
+
 def generate_reports(
     result: BacktestResult,
     output_dir: Optional[Path] = None,
-    prefix: str = ""
+    prefix: str = "",
+    robustness: Optional["RobustnessReport"] = None,
+    report_format: Optional[str] = None,
+    plot: Optional[str] = None
 ) -> dict:
     """
     Convenience function to generate all reports.
@@ -256,10 +516,13 @@ def generate_reports(
         result: BacktestResult object.
         output_dir: Output directory.
         prefix: Filename prefix.
+        robustness: Optional Monte Carlo report.
+        report_format: "csv", "parquet" or "both" (default: REPORT_FORMAT).
+        plot: "sync", "background" or "off" (default: REPORT_PLOT).
     
     Returns:
         Dict of generated file paths.
     """
-    generator = ReportGenerator(output_dir)
-    return generator.generate(result, prefix)
+    generator = ReportGenerator(output_dir, report_format=report_format, plot=plot)
+    return generator.generate(result, prefix, robustness)
 
@@ -0,0 +1,311 @@
+"""
+Monte Carlo robustness analysis for backtest results.
+
+Resamples a finished BacktestResult to estimate how much of its performance
+depends on luck of ordering and sampling:
+- trade_shuffle: realized trade P&L in random order
+- block_bootstrap: circular block bootstrap of daily equity returns
+- trade_skip: each trade independently skipped with probability p
+
+Every scenario produces a batch of daily equity paths and the same metrics
+(CAGR, Sharpe, max drawdown, time to recover) are computed on all paths at
+once with NumPy, so 10k resamples of a 5-year curve take seconds.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Optional, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from config import get_config
+from backtester import BacktestResult
+from utils import get_logger
+
+logger = get_logger("robustness")
+
+TRADING_DAYS_PER_YEAR = 252
+METRICS = ("cagr_pct", "sharpe_ratio", "max_drawdown_pct", "time_to_recover_days")
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_SEED = 42
+
+
+@dataclass
+class RobustnessReport:
+    """Container for Monte Carlo resampling results."""
+    n_resamples: int
+    confidence: float
+    block_days: int
+    skip_prob: float
+    elapsed_sec: float
+    # scenario -> metric -> observed value on the unresampled path
+    observed: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    # scenario -> metric -> array of n_resamples values
+    samples: Dict[str, Dict[str, np.ndarray]] = field(default_factory=dict)
+    
+    def summary(self) -> pd.DataFrame:
+        """
+        Summarize each scenario/metric with its confidence interval.
+        
+        Returns:
+            DataFrame with columns scenario, metric, observed, mean, median,
+            ci_low, ci_high.
+        """
+        tail = (1.0 - self.confidence) / 2 * 100
+        rows = []
+        for scenario, metrics in self.samples.items():
+            for metric in METRICS:
+                values = metrics[metric]
+                low, median, high = np.nanpercentile(values, [tail, 50, 100 - tail])
+                rows.append({
+                    'scenario': scenario,
+                    'metric': metric,
+                    'observed': self.observed[scenario][metric],
+                    'mean': float(np.nanmean(values)),
+                    'median': float(median),
+                    'ci_low': float(low),
+                    'ci_high': float(high),
+                })
+        return pd.DataFrame(rows)
+    
+    def to_dict(self) -> dict:
+        """Convert to dictionary (excludes raw samples)."""
+        return {
+            'n_resamples': self.n_resamples,
+            'confidence': self.confidence,
+            'block_days': self.block_days,
+            'skip_prob': self.skip_prob,
+            'elapsed_sec': self.elapsed_sec,
+            'summary': self.summary().to_dict(orient='records'),
+        }
+
+
+def path_metrics(equity: np.ndarray, years: float) -> Dict[str, np.ndarray]:
+    """
+    Compute performance metrics for a batch of equity paths.
+    
+    Args:
+        equity: (n_paths, n_points) equity values; column 0 is the start.
+        years: Calendar length of the paths in years.
+    
+    Returns:
+        Dict of metric name -> (n_paths,) array.
+    """
+    start = equity[:, 0]
+    end = equity[:, -1]
+    
+    growth = np.clip(end / start, 0.0, None)
+    cagr = (growth ** (1.0 / years) - 1.0) * 100
+    
+    returns = np.diff(equity, axis=1) / equity[:, :-1]
+    mean = returns.mean(axis=1)
+    std = returns.std(axis=1, ddof=1) if returns.shape[1] > 1 else np.zeros(len(equity))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where(std > 0, mean / std * np.sqrt(TRADING_DAYS_PER_YEAR), 0.0)
+    
+    peak = np.maximum.accumulate(equity, axis=1)
+    max_dd = (1.0 - equity / peak).max(axis=1) * 100
+    
+    # Longest underwater stretch (bars since last peak); an unrecovered
+    # drawdown counts up to the end of the path
+    idx = np.arange(equity.shape[1])
+    last_peak = np.maximum.accumulate(np.where(equity < peak, 0, idx), axis=1)
+    recover = (idx - last_peak).max(axis=1)
+    
+    return {
+        'cagr_pct': cagr,
+        'sharpe_ratio': sharpe,
+        'max_drawdown_pct': max_dd,
+        'time_to_recover_days': recover.astype(np.float64),
+    }
+
+
+def _exit_counts(trades: pd.DataFrame, dates: np.ndarray) -> np.ndarray:
+    """Number of realized trades at or before each equity date."""
+    exit_ts = np.sort(trades['timestamp'].values.astype('datetime64[ns]'))
+    counts = np.searchsorted(exit_ts, dates, side='right')
+    # Positions closed after the last record (end of backtest) land on the last day
+    counts[-1] = len(exit_ts)
+    return counts
+
+
+def _trade_paths(
+    pnl: np.ndarray,
+    counts: np.ndarray,
+    initial: float
+) -> np.ndarray:
+    """
+    Build daily realized-P&L equity paths from per-trade P&L.
+    
+    Args:
+        pnl: (n_paths, n_trades) trade P&L in the order realized.
+        counts: (n_days,) trades realized by each day.
+        initial: Starting capital.
+    
+    Returns:
+        (n_paths, n_days + 1) equity, column 0 is the start.
+    """
+    cumulative = np.zeros((pnl.shape[0], pnl.shape[1] + 1))
+    np.cumsum(pnl, axis=1, out=cumulative[:, 1:])
+    equity = np.empty((pnl.shape[0], len(counts) + 1))
+    equity[:, 0] = initial
+    equity[:, 1:] = initial + cumulative[:, counts]
+    return equity
+
+
+def _bootstrap_paths(
+    returns: np.ndarray,
+    n_paths: int,
+    block_days: int,
+    initial: float,
+    rng: np.random.Generator
+) -> np.ndarray:
+    """
+    Build equity paths from circular block-bootstrapped daily returns.
+    
+    Args:
+        returns: (n_days,) observed daily returns.
+        n_paths: Number of paths.
+        block_days: Block length (preserves short-range autocorrelation).
+        initial: Starting capital.
+        rng: Random generator.
+    
+    Returns:
+        (n_paths, n_days + 1) equity, column 0 is the start.
+    """
+    n = len(returns)
+    block = max(1, min(block_days, n))
+    n_blocks = -(-n // block)
+    starts = rng.integers(0, n, size=(n_paths, n_blocks))
+    idx = (starts[:, :, None] + np.arange(block)) % n
+    sampled = returns[idx.reshape(n_paths, -1)[:, :n]]
+    
+    equity = np.empty((n_paths, n + 1))
+    equity[:, 0] = initial
+    np.cumprod(1.0 + sampled, axis=1, out=equity[:, 1:])
+    equity[:, 1:] *= initial
+    return equity
+
+
+def _batch_sizes(n_resamples: int, batch_size: int) -> List[int]:
+    """Split n_resamples into batches of at most batch_size."""
+    full, rest = divmod(n_resamples, batch_size)
+    return [batch_size] * full + ([rest] if rest else [])
+
+
+def _collect(batches: List[Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+    """Concatenate per-batch metric arrays."""
+    return {m: np.concatenate([b[m] for b in batches]) for m in METRICS}
+
+
+def _scalar_metrics(metrics: Dict[str, np.ndarray]) -> Dict[str, float]:
+    """Unwrap single-path metric arrays."""
+    return {m: float(metrics[m][0]) for m in METRICS}
+
+
+def run_robustness(
+    result: BacktestResult,
+    n_resamples: Optional[int] = None,
+    block_days: Optional[int] = None,
+    skip_prob: Optional[float] = None,
+    confidence: Optional[float] = None,
+    seed: int = DEFAULT_SEED,
+    batch_size: int = DEFAULT_BATCH_SIZE
+) -> RobustnessReport:
+    """
+    Run all Monte Carlo scenarios on a backtest result.
+    
+    Trade scenarios use the realized-P&L equity path (exits booked on their
+    exit day); the bootstrap uses the mark-to-market equity curve. Shuffling
+    trades leaves the final P&L unchanged, so its CAGR interval collapses to a
+    point - it measures path risk (drawdown, recovery) only.
+    
+    Args:
+        result: Finished backtest.
+        n_resamples: Resamples per scenario (default: MC_RESAMPLES).
+        block_days: Bootstrap block length (default: MC_BLOCK_DAYS).
+        skip_prob: Per-trade skip probability (default: MC_SKIP_PROB).
+        confidence: Confidence interval width (default: MC_CONFIDENCE).
+        seed: Random seed (results are reproducible).
+        batch_size: Paths generated per NumPy batch (bounds memory).
+    
+    Returns:
+        RobustnessReport with observed values and resampled distributions.
+    
+    Raises:
+        ValueError: If the equity curve has fewer than two points.
+    """
+    config = get_config().backtest
+    n_resamples = n_resamples or config.mc_resamples
+    block_days = block_days or config.mc_block_days
+    skip_prob = config.mc_skip_prob if skip_prob is None else skip_prob
+    confidence = confidence or config.mc_confidence
+    
+    equity_df = result.equity_curve
+    if len(equity_df) < 2:
+        raise ValueError("Equity curve too short for robustness analysis")
+    
+    started = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    initial = float(result.initial_capital)
+    
+    dates = equity_df['timestamp'].values.astype('datetime64[ns]')
+    curve = equity_df['equity'].to_numpy(dtype=np.float64)
+    days = (dates[-1] - dates[0]) / np.timedelta64(1, 'D')
+    years = days / 365.25 if days > 0 else len(curve) / TRADING_DAYS_PER_YEAR
+    
+    report = RobustnessReport(
+        n_resamples=n_resamples,
+        confidence=confidence,
+        block_days=block_days,
+        skip_prob=skip_prob,
+        elapsed_sec=0.0
+    )
+    batches = _batch_sizes(n_resamples, batch_size)
+    
+    # Block bootstrap of daily returns (mark-to-market curve)
+    observed_path = np.concatenate([[initial], curve])[None, :]
+    returns = curve[1:] / curve[:-1] - 1.0
+    report.observed['block_bootstrap'] = _scalar_metrics(path_metrics(observed_path, years))
+    report.samples['block_bootstrap'] = _collect([
+        path_metrics(_bootstrap_paths(returns, size, block_days, initial, rng), years)
+        for size in batches
+    ])
+    
+    # Trade-level scenarios (realized P&L path)
+    trades = result.trades
+    if not trades.empty and 'action' in trades.columns:
+        exits = trades[trades['action'] == 'exit'].sort_values('timestamp')
+    else:
+        exits = pd.DataFrame()
+    
+    if exits.empty:
+        logger.warning("No closed trades - skipping trade shuffle and skip scenarios")
+    else:
+        pnl = exits['pnl'].to_numpy(dtype=np.float64)
+        counts = _exit_counts(exits, dates)
+        
+        observed_trades = _scalar_metrics(path_metrics(_trade_paths(pnl[None, :], counts, initial), years))
+        
+        shuffle_batches = []
+        skip_batches = []
+        for size in batches:
+            tiled = np.broadcast_to(pnl, (size, len(pnl)))
+            shuffled = rng.permuted(tiled, axis=1)
+            shuffle_batches.append(path_metrics(_trade_paths(shuffled, counts, initial), years))
+            
+            kept = rng.random((size, len(pnl))) >= skip_prob
+            skip_batches.append(path_metrics(_trade_paths(tiled * kept, counts, initial), years))
+        
+        report.observed['trade_shuffle'] = observed_trades
+        report.samples['trade_shuffle'] = _collect(shuffle_batches)
+        report.observed['trade_skip'] = observed_trades
+        report.samples['trade_skip'] = _collect(skip_batches)
+    
+    report.elapsed_sec = time.perf_counter() - started
+    logger.info(
+        f"Robustness analysis: {n_resamples} resamples x {len(report.samples)} scenarios "
+        f"in {report.elapsed_sec:.2f}s"
+    )
+    return report
@@ -0,0 +1,349 @@
+"""
+Staged scan pipeline for live trading.
+
+One scan cycle runs as overlapping stages instead of strictly in sequence:
+
+    bars -> regime -> technical scan --(candidates)--> news + sentiment pool
+                                                              |
+                                          (confirmed signals) v
+                                                          order pool
+
+The technical scan stays on the calling thread. Every symbol that passes the
+regime, technical and trend checks is handed to a sentiment worker while the
+scan continues, and a confirmed signal is submitted to the rate-limited order
+pool as soon as its sentiment check returns. Account equity (for sizing) is
+fetched in the order pool while bars are downloading.
+
+Each scan returns a ScanReport; its end-to-end time is the headline metric.
+Stage times after the technical scan are the tail left on the critical path,
+with total worker time reported as busy time.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, Future, wait
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional, Dict, List
+
+import pandas as pd
+
+from config import get_config, Config
+from data_provider import DataProvider
+from portfolio import LivePortfolioManager
+from strategy import TradingStrategy, TradeSignal, SignalType
+from utils import get_logger, utc_now
+
+logger = get_logger("scan_pipeline")
+
+# Fewer bars than this cannot produce indicators (matches scan_universe)
+MIN_BARS = 30
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter spacing calls at least 1/rate seconds apart.
+    
+    Slots are reserved under the lock and slept outside it, so waiting callers
+    are released in order without holding up each other's bookkeeping.
+    """
+    
+    def __init__(self, rate_per_sec: float):
+        """
+        Initialize limiter.
+        
+        Args:
+            rate_per_sec: Maximum calls per second (<= 0 disables limiting).
+        """
+        self._interval = 1.0 / rate_per_sec if rate_per_sec > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+    
+    def acquire(self) -> float:
+        """
+        Block until the next call is allowed.
+        
+        Returns:
+            float: Seconds spent waiting.
+        """
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self._interval
+        
+        wait_sec = slot - now
+        if wait_sec > 0:
+            time.sleep(wait_sec)
+        return wait_sec
+
+
+@dataclass
+class ScanReport:
+    """Timings and counts for one scan cycle."""
+    started_at: datetime
+    total_sec: float = 0.0
+    # stage -> seconds on the critical path
+    stages: Dict[str, float] = field(default_factory=dict)
+    # stage -> seconds of worker time (overlapped with other stages)
+    busy: Dict[str, float] = field(default_factory=dict)
+    symbols: int = 0
+    candidates: int = 0
+    signals: List[TradeSignal] = field(default_factory=list)
+    orders_placed: int = 0
+    orders_failed: int = 0
+    throttled_sec: float = 0.0
+    
+    def summary(self) -> str:
+        """Format the one-line latency summary logged after every scan."""
+        parts = []
+        for name, seconds in self.stages.items():
+            text = f"{name}={seconds:.2f}s"
+            if name in self.busy:
+                text += f" (busy {self.busy[name]:.2f}s)"
+            parts.append(text)
+        
+        return (
+            f"Scan complete in {self.total_sec:.2f}s | "
+            f"symbols={self.symbols}, candidates={self.candidates}, signals={len(self.signals)}, "
+            f"orders={self.orders_placed} ok/{self.orders_failed} failed | "
+            + ", ".join(parts)
+            + (f" | order throttle {self.throttled_sec:.2f}s" if self.throttled_sec > 0 else "")
+        )
+    
+    def to_dict(self) -> dict:
+        """Convert to dictionary."""
+        return {
+            'started_at': self.started_at.isoformat(),
+            'total_sec': self.total_sec,
+            'stages': dict(self.stages),
+            'busy': dict(self.busy),
+            'symbols': self.symbols,
+            'candidates': self.candidates,
+            'signals': len(self.signals),
+            'orders_placed': self.orders_placed,
+            'orders_failed': self.orders_failed,
+            'throttled_sec': self.throttled_sec,
+        }
+
+
+class ScanPipeline:
+    """
+    Runs live scan cycles with overlapping sentiment and order stages.
+    
+    Worker pools are created once and reused across scans; call close() when
+    the bot shuts down.
+    """
+    
+    def __init__(
+        self,
+        strategy: TradingStrategy,
+        data_provider: DataProvider,
+        portfolio_manager: LivePortfolioManager,
+        symbols: List[str],
+        dry_run: bool = False,
+        config: Optional[Config] = None
+    ):
+        """
+        Initialize pipeline.
+        
+        Args:
+            strategy: Initialized trading strategy.
+            data_provider: Source of latest bars.
+            portfolio_manager: Live portfolio manager used for equity and orders.
+            symbols: Symbols to scan.
+            dry_run: Log orders instead of submitting them.
+            config: Configuration (default: global config).
+        """
+        self._config = config or get_config()
+        self._strategy = strategy
+        self._data_provider = data_provider
+        self._portfolio_manager = portfolio_manager
+        self._symbols = symbols
+        self._dry_run = dry_run
+        
+        live = self._config.live
+        self._sentiment_pool = ThreadPoolExecutor(
+            max_workers=max(1, live.sentiment_workers),
+            thread_name_prefix="sentiment"
+        )
+        self._order_pool = ThreadPoolExecutor(
+            max_workers=max(1, live.order_workers),
+            thread_name_prefix="orders"
+        )
+        self._order_limiter = RateLimiter(live.order_rate_per_sec)
+        
+        # Guards the report counters updated from worker threads
+        self._lock = threading.Lock()
+    
+    def close(self) -> None:
+        """Shut down worker pools."""
+        self._sentiment_pool.shutdown(wait=True)
+        self._order_pool.shutdown(wait=True)
+    
+    def _add_busy(self, report: ScanReport, stage: str, seconds: float) -> None:
+        """Accumulate worker time for a stage."""
+        with self._lock:
+            report.busy[stage] = report.busy.get(stage, 0.0) + seconds
+    
+    def run(self) -> ScanReport:
+        """
+        Execute one scan cycle.
+        
+        Returns:
+            ScanReport with per-stage latency and counts.
+        """
+        report = ScanReport(started_at=utc_now())
+        started = time.perf_counter()
+        
+        # Equity is only needed for sizing; fetch it while bars download
+        equity_future: Optional[Future] = None
+        if not self._dry_run:
+            equity_future = self._order_pool.submit(self._portfolio_manager.get_account_equity)
+        
+        # Stage 1: latest bars
+        step_start = time.perf_counter()
+        symbol_data = self._data_provider.get_latest_bars(self._symbols)
+        report.stages['bars'] = time.perf_counter() - step_start
+        logger.info(f"Fetched {len(symbol_data)} symbols ({report.stages['bars']:.2f}s)")
+        
+        # Stage 2: current regime
+        step_start = time.perf_counter()
+        regime, bull, bear, side = self._strategy._regime_detector.get_current_regime()
+        report.stages['regime'] = time.perf_counter() - step_start
+        logger.info(
+            f"Regime: {regime.value} (bull={bull:.2f}, bear={bear:.2f}, side={side:.2f}) "
+            f"({report.stages['regime']:.2f}s)"
+        )
+        
+        # Stage 3: technical scan; candidates go to the sentiment pool immediately
+        date = utc_now()
+        step_start = time.perf_counter()
+        sentiment_futures: List[Future] = []
+        for symbol, df in symbol_data.items():
+            if df is None or df.empty or len(df) < MIN_BARS:
+                logger.debug(f"Skipping {symbol}: insufficient data")
+                continue
+            
+            report.symbols += 1
+            try:
+                signal = self._strategy.generate_signal(symbol, df, date, check_sentiment=False)
+            except Exception as e:
+                logger.error(f"Error generating signal for {symbol}: {e}")
+                continue
+            
+            if signal.should_trade:
+                report.candidates += 1
+                sentiment_futures.append(
+                    self._sentiment_pool.submit(self._confirm, signal, df, equity_future, report)
+                )
+        
+        technical_end = time.perf_counter()
+        report.stages['technical'] = technical_end - step_start
+        
+        # Stage 4: remaining sentiment checks (most overlapped with the scan)
+        order_futures: List[Future] = []
+        for future in sentiment_futures:
+            signal, order_future = future.result()
+            if signal is not None and signal.should_trade:
+                report.signals.append(signal)
+            if order_future is not None:
+                order_futures.append(order_future)
+        
+        sentiment_end = time.perf_counter()
+        report.stages['sentiment'] = sentiment_end - technical_end
+        
+        # Stage 5: remaining order submissions
+        wait(order_futures)
+        report.stages['orders'] = time.perf_counter() - sentiment_end
+        
+        report.total_sec = time.perf_counter() - started
+        logger.info(report.summary())
+        return report
+    
+    def _confirm(
+        self,
+        signal: TradeSignal,
+        df: pd.DataFrame,
+        equity_future: Optional[Future],
+        report: ScanReport
+    ):
+        """
+        Sentiment worker: confirm a candidate and hand it to the order pool.
+        
+        Returns:
+            Tuple of (final signal or None on error, order future or None).
+        """
+        step_start = time.perf_counter()
+        try:
+            signal = self._strategy.confirm_sentiment(signal)
+        except Exception as e:
+            logger.error(f"Sentiment check failed for {signal.symbol}: {e}")
+            return None, None
+        finally:
+            self._add_busy(report, 'sentiment', time.perf_counter() - step_start)
+        
+        if not signal.should_trade:
+            logger.debug(f"{signal.symbol}: {signal.reject_reason}")
+            return signal, None
+        
+        rsi = f"{signal.rsi:.1f}" if signal.rsi is not None else "n/a"
+        logger.info(
+            f"Signal: {signal.signal_type.value.upper()} {signal.symbol} | "
+            f"RSI={rsi} | Sentiment={signal.sentiment_str}"
+        )
+        
+        if self._dry_run:
+            logger.info(f"DRY RUN: Would {signal.signal_type.value} {signal.symbol}")
+            return signal, None
+        
+        return signal, self._order_pool.submit(self._submit_order, signal, df, equity_future, report)
+    
+    def _submit_order(
+        self,
+        signal: TradeSignal,
+        df: pd.DataFrame,
+        equity_future: Future,
+        report: ScanReport
+    ) -> bool:
+        """
+        Order worker: size and submit one order under the rate limit.
+        
+        Returns:
+            bool: True if the order was accepted.
+        """
+        step_start = time.perf_counter()
+        # None = skipped (not counted as placed or failed)
+        success: Optional[bool] = None
+        try:
+            equity = equity_future.result()
+            position_value = equity * (self._config.risk.max_position_pct / 100) * 0.5
+            price = float(df['close'].iloc[-1])
+            qty = int(position_value / price)
+            if qty <= 0:
+                logger.info(f"Skipping {signal.symbol}: position size rounds to 0 shares")
+                return False
+            
+            side = "buy" if signal.signal_type == SignalType.LONG else "sell"
+            throttled = self._order_limiter.acquire()
+            with self._lock:
+                report.throttled_sec += throttled
+            
+            success, msg, order_id = self._portfolio_manager.place_order(signal.symbol, side, qty)
+            if success:
+                logger.info(f"Order placed: {side} {qty} {signal.symbol}")
+            else:
+                logger.error(f"Order failed: {msg}")
+            return success
+        
+        except Exception as e:
+            logger.error(f"Order failed for {signal.symbol}: {e}")
+            success = False
+            return False
+        
+        finally:
+            with self._lock:
+                if success:
+                    report.orders_placed += 1
+                elif success is not None:
+                    report.orders_failed += 1
+            self._add_busy(report, 'orders', time.perf_counter() - step_start)
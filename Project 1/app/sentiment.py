@@ -7,6 +7,7 @@ IMPORTANT: Returns None when no articles available, never fake 0.50.
 
 import logging
 import csv
+import threading
 from datetime import datetime
 from typing import Optional, Dict, List, Tuple
 from pathlib import Path
@@ -64,6 +65,8 @@ class SentimentAnalyzer:
         self._pipeline = None
         self._model_available = True  # Assume available until proven otherwise
         self._cache: Dict[str, Dict[str, float]] = {}
+        # Guards model loading and cache appends (live scans score in worker threads)
+        self._lock = threading.Lock()
         self._cache_path = get_config().paths.data_dir / self._config.cache_file
         self._load_cache()
         
@@ -87,17 +90,18 @@ class SentimentAnalyzer:
     def _save_to_cache(self, text_hash: str, scores: Dict[str, float]) -> None:
         """Append a single entry to the cache file."""
         try:
-            file_exists = self._cache_path.exists()
-            with open(self._cache_path, 'a', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=['text_hash', 'positive', 'negative', 'neutral'])
-                if not file_exists:
-                    writer.writeheader()
-                writer.writerow({
-                    'text_hash': text_hash,
-                    'positive': scores['positive'],
-                    'negative': scores['negative'],
-                    'neutral': scores['neutral']
-                })
+            with self._lock:
+                file_exists = self._cache_path.exists()
+                with open(self._cache_path, 'a', newline='', encoding='utf-8') as f:
+                    writer = csv.DictWriter(f, fieldnames=['text_hash', 'positive', 'negative', 'neutral'])
+                    if not file_exists:
+                        writer.writeheader()
+                    writer.writerow({
+                        'text_hash': text_hash,
+                        'positive': scores['positive'],
+                        'negative': scores['negative'],
+                        'neutral': scores['neutral']
+                    })
         except Exception as e:
             logger.warning(f"Failed to append to sentiment cache: {e}")
     
@@ -109,23 +113,25 @@ class SentimentAnalyzer:
             return None
             
         if self._pipeline is None:
-            logger.info(f"Loading FinBERT model: {self._config.model_name}")
-            try:
-                from transformers import pipeline
-                self._pipeline = pipeline(
-                    "sentiment-analysis",
-                    model=self._config.model_name,
-                    tokenizer=self._config.model_name,
-                    truncation=True,
-                    max_length=512
-                )
-                logger.info("FinBERT model loaded successfully")
-            except Exception as e:
-                if not _model_unavailable_notice_shown:
-                    logger.warning(f"Sentiment model unavailable; sentiment disabled for this run. Error: {e}")
-                    _model_unavailable_notice_shown = True
-                self._model_available = False
-                return None
+            with self._lock:
+                if self._pipeline is None and self._model_available:
+                    logger.info(f"Loading FinBERT model: {self._config.model_name}")
+                    try:
+                        from transformers import pipeline
+                        self._pipeline = pipeline(
+                            "sentiment-analysis",
+                            model=self._config.model_name,
+                            tokenizer=self._config.model_name,
+                            truncation=True,
+                            max_length=512
+                        )
+                        logger.info("FinBERT model loaded successfully")
+                    except Exception as e:
+                        if not _model_unavailable_notice_shown:
+                            logger.warning(f"Sentiment model unavailable; sentiment disabled for this run. Error: {e}")
+                            _model_unavailable_notice_shown = True
+                        self._model_available = False
+                        return None
                 
         return self._pipeline
     
@@ -7,7 +7,7 @@ Combines regime detection, technical indicators, trend filter, and sentiment for
 import logging
 from datetime import datetime, timedelta
 from typing import Optional, Dict, List, Tuple, Any
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from enum import Enum
 
 import pandas as pd
@@ -17,6 +17,7 @@ from regime_hmm import get_regime_detector, MarketRegime
 from indicators import TechnicalIndicators, get_entry_signals
 from sentiment import get_sentiment_analyzer, SentimentScore
 from news_provider import get_news_provider
+from profiling import get_profiler
 from utils import get_logger
 
 logger = get_logger("strategy")
@@ -128,6 +129,7 @@ class TradingStrategy:
         self._sentiment_analyzer = get_sentiment_analyzer()
         self._news_provider = get_news_provider()
         self._indicators = TechnicalIndicators()
+        self._profiler = get_profiler()
         
         # Cooldown tracking: symbol -> last hard stop date
         self._cooldown_map: Dict[str, datetime] = {}
@@ -183,7 +185,8 @@ class TradingStrategy:
         Returns:
             Tuple of (passed, regime, bull_prob, bear_prob, side_prob, reason).
         """
-        regime, bull_prob, bear_prob, side_prob = self._regime_detector.get_current_regime(as_of_date=as_of_date)
+        with self._profiler.stage("regime"):
+            regime, bull_prob, bear_prob, side_prob = self._regime_detector.get_current_regime(as_of_date=as_of_date)
         
         if signal_type == SignalType.LONG:
             if regime == MarketRegime.BULL and bull_prob >= self._config.hmm.bull_prob_threshold:
@@ -257,8 +260,9 @@ class TradingStrategy:
         Returns:
             Tuple of (long_signal, short_signal, indicator_values).
         """
-        indicators_df = self._indicators.calculate(df)
-        signals = self._indicators.get_latest_signals()
+        with self._profiler.stage("indicators"):
+            indicators_df = self._indicators.calculate(df)
+            signals = self._indicators.get_latest_signals()
         
         return signals['long_technical'], signals['short_technical'], signals
     
@@ -290,12 +294,13 @@ class TradingStrategy:
         end_dt = date
         start_dt = date - timedelta(days=lookback)
         
-        articles = self._news_provider.get_news_window(symbol, start_dt, end_dt)
-        
-        if not articles:
-            sentiment = None
-        else:
-            sentiment = self._sentiment_analyzer.score_articles(articles)
+        with self._profiler.stage("sentiment"):
+            articles = self._news_provider.get_news_window(symbol, start_dt, end_dt)
+            
+            if not articles:
+                sentiment = None
+            else:
+                sentiment = self._sentiment_analyzer.score_articles(articles)
         
         # Mode: STRICT - require sentiment confirmation
         if mode == "strict":
@@ -367,7 +372,8 @@ class TradingStrategy:
             proposed = SignalType.NONE
         
         # Get regime info (always needed for reporting)
-        regime, bull_prob, bear_prob, side_prob = self._regime_detector.get_current_regime(as_of_date=date)
+        with self._profiler.stage("regime"):
+            regime, bull_prob, bear_prob, side_prob = self._regime_detector.get_current_regime(as_of_date=date)
         
         # Base signal for no technical trigger
         if proposed == SignalType.NONE:
@@ -589,6 +595,35 @@ class TradingStrategy:
         
         return signals
     
+    def confirm_sentiment(self, signal: TradeSignal) -> TradeSignal:
+        """
+        Run the sentiment check on a pre-filtered candidate.
+        
+        Equivalent to generate_signal(..., check_sentiment=True) for a signal
+        that passed every other check, without recomputing technicals or
+        regime. Safe to call from worker threads.
+        
+        Args:
+            signal: Candidate from generate_signal(check_sentiment=False).
+        
+        Returns:
+            TradeSignal with sentiment fields filled in.
+        """
+        if not signal.should_trade:
+            return signal
+        
+        side = "long" if signal.signal_type == SignalType.LONG else "short"
+        passed, sentiment, reason = self._check_sentiment(signal.symbol, signal.date, side)
+        
+        return replace(
+            signal,
+            sentiment=sentiment,
+            sentiment_passed=passed,
+            sentiment_reason=reason,
+            should_trade=passed,
+            reject_reason=None if passed else f"SKIP: {reason}"
+        )
+    
     def get_actionable_signals(
         self,
         symbol_data: Dict[str, pd.DataFrame],
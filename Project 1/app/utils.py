@@ -342,6 +342,34 @@ def ensure_tz_aware(
     return df
 
 
+def enable_copy_on_write() -> None:
+    """
+    Enable pandas Copy-on-Write (always on from pandas 3.0).
+    
+    Bar frames are shared read-only between the data provider, backtester,
+    strategy and indicators without defensive copies. Under Copy-on-Write a
+    slice or derived frame can never write through to the shared data: any
+    modification copies first, and `.to_numpy()` returns read-only arrays.
+    """
+    if int(pd.__version__.split(".")[0]) < 3:
+        pd.set_option("mode.copy_on_write", True)
+
+
+def downcast_floats(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert float64 columns to float32 in place (halves numeric memory).
+    
+    Args:
+        df: DataFrame to convert.
+    
+    Returns:
+        pd.DataFrame: The same DataFrame.
+    """
+    for col in df.columns[(df.dtypes == np.float64).to_numpy()]:
+        df[col] = df[col].to_numpy(dtype=np.float32)
+    return df
+
+
 def hash_text(text: str) -> str:
     """
     Create a hash of text for caching purposes.
@@ -420,3 +448,6 @@ def is_market_open(dt: Optional[datetime] = None) -> bool:
     
     return True
 
+
+# Shared bar frames rely on Copy-on-Write (see enable_copy_on_write)
+enable_copy_on_write()
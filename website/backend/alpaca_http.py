@@ -0,0 +1,131 @@
+"""Pooled keep-alive HTTP client for raw Alpaca REST calls.
+
+alpaca-py does not cover every endpoint the dashboard uses (portfolio
+history, account activities), so those are called over plain HTTP. AlpacaHTTP
+keeps one requests.Session per account, so calls reuse pooled keep-alive
+connections instead of paying a TCP and TLS handshake each time, retries
+429/5xx responses with exponential backoff (honouring Retry-After), and
+applies the same timeout everywhere. It records per-call latency and
+per-host connection reuse for the metrics endpoint.
+"""
+import threading
+import time
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class AlpacaHTTP:
+    """Session-backed REST client for one Alpaca account."""
+
+    # Latency samples kept for percentiles
+    WINDOW = 500
+
+    def __init__(self, base_url, api_key, secret_key, timeout=10.0, retries=3,
+                 backoff=0.5, pool_size=10):
+        """
+        Args:
+            base_url: Account API base URL (paper or live).
+            api_key: Alpaca API key id.
+            secret_key: Alpaca secret key.
+            timeout: Default timeout in seconds for each attempt.
+            retries: Retries on connection errors and 429/5xx responses.
+            backoff: Backoff factor; retry n waits backoff * 2**(n-1) seconds.
+            pool_size: Keep-alive connections kept per host.
+        """
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update({
+            'APCA-API-KEY-ID': api_key or '',
+            'APCA-API-SECRET-KEY': secret_key or ''
+        })
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(['GET']),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        self._adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount('https://', self._adapter)
+        self.session.mount('http://', self._adapter)
+
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=self.WINDOW)
+        self.calls = 0
+        self.errors = 0
+        self.status_counts = {}
+
+    def get(self, path_or_url, params=None, timeout=None):
+        """GET an account API path (or absolute URL).
+
+        Args:
+            path_or_url: e.g. '/v2/account/portfolio/history'.
+            params: Query parameters.
+            timeout: Override the default timeout.
+
+        Returns:
+            requests.Response: Final response after any retries.
+
+        Raises:
+            requests.RequestException: On connection failure after retries.
+        """
+        url = path_or_url if path_or_url.startswith('http') else f"{self.base_url}{path_or_url}"
+        started = time.perf_counter()
+        status = None
+        try:
+            response = self.session.get(url, params=params, timeout=timeout or self.timeout)
+            status = response.status_code
+            return response
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            with self._lock:
+                self.calls += 1
+                self._latencies.append(elapsed_ms)
+                if status is None:
+                    self.errors += 1
+                else:
+                    self.status_counts[status] = self.status_counts.get(status, 0) + 1
+
+    def stats(self):
+        """Latency percentiles, status counts and connection reuse per host."""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            status_counts = {str(k): v for k, v in self.status_counts.items()}
+            calls, errors = self.calls, self.errors
+
+        def percentile(p):
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 1)
+
+        hosts = {}
+        pools = self._adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            host = getattr(key, 'key_host', None) or str(key)
+            # num_requests counts HTTP requests (including retries), num_connections new sockets
+            hosts[host] = {
+                'requests': pool.num_requests,
+                'newConnections': pool.num_connections,
+                'reuseRatio': round(1 - pool.num_connections / pool.num_requests, 3) if pool.num_requests else None
+            }
+
+        return {
+            'calls': calls,
+            'errors': errors,
+            'statusCounts': status_counts,
+            'latencyMs': {
+                'p50': percentile(0.50),
+                'p95': percentile(0.95),
+                'p99': percentile(0.99),
+                'max': round(latencies[-1], 1) if latencies else None
+            },
+            'hosts': hosts
+        }
@@ -1,7 +1,6 @@
 """Backend API server for trading algorithms portfolio website."""
 import os
 import json
-import requests
 from datetime import datetime, timedelta, timezone
 try:
     from zoneinfo import ZoneInfo
@@ -15,11 +14,23 @@ from flask import Flask, jsonify, request
 from flask_cors import CORS
 from dotenv import load_dotenv
 from alpaca.trading.client import TradingClient
-from alpaca.trading.requests import GetOrdersRequest
-from alpaca.trading.enums import QueryOrderStatus, OrderSide
+from alpaca.trading.enums import OrderSide
+from alpaca.trading.models import Order
 from alpaca.data.historical import StockHistoricalDataClient, CryptoHistoricalDataClient
+from alpaca.data.requests import StockLatestTradeRequest, CryptoLatestTradeRequest
 from pathlib import Path
 from agent_baselines import get_baseline, get_baseline_start_datetime
+from snapshot_cache import SnapshotCache, SQLiteStore, MemoryStore
+from payload_scheduler import PayloadScheduler, format_generated_at
+from quote_service import QuoteService
+from alpaca_http import AlpacaHTTP
+from order_ledger import (OrderLedger, InvalidCursor, encode_cursor, decode_cursor, to_iso, from_iso,
+                          round_trip_tie)
+from fill_ledger import FillLedger
+from fanout import FanOut
+from equity_store import EquityStore, RES_DAILY, RES_INTRADAY, INTRADAY_MAX_DAYS
+from equity_series import parse_portfolio_history, equity_at_or_before
+from trade_stream import TradeUpdateListener, STREAM_URLS, stream_connected
 
 # Load .env from the backend directory, not current working directory
 env_path = Path(__file__).parent / '.env'
@@ -27,6 +38,12 @@ load_dotenv(dotenv_path=env_path)
 
 DEBUG_LOG_PATH = os.getenv("DEBUG_LOG_PATH", "debug.log")
 
+# Local state (snapshot cache, ledgers, stream locks) lives next to the app by
+# default rather than in the world-writable temp dir, so it survives reboots and
+# other local users cannot plant or read it
+DATA_DIR = os.getenv('DATA_DIR', str(Path(__file__).parent / 'data'))
+os.makedirs(DATA_DIR, mode=0o700, exist_ok=True)
+
 app = Flask(__name__)
 CORS(app)
 
@@ -76,6 +93,227 @@ except Exception as e:
     import traceback
     traceback.print_exc()
 
+# Broker snapshot cache: one shared copy of each account's positions and
+# account, refreshed at most once per TTL (seconds)
+SNAPSHOT_TTLS = {
+    'positions': float(os.getenv('SNAPSHOT_TTL_POSITIONS', '10')),
+    'account': float(os.getenv('SNAPSHOT_TTL_ACCOUNT', '10')),
+}
+
+# Gunicorn workers share snapshots through a SQLite file on the host (one
+# elected refresher per key); set SNAPSHOT_CACHE_DB= (empty) for a per-process cache
+SNAPSHOT_CACHE_DB = os.getenv('SNAPSHOT_CACHE_DB', os.path.join(DATA_DIR, 'broker_snapshots.db'))
+try:
+    snapshot_store = SQLiteStore(SNAPSHOT_CACHE_DB) if SNAPSHOT_CACHE_DB else MemoryStore()
+except Exception as e:
+    print(f"Error opening snapshot cache {SNAPSHOT_CACHE_DB}, using in-process cache: {e}")
+    snapshot_store = MemoryStore()
+broker_cache = SnapshotCache(
+    store=snapshot_store,
+    stale_sec=float(os.getenv('SNAPSHOT_STALE_SEC', '120'))
+)
+
+
+def is_market_hours(now=None):
+    """Check whether US equity regular hours (9:30-16:00 ET, weekdays) are open."""
+    if ZoneInfo is None:
+        return False
+    now = now or datetime.now(ZoneInfo('America/New_York'))
+    if now.weekday() >= 5:
+        return False
+    minutes = now.hour * 60 + now.minute
+    return 9 * 60 + 30 <= minutes < 16 * 60
+
+
+# Background precompute of dashboard payloads (see register calls at the bottom)
+PRECOMPUTE_ENABLED = os.getenv('PRECOMPUTE_ENABLED', 'true').lower() == 'true'
+payloads = PayloadScheduler(
+    store=snapshot_store,
+    interval_sec=float(os.getenv('PRECOMPUTE_INTERVAL_SEC', '60')),
+    market_interval_sec=float(os.getenv('PRECOMPUTE_MARKET_INTERVAL_SEC', '15')),
+    is_market_hours=is_market_hours,
+    dumps=lambda payload: app.json.dumps(payload)
+)
+
+# Latest-trade marks for open positions: one multi-symbol request per batch,
+# each symbol cached for QUOTE_TTL_SEC and shared by every live-equity path
+QUOTE_TTL_SEC = float(os.getenv('QUOTE_TTL_SEC', '5'))
+stock_quotes = QuoteService(
+    lambda symbols: data_client.get_stock_latest_trade(
+        StockLatestTradeRequest(symbol_or_symbols=symbols, feed='iex')
+    ),
+    ttl_sec=QUOTE_TTL_SEC
+)
+crypto_quotes = QuoteService(
+    lambda symbols: data_client_2.get_crypto_latest_trade(
+        CryptoLatestTradeRequest(symbol_or_symbols=symbols)
+    ),
+    ttl_sec=QUOTE_TTL_SEC
+)
+
+
+def cached_snapshot(kind, project, loader, *key_parts):
+    """Get a broker snapshot for one account through the shared cache.
+
+    Args:
+        kind: Snapshot type (key of SNAPSHOT_TTLS)
+        project: Project number (1 or 2)
+        loader: Zero-argument callable that calls Alpaca
+        key_parts: Extra key parts (e.g. request parameters)
+    """
+    return broker_cache.get((kind, project) + key_parts, loader, SNAPSHOT_TTLS[kind])
+
+
+def get_account_credentials(project=1):
+    """Get (base_url, api_key, secret_key) for a project's Alpaca account."""
+    if project == 2:
+        return ALPACA_BASE_URL_2, ALPACA_API_KEY_2, ALPACA_SECRET_KEY_2
+    return ALPACA_BASE_URL, ALPACA_API_KEY, ALPACA_SECRET_KEY
+
+
+# Pooled keep-alive sessions (with retry/backoff on 429/5xx) for raw REST calls, per account
+alpaca_http = {
+    project: AlpacaHTTP(
+        *get_account_credentials(project),
+        timeout=float(os.getenv('ALPACA_HTTP_TIMEOUT', '10')),
+        retries=int(os.getenv('ALPACA_HTTP_RETRIES', '3')),
+        pool_size=int(os.getenv('ALPACA_HTTP_POOL_SIZE', '10'))
+    )
+    for project in (1, 2)
+}
+
+# Local order ledger (both accounts), synced incrementally at most every ORDER_SYNC_SEC
+ORDER_LEDGER_DB = os.getenv('ORDER_LEDGER_DB', os.path.join(DATA_DIR, 'order_ledger.db'))
+order_ledger = OrderLedger(ORDER_LEDGER_DB, sync_interval_sec=float(os.getenv('ORDER_SYNC_SEC', '15')))
+# Fill activities for micro-metrics, kept in the same file and synced on the same cadence
+fill_ledger = FillLedger(ORDER_LEDGER_DB, sync_interval_sec=float(os.getenv('ORDER_SYNC_SEC', '15')))
+
+# Shared pool for compute_micro_metrics' concurrent sub-fetches; each call waits at most
+# METRICS_SUBFETCH_TIMEOUT_SEC and reports sub-fetches that miss it as a partial result
+micro_metrics_fanout = FanOut(
+    max_workers=int(os.getenv('METRICS_MAX_WORKERS', '16')),
+    timeout_sec=float(os.getenv('METRICS_SUBFETCH_TIMEOUT_SEC', '8')),
+    name='micro-metrics'
+)
+
+
+# Optional trade-updates streams (see the listeners at the bottom). While an account's
+# stream is up, fills and cancels arrive as events and ledger polling relaxes to
+# ORDER_STREAM_SYNC_SEC as a safety net; when it is down, polling every ORDER_SYNC_SEC resumes
+TRADE_STREAM_ENABLED = os.getenv('TRADE_STREAM_ENABLED', 'false').lower() == 'true'
+ORDER_STREAM_SYNC_SEC = float(os.getenv('ORDER_STREAM_SYNC_SEC', '300'))
+
+
+def ledger_sync_interval(project):
+    """Minimum seconds between ledger syncs of a project right now (None for the default)."""
+    if TRADE_STREAM_ENABLED and stream_connected(snapshot_store, project):
+        return ORDER_STREAM_SYNC_SEC
+    return None
+
+
+def sync_order_ledger(project, force=False):
+    """Bring the project's order ledger up to date (no-op if synced recently, unless forced)."""
+    client = trading_client_2 if project == 2 else trading_client
+    if not client:
+        return
+    try:
+        order_ledger.sync(project, client, get_baseline_start_datetime(project),
+                          force=force, interval_sec=ledger_sync_interval(project))
+    except Exception as e:
+        # Serve what the ledger already has
+        print(f"Error syncing order ledger (Project {project}): {e}")
+
+
+def fetch_account_activities(project, params, timeout=None):
+    """Request one page of account activities from Alpaca (uncached).
+
+    Raises:
+        RuntimeError: If Alpaca returns an error response.
+    """
+    response = alpaca_http[project].get('/v2/account/activities', params=params, timeout=timeout)
+    if response.status_code != 200:
+        raise RuntimeError(f"account activities request failed: {response.status_code} - {response.text}")
+    return response.json()
+
+
+def request_portfolio_history(project, params):
+    """Request raw portfolio history JSON from Alpaca (uncached).
+
+    Args:
+        project: Project number (1 or 2)
+        params: Query parameters for /v2/account/portfolio/history
+
+    Returns:
+        dict: Alpaca response JSON, or None on a non-200 response
+    """
+    response = alpaca_http[project].get('/v2/account/portfolio/history', params=params)
+    if response.status_code != 200:
+        print(f"Error fetching portfolio history (Project {project}): {response.status_code} - {response.text}")
+        return None
+    return response.json()
+
+
+# Local equity history (both accounts): daily and 5Min series that answer every chart
+# timeframe and the baseline lookup; synced at most every EQUITY_SYNC_SEC (intraday)
+# and EQUITY_DAILY_SYNC_SEC (daily)
+EQUITY_STORE_DB = os.getenv('EQUITY_STORE_DB', os.path.join(DATA_DIR, 'equity_store.db'))
+equity_store = EquityStore(
+    EQUITY_STORE_DB,
+    intraday_sync_sec=float(os.getenv('EQUITY_SYNC_SEC', '60')),
+    daily_sync_sec=float(os.getenv('EQUITY_DAILY_SYNC_SEC', '600'))
+)
+
+
+def load_equity_points(project, params):
+    """Fetch portfolio history as canonical equity points for the equity store.
+
+    Raises:
+        RuntimeError: If Alpaca returns an error response.
+    """
+    data = request_portfolio_history(project, params)
+    if data is None:
+        raise RuntimeError(f"portfolio history request failed ({params})")
+    # Keep everything; the baseline is applied when reading
+    return parse_portfolio_history(data, datetime.fromtimestamp(0, tz=timezone.utc))
+
+
+def sync_equity_store(project):
+    """Bring the project's equity history up to date (no-op if synced recently)."""
+    _, api_key, secret_key = get_account_credentials(project)
+    if not api_key or not secret_key:
+        return
+    try:
+        equity_store.sync(project, lambda params: load_equity_points(project, params))
+    except Exception as e:
+        # Serve what the store already has
+        print(f"Error syncing equity store (Project {project}): {e}")
+
+
+def account_to_dict(account):
+    """Convert an Alpaca account object to the dict used by the API."""
+    return {
+        'equity': float(account.equity) if account.equity else 0,
+        'cash': float(account.cash) if account.cash else 0,
+        'buying_power': float(account.buying_power) if account.buying_power else 0,
+        'portfolio_value': float(account.portfolio_value) if account.portfolio_value else 0
+    }
+
+
+def positions_to_dicts(positions):
+    """Convert Alpaca position objects to the dicts used by the API."""
+    return [
+        {
+            'symbol': pos.symbol,
+            'qty': float(pos.qty),
+            'avg_entry_price': float(pos.avg_entry_price),
+            'current_price': float(pos.current_price),
+            'market_value': float(pos.market_value),
+            'unrealized_pl': float(pos.unrealized_pl),
+            'unrealized_plpc': float(pos.unrealized_plpc)
+        }
+        for pos in positions
+    ]
+
 
 def get_alpaca_orders(limit=100, project=1):
     """Fetch filled orders (trades) from Alpaca and combine with positions.
@@ -92,13 +330,9 @@ def get_alpaca_orders(limit=100, project=1):
         # Get baseline start datetime for filtering
         baseline_start = get_baseline_start_datetime(project)
         
-        # Get all orders and positions
-        request_params = GetOrdersRequest(
-            status=QueryOrderStatus.ALL,
-            limit=limit,
-            nested=True
-        )
-        orders = trading_client.get_orders(request_params)
+        # Filled orders since baseline from the local ledger, and positions
+        sync_order_ledger(1)
+        orders = order_ledger.filled_orders(1, baseline_start, limit)
         positions = get_alpaca_positions()
         
         # Filter orders to only include those after baseline
@@ -378,18 +612,12 @@ def get_alpaca_orders(limit=100, project=1):
 
 
 def get_alpaca_account():
-    """Get account information from Alpaca."""
+    """Get account information from Alpaca (cached snapshot)."""
     if not trading_client:
         return None
     
     try:
-        account = trading_client.get_account()
-        return {
-            'equity': float(account.equity) if account.equity else 0,
-            'cash': float(account.cash) if account.cash else 0,
-            'buying_power': float(account.buying_power) if account.buying_power else 0,
-            'portfolio_value': float(account.portfolio_value) if account.portfolio_value else 0
-        }
+        return cached_snapshot('account', 1, lambda: account_to_dict(trading_client.get_account()))
     except Exception as e:
         print(f"Error fetching Alpaca account: {e}")
         import traceback
@@ -398,24 +626,12 @@ def get_alpaca_account():
 
 
 def get_alpaca_positions():
-    """Get current positions from Alpaca."""
+    """Get current positions from Alpaca (cached snapshot)."""
     if not trading_client:
         return []
     
     try:
-        positions = trading_client.get_all_positions()
-        return [
-            {
-                'symbol': pos.symbol,
-                'qty': float(pos.qty),
-                'avg_entry_price': float(pos.avg_entry_price),
-                'current_price': float(pos.current_price),
-                'market_value': float(pos.market_value),
-                'unrealized_pl': float(pos.unrealized_pl),
-                'unrealized_plpc': float(pos.unrealized_plpc)
-            }
-            for pos in positions
-        ]
+        return cached_snapshot('positions', 1, lambda: positions_to_dicts(trading_client.get_all_positions()))
     except Exception as e:
         print(f"Error fetching Alpaca positions: {e}")
         return []
@@ -425,6 +641,60 @@ def get_alpaca_positions():
 # PROJECT 2 (CRYPTO) FUNCTIONS
 # ============================================================================
 
+def datetime_to_iso_2(dt):
+    """Convert a datetime to ISO UTC with millisecond precision and Z suffix."""
+    if dt is None:
+        return None
+    # If datetime is timezone-aware, convert to UTC
+    if hasattr(dt, 'tzinfo') and dt.tzinfo is not None:
+        utc_dt = dt.astimezone(timezone.utc)
+        # Return ISO format with Z suffix for UTC
+        iso_str = utc_dt.strftime('%Y-%m-%dT%H:%M:%S')
+        # Add microseconds if present
+        if utc_dt.microsecond:
+            iso_str += f'.{utc_dt.microsecond:06d}'[:4]  # First 3 digits of microseconds
+        return iso_str + 'Z'
+    # If datetime is naive, assume it's UTC and add Z
+    if hasattr(dt, 'isoformat'):
+        return dt.isoformat() + 'Z'
+    return str(dt)
+
+
+def order_to_trade_2(order, position_map):
+    """Format one filled order as a Project 2 transaction (individual order, no P&L).
+    
+    Args:
+        order: Alpaca Order or LedgerOrder
+        position_map: Current positions by symbol (marks the order open/closed)
+    """
+    side = str(order.side).lower()
+    if hasattr(order.side, 'value'):
+        side = order.side.value.lower()
+    
+    filled_qty = float(order.filled_qty)
+    avg_fill_price = float(order.filled_avg_price) if order.filled_avg_price else 0
+    # Order time for display and sorting (filled_at > created_at)
+    if order.filled_at:
+        order_time = order.filled_at
+    else:
+        order_time = order.created_at if order.created_at else datetime.now(timezone.utc)
+    order_time_str = datetime_to_iso_2(order_time)
+    
+    return {
+        'symbol': order.symbol,
+        'side': side if side in ['buy', 'sell'] else ('buy' if 'buy' in side else 'sell'),
+        'qty': filled_qty,
+        'entry_price': avg_fill_price,
+        'exit_price': avg_fill_price,  # Same as entry for individual orders
+        'pnl': 0,  # P&L calculated separately for stats
+        'pnl_percent': 0,
+        'entry_time': order_time_str,
+        'exit_time': order_time_str,
+        # Open if this symbol still has a position
+        'status': 'open' if order.symbol in position_map else 'closed'
+    }
+
+
 def get_alpaca_orders_2(limit=100):
     """Fetch filled orders (trades) from Alpaca Project 2 (Crypto) and combine with positions.
     
@@ -439,13 +709,9 @@ def get_alpaca_orders_2(limit=100):
         # Get baseline start datetime for filtering
         baseline_start = get_baseline_start_datetime(2)
         
-        # Get all orders and positions
-        request_params = GetOrdersRequest(
-            status=QueryOrderStatus.ALL,
-            limit=limit,
-            nested=True
-        )
-        orders = trading_client_2.get_orders(request_params)
+        # Filled orders since baseline from the local ledger, and positions
+        sync_order_ledger(2)
+        orders = order_ledger.filled_orders(2, baseline_start, limit)
         positions = get_alpaca_positions_2()
         
         # Filter orders to only include those after baseline
@@ -475,30 +741,6 @@ def get_alpaca_orders_2(limit=100):
                 return order.filled_at
             return datetime.now(timezone.utc)
         
-        # Helper function to convert datetime to ISO string, handling timezones properly
-        def datetime_to_iso(dt):
-            if dt is None:
-                return None
-            # If datetime is timezone-aware, convert to UTC
-            if hasattr(dt, 'tzinfo') and dt.tzinfo is not None:
-                utc_dt = dt.astimezone(timezone.utc)
-                # Return ISO format with Z suffix for UTC
-                iso_str = utc_dt.strftime('%Y-%m-%dT%H:%M:%S')
-                # Add microseconds if present
-                if utc_dt.microsecond:
-                    iso_str += f'.{utc_dt.microsecond:06d}'[:4]  # First 3 digits of microseconds
-                return iso_str + 'Z'
-            # If datetime is naive, assume it's UTC and add Z
-            if hasattr(dt, 'isoformat'):
-                return dt.isoformat() + 'Z'
-            return str(dt)
-        
-        # Helper function to get order time for sorting (filled_at > created_at)
-        def get_order_time(order):
-            if hasattr(order, 'filled_at') and order.filled_at:
-                return order.filled_at
-            return order.created_at if hasattr(order, 'created_at') and order.created_at else datetime.now(timezone.utc)
-        
         # For Recent Transactions: show ALL individual orders (both buys and sells)
         trades = []
         
@@ -511,9 +753,6 @@ def get_alpaca_orders_2(limit=100):
                 side = order.side.value.lower()
             
             filled_qty = float(order.filled_qty)
-            avg_fill_price = float(order.filled_avg_price) if order.filled_avg_price else 0
-            order_time = get_order_time(order)
-            order_time_str = datetime_to_iso(order_time)
             
             # Count buy orders
             if side == 'buy' or side == 'buy_order':
@@ -523,23 +762,7 @@ def get_alpaca_orders_2(limit=100):
                     f.write(json.dumps({'sessionId': 'debug-session', 'runId': 'run1', 'hypothesisId': 'B', 'location': 'app.py:536', 'message': 'Project 2 buy order counted', 'data': {'symbol': order.symbol, 'side': side, 'qty': filled_qty, 'buy_orders_count': buy_orders_count}, 'timestamp': int(datetime.now().timestamp() * 1000)}) + '\n')
                 # #endregion
             
-            # Check if this symbol has an open position
-            symbol = order.symbol
-            is_open = symbol in position_map
-            
-            trade = {
-                'symbol': symbol,
-                'side': side if side in ['buy', 'sell'] else ('buy' if 'buy' in side else 'sell'),
-                'qty': filled_qty,
-                'entry_price': avg_fill_price,
-                'exit_price': avg_fill_price,  # Same as entry for individual orders
-                'pnl': 0,  # P&L calculated separately for stats
-                'pnl_percent': 0,
-                'entry_time': order_time_str,
-                'exit_time': order_time_str,
-                'status': 'open' if is_open else 'closed'
-            }
-            trades.append(trade)
+            trades.append(order_to_trade_2(order, position_map))
         
         # Sort trades by time (most recent first) for display
         def get_sort_time(trade):
@@ -577,18 +800,12 @@ def get_alpaca_orders_2(limit=100):
     
 
 def get_alpaca_account_2():
-    """Get account information from Alpaca Project 2."""
+    """Get account information from Alpaca Project 2 (cached snapshot)."""
     if not trading_client_2:
         return None
     
     try:
-        account = trading_client_2.get_account()
-        return {
-            'equity': float(account.equity) if account.equity else 0,
-            'cash': float(account.cash) if account.cash else 0,
-            'buying_power': float(account.buying_power) if account.buying_power else 0,
-            'portfolio_value': float(account.portfolio_value) if account.portfolio_value else 0
-        }
+        return cached_snapshot('account', 2, lambda: account_to_dict(trading_client_2.get_account()))
     except Exception as e:
         print(f"Error fetching Alpaca account (Project 2): {e}")
         import traceback
@@ -597,24 +814,12 @@ def get_alpaca_account_2():
 
 
 def get_alpaca_positions_2():
-    """Get current positions from Alpaca Project 2."""
+    """Get current positions from Alpaca Project 2 (cached snapshot)."""
     if not trading_client_2:
         return []
     
     try:
-        positions = trading_client_2.get_all_positions()
-        return [
-            {
-                'symbol': pos.symbol,
-                'qty': float(pos.qty),
-                'avg_entry_price': float(pos.avg_entry_price),
-                'current_price': float(pos.current_price),
-                'market_value': float(pos.market_value),
-                'unrealized_pl': float(pos.unrealized_pl),
-                'unrealized_plpc': float(pos.unrealized_plpc)
-            }
-            for pos in positions
-        ]
+        return cached_snapshot('positions', 2, lambda: positions_to_dicts(trading_client_2.get_all_positions()))
     except Exception as e:
         print(f"Error fetching Alpaca positions (Project 2): {e}")
         import traceback
@@ -646,23 +851,11 @@ def get_live_portfolio_equity_2():
             # Still get positions for prices_used logging
             positions = get_alpaca_positions_2()
             prices_used = {}
-            if data_client_2:
-                from alpaca.data.requests import CryptoLatestTradeRequest
-                for position in positions:
-                    symbol = position['symbol']
-                    try:
-                        # Try to get latest extended-hours price for logging
-                        latest_trade_req = CryptoLatestTradeRequest(symbol_or_symbols=[symbol])
-                        latest_trades = data_client_2.get_crypto_latest_trade(latest_trade_req)
-                        if symbol in latest_trades and latest_trades[symbol]:
-                            prices_used[symbol] = float(latest_trades[symbol].price)
-                        else:
-                            prices_used[symbol] = float(position['current_price'])
-                    except:
-                        prices_used[symbol] = float(position['current_price'])
-            else:
-                for position in positions:
-                    prices_used[position['symbol']] = float(position['current_price'])
+            # One batched quote request for all held symbols
+            quotes = crypto_quotes.get_latest([p['symbol'] for p in positions]) if data_client_2 and positions else {}
+            for position in positions:
+                quote = quotes.get(position['symbol'])
+                prices_used[position['symbol']] = quote[0] if quote else float(position['current_price'])
             
             # Get the actual timestamp from account or use current time
             as_of_timestamp = int(datetime.now().timestamp() * 1000)
@@ -686,31 +879,17 @@ def get_live_portfolio_equity_2():
         latest_timestamp = 0
         
         if data_client_2:
-            from alpaca.data.requests import CryptoLatestTradeRequest
+            # Latest trades for all positions in one batched request (crypto is 24/7)
+            quotes = crypto_quotes.get_latest([p['symbol'] for p in positions]) if positions else {}
             for position in positions:
                 symbol = position['symbol']
                 qty = position['qty']
                 latest_price = None
                 trade_timestamp = 0
                 
-                try:
-                    # Get latest trade (crypto is 24/7)
-                    latest_trade_req = CryptoLatestTradeRequest(symbol_or_symbols=[symbol])
-                    latest_trades = data_client_2.get_crypto_latest_trade(latest_trade_req)
-                    
-                    if symbol in latest_trades and latest_trades[symbol]:
-                        latest_trade = latest_trades[symbol]
-                        latest_price = float(latest_trade.price)
-                        # Handle timestamp
-                        if hasattr(latest_trade.timestamp, 'timestamp'):
-                            trade_timestamp = int(latest_trade.timestamp.timestamp() * 1000)
-                        elif isinstance(latest_trade.timestamp, (int, float)):
-                            trade_timestamp = int(latest_trade.timestamp * 1000) if latest_trade.timestamp < 10000000000 else int(latest_trade.timestamp)
-                        else:
-                            trade_timestamp = int(datetime.now().timestamp() * 1000)
-                        print(f"LIVE_EQUITY (Project 2): {symbol} - Latest trade price: ${latest_price} (timestamp: {trade_timestamp})")
-                except Exception as e:
-                    print(f"LIVE_EQUITY (Project 2): Error fetching latest trade for {symbol}: {e}")
+                if symbol in quotes:
+                    latest_price, trade_timestamp = quotes[symbol]
+                    print(f"LIVE_EQUITY (Project 2): {symbol} - Latest trade price: ${latest_price} (timestamp: {trade_timestamp})")
                 
                 # Fallback to position's current_price
                 if latest_price is None:
@@ -745,255 +924,6 @@ def get_live_portfolio_equity_2():
         return None
 
 
-def get_alpaca_portfolio_history_2(timeframe='all'):
-    """Fetch portfolio history (equity curve) from Alpaca API for Project 2 (Crypto)."""
-    if not trading_client_2 or not ALPACA_API_KEY_2 or not ALPACA_SECRET_KEY_2:
-        print("No trading client or API credentials available for Project 2")
-        return []
-    
-    try:
-        now = datetime.now()
-        
-        # Map our timeframe to Alpaca's period and timeframe parameters
-        # Crypto trades 24/7, so no weekend handling needed
-        if timeframe == 'day':
-            date_end = now.strftime('%Y-%m-%d')
-            period = '1D'
-            alpaca_timeframe = '1Min'  # 1-minute intervals for intraday
-            extended_hours = 'true'
-        elif timeframe == 'week':
-            period = '1W'
-            alpaca_timeframe = '15Min'  # 15-minute intervals for intraday
-            date_end = now.strftime('%Y-%m-%d')
-            extended_hours = 'true'
-        elif timeframe == 'month':
-            period = '29D'  # 29 days (approximately 1 month)
-            alpaca_timeframe = '1D'  # Daily points
-            date_end = now.strftime('%Y-%m-%d')
-            extended_hours = 'false'  # No effect for daily
-        elif timeframe == '3m':
-            period = '3M'
-            alpaca_timeframe = '1D'  # Daily points
-            date_end = now.strftime('%Y-%m-%d')
-            extended_hours = 'false'  # No effect for daily
-        elif timeframe == 'year':
-            period = '1A'  # 1 year
-            alpaca_timeframe = '1D'  # Daily points
-            date_end = now.strftime('%Y-%m-%d')
-            extended_hours = 'false'  # No effect for daily
-        elif timeframe == 'ytd':
-            # For YTD, calculate days since Jan 1
-            year_start = datetime(now.year, 1, 1)
-            days_since_start = (now - year_start).days
-            if days_since_start <= 29:
-                period = f'{days_since_start}D'
-                alpaca_timeframe = '1H'
-                extended_hours = 'true'
-            else:
-                period = '1A'
-                alpaca_timeframe = '1D'
-                extended_hours = 'false'
-            date_end = now.strftime('%Y-%m-%d')
-        else:  # 'all'
-            period = '1A'  # Max 1 year for now
-            alpaca_timeframe = '1D'  # Daily points
-            date_end = now.strftime('%Y-%m-%d')
-            extended_hours = 'false'  # No effect for daily
-        
-        # Make API request to Alpaca portfolio history endpoint
-        url = f"{ALPACA_BASE_URL_2}/v2/account/portfolio/history"
-        headers = {
-            "APCA-API-KEY-ID": ALPACA_API_KEY_2,
-            "APCA-API-SECRET-KEY": ALPACA_SECRET_KEY_2
-        }
-        params = {
-            "period": period,
-            "timeframe": alpaca_timeframe,
-            "date_end": date_end,
-            "extended_hours": extended_hours
-        }
-        
-        print(f"Project 2: Fetching portfolio history: period={period}, timeframe={alpaca_timeframe}, date_end={date_end}, extended_hours={extended_hours}")
-        response = requests.get(url, headers=headers, params=params)
-        
-        if response.status_code == 200:
-            data = response.json()
-            timestamps = data.get('timestamp', [])
-            equity_values = data.get('equity', [])
-            profit_loss = data.get('profit_loss', [])
-            
-            print(f"Project 2 DEBUG [{timeframe}]: timestamps.length={len(timestamps)}, equity.length={len(equity_values)}")
-            
-            if not timestamps or not equity_values:
-                print("Project 2: No portfolio history data returned from Alpaca")
-                return []
-            
-            if len(timestamps) != len(equity_values):
-                print(f"Project 2 WARNING: Mismatch - {len(timestamps)} timestamps but {len(equity_values)} equity values")
-            
-            is_month_plus = timeframe in ['month', '3m', 'year', 'ytd', 'all']
-            
-            # Filter to only include points >= baseline
-            baseline_start = get_baseline_start_datetime(2)
-            baseline_ts_ms = int(baseline_start.timestamp() * 1000)
-            
-            performance_data = []
-            equity_values_used = []
-            
-            for i in range(len(timestamps)):
-                timestamp = timestamps[i]
-                
-                if isinstance(timestamp, (int, float)):
-                    timestamp_ms = int(timestamp * 1000) if timestamp < 1e10 else int(timestamp)
-                    dt = datetime.fromtimestamp(timestamp_ms / 1000)
-                else:
-                    try:
-                        dt = datetime.fromisoformat(str(timestamp).replace('Z', '+00:00'))
-                        if dt.tzinfo:
-                            dt = dt.replace(tzinfo=None)
-                        timestamp_ms = int(dt.timestamp() * 1000)
-                    except Exception as e:
-                        print(f"Project 2: Error parsing timestamp {timestamp}: {e}")
-                        continue
-                
-                # Filter out points before baseline
-                if timestamp_ms < baseline_ts_ms:
-                    continue
-                
-                equity = float(equity_values[i]) if i < len(equity_values) else None
-                if equity is None:
-                    continue
-                
-                equity_values_used.append(equity)
-                
-                # For month+ timeframes: use raw equity, calculate returns relative to first equity value
-                # For day/week: can use profit_loss if available, otherwise calculate from equity
-                if is_month_plus:
-                    # Use first equity value as baseline for returns calculation only
-                    first_equity = float(equity_values[0]) if equity_values else equity
-                    returns = equity - first_equity
-                else:
-                    # For day/week, use profit_loss if available
-                    pnl = float(profit_loss[i]) if profit_loss and i < len(profit_loss) else None
-                    if pnl is not None:
-                        returns = pnl
-                    else:
-                        # Fallback: calculate from equity
-                        first_equity = float(equity_values[0]) if equity_values else equity
-                        returns = equity - first_equity
-                
-                # Format date based on timeframe
-                if timeframe in ['day', 'week']:
-                    # Include time for intraday
-                    date_str = dt.strftime('%Y-%m-%dT%H:%M:%S')
-                else:
-                    # Date only for daily timeframes (month, 3m, year, ytd, all)
-                    date_str = dt.strftime('%Y-%m-%d')
-                
-                performance_data.append({
-                    'date': date_str,
-                    'returns': round(returns, 2),
-                    'equity': round(equity, 2),  # Use raw equity value, no normalization
-                    'timestamp': timestamp_ms  # Already in milliseconds
-                })
-            
-            # Part A: Log what Month+ data actually is (no guessing)
-            if is_month_plus and equity_values_used:
-                points_count = len(equity_values_used)
-                min_value = min(equity_values_used)
-                max_value = max(equity_values_used)
-                unique_values_count = len(set(equity_values_used))
-                first_value = equity_values_used[0]
-                last_value = equity_values_used[-1]
-                print(f"Project 2 MONTH_PLUS_DATA [{timeframe}]: points_count={points_count}, min_value={min_value}, max_value={max_value}, unique_values_count={unique_values_count}, first_value={first_value}, last_value={last_value}")
-                if unique_values_count == 1:
-                    print(f"Project 2 WARNING [{timeframe}]: All equity values are the same ({first_value}). This suggests we're plotting the wrong field or overwriting the series.")
-            
-            print(f"Project 2: Fetched {len(performance_data)} portfolio history points from Alpaca for {timeframe}")
-            return performance_data
-        else:
-            print(f"Project 2: Error fetching portfolio history: {response.status_code} - {response.text}")
-            return []
-            
-    except Exception as e:
-        print(f"Project 2: Error fetching Alpaca portfolio history: {e}")
-        import traceback
-        traceback.print_exc()
-        return []
-
-
-def get_day_chart_live_value_2():
-    """Get live value from Day chart's portfolio history for Project 2 (Crypto).
-    
-    Returns:
-        tuple: (live_value: float, live_asof_timestamp_ms: int) or (None, None) if error
-    """
-    if not trading_client_2 or not ALPACA_API_KEY_2 or not ALPACA_SECRET_KEY_2:
-        return None, None
-    
-    try:
-        now = datetime.now()
-        
-        # Use same params as Day chart (crypto trades 24/7, no weekend handling)
-        date_end = now.strftime('%Y-%m-%d')
-        period = '1D'
-        alpaca_timeframe = '1Min'
-        extended_hours = 'true'
-        
-        # Make API request to Alpaca portfolio history endpoint
-        url = f"{ALPACA_BASE_URL_2}/v2/account/portfolio/history"
-        headers = {
-            "APCA-API-KEY-ID": ALPACA_API_KEY_2,
-            "APCA-API-SECRET-KEY": ALPACA_SECRET_KEY_2
-        }
-        params = {
-            "period": period,
-            "timeframe": alpaca_timeframe,
-            "date_end": date_end,
-            "extended_hours": extended_hours
-        }
-        
-        response = requests.get(url, headers=headers, params=params)
-        
-        if response.status_code == 200:
-            data = response.json()
-            timestamps = data.get('timestamp', [])
-            equity_values = data.get('equity', [])
-            
-            if not timestamps or not equity_values:
-                return None, None
-            
-            live_value = float(equity_values[-1]) if equity_values else None
-            last_timestamp = timestamps[-1] if timestamps else None
-            
-            if live_value is None or last_timestamp is None:
-                return None, None
-            
-            # Convert timestamp to milliseconds
-            if isinstance(last_timestamp, (int, float)):
-                live_asof_timestamp_ms = int(last_timestamp * 1000)
-            else:
-                try:
-                    dt = datetime.fromisoformat(str(last_timestamp).replace('Z', '+00:00'))
-                    if dt.tzinfo:
-                        dt = dt.replace(tzinfo=None)
-                    live_asof_timestamp_ms = int(dt.timestamp() * 1000)
-                except Exception as e:
-                    print(f"Project 2: Error parsing timestamp {last_timestamp}: {e}")
-                    return None, None
-            
-            return live_value, live_asof_timestamp_ms
-        else:
-            print(f"Project 2: Error fetching Day chart portfolio history: {response.status_code} - {response.text}")
-            return None, None
-            
-    except Exception as e:
-        print(f"Project 2: Error getting Day chart live value: {e}")
-        import traceback
-        traceback.print_exc()
-        return None, None
-
-
 # ============================================================================
 # Removed Project 3 (Options) - all functions deleted
 
@@ -1030,53 +960,21 @@ def get_live_portfolio_equity():
             # Still get positions for prices_used logging
             positions = get_alpaca_positions()
             prices_used = {}
-            if data_client:
-                from alpaca.data.requests import StockLatestTradeRequest
-                for position in positions:
-                    symbol = position['symbol']
-                    try:
-                        # Try to get latest extended-hours price for logging
-                        latest_trade_req = StockLatestTradeRequest(symbol_or_symbols=[symbol], feed='iex')
-                        latest_trades = data_client.get_stock_latest_trade(latest_trade_req)
-                        if symbol in latest_trades and latest_trades[symbol]:
-                            prices_used[symbol] = float(latest_trades[symbol].price)
-                        else:
-                            prices_used[symbol] = float(position['current_price'])
-                    except:
-                        prices_used[symbol] = float(position['current_price'])
-            else:
-                for position in positions:
-                    prices_used[position['symbol']] = float(position['current_price'])
+            # One batched quote request for all held symbols (prices and timestamp)
+            quotes = stock_quotes.get_latest([p['symbol'] for p in positions]) if data_client and positions else {}
+            for position in positions:
+                quote = quotes.get(position['symbol'])
+                prices_used[position['symbol']] = quote[0] if quote else float(position['current_price'])
             
             # Get the actual timestamp from account or use current time
             # Alpaca account equity reflects the latest market snapshot (includes extended hours)
             # Use current time as the snapshot timestamp since account equity is live
             as_of_timestamp = int(datetime.now().timestamp() * 1000)
             
-            # Try to get a more accurate timestamp from latest trades if available
-            if data_client and positions:
-                from alpaca.data.requests import StockLatestTradeRequest
-                latest_timestamp = 0
-                for position in positions:
-                    symbol = position['symbol']
-                    try:
-                        latest_trade_req = StockLatestTradeRequest(symbol_or_symbols=[symbol], feed='iex')
-                        latest_trades = data_client.get_stock_latest_trade(latest_trade_req)
-                        if symbol in latest_trades and latest_trades[symbol]:
-                            latest_trade = latest_trades[symbol]
-                            if hasattr(latest_trade.timestamp, 'timestamp'):
-                                trade_ts = int(latest_trade.timestamp.timestamp() * 1000)
-                            elif isinstance(latest_trade.timestamp, (int, float)):
-                                trade_ts = int(latest_trade.timestamp * 1000) if latest_trade.timestamp < 10000000000 else int(latest_trade.timestamp)
-                            else:
-                                trade_ts = 0
-                            if trade_ts > latest_timestamp:
-                                latest_timestamp = trade_ts
-                    except:
-                        pass
-                
-                if latest_timestamp > 0:
-                    as_of_timestamp = latest_timestamp
+            # Use the most recent trade time across positions if available
+            latest_timestamp = max((quote[1] for quote in quotes.values()), default=0)
+            if latest_timestamp > 0:
+                as_of_timestamp = latest_timestamp
             
             return {
                 'live_equity': round(account_equity, 2),
@@ -1109,8 +1007,8 @@ def get_live_portfolio_equity():
                 prices_used[symbol] = latest_price
                 print(f"LIVE_EQUITY: {symbol} - qty={qty}, price=${latest_price}, market_value=${market_value}")
         else:
-            from alpaca.data.requests import StockLatestTradeRequest
-            from alpaca.data.timeframe import TimeFrame
+            # Latest trades (IEX feed includes extended hours) for all positions in one request
+            quotes = stock_quotes.get_latest([p['symbol'] for p in positions]) if positions else {}
             
             for position in positions:
                 symbol = position['symbol']
@@ -1120,24 +1018,9 @@ def get_live_portfolio_equity():
                 latest_price = None
                 trade_timestamp = 0
                 
-                try:
-                    # Get latest trade (includes extended hours) - IEX feed includes extended hours
-                    latest_trade_req = StockLatestTradeRequest(symbol_or_symbols=[symbol], feed='iex')
-                    latest_trades = data_client.get_stock_latest_trade(latest_trade_req)
-                    
-                    if symbol in latest_trades and latest_trades[symbol]:
-                        latest_trade = latest_trades[symbol]
-                        latest_price = float(latest_trade.price)
-                        # Handle timestamp
-                        if hasattr(latest_trade.timestamp, 'timestamp'):
-                            trade_timestamp = int(latest_trade.timestamp.timestamp() * 1000)
-                        elif isinstance(latest_trade.timestamp, (int, float)):
-                            trade_timestamp = int(latest_trade.timestamp * 1000) if latest_trade.timestamp < 10000000000 else int(latest_trade.timestamp)
-                        else:
-                            trade_timestamp = int(datetime.now().timestamp() * 1000)
-                        print(f"LIVE_EQUITY: {symbol} - Latest trade price: ${latest_price} (timestamp: {trade_timestamp})")
-                except Exception as e:
-                    print(f"LIVE_EQUITY: Error fetching latest trade for {symbol}: {e}")
+                if symbol in quotes:
+                    latest_price, trade_timestamp = quotes[symbol]
+                    print(f"LIVE_EQUITY: {symbol} - Latest trade price: ${latest_price} (timestamp: {trade_timestamp})")
                 
                 # Fallback to position's current_price
                 if latest_price is None:
@@ -1172,215 +1055,70 @@ def get_live_portfolio_equity():
         return None
 
 
-def get_alpaca_portfolio_history(timeframe='all'):
-    """Fetch portfolio history (equity curve) from Alpaca API."""
-    if not trading_client or not ALPACA_API_KEY or not ALPACA_SECRET_KEY:
-        print("No trading client or API credentials available")
-        return []
+# Chart timeframes read from the equity store: (resolution, lookback, downsampling
+# bucket in ms or None to keep every point). 'day' and 'ytd' are resolved in equity_window().
+EQUITY_TIMEFRAMES = {
+    'week': (RES_INTRADAY, timedelta(days=7), 15 * 60 * 1000),
+    'month': (RES_DAILY, timedelta(days=29), None),
+    '3m': (RES_DAILY, timedelta(days=91), None),
+    'year': (RES_DAILY, timedelta(days=365), None),
+    'all': (RES_DAILY, timedelta(days=365), None),
+}
+
+
+def equity_window(project, timeframe, now=None):
+    """Map a chart timeframe to an equity store range.
     
-    try:
-        now = datetime.now()
-        
-        # Map our timeframe to Alpaca's period and timeframe parameters
-        # For day timeframe, if it's a weekend, use the last trading day
-        if timeframe == 'day':
-            if now.weekday() >= 5:  # Saturday or Sunday
-                display_date = get_last_trading_day(now)
-                date_end = display_date.strftime('%Y-%m-%d')
-            else:
-                date_end = now.strftime('%Y-%m-%d')
-            period = '1D'
-            alpaca_timeframe = '1Min'  # 1-minute intervals for intraday
-            extended_hours = 'true'
-        elif timeframe == 'week':
-            period = '1W'
-            alpaca_timeframe = '15Min'  # 15-minute intervals for intraday
-            date_end = now.strftime('%Y-%m-%d')
-            extended_hours = 'true'
-        elif timeframe == 'month':
-            period = '29D'  # 29 days (approximately 1 month)
-            alpaca_timeframe = '1D'  # Daily points (same as other timeframes)
-            date_end = now.strftime('%Y-%m-%d')
-            extended_hours = 'false'  # No effect for daily
-        elif timeframe == '3m':
-            period = '3M'
-            alpaca_timeframe = '1D'  # Daily points
-            date_end = now.strftime('%Y-%m-%d')
-            extended_hours = 'false'  # No effect for daily
-        elif timeframe == 'year':
-            period = '1A'  # 1 year
-            alpaca_timeframe = '1D'  # Daily points
-            date_end = now.strftime('%Y-%m-%d')
-            extended_hours = 'false'  # No effect for daily
-        elif timeframe == 'ytd':
-            # For YTD, calculate days since Jan 1
-            year_start = datetime(now.year, 1, 1)
-            days_since_start = (now - year_start).days
-            if days_since_start <= 29:
-                period = f'{days_since_start}D'
-                alpaca_timeframe = '1H'
-                extended_hours = 'true'
-            else:
-                period = '1A'
-                alpaca_timeframe = '1D'
-                extended_hours = 'false'
-            date_end = now.strftime('%Y-%m-%d')
-        else:  # 'all'
-            period = '1A'  # Max 1 year for now
-            alpaca_timeframe = '1D'  # Daily points
-            date_end = now.strftime('%Y-%m-%d')
-            extended_hours = 'false'  # No effect for daily
-        
-        # Make API request to Alpaca portfolio history endpoint
-        url = f"{ALPACA_BASE_URL}/v2/account/portfolio/history"
-        headers = {
-            "APCA-API-KEY-ID": ALPACA_API_KEY,
-            "APCA-API-SECRET-KEY": ALPACA_SECRET_KEY
-        }
-        params = {
-            "period": period,
-            "timeframe": alpaca_timeframe,
-            "date_end": date_end,
-            "extended_hours": extended_hours
+    Returns:
+        tuple: (resolution, start_ms, bucket_ms)
+    """
+    now = now or datetime.now()
+    if timeframe == 'day':
+        # Latest session: for stocks the NY calendar day of the newest point (the last
+        # trading day on weekends); crypto trades 24/7, so the trailing 24 hours
+        latest_ms = equity_store.latest_time(project, RES_INTRADAY) or int(now.timestamp() * 1000)
+        if project == 2 or ZoneInfo is None:
+            return RES_INTRADAY, latest_ms - 24 * 60 * 60 * 1000, None
+        day_start = datetime.fromtimestamp(latest_ms / 1000, tz=ZoneInfo('America/New_York')).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        return RES_INTRADAY, int(day_start.timestamp() * 1000), None
+    if timeframe == 'ytd':
+        # Early in the year use hourly points so the chart isn't a handful of dots
+        year_start_ms = int(datetime(now.year, 1, 1).timestamp() * 1000)
+        if (now - datetime(now.year, 1, 1)).days <= INTRADAY_MAX_DAYS:
+            return RES_INTRADAY, year_start_ms, 60 * 60 * 1000
+        return RES_DAILY, year_start_ms, None
+    resolution, lookback, bucket_ms = EQUITY_TIMEFRAMES.get(timeframe, EQUITY_TIMEFRAMES['all'])
+    return resolution, int((now - lookback).timestamp() * 1000), bucket_ms
+
+
+def get_equity_performance(project, timeframe='all'):
+    """Get the equity curve for a chart timeframe from the local equity store.
+    
+    Returns:
+        list: [{date, returns, equity, timestamp}] at or after the baseline, oldest
+        first; returns are relative to the first point in the window.
+    """
+    sync_equity_store(project)
+    resolution, start_ms, bucket_ms = equity_window(project, timeframe)
+    baseline_ts_ms = int(get_baseline_start_datetime(project).timestamp() * 1000)
+    rows = equity_store.series(project, resolution, max(start_ms, baseline_ts_ms), bucket_ms=bucket_ms)
+    
+    # Include time for intraday timeframes, date only for daily ones
+    date_format = '%Y-%m-%dT%H:%M:%S' if timeframe in ['day', 'week'] else '%Y-%m-%d'
+    first_equity = rows[0][1] if rows else None
+    performance_data = [
+        {
+            'date': datetime.fromtimestamp(t / 1000).strftime(date_format),
+            'returns': round(equity - first_equity, 2),
+            'equity': round(equity, 2),
+            'timestamp': t
         }
-        
-        print(f"Fetching portfolio history: period={period}, timeframe={alpaca_timeframe}, date_end={date_end}, extended_hours={extended_hours}")
-        response = requests.get(url, headers=headers, params=params)
-        
-        if response.status_code == 200:
-            data = response.json()
-            # Alpaca returns: { "timestamp": [...], "equity": [...], "profit_loss": [...], "profit_loss_pct": [...] }
-            timestamps = data.get('timestamp', [])
-            equity_values = data.get('equity', [])
-            profit_loss = data.get('profit_loss', [])
-            
-            # Debug log: timestamps.length, equity.length, first/last timestamp
-            print(f"DEBUG [{timeframe}]: timestamps.length={len(timestamps)}, equity.length={len(equity_values)}")
-            if timestamps and equity_values:
-                first_ts = timestamps[0] if timestamps else None
-                last_ts = timestamps[-1] if timestamps else None
-                print(f"DEBUG [{timeframe}]: first_timestamp={first_ts}, last_timestamp={last_ts}")
-            
-            # Log Month series values to identify outlier
-            if timeframe == 'month' and equity_values:
-                min_equity = min(equity_values) if equity_values else None
-                max_equity = max(equity_values) if equity_values else None
-                print(f"DEBUG [month]: First 10 equity values: {equity_values[:10]}")
-                print(f"DEBUG [month]: Last 10 equity values: {equity_values[-10:]}")
-                print(f"DEBUG [month]: MIN equity: {min_equity}, MAX equity: {max_equity}")
-                # Check if Alpaca response has other fields that might be mixed in
-                print(f"DEBUG [month]: Alpaca response keys: {list(data.keys())}")
-                if 'profit_loss' in data:
-                    print(f"DEBUG [month]: First 10 profit_loss: {data.get('profit_loss', [])[:10]}")
-                if 'portfolio_value' in data:
-                    print(f"DEBUG [month]: First 10 portfolio_value: {data.get('portfolio_value', [])[:10]}")
-                if 'buying_power' in data:
-                    print(f"DEBUG [month]: First 10 buying_power: {data.get('buying_power', [])[:10]}")
-            
-            if not timestamps or not equity_values:
-                print("No portfolio history data returned from Alpaca")
-                return []
-            
-            if len(timestamps) != len(equity_values):
-                print(f"WARNING: Mismatch - {len(timestamps)} timestamps but {len(equity_values)} equity values")
-            
-            # For month/3m/year/ytd/all: build series ONLY from Alpaca portfolio_history equity[]
-            # Do NOT normalize to baseline, do NOT use profit_loss for equity, use raw equity values
-            is_month_plus = timeframe in ['month', '3m', 'year', 'ytd', 'all']
-            
-            # Map ALL returned points: series = timestamps.map((t,i)=>({t: timestamps[i]*1000, v: equity[i]}))
-            # IMPORTANT: Use ONLY the 'equity' field from Alpaca - never buying_power, portfolio_value, or cash
-            # Filter to only include points >= baseline
-            baseline_start = get_baseline_start_datetime(1)
-            baseline_ts_ms = int(baseline_start.timestamp() * 1000)
-            
-            performance_data = []
-            equity_values_used = []
-            
-            for i in range(len(timestamps)):
-                timestamp = timestamps[i]
-                
-                # Alpaca timestamps are in seconds (Unix timestamp), convert to milliseconds
-                if isinstance(timestamp, (int, float)):
-                    # Timestamp is in seconds, convert to ms
-                    timestamp_ms = int(timestamp * 1000) if timestamp < 1e10 else int(timestamp)
-                    dt = datetime.fromtimestamp(timestamp_ms / 1000)
-                else:
-                    # Try parsing as ISO string
-                    try:
-                        dt = datetime.fromisoformat(str(timestamp).replace('Z', '+00:00'))
-                        if dt.tzinfo:
-                            dt = dt.replace(tzinfo=None)
-                        timestamp_ms = int(dt.timestamp() * 1000)
-                    except Exception as e:
-                        print(f"Error parsing timestamp {timestamp}: {e}")
-                        continue
-                
-                # Filter out points before baseline
-                if timestamp_ms < baseline_ts_ms:
-                    continue
-                
-                # CRITICAL: Use ONLY equity_values[i] - this is the account equity, not buying_power
-                equity = float(equity_values[i]) if i < len(equity_values) else None
-                if equity is None:
-                    continue
-                
-                equity_values_used.append(equity)
-                
-                # For month+ timeframes: use raw equity, calculate returns relative to first equity value
-                # For day/week: can use profit_loss if available, otherwise calculate from equity
-                if is_month_plus:
-                    # Use first equity value as baseline for returns calculation only
-                    first_equity = float(equity_values[0]) if equity_values else equity
-                    returns = equity - first_equity
-                else:
-                    # For day/week, use profit_loss if available
-                    pnl = float(profit_loss[i]) if i < len(profit_loss) else None
-                    if pnl is not None:
-                        returns = pnl
-                    else:
-                        # Fallback: calculate from equity
-                        first_equity = float(equity_values[0]) if equity_values else equity
-                        returns = equity - first_equity
-                
-                # Format date based on timeframe
-                if timeframe in ['day', 'week']:
-                    # Include time for intraday
-                    date_str = dt.strftime('%Y-%m-%dT%H:%M:%S')
-                else:
-                    # Date only for daily timeframes (month, 3m, year, ytd, all)
-                    date_str = dt.strftime('%Y-%m-%d')
-                
-                performance_data.append({
-                    'date': date_str,
-                    'returns': round(returns, 2),
-                    'equity': round(equity, 2),  # Use raw equity value, no normalization
-                    'timestamp': timestamp_ms  # Already in milliseconds
-                })
-            
-            # Part A: Log what Month+ data actually is (no guessing)
-            if is_month_plus and equity_values_used:
-                points_count = len(equity_values_used)
-                min_value = min(equity_values_used)
-                max_value = max(equity_values_used)
-                unique_values_count = len(set(equity_values_used))
-                first_value = equity_values_used[0]
-                last_value = equity_values_used[-1]
-                print(f"MONTH_PLUS_DATA [{timeframe}]: points_count={points_count}, min_value={min_value}, max_value={max_value}, unique_values_count={unique_values_count}, first_value={first_value}, last_value={last_value}")
-                if unique_values_count == 1:
-                    print(f"WARNING [{timeframe}]: All equity values are the same ({first_value}). This suggests we're plotting the wrong field or overwriting the series.")
-            
-            print(f"Fetched {len(performance_data)} portfolio history points from Alpaca for {timeframe}")
-            return performance_data
-        else:
-            print(f"Error fetching portfolio history: {response.status_code} - {response.text}")
-            return []
-            
-    except Exception as e:
-        print(f"Error fetching Alpaca portfolio history: {e}")
-        import traceback
-        traceback.print_exc()
-        return []
+        for t, equity in rows
+    ]
+    print(f"Project {project}: {len(performance_data)} equity points from local store for {timeframe} ({resolution})")
+    return performance_data
 
 
 def calculate_performance_data(trades, timeframe='all'):
@@ -1835,93 +1573,40 @@ _max_trade_counts = load_max_trade_counts()
 
 def get_baseline_equity_from_api(project):
     """
-    Fetch the actual baseline equity from the account's portfolio history at baselineStartIso.
-    This is the REAL equity value from the account, not a config value.
+    Get the actual baseline equity from the account's equity history at baselineStartIso.
+    This is the REAL equity value from the account (local equity store), not a config value.
     
     Returns the actual equity value from the account, or None if not available.
     """
-    baseline = get_baseline(project)
-    baseline_start = get_baseline_start_datetime(project)
-    
-    # Select appropriate client and credentials based on project
-    if project == 2:
-        base_url = ALPACA_BASE_URL_2
-        api_key = ALPACA_API_KEY_2
-        secret_key = ALPACA_SECRET_KEY_2
-    else:
-        base_url = ALPACA_BASE_URL
-        api_key = ALPACA_API_KEY
-        secret_key = ALPACA_SECRET_KEY
-    
+    _, api_key, secret_key = get_account_credentials(project)
     if not api_key or not secret_key:
         return None
     
-    headers = {
-        "APCA-API-KEY-ID": api_key,
-        "APCA-API-SECRET-KEY": secret_key
-    }
-    
     try:
-        # Fetch portfolio history covering the baseline period
-        # Try multiple periods to ensure we get data if baseline is older
-        url_history = f"{base_url}/v2/account/portfolio/history"
-        now = datetime.now(timezone.utc)
-        date_end = now.strftime('%Y-%m-%d')
-        
-        # Try different periods: 29D (month), 1A (year)
-        periods_to_try = [
-            ("29D", "1D", "false"),  # 29 days, daily timeframe
-            ("1A", "1D", "false"),   # 1 year, daily timeframe
-        ]
+        sync_equity_store(project)
+        baseline_ts_ms = int(get_baseline_start_datetime(project).timestamp() * 1000)
         
-        for period, timeframe, extended_hours in periods_to_try:
-            params = {
-                "period": period,
-                "timeframe": timeframe,
-                "date_end": date_end,
-                "extended_hours": extended_hours
-            }
+        # Daily points first (a year of history), intraday if the daily series has none yet
+        for resolution in (RES_DAILY, RES_INTRADAY):
+            first_equity, first_ts = equity_store.first_at_or_after(project, resolution, baseline_ts_ms)
+            if first_equity is None:
+                continue
             
-            response = requests.get(url_history, headers=headers, params=params, timeout=10)
-            if response.status_code == 200:
-                data = response.json()
-                equity_points = parse_portfolio_history(data, baseline_start)
-                
-                # Get the first equity point at or after baseline
-                baseline_ts_ms = int(baseline_start.timestamp() * 1000)
-                first_equity, first_ts = equity_at_or_after(equity_points, baseline_ts_ms)
-                
-                # If first equity is 0 or very small, try to find first non-zero point
+            if first_equity <= 0.01:  # Account might have been empty at baseline
+                # Find first non-zero equity point
+                first_equity, first_ts = equity_store.first_at_or_after(
+                    project, resolution, baseline_ts_ms, min_equity=0.01
+                )
                 if first_equity is not None:
-                    if first_equity <= 0.01:  # Account might have been empty at baseline
-                        # Find first non-zero equity point
-                        for point in equity_points:
-                            if point['t'] >= baseline_ts_ms and point['equity'] > 0.01:
-                                first_equity = point['equity']
-                                first_ts = point['t']
-                                print(f"Found first non-zero equity for project {project}: {first_equity} (at ts={first_ts})")
-                                break
-                    
-                    if first_equity > 0.01:
-                        print(f"Fetched baseline equity from API for project {project}: {first_equity} (at ts={first_ts}, using period={period})")
-                        return first_equity
-                    else:
-                        print(f"Warning: Baseline equity for project {project} is {first_equity}, which seems incorrect. Using config fallback.")
-                        return None
-                else:
-                    # Try next period if this one didn't have data
-                    if period != periods_to_try[-1][0]:
-                        continue
-                    print(f"No equity point found after baseline for project {project} (tried periods: {[p[0] for p in periods_to_try]}), using config fallback")
-                    return None
-            else:
-                error_text = response.text if hasattr(response, 'text') else ''
-                print(f"Error fetching portfolio history for baseline equity (project {project}, period={period}): {response.status_code} - {error_text}")
-                if period == periods_to_try[-1][0]:
-                    return None
-                # Try next period
-                continue
+                    print(f"Found first non-zero equity for project {project}: {first_equity} (at ts={first_ts})")
+            
+            if first_equity is not None and first_equity > 0.01:
+                print(f"Baseline equity for project {project}: {first_equity} (at ts={first_ts}, {resolution} series)")
+                return first_equity
+            print(f"Warning: Baseline equity for project {project} is {first_equity}, which seems incorrect. Using config fallback.")
+            return None
         
+        print(f"No equity point found after baseline for project {project}, using config fallback")
         return None
     except Exception as e:
         print(f"Error fetching baseline equity from API for project {project}: {e}")
@@ -2199,13 +1884,112 @@ def get_project_for_algorithm(algorithm_name):
 @app.route('/algorithms', methods=['GET'])
 @app.route('/api/algorithms', methods=['GET'])
 def get_algorithms():
-    """Get list of all trading algorithms."""
-    # Prevent caching to ensure fresh data on each request
-    response_headers = {
-        'Cache-Control': 'no-cache, no-store, must-revalidate',
-        'Pragma': 'no-cache',
-        'Expires': '0'
+    """Get list of all trading algorithms (precomputed payload)."""
+    return payload_response('algorithms')
+
+
+def payload_body(name):
+    """Latest precomputed payload (built now if precompute is off or nothing is stored yet).
+    
+    Returns:
+        tuple: (json string, generated_at epoch seconds)
+    """
+    if PRECOMPUTE_ENABLED:
+        return payloads.get_or_build(name)
+    return payloads.render(name)
+
+
+def freshness_headers(response, generated_at):
+    """Add X-Generated-At / X-Payload-Age-Sec and disable browser/proxy caching."""
+    response.headers['X-Generated-At'] = format_generated_at(generated_at)
+    response.headers['X-Payload-Age-Sec'] = f"{max(0.0, datetime.now().timestamp() - generated_at):.1f}"
+    # Prevent browser/proxy caching; freshness is controlled by the scheduler
+    response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
+    response.headers['Pragma'] = 'no-cache'
+    response.headers['Expires'] = '0'
+    return response
+
+
+def payload_response(name):
+    """Serve the latest precomputed payload with its generation time.
+    
+    The body is the stored JSON as-is; X-Generated-At and X-Payload-Age-Sec
+    tell the client how fresh it is.
+    """
+    body, generated_at = payload_body(name)
+    return freshness_headers(app.response_class(body, mimetype='application/json'), generated_at)
+
+
+# Sections /api/dashboard adds to each algorithm entry (each can be excluded)
+DASHBOARD_SECTIONS = ('metrics', 'performance', 'trades')
+
+
+@app.route('/dashboard', methods=['GET'])
+@app.route('/api/dashboard', methods=['GET'])
+def get_dashboard():
+    """Everything the trading page needs in one response.
+    
+    Each entry of the precomputed algorithms payload is extended with the
+    algorithm's project, micro-metrics (precomputed), performance for one
+    timeframe (equity store) and recent trades (order ledger), so a page load
+    is one request instead of one per card and section. A section that fails
+    is returned as null and listed in the entry's errors.
+    
+    Query params:
+        exclude: Comma-separated algorithm fields to leave out, e.g.
+            description,trades (excluded sections are not built); use
+            section.field for fields inside a section, e.g. trades.total
+        timeframe: Performance timeframe (default day)
+        trades_limit: Number of recent trades (default 5)
+    """
+    exclude = {field.strip() for field in request.args.get('exclude', '').split(',') if field.strip()}
+    nested_exclude = {}  # section -> fields to drop from that section's dict
+    for field in exclude:
+        if '.' in field:
+            section, inner = field.split('.', 1)
+            nested_exclude.setdefault(section, set()).add(inner)
+    
+    def trimmed(section, value):
+        drop = nested_exclude.get(section)
+        if not drop or not isinstance(value, dict):
+            return value
+        return {key: inner for key, inner in value.items() if key not in drop}
+    
+    timeframe = request.args.get('timeframe', 'day')
+    trades_limit = max(1, min(request.args.get('trades_limit', 5, type=int), 500))
+    
+    builders = {
+        'metrics': lambda name, project: json.loads(payload_body(f'metrics:{project}')[0]),
+        'performance': lambda name, project: build_performance(name, timeframe),
+        'trades': lambda name, project: build_trades_page(name, trades_limit),
     }
+    
+    body, generated_at = payload_body('algorithms')
+    algorithms = []
+    for algorithm in json.loads(body):
+        name = algorithm['name']
+        project = get_project_for_algorithm(name)
+        entry = {key: trimmed(key, value) for key, value in algorithm.items() if key not in exclude}
+        entry['project'] = project
+        errors = {}
+        for section in DASHBOARD_SECTIONS:
+            if section in exclude:
+                continue
+            try:
+                entry[section] = trimmed(section, builders[section](name, project))
+            except Exception as e:
+                print(f"Error building dashboard {section} for {name}: {e}")
+                entry[section] = None
+                errors[section] = str(e)
+        if errors:
+            entry['errors'] = errors
+        algorithms.append(entry)
+    
+    return freshness_headers(jsonify({'algorithms': algorithms, 'timeframe': timeframe}), generated_at)
+
+
+def build_algorithms_payload():
+    """Build the /api/algorithms payload (stats and portfolio value per algorithm)."""
     algorithms = []
     
     # Project 1: Swing Trading Agent (Stocks)
@@ -2281,11 +2065,7 @@ def get_algorithms():
             'portfolioValue': 0
         })
     
-    response = jsonify(algorithms)
-    # Add cache-control headers to prevent stale data
-    for header, value in response_headers.items():
-        response.headers[header] = value
-    return response
+    return algorithms
 
 @app.route('/algorithms/<algorithm_name>', methods=['GET'])
 @app.route('/api/algorithms/<algorithm_name>', methods=['GET'])
@@ -2340,99 +2120,30 @@ def get_algorithm(algorithm_name):
         })
 
 
-def get_day_chart_live_value():
-    """Get live value from Day chart's portfolio history (period=1D, timeframe=1Min, extended_hours=true).
+def get_day_chart_live_value(project=1):
+    """Get the live value shown at the right edge of the Day chart (newest intraday equity point).
     
     Returns:
-        tuple: (live_value: float, live_asof_timestamp_ms: int) or (None, None) if error
+        tuple: (live_value: float, live_asof_timestamp_ms: int) or (None, None) if no data
     """
-    if not trading_client or not ALPACA_API_KEY or not ALPACA_SECRET_KEY:
-        return None, None
-    
-    try:
-        now = datetime.now()
-        
-        # Use same params as Day chart
-        if now.weekday() >= 5:  # Saturday or Sunday
-            display_date = get_last_trading_day(now)
-            date_end = display_date.strftime('%Y-%m-%d')
-        else:
-            date_end = now.strftime('%Y-%m-%d')
-        
-        period = '1D'
-        alpaca_timeframe = '1Min'
-        extended_hours = 'true'
-        
-        # Make API request to Alpaca portfolio history endpoint (same as Day chart)
-        url = f"{ALPACA_BASE_URL}/v2/account/portfolio/history"
-        headers = {
-            "APCA-API-KEY-ID": ALPACA_API_KEY,
-            "APCA-API-SECRET-KEY": ALPACA_SECRET_KEY
-        }
-        params = {
-            "period": period,
-            "timeframe": alpaca_timeframe,
-            "date_end": date_end,
-            "extended_hours": extended_hours
-        }
-        
-        response = requests.get(url, headers=headers, params=params)
-        
-        if response.status_code == 200:
-            data = response.json()
-            timestamps = data.get('timestamp', [])
-            equity_values = data.get('equity', [])
-            
-            if not timestamps or not equity_values:
-                return None, None
-            
-            # Get last equity value and timestamp
-            live_value = float(equity_values[-1]) if equity_values else None
-            last_timestamp = timestamps[-1] if timestamps else None
-            
-            if live_value is None or last_timestamp is None:
-                return None, None
-            
-            # Convert timestamp to milliseconds
-            if isinstance(last_timestamp, (int, float)):
-                # Timestamp is in seconds, convert to ms
-                live_asof_timestamp_ms = int(last_timestamp * 1000)
-            else:
-                # Try parsing as ISO string
-                try:
-                    dt = datetime.fromisoformat(str(last_timestamp).replace('Z', '+00:00'))
-                    if dt.tzinfo:
-                        dt = dt.replace(tzinfo=None)
-                    live_asof_timestamp_ms = int(dt.timestamp() * 1000)
-                except Exception as e:
-                    print(f"Error parsing timestamp {last_timestamp}: {e}")
-                    return None, None
-            
-            return live_value, live_asof_timestamp_ms
-        else:
-            print(f"Error fetching Day chart portfolio history: {response.status_code} - {response.text}")
-            return None, None
-            
-    except Exception as e:
-        print(f"Error getting Day chart live value: {e}")
-        import traceback
-        traceback.print_exc()
-        return None, None
+    sync_equity_store(project)
+    return equity_store.latest(project, RES_INTRADAY)
+
 
 @app.route('/algorithms/<algorithm_name>/performance', methods=['GET'])
 @app.route('/api/algorithms/<algorithm_name>/performance', methods=['GET'])
 def get_performance(algorithm_name):
-    """Get performance data for a specific timeframe using Alpaca portfolio history."""
+    """Get performance data for a specific timeframe from the account's equity history."""
     timeframe = request.args.get('timeframe', 'all')
-    
-    algorithm_name_decoded = algorithm_name.replace('_', ' ')
+    return jsonify(build_performance(algorithm_name.replace('_', ' '), timeframe))
+
+
+def build_performance(algorithm_name_decoded, timeframe):
+    """Performance payload for one algorithm and timeframe (equity history with a live last point)."""
     project = get_project_for_algorithm(algorithm_name_decoded)
     
-    # Use Alpaca portfolio history instead of calculating from trades
-    if project == 2:
-        performance_data = get_alpaca_portfolio_history_2(timeframe)
-    else:
-        performance_data = get_alpaca_portfolio_history(timeframe)
+    # Use the account's equity history (local equity store) instead of calculating from trades
+    performance_data = get_equity_performance(project, timeframe)
     
     # For month/3m/ytd/year/all: use Day chart's live value to update last point
     # For day/week: use existing logic (unchanged)
@@ -2440,11 +2151,8 @@ def get_performance(algorithm_name):
     as_of_timestamp = None
     
     if is_month_plus:
-        # Get live value from Day chart's portfolio history
-        if project == 2:
-            live_value, live_asof_timestamp_ms = get_day_chart_live_value_2()
-        else:
-            live_value, live_asof_timestamp_ms = get_day_chart_live_value()
+        # Get live value from Day chart's equity series
+        live_value, live_asof_timestamp_ms = get_day_chart_live_value(project)
         
         if live_value is not None and performance_data and len(performance_data) > 0:
             # Get last point info BEFORE replacement
@@ -2558,12 +2266,12 @@ def get_performance(algorithm_name):
                 # Ensure sorted by timestamp
                 performance_data.sort(key=lambda x: x.get('timestamp', 0))
     
-    return jsonify({
+    return {
         'algorithm': algorithm_name_decoded,
         'timeframe': timeframe,
         'data': performance_data,
         'as_of_timestamp': as_of_timestamp  # Return separately for display
-    })
+    }
 
 @app.route('/algorithms/<algorithm_name>', methods=['GET'])
 @app.route('/api/live-equity', methods=['GET'])
@@ -2579,77 +2287,20 @@ def get_live_equity():
 def get_portfolio_live_equity_extended():
     """Get live portfolio equity extended using the same data source as Day chart.
     
-    Uses Alpaca portfolio history with same params as Day chart:
-    - period=1D, timeframe=1Min, extended_hours=true
+    Reads the newest intraday point of the Day chart's equity series (local
+    equity store, 5Min, extended hours).
     
     Returns:
-        JSON: { value: equity[-1], as_of: timestamp_iso }
+        JSON: { value: latest equity, as_of: timestamp_iso }
     """
     if not trading_client or not ALPACA_API_KEY or not ALPACA_SECRET_KEY:
         return jsonify({'error': 'Trading client or API credentials not available'}), 500
     
     try:
-        now = datetime.now()
-        
-        # Use same params as Day chart
-        if now.weekday() >= 5:  # Saturday or Sunday
-            display_date = get_last_trading_day(now)
-            date_end = display_date.strftime('%Y-%m-%d')
-        else:
-            date_end = now.strftime('%Y-%m-%d')
+        headline_value, last_timestamp_ms = get_day_chart_live_value(1)
         
-        period = '1D'
-        alpaca_timeframe = '1Min'  # 1-minute intervals for intraday
-        extended_hours = 'true'
-        
-        # Make API request to Alpaca portfolio history endpoint (same as Day chart)
-        url = f"{ALPACA_BASE_URL}/v2/account/portfolio/history"
-        headers = {
-            "APCA-API-KEY-ID": ALPACA_API_KEY,
-            "APCA-API-SECRET-KEY": ALPACA_SECRET_KEY
-        }
-        params = {
-            "period": period,
-            "timeframe": alpaca_timeframe,
-            "date_end": date_end,
-            "extended_hours": extended_hours
-        }
-        
-        response = requests.get(url, headers=headers, params=params)
-        
-        if response.status_code == 200:
-            data = response.json()
-            timestamps = data.get('timestamp', [])
-            equity_values = data.get('equity', [])
-            
-            if not timestamps or not equity_values:
-                return jsonify({'error': 'No portfolio history data returned'}), 500
-            
-            # Get last equity value and timestamp (same as Day chart uses)
-            headline_value = float(equity_values[-1]) if equity_values else None
-            last_timestamp = timestamps[-1] if timestamps else None
-            
-            if headline_value is None or last_timestamp is None:
-                return jsonify({'error': 'Invalid portfolio history data'}), 500
-            
-            # Convert timestamp to UTC datetime and format
-            if isinstance(last_timestamp, (int, float)):
-                # Timestamp is in seconds, convert to UTC datetime
-                dt_utc = datetime.fromtimestamp(last_timestamp, tz=timezone.utc)
-            else:
-                # Try parsing as ISO string
-                try:
-                    dt_str = str(last_timestamp).replace('Z', '+00:00')
-                    dt_utc = datetime.fromisoformat(dt_str)
-                    if dt_utc.tzinfo is None:
-                        # Assume UTC if no timezone info
-                        dt_utc = dt_utc.replace(tzinfo=timezone.utc)
-                    else:
-                        # Convert to UTC
-                        dt_utc = dt_utc.astimezone(timezone.utc)
-                except Exception as e:
-                    print(f"Error parsing timestamp {last_timestamp}: {e}")
-                    return jsonify({'error': 'Invalid timestamp format'}), 500
+        if headline_value is not None:
+            dt_utc = datetime.fromtimestamp(last_timestamp_ms / 1000, tz=timezone.utc)
             
             # Format as ISO UTC with Z
             as_of_utc = dt_utc.isoformat().replace('+00:00', 'Z')
@@ -2676,8 +2327,8 @@ def get_portfolio_live_equity_extended():
                 'as_of_et_display': as_of_et_display
             })
         else:
-            print(f"Error fetching portfolio history: {response.status_code} - {response.text}")
-            return jsonify({'error': 'Failed to fetch portfolio history'}), 500
+            print("No intraday equity points available")
+            return jsonify({'error': 'No portfolio history data returned'}), 500
             
     except Exception as e:
         print(f"Error computing live equity extended: {e}")
@@ -2688,25 +2339,114 @@ def get_portfolio_live_equity_extended():
 @app.route('/algorithms/<algorithm_name>/trades', methods=['GET'])
 @app.route('/api/algorithms/<algorithm_name>/trades', methods=['GET'])
 def get_trades(algorithm_name):
-    """Get recent trades for an algorithm."""
-    limit = request.args.get('limit', 10, type=int)
+    """Get recent trades for an algorithm, newest first.
     
-    algorithm_name_decoded = algorithm_name.replace('_', ' ')
+    Query params:
+        limit: Page size (default 10)
+        cursor: nextCursor from the previous page
+    """
+    limit = max(1, min(request.args.get('limit', 10, type=int), 500))
+    cursor = request.args.get('cursor') or None
+    
+    try:
+        if cursor:
+            # Reject a malformed cursor before doing any work
+            decode_cursor(cursor)
+        return jsonify(build_trades_page(algorithm_name.replace('_', ' '), limit, cursor))
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
+
+
+def build_trades_page(algorithm_name_decoded, limit, cursor=None):
+    """One page of an algorithm's recent trades, newest first.
+    
+    Raises:
+        InvalidCursor: If the cursor is malformed.
+    """
     project = get_project_for_algorithm(algorithm_name_decoded)
     
     if project == 2:
-        trades, _ = get_alpaca_orders_2(limit=1000)
+        # Individual orders: one indexed page straight from the ledger
+        baseline_start = get_baseline_start_datetime(2)
+        sync_order_ledger(2)
+        orders, next_cursor = order_ledger.page_filled(2, baseline_start, limit, cursor)
+        position_map = {pos['symbol']: pos for pos in get_alpaca_positions_2()}
+        recent_trades = [order_to_trade_2(order, position_map) for order in orders]
+        total = order_ledger.count_filled(2, baseline_start)
     else:
-        trades, _ = get_alpaca_orders(limit=1000)
-    
-    # Return most recent trades
-    recent_trades = trades[:limit]
+        # Matched round trips: one indexed page from the ledger, merged with open positions
+        baseline_start = get_baseline_start_datetime(1)
+        sync_order_ledger(1)
+        order_ledger.refresh_round_trips(1, baseline_start)
+        after = decode_cursor(cursor) if cursor else None
+        
+        positions = get_alpaca_positions()
+        open_trades = [open_trade_page_entry(position, baseline_start) for position in positions]
+        open_symbols = [position['symbol'] for position in positions]
+        entries = [entry for entry in open_trades if not after or entry[:2] < after]
+        entries += [
+            (row[0], row[1], round_trip_to_trade(row))
+            for row in order_ledger.page_round_trips(1, limit + 1, after, open_symbols)
+        ]
+        entries.sort(key=lambda entry: entry[:2], reverse=True)
+        recent_trades = [entry[2] for entry in entries[:limit]]
+        next_cursor = encode_cursor(*entries[limit - 1][:2]) if len(entries) > limit else None
+        total = len(open_trades) + order_ledger.count_round_trips(1, open_symbols)
     
-    return jsonify({
+    return {
         'algorithm': algorithm_name_decoded,
         'trades': recent_trades,
-        'total': len(trades)
-    })
+        'total': total,
+        'nextCursor': next_cursor
+    }
+
+
+def round_trip_to_trade(row):
+    """Format one ledger round trip (OrderLedger.page_round_trips row) as a closed Project 1 trade."""
+    exit_time, _, symbol, entry_time, entry_price, exit_price, shares = row
+    pnl_percent = (exit_price - entry_price) / entry_price * 100 if entry_price else 0
+    return {
+        'symbol': symbol,
+        'side': 'sell',
+        'entry_price': entry_price,
+        'exit_price': exit_price,
+        'shares': shares,
+        'pnl': round((exit_price - entry_price) * shares, 2),
+        'pnl_percent': round(pnl_percent, 2),
+        'entry_time': from_iso(entry_time).isoformat(),
+        'exit_time': from_iso(exit_time).isoformat(),
+        'status': 'closed'
+    }
+
+
+def open_trade_page_entry(position, baseline_start):
+    """Format an open Project 1 position as a trade, with its page position.
+    
+    The entry time is the latest buy fill (else the latest fill) since the
+    baseline, or yesterday midnight if the ledger has none, as in get_alpaca_orders.
+    
+    Returns:
+        tuple: (sort time, tie, trade)
+    """
+    symbol = position['symbol']
+    entry_time = (order_ledger.latest_fill_time(1, symbol, baseline_start, side='buy')
+                  or order_ledger.latest_fill_time(1, symbol, baseline_start)
+                  or (datetime.now() - timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0))
+    sort_time = to_iso(entry_time)
+    trade = {
+        'symbol': symbol,
+        'side': 'buy',
+        'entry_price': position['avg_entry_price'],
+        'exit_price': None,
+        'shares': position['qty'],
+        'pnl': position['unrealized_pl'],
+        'pnl_percent': position['unrealized_plpc'] * 100,
+        'entry_time': from_iso(sort_time).isoformat(),
+        'exit_time': None,
+        'status': 'open',
+        'current_price': position['current_price']
+    }
+    return sort_time, round_trip_tie(symbol, sort_time), trade
 
 @app.route('/algorithms/<algorithm_name>/stats', methods=['GET'])
 @app.route('/api/algorithms/<algorithm_name>/stats', methods=['GET'])
@@ -2752,6 +2492,29 @@ def health_check():
     })
 
 
+@app.route('/cache/stats', methods=['GET'])
+@app.route('/api/cache/stats', methods=['GET'])
+def get_cache_stats():
+    """Backend metrics: broker snapshots, precomputed payloads, quotes, REST latency and local stores."""
+    stats = broker_cache.stats()
+    stats['ttls'] = SNAPSHOT_TTLS
+    stats['precompute'] = payloads.stats() if PRECOMPUTE_ENABLED else None
+    stats['quotes'] = {'stocks': stock_quotes.stats(), 'crypto': crypto_quotes.stats()}
+    stats['http'] = {f'project{project}': client.stats() for project, client in alpaca_http.items()}
+    stats['orderLedger'] = order_ledger.stats()
+    stats['fillLedger'] = fill_ledger.stats()
+    stats['microMetrics'] = micro_metrics_fanout.stats()
+    stats['equityStore'] = equity_store.stats()
+    stats['tradeStreams'] = {
+        f'project{project}': {
+            'connected': stream_connected(snapshot_store, project),
+            'listener': listener.stats()
+        }
+        for project, listener in trade_streams.items()
+    } if TRADE_STREAM_ENABLED else None
+    return jsonify(stats)
+
+
 def get_today_start_ny():
     """Get start of today in America/New_York timezone as ISO string."""
     try:
@@ -2780,143 +2543,6 @@ def get_today_start_ny():
         return today_start.isoformat()
 
 
-def equity_at_or_after(points, t0_ms):
-    """
-    Find the equity at the first point with t >= t0_ms (or nearest after).
-    Returns (equity, timestamp_ms) or (None, None) if no point found.
-    """
-    for point in points:
-        if point['t'] >= t0_ms:
-            return point['equity'], point['t']
-    return None, None
-
-
-def equity_at_or_before(points, t0_ms):
-    """
-    Find the equity at the last point with t <= t0_ms (nearest before or at).
-    If no point exists before t0, return the first point.
-    Returns (equity, timestamp_ms) or (None, None) if no points exist.
-    """
-    if not points:
-        return None, None
-    
-    # Points should be sorted by timestamp
-    last_before = None
-    last_before_ts = None
-    
-    for point in points:
-        point_ts = point['t']
-        if point_ts <= t0_ms:
-            if point.get('equity') is not None:
-                last_before = point['equity']
-                last_before_ts = point_ts
-        else:
-            # We've passed t0, stop searching
-            break
-    
-    if last_before is not None:
-        return last_before, last_before_ts
-    
-    # If no point before t0, return first point
-    first_point = points[0]
-    if first_point.get('equity') is not None:
-        return first_point['equity'], first_point['t']
-    
-    return None, None
-
-
-def equity_latest(points):
-    """
-    Get the latest equity point.
-    Returns (equity, timestamp_ms) or (None, None) if no points.
-    """
-    if not points:
-        return None, None
-    last_point = points[-1]
-    return last_point['equity'], last_point['t']
-
-
-def parse_portfolio_history(data, baseline_start, account_equity_hint=None):
-    """
-    Parse Alpaca portfolio history response into canonical equity points.
-    Returns list of {t: ms, equity: number} filtered to >= baseline.
-    """
-    timestamps = data.get('timestamp', [])
-    equity_values = data.get('equity', [])
-    base_value_raw = data.get('base_value', None)
-    
-    if not timestamps or not equity_values or len(timestamps) != len(equity_values):
-        return []
-
-    # Alpaca sometimes returns `equity` as a delta from `base_value` (especially around resets / some account types).
-    # Detect this and normalize to absolute equity.
-    base_value = None
-    try:
-        base_value = float(base_value_raw) if base_value_raw is not None else None
-    except (ValueError, TypeError):
-        base_value = None
-
-    interpret_equity_as_delta = False
-    if base_value is not None and equity_values:
-        try:
-            last_val = float(equity_values[-1])
-            # Strong signal: if base_value + last_val matches the live account equity, `equity` is a delta.
-            if account_equity_hint is not None:
-                try:
-                    acct_eq = float(account_equity_hint)
-                    if acct_eq > 0 and abs((base_value + last_val) - acct_eq) <= max(1.0, acct_eq * 0.01):
-                        interpret_equity_as_delta = True
-                except (ValueError, TypeError):
-                    pass
-            # Heuristic fallback: if values are "small" compared to base_value, treat as delta.
-            if not interpret_equity_as_delta:
-                sample = []
-                for v in equity_values[: min(50, len(equity_values))]:
-                    try:
-                        sample.append(abs(float(v)))
-                    except (ValueError, TypeError):
-                        continue
-                if sample and max(sample) < base_value * 0.5:
-                    interpret_equity_as_delta = True
-        except (ValueError, TypeError):
-            pass
-    
-    baseline_ts_ms = int(baseline_start.timestamp() * 1000)
-    points = []
-    
-    for i, ts in enumerate(timestamps):
-        # Convert timestamp to milliseconds
-        if isinstance(ts, (int, float)):
-            ts_val_ms = int(ts * 1000) if ts < 1e10 else int(ts)
-        else:
-            try:
-                dt = datetime.fromisoformat(str(ts).replace('Z', '+00:00'))
-                if dt.tzinfo:
-                    dt = dt.replace(tzinfo=None)
-                ts_val_ms = int(dt.timestamp() * 1000)
-            except:
-                continue
-        
-        # Only include points >= baseline
-        if ts_val_ms < baseline_ts_ms:
-            continue
-        
-        equity = equity_values[i]
-        # Ensure numeric conversion (Alpaca may return strings)
-        try:
-            equity_float = float(equity) if equity is not None else None
-            if equity_float is not None and interpret_equity_as_delta and base_value is not None:
-                equity_float = base_value + equity_float
-            if equity_float is not None:
-                points.append({'t': ts_val_ms, 'equity': equity_float})
-        except (ValueError, TypeError):
-            continue
-    
-    # Sort by timestamp
-    points.sort(key=lambda x: x['t'])
-    return points
-
-
 def compute_micro_metrics(project=1):
     """
     Compute micro-metrics for a given project using Alpaca API.
@@ -2931,21 +2557,12 @@ def compute_micro_metrics(project=1):
     # Get baseline configuration
     baseline = get_baseline(project)
     baseline_start = get_baseline_start_datetime(project)
-    baseline_start_iso = baseline['baselineStartIso']
     baseline_equity = baseline['baselineEquity']
     baseline_start_ms = int(baseline_start.timestamp() * 1000)
     
     # Select appropriate client and credentials based on project
-    if project == 2:
-        base_url = ALPACA_BASE_URL_2
-        api_key = ALPACA_API_KEY_2
-        secret_key = ALPACA_SECRET_KEY_2
-        get_account_func = get_alpaca_account_2
-    else:
-        base_url = ALPACA_BASE_URL
-        api_key = ALPACA_API_KEY
-        secret_key = ALPACA_SECRET_KEY
-        get_account_func = get_alpaca_account
+    _, api_key, secret_key = get_account_credentials(project)
+    get_account_func = get_alpaca_account_2 if project == 2 else get_alpaca_account
     
     if not api_key or not secret_key:
         return {
@@ -2954,11 +2571,6 @@ def compute_micro_metrics(project=1):
             'lastTradeHoursAgo': None, 'dayChangePct': None, 'investedPct': None
         }
     
-    headers = {
-        "APCA-API-KEY-ID": api_key,
-        "APCA-API-SECRET-KEY": secret_key
-    }
-    
     result = {
         'pnlWeek': None,
         'pnlMonth': None,
@@ -2968,23 +2580,21 @@ def compute_micro_metrics(project=1):
         'tradesToday': None,  # Use None as default, set to 0 only when we have data confirming 0 trades
         'lastTradeHoursAgo': None,
         'dayChangePct': None,
-        'investedPct': None
+        'investedPct': None,
+        'partial': False,  # True if some upstream sub-fetches failed or timed out
+        'missing': []  # Names of those sub-fetches
     }
     
     try:
-        from concurrent.futures import ThreadPoolExecutor, as_completed
-        
         # Get today start - use NY timezone for stocks, UTC for crypto (24/7 trading)
         now_utc = datetime.now(timezone.utc)
         
         if project == 2:  # Crypto - use UTC for "today" since crypto trades 24/7
             today_start_utc = now_utc.replace(hour=0, minute=0, second=0, microsecond=0)
-            today_start_ny = today_start_utc.isoformat()  # ISO format for API
             day_start_utc = today_start_utc
             day_start_ms = int(day_start_utc.timestamp() * 1000)
         else:  # Stocks/Options - use NY timezone
             today_start_ny_str = get_today_start_ny()
-            today_start_ny = today_start_ny_str
             # Parse the ISO string to get UTC datetime
             try:
                 today_start_utc = datetime.fromisoformat(today_start_ny_str.replace('Z', '+00:00'))
@@ -3028,54 +2638,32 @@ def compute_micro_metrics(project=1):
         week_start_ms = max(desired_week_start_ms, baseline_start_ms)
         month_start_ms = max(desired_month_start_ms, baseline_start_ms)
         
-        # Fetch portfolio history using separate windows
-        url_history = f"{base_url}/v2/account/portfolio/history"
-        url_activities = f"{base_url}/v2/account/activities"
-        url_account = f"{base_url}/v2/account"
-        
-        request_configs = {
-            'history_1d': (url_history, {"period": "1D", "timeframe": "5Min", "extended_hours": "true"}),
-            'history_7d': (url_history, {"period": "7D", "timeframe": "1H", "extended_hours": "true"}),
-            'history_30d': (url_history, {"period": "30D", "timeframe": "1D", "extended_hours": "true"}),
-            'account': (url_account, {}),
-            'fills_today': (url_activities, {"activity_types": "FILL", "after": today_start_ny, "direction": "asc", "page_size": 200}),
-            'latest_fill': (url_activities, {"activity_types": "FILL", "direction": "desc", "page_size": 1}),
-            'fills_7d': (url_activities, {"activity_types": "FILL", "after": baseline_start_iso, "direction": "asc", "page_size": 500}),
-        }
-        
-        def fetch_request(key, url, params):
-            try:
-                resp = requests.get(url, headers=headers, params=params, timeout=10)
-                return key, resp
-            except Exception as e:
-                print(f"Error fetching {key}: {e}")
-                return key, None
-        
-        # Fetch account and all HTTP requests in parallel
-        responses = {}
-        account = None
-        
-        with ThreadPoolExecutor(max_workers=7) as executor:
-            # Submit account fetch (using function)
-            account_future = executor.submit(get_account_func)
-            
-            # Submit all HTTP requests
-            futures = {
-                executor.submit(fetch_request, key, url, params): key 
-                for key, (url, params) in request_configs.items()
-            }
-            
-            # Collect results
-            for future in as_completed(futures):
-                key, resp = future.result()
-                responses[key] = resp
-            
-            # Get account result
-            try:
-                account = account_future.result()
-            except Exception as e:
-                print(f"Error fetching account: {e}")
-                account = None
+        # Fetch portfolio history windows, the account and new fills concurrently on the
+        # shared pool; sub-fetches that fail or miss the deadline are reported as missing
+        url_history = "/v2/account/portfolio/history"
+        url_account = "/v2/account"
+        subfetch_timeout = micro_metrics_fanout.timeout_sec
+        
+        def fetch_request(url, params):
+            return alpaca_http[project].get(url, params=params, timeout=subfetch_timeout)
+        
+        responses, missing = micro_metrics_fanout.run({
+            'history_1d': lambda: fetch_request(url_history, {"period": "1D", "timeframe": "5Min", "extended_hours": "true"}),
+            'history_7d': lambda: fetch_request(url_history, {"period": "7D", "timeframe": "1H", "extended_hours": "true"}),
+            'history_30d': lambda: fetch_request(url_history, {"period": "30D", "timeframe": "1D", "extended_hours": "true"}),
+            'account': lambda: fetch_request(url_account, {}),
+            'account_snapshot': get_account_func,
+            'fills': lambda: fill_ledger.sync(
+                project, lambda params: fetch_account_activities(project, params, timeout=subfetch_timeout), baseline_start,
+                interval_sec=ledger_sync_interval(project)
+            ),
+        })
+        if missing:
+            # Compute what the finished sub-fetches allow; fills fall back to what the ledger already has
+            result['partial'] = True
+            result['missing'] = sorted(missing)
+            print(f"WARNING [compute_micro_metrics] project={project}: partial result, missing {missing}")
+        account = responses.get('account_snapshot')
         
         # Get account from API response if function didn't work
         response_account = responses.get('account')
@@ -3087,6 +2675,11 @@ def compute_micro_metrics(project=1):
             elif not account:
                 account = account_data
         
+        # Fills from the local fill ledger (every fill since baseline, oldest first)
+        fills_today = fill_ledger.fills(project, max(baseline_start, today_start_utc))
+        latest_fill = fill_ledger.latest(project, baseline_start)
+        fills_7d = fill_ledger.fills(project, baseline_start)
+        
         # Get equityNow from account (most accurate "now" value)
         equity_now = None
         if account:
@@ -3109,8 +2702,6 @@ def compute_micro_metrics(project=1):
         if response_1d and response_1d.status_code == 200:
             data_1d = response_1d.json()
             day_points = parse_portfolio_history(data_1d, baseline_start, account_equity_hint=equity_now)
-            # Filter to >= baseline
-            day_points = [p for p in day_points if p['t'] >= baseline_start_ms]
         
         # Week: 7D history with 1H timeframe
         week_points = []
@@ -3118,8 +2709,6 @@ def compute_micro_metrics(project=1):
         if response_7d and response_7d.status_code == 200:
             data_7d = response_7d.json()
             week_points = parse_portfolio_history(data_7d, baseline_start, account_equity_hint=equity_now)
-            # Filter to >= baseline
-            week_points = [p for p in week_points if p['t'] >= baseline_start_ms]
         
         # Month: 30D history with 1D timeframe
         month_points = []
@@ -3127,8 +2716,6 @@ def compute_micro_metrics(project=1):
         if response_30d and response_30d.status_code == 200:
             data_30d = response_30d.json()
             month_points = parse_portfolio_history(data_30d, baseline_start, account_equity_hint=equity_now)
-            # Filter to >= baseline
-            month_points = [p for p in month_points if p['t'] >= baseline_start_ms]
         
         # ===== DAY CHANGE % =====
         # Preferred: Use account.last_equity if available AND reset not inside today window
@@ -3193,62 +2780,15 @@ def compute_micro_metrics(project=1):
                 print(f"DEBUG [pnlMonth] project={project}: No month history available, using baseline: {baseline_equity} -> {equity_now}, pnl={result['pnlMonth']}")
         
         
-        # Process fills today (filter by baseline AND today's date)
-        response_fills_today = responses.get('fills_today')
-        if response_fills_today and response_fills_today.status_code == 200:
-            fills_today = response_fills_today.json()
-            if isinstance(fills_today, list):
-                # Filter fills to only include those after baseline AND within today
-                filtered_fills_today = []
-                # Use today_start_utc (defined above) for filtering - ensures crypto uses UTC, stocks use NY->UTC
-                
-                for fill in fills_today:
-                    transaction_time = fill.get('transaction_time')
-                    if transaction_time:
-                        try:
-                            fill_time = datetime.fromisoformat(transaction_time.replace('Z', '+00:00'))
-                            if fill_time.tzinfo is None:
-                                fill_time = fill_time.replace(tzinfo=timezone.utc)
-                            
-                            # Must be after baseline AND within today (since midnight)
-                            # For crypto: today_start_utc is UTC midnight; for stocks: NY midnight converted to UTC
-                            if fill_time >= baseline_start and fill_time >= today_start_utc:
-                                filtered_fills_today.append(fill)
-                        except Exception as e:
-                            print(f"Error parsing transaction_time: {e}")
-                # Always set tradesToday - 0 if no trades, count if there are trades
-                result['tradesToday'] = len(filtered_fills_today)
-                print(f"DEBUG [tradesToday] project={project}: Found {result['tradesToday']} trades today (total fills={len(fills_today)}, after baseline and today start)")
-            else:
-                # Response was not a list - set to 0
-                result['tradesToday'] = 0
-                print(f"DEBUG [tradesToday] project={project}: Response was not a list, setting to 0")
-        else:
-            # No response or error - set to 0 (we have no data, so assume 0)
-            result['tradesToday'] = 0
-            print(f"DEBUG [tradesToday] project={project}: No valid response, setting to 0")
-        
-        # Process latest fill (must be after baseline)
-        response_latest_fill = responses.get('latest_fill')
-        if response_latest_fill and response_latest_fill.status_code == 200:
-            latest_fills = response_latest_fill.json()
-            if isinstance(latest_fills, list) and len(latest_fills) > 0:
-                # Find the latest fill that's after baseline
-                for fill in latest_fills:
-                    transaction_time = fill.get('transaction_time')
-                    if transaction_time:
-                        try:
-                            # Parse ISO timestamp
-                            fill_time = datetime.fromisoformat(transaction_time.replace('Z', '+00:00'))
-                            if fill_time.tzinfo is None:
-                                fill_time = fill_time.replace(tzinfo=timezone.utc)
-                            if fill_time >= baseline_start:
-                                now_utc = datetime.now(timezone.utc)
-                                hours_ago = (now_utc - fill_time).total_seconds() / 3600
-                                result['lastTradeHoursAgo'] = round(hours_ago, 1)
-                                break
-                        except Exception as e:
-                            print(f"Error parsing transaction_time: {e}")
+        # Fills today (after baseline AND since today's start: UTC midnight for crypto, NY midnight for stocks)
+        result['tradesToday'] = len(fills_today)
+        print(f"DEBUG [tradesToday] project={project}: Found {result['tradesToday']} trades today (after baseline and today start)")
+        
+        # Latest fill (after baseline)
+        if latest_fill:
+            fill_time = datetime.fromisoformat(latest_fill['transaction_time'].replace('Z', '+00:00'))
+            hours_ago = (datetime.now(timezone.utc) - fill_time).total_seconds() / 3600
+            result['lastTradeHoursAgo'] = round(hours_ago, 1)
         
         # Process account for invested %
         if account:
@@ -3261,149 +2801,85 @@ def compute_micro_metrics(project=1):
             except (ValueError, TypeError):
                 pass
         
-        # Process fills 7D for W/L and avg return (already filtered by baseline via API)
-        response_fills_7d = responses.get('fills_7d')
+        # Process fills since baseline for W/L and avg return (every fill from the ledger)
         matched_segments = []
         
-        # #region agent log - Hypothesis A: Check if fills_7d response exists and is valid
-        log_data = {'project': project, 'has_response': response_fills_7d is not None}
-        if response_fills_7d:
-            log_data['status_code'] = response_fills_7d.status_code if hasattr(response_fills_7d, 'status_code') else None
-            log_data['status_code_is_200'] = (hasattr(response_fills_7d, 'status_code') and response_fills_7d.status_code == 200)
-        try:
-            with open(DEBUG_LOG_PATH, 'a') as f:
-                import json
-                f.write(json.dumps({'location': 'app.py:3966', 'message': 'fills_7d response check', 'data': log_data, 'timestamp': int(datetime.now(timezone.utc).timestamp() * 1000), 'sessionId': 'debug-session', 'runId': 'run1', 'hypothesisId': 'A'}) + '\n')
-        except: pass
-        # #endregion
-        
-        if response_fills_7d and response_fills_7d.status_code == 200:
-            # #region agent log - Entered 200 block
-            try:
-                with open(DEBUG_LOG_PATH, 'a') as f:
-                    import json
-                    f.write(json.dumps({'location': 'app.py:3969', 'message': 'entered status 200 block', 'data': {'project': project}, 'timestamp': int(datetime.now(timezone.utc).timestamp() * 1000), 'sessionId': 'debug-session', 'runId': 'run1', 'hypothesisId': 'A'}) + '\n')
-            except: pass
-            # #endregion
-            fills_7d = response_fills_7d.json()
+        if fills_7d:
+            # FIFO matching per symbol
+            open_lots = {}  # symbol -> list of {qty, price, timestamp}
+            buy_count = 0
+            sell_count = 0
             
-            # #region agent log - Hypothesis B: Check fills structure for crypto
-            log_data = {'project': project, 'is_list': isinstance(fills_7d, list), 'total_fills': len(fills_7d) if isinstance(fills_7d, list) else 0}
-            if isinstance(fills_7d, list) and len(fills_7d) > 0:
-                sample_fill = fills_7d[0]
-                log_data['sample_fill_keys'] = list(sample_fill.keys()) if isinstance(sample_fill, dict) else []
-                log_data['sample_fill_side'] = sample_fill.get('side') if isinstance(sample_fill, dict) else None
-                log_data['sample_fill_symbol'] = sample_fill.get('symbol') if isinstance(sample_fill, dict) else None
+            for fill in fills_7d:
+                symbol = fill.get('symbol')
+                side = fill.get('side', '').upper()
+                try:
+                    qty = float(fill.get('qty', 0))
+                    price = float(fill.get('price', 0))
+                except (ValueError, TypeError):
+                    continue
+                
+                if not symbol or qty == 0 or price == 0:
+                    continue
+                
+                # #region agent log - Hypothesis D: Count buy/sell fills
+                if side == 'BUY':
+                    buy_count += 1
+                elif side == 'SELL':
+                    sell_count += 1
+                # #endregion
+                
+                if side == 'BUY':
+                    # Add to open lots
+                    if symbol not in open_lots:
+                        open_lots[symbol] = []
+                    open_lots[symbol].append({'qty': qty, 'price': price})
+                elif side == 'SELL':
+                    # Match against open lots (FIFO)
+                    if symbol in open_lots and len(open_lots[symbol]) > 0:
+                        remaining_qty = qty
+                        while remaining_qty > 0 and len(open_lots[symbol]) > 0:
+                            lot = open_lots[symbol][0]
+                            matched_qty = min(remaining_qty, lot['qty'])
+                            
+                            # Calculate realized P&L
+                            entry_price = lot['price']
+                            exit_price = price
+                            realized_pnl = (exit_price - entry_price) * matched_qty
+                            
+                            # Calculate return % and store P&L
+                            cost_basis = matched_qty * entry_price
+                            if cost_basis > 0:
+                                return_pct = (realized_pnl / cost_basis) * 100
+                                matched_segments.append({
+                                    'return_pct': return_pct,
+                                    'pnl': realized_pnl,  # Store dollar amount P&L
+                                    'qty': matched_qty
+                                })
+                            
+                            # Update lot
+                            lot['qty'] -= matched_qty
+                            if lot['qty'] <= 0:
+                                open_lots[symbol].pop(0)
+                            
+                            remaining_qty -= matched_qty
+                    else:
+                        # #region agent log - Hypothesis E: No matching buy for sell
+                        try:
+                            with open(DEBUG_LOG_PATH, 'a') as f:
+                                import json
+                                f.write(json.dumps({'location': 'app.py:4014', 'message': 'sell without matching buy', 'data': {'project': project, 'symbol': symbol, 'qty': qty, 'open_lots_has_symbol': symbol in open_lots, 'open_lots_count': len(open_lots.get(symbol, []))}, 'timestamp': int(datetime.now(timezone.utc).timestamp() * 1000), 'sessionId': 'debug-session', 'runId': 'run1', 'hypothesisId': 'E'}) + '\n')
+                        except: pass
+                        # #endregion
+            
+            # #region agent log - Hypothesis D: Final buy/sell counts and matching results
             try:
                 with open(DEBUG_LOG_PATH, 'a') as f:
                     import json
-                    f.write(json.dumps({'location': 'app.py:3970', 'message': 'fills_7d structure check', 'data': log_data, 'timestamp': int(datetime.now(timezone.utc).timestamp() * 1000), 'sessionId': 'debug-session', 'runId': 'run1', 'hypothesisId': 'B'}) + '\n')
+                    f.write(json.dumps({'location': 'app.py:4036', 'message': 'buy/sell matching summary', 'data': {'project': project, 'buy_count': buy_count, 'sell_count': sell_count, 'matched_segments_count': len(matched_segments), 'open_lots_symbols': list(open_lots.keys()), 'open_lots_total_qty': {k: sum(lot['qty'] for lot in v) for k, v in open_lots.items()}}, 'timestamp': int(datetime.now(timezone.utc).timestamp() * 1000), 'sessionId': 'debug-session', 'runId': 'run1', 'hypothesisId': 'D'}) + '\n')
             except: pass
             # #endregion
-            
-            # Additional client-side filtering to ensure all fills are after baseline
-            if isinstance(fills_7d, list):
-                filtered_fills_7d = []
-                before_baseline_count = 0
-                for fill in fills_7d:
-                    transaction_time = fill.get('transaction_time')
-                    if transaction_time:
-                        try:
-                            fill_time = datetime.fromisoformat(transaction_time.replace('Z', '+00:00'))
-                            if fill_time.tzinfo is None:
-                                fill_time = fill_time.replace(tzinfo=timezone.utc)
-                            if fill_time >= baseline_start:
-                                filtered_fills_7d.append(fill)
-                            else:
-                                before_baseline_count += 1
-                        except Exception as e:
-                            print(f"Error parsing transaction_time: {e}")
-                fills_7d = filtered_fills_7d
-                
-                # #region agent log - Hypothesis C: Check baseline filtering
-                try:
-                    with open(DEBUG_LOG_PATH, 'a') as f:
-                        import json
-                        f.write(json.dumps({'location': 'app.py:3985', 'message': 'baseline filtering results', 'data': {'project': project, 'filtered_count': len(fills_7d), 'before_baseline_count': before_baseline_count, 'baseline_start': baseline_start.isoformat()}, 'timestamp': int(datetime.now(timezone.utc).timestamp() * 1000), 'sessionId': 'debug-session', 'runId': 'run1', 'hypothesisId': 'C'}) + '\n')
-                except: pass
-                # #endregion
-            
-            if len(fills_7d) > 0:
-                # FIFO matching per symbol
-                open_lots = {}  # symbol -> list of {qty, price, timestamp}
-                buy_count = 0
-                sell_count = 0
-                
-                for fill in fills_7d:
-                    symbol = fill.get('symbol')
-                    side = fill.get('side', '').upper()
-                    try:
-                        qty = float(fill.get('qty', 0))
-                        price = float(fill.get('price', 0))
-                    except (ValueError, TypeError):
-                        continue
-                    
-                    if not symbol or qty == 0 or price == 0:
-                        continue
-                    
-                    # #region agent log - Hypothesis D: Count buy/sell fills
-                    if side == 'BUY':
-                        buy_count += 1
-                    elif side == 'SELL':
-                        sell_count += 1
-                    # #endregion
-                    
-                    if side == 'BUY':
-                        # Add to open lots
-                        if symbol not in open_lots:
-                            open_lots[symbol] = []
-                        open_lots[symbol].append({'qty': qty, 'price': price})
-                    elif side == 'SELL':
-                        # Match against open lots (FIFO)
-                        if symbol in open_lots and len(open_lots[symbol]) > 0:
-                            remaining_qty = qty
-                            while remaining_qty > 0 and len(open_lots[symbol]) > 0:
-                                lot = open_lots[symbol][0]
-                                matched_qty = min(remaining_qty, lot['qty'])
-                                
-                                # Calculate realized P&L
-                                entry_price = lot['price']
-                                exit_price = price
-                                realized_pnl = (exit_price - entry_price) * matched_qty
-                                
-                                # Calculate return % and store P&L
-                                cost_basis = matched_qty * entry_price
-                                if cost_basis > 0:
-                                    return_pct = (realized_pnl / cost_basis) * 100
-                                    matched_segments.append({
-                                        'return_pct': return_pct,
-                                        'pnl': realized_pnl,  # Store dollar amount P&L
-                                        'qty': matched_qty
-                                    })
-                                
-                                # Update lot
-                                lot['qty'] -= matched_qty
-                                if lot['qty'] <= 0:
-                                    open_lots[symbol].pop(0)
-                                
-                                remaining_qty -= matched_qty
-                        else:
-                            # #region agent log - Hypothesis E: No matching buy for sell
-                            try:
-                                with open(DEBUG_LOG_PATH, 'a') as f:
-                                    import json
-                                    f.write(json.dumps({'location': 'app.py:4014', 'message': 'sell without matching buy', 'data': {'project': project, 'symbol': symbol, 'qty': qty, 'open_lots_has_symbol': symbol in open_lots, 'open_lots_count': len(open_lots.get(symbol, []))}, 'timestamp': int(datetime.now(timezone.utc).timestamp() * 1000), 'sessionId': 'debug-session', 'runId': 'run1', 'hypothesisId': 'E'}) + '\n')
-                            except: pass
-                            # #endregion
-                
-                # #region agent log - Hypothesis D: Final buy/sell counts and matching results
-                try:
-                    with open(DEBUG_LOG_PATH, 'a') as f:
-                        import json
-                        f.write(json.dumps({'location': 'app.py:4036', 'message': 'buy/sell matching summary', 'data': {'project': project, 'buy_count': buy_count, 'sell_count': sell_count, 'matched_segments_count': len(matched_segments), 'open_lots_symbols': list(open_lots.keys()), 'open_lots_total_qty': {k: sum(lot['qty'] for lot in v) for k, v in open_lots.items()}}, 'timestamp': int(datetime.now(timezone.utc).timestamp() * 1000), 'sessionId': 'debug-session', 'runId': 'run1', 'hypothesisId': 'D'}) + '\n')
-                except: pass
-                # #endregion
-        
+    
         # #region agent log - Final matched segments check
         try:
             with open(DEBUG_LOG_PATH, 'a') as f:
@@ -3418,8 +2894,7 @@ def compute_micro_metrics(project=1):
                 import json
                 summary = {
                     'project': project,
-                    'response_exists': response_fills_7d is not None,
-                    'response_status': response_fills_7d.status_code if (response_fills_7d and hasattr(response_fills_7d, 'status_code')) else None,
+                    'fills_count': len(fills_7d),
                     'matched_segments_count': len(matched_segments),
                     'result_wins': result.get('wins'),
                     'result_losses': result.get('losses')
@@ -3645,13 +3120,7 @@ def get_alpaca_metrics():
         return jsonify({'error': 'Invalid project. Must be 1 or 2'}), 400
     
     try:
-        metrics = compute_micro_metrics(project)
-        response = jsonify(metrics)
-        # Prevent caching - always fetch fresh data
-        response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, max-age=0'
-        response.headers['Pragma'] = 'no-cache'
-        response.headers['Expires'] = '0'
-        return response
+        return payload_response(f'metrics:{project}')
     except Exception as e:
         print(f"Error fetching metrics: {e}")
         import traceback
@@ -3659,6 +3128,86 @@ def get_alpaca_metrics():
         return jsonify({'error': str(e)}), 500
 
 
+def sync_fill_ledger(project, force=False):
+    """Bring the project's fill ledger up to date (no-op if synced recently, unless forced)."""
+    try:
+        fill_ledger.sync(project, lambda params: fetch_account_activities(project, params),
+                         get_baseline_start_datetime(project), force=force)
+    except Exception as e:
+        print(f"Error syncing fill ledger (Project {project}): {e}")
+
+
+def handle_trade_update(project, update):
+    """Apply one order event from the trade-updates stream.
+
+    Stores the order carried by the event and drops the project's position
+    and account snapshots. Events that change what the payloads show (fills,
+    or an order ending with a partial fill) mark the fill ledger due and the
+    payloads dirty; the scheduler rebuilds each once on its next tick, however
+    many events arrive before it. Nothing is rebuilt on the listener thread.
+    """
+    event = update.get('event')
+    filled = event in ('fill', 'partial_fill')
+    try:
+        order = Order(**update['order'])
+        order_ledger.upsert(project, [order])
+        filled = filled or float(order.filled_qty or 0) > 0
+    except Exception as e:
+        print(f"Trade update (Project {project}): could not store order from {event} event, syncing instead: {e}")
+        sync_order_ledger(project, force=True)
+
+    broker_cache.invalidate('positions', project)
+    broker_cache.invalidate('account', project)
+    if not filled:
+        return
+    fill_ledger.mark_due(project)
+    if PRECOMPUTE_ENABLED:
+        payloads.mark_dirty('algorithms')
+        payloads.mark_dirty(f'metrics:{project}')
+
+
+def catch_up_trade_updates(project):
+    """After a stream (re)connect, sync the ledgers for anything missed while polling."""
+    sync_order_ledger(project, force=True)
+    sync_fill_ledger(project, force=True)
+
+
+# One listener per configured account (only started with TRADE_STREAM_ENABLED); point
+# TRADE_STREAM_URL / TRADE_STREAM_URL_2 at a local fake stream to test without Alpaca
+trade_streams = {
+    project: TradeUpdateListener(
+        project,
+        url=os.getenv('TRADE_STREAM_URL' + ('_2' if project == 2 else '')) or STREAM_URLS[is_paper],
+        api_key=api_key,
+        secret_key=secret_key,
+        on_update=lambda update, project=project: handle_trade_update(project, update),
+        on_connect=lambda project=project: catch_up_trade_updates(project),
+        store=snapshot_store,
+        lock_path=os.path.join(DATA_DIR, f'trade_stream_{project}.lock')
+    )
+    for project, is_paper, api_key, secret_key in (
+        (1, IS_PAPER, ALPACA_API_KEY, ALPACA_SECRET_KEY),
+        (2, IS_PAPER_2, ALPACA_API_KEY_2, ALPACA_SECRET_KEY_2),
+    )
+    if api_key and secret_key
+}
+
+
+@app.before_request
+def start_background_jobs():
+    """Start this worker's payload scheduler and stream listeners on its first request (after any fork)."""
+    if PRECOMPUTE_ENABLED:
+        payloads.start()
+    if TRADE_STREAM_ENABLED:
+        for listener in trade_streams.values():
+            listener.start()
+
+
+payloads.register('algorithms', build_algorithms_payload)
+payloads.register('metrics:1', lambda: compute_micro_metrics(1))
+payloads.register('metrics:2', lambda: compute_micro_metrics(2))
+
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     app.run(debug=True, host='0.0.0.0', port=port)
@@ -0,0 +1,167 @@
+"""
+Micro-benchmark for portfolio history parsing and equity lookups.
+
+Builds a deterministic 30-day, 5-minute portfolio-history response (the
+shape Alpaca returns) and times:
+- parse: parse_portfolio_history on the whole response
+- lookups: equity_at_or_before / equity_at_or_after at many probe times
+
+each against the previous pure-Python implementation (kept below as the
+reference), after checking both produce the same points and lookup results.
+
+Usage:
+    python benchmark_equity.py [--days 30] [--lookups 1000] [--repeat 5] [--delta]
+"""
+import argparse
+import statistics
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from equity_series import parse_portfolio_history, equity_at_or_after, equity_at_or_before
+
+INTERVAL_SEC = 5 * 60
+
+
+def make_history(days, delta=False, seed=7):
+    """Synthetic portfolio-history JSON: timestamps in epoch seconds, equity random walk."""
+    rng = np.random.default_rng(seed)
+    n = days * 24 * 60 * 60 // INTERVAL_SEC
+    end = int(datetime(2026, 1, 30, tzinfo=timezone.utc).timestamp())
+    timestamps = np.arange(end - (n - 1) * INTERVAL_SEC, end + 1, INTERVAL_SEC)
+    base_value = 100000.0
+    equity = base_value + np.cumsum(rng.normal(0, 25, n))
+    return {
+        'timestamp': timestamps.tolist(),
+        'equity': (equity - base_value if delta else equity).round(2).tolist(),
+        'base_value': base_value,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Reference: the per-point loop and linear scans this module replaced
+
+def reference_parse(data, baseline_start, account_equity_hint=None):
+    timestamps = data.get('timestamp', [])
+    equity_values = data.get('equity', [])
+    base_value_raw = data.get('base_value', None)
+    if not timestamps or not equity_values or len(timestamps) != len(equity_values):
+        return []
+    base_value = None
+    try:
+        base_value = float(base_value_raw) if base_value_raw is not None else None
+    except (ValueError, TypeError):
+        base_value = None
+    interpret_equity_as_delta = False
+    if base_value is not None and equity_values:
+        try:
+            last_val = float(equity_values[-1])
+            if account_equity_hint is not None:
+                acct_eq = float(account_equity_hint)
+                if acct_eq > 0 and abs((base_value + last_val) - acct_eq) <= max(1.0, acct_eq * 0.01):
+                    interpret_equity_as_delta = True
+            if not interpret_equity_as_delta:
+                sample = []
+                for v in equity_values[: min(50, len(equity_values))]:
+                    try:
+                        sample.append(abs(float(v)))
+                    except (ValueError, TypeError):
+                        continue
+                if sample and max(sample) < base_value * 0.5:
+                    interpret_equity_as_delta = True
+        except (ValueError, TypeError):
+            pass
+    baseline_ts_ms = int(baseline_start.timestamp() * 1000)
+    points = []
+    for i, ts in enumerate(timestamps):
+        ts_val_ms = int(ts * 1000) if ts < 1e10 else int(ts)
+        if ts_val_ms < baseline_ts_ms:
+            continue
+        try:
+            equity_float = float(equity_values[i]) if equity_values[i] is not None else None
+            if equity_float is not None and interpret_equity_as_delta and base_value is not None:
+                equity_float = base_value + equity_float
+            if equity_float is not None:
+                points.append({'t': ts_val_ms, 'equity': equity_float})
+        except (ValueError, TypeError):
+            continue
+    points.sort(key=lambda x: x['t'])
+    return points
+
+
+def reference_at_or_after(points, t0_ms):
+    for point in points:
+        if point['t'] >= t0_ms:
+            return point['equity'], point['t']
+    return None, None
+
+
+def reference_at_or_before(points, t0_ms):
+    if not points:
+        return None, None
+    last_before = None
+    last_before_ts = None
+    for point in points:
+        if point['t'] <= t0_ms:
+            last_before = point['equity']
+            last_before_ts = point['t']
+        else:
+            break
+    if last_before is not None:
+        return last_before, last_before_ts
+    return points[0]['equity'], points[0]['t']
+
+
+# ---------------------------------------------------------------------------
+
+def timed(fn, repeat):
+    """Median wall time of fn() in ms over repeat runs, plus the last result."""
+    samples = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), result
+
+
+def run(days=30, lookups=1000, repeat=5, delta=False):
+    data = make_history(days, delta=delta)
+    baseline_start = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    first_ms, last_ms = data['timestamp'][0] * 1000, data['timestamp'][-1] * 1000
+    probes = np.random.default_rng(11).integers(first_ms - 3600000, last_ms + 3600000, lookups).tolist()
+
+    ref_parse_ms, ref_points = timed(lambda: reference_parse(data, baseline_start), repeat)
+    new_parse_ms, series = timed(lambda: parse_portfolio_history(data, baseline_start), repeat)
+    assert list(series) == ref_points, "parsed points differ from the reference"
+
+    def ref_lookups():
+        return [(reference_at_or_before(ref_points, p), reference_at_or_after(ref_points, p)) for p in probes]
+
+    def new_lookups():
+        return [(equity_at_or_before(series, p), equity_at_or_after(series, p)) for p in probes]
+
+    ref_lookup_ms, ref_results = timed(ref_lookups, repeat)
+    new_lookup_ms, new_results = timed(new_lookups, repeat)
+    assert new_results == ref_results, "lookup results differ from the reference"
+
+    print(f"{len(series)} points ({days} days x 5Min{', delta equity' if delta else ''}), "
+          f"{lookups} probes x 2 lookups, median of {repeat}")
+    print(f"{'':10} {'reference ms':>14} {'numpy ms':>10} {'speedup':>9}")
+    for name, ref_ms, new_ms in (('parse', ref_parse_ms, new_parse_ms), ('lookups', ref_lookup_ms, new_lookup_ms)):
+        print(f"{name:10} {ref_ms:14.2f} {new_ms:10.2f} {ref_ms / new_ms:8.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--lookups', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--delta', action='store_true', help='Return equity as deltas from base_value')
+    args = parser.parse_args()
+    run(days=args.days, lookups=args.lookups, repeat=args.repeat, delta=args.delta)
+
+
+if __name__ == '__main__':
+    main()
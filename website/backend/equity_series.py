@@ -0,0 +1,160 @@
+"""Portfolio history as NumPy arrays, with binary-search equity lookups.
+
+parse_portfolio_history converts an Alpaca portfolio-history response once
+into sorted timestamp/equity arrays (an EquitySeries), applying the
+delta-versus-absolute equity heuristic as array operations. The lookups
+(equity_at_or_after, equity_at_or_before, equity_latest) are O(log n)
+searchsorted calls instead of linear scans, so metrics can probe the same
+series many times cheaply.
+
+An EquitySeries still iterates as {'t': ms, 'equity': value} dicts, the shape
+the rest of the backend uses for equity points.
+"""
+from datetime import datetime
+
+import numpy as np
+
+
+class EquitySeries:
+    """Equity points sorted by time: t (int64 epoch ms) and equity (float64)."""
+
+    __slots__ = ('t', 'equity')
+
+    def __init__(self, t, equity):
+        self.t = t
+        self.equity = equity
+
+    @classmethod
+    def empty(cls):
+        return cls(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64))
+
+    def __len__(self):
+        return len(self.t)
+
+    def __iter__(self):
+        for t, equity in zip(self.t.tolist(), self.equity.tolist()):
+            yield {'t': t, 'equity': equity}
+
+
+def _timestamps_ms(timestamps):
+    """Convert Alpaca timestamps (epoch s/ms, or ISO strings) to int64 ms (-1 if unparseable)."""
+    try:
+        ts = np.asarray(timestamps, dtype=np.float64)
+    except (ValueError, TypeError):
+        ts = None
+    if ts is not None:
+        return np.where(ts < 1e10, ts * 1000, ts).astype(np.int64)
+
+    # Rare: ISO strings (parsed as naive local time, like the rest of the backend)
+    out = np.full(len(timestamps), -1, dtype=np.int64)
+    for i, value in enumerate(timestamps):
+        if isinstance(value, (int, float)):
+            out[i] = int(value * 1000) if value < 1e10 else int(value)
+            continue
+        try:
+            dt = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+            if dt.tzinfo:
+                dt = dt.replace(tzinfo=None)
+            out[i] = int(dt.timestamp() * 1000)
+        except (ValueError, TypeError):
+            continue
+    return out
+
+
+def _equity_values(values):
+    """Convert equity values (numbers, numeric strings or None) to float64 (NaN if invalid)."""
+    try:
+        return np.asarray(values, dtype=np.float64)
+    except (ValueError, TypeError):
+        out = np.full(len(values), np.nan)
+        for i, value in enumerate(values):
+            try:
+                out[i] = float(value)
+            except (ValueError, TypeError):
+                continue
+        return out
+
+
+def parse_portfolio_history(data, baseline_start, account_equity_hint=None):
+    """
+    Parse Alpaca portfolio history response into canonical equity points.
+    Returns an EquitySeries filtered to >= baseline, sorted by timestamp.
+    """
+    timestamps = data.get('timestamp', [])
+    equity_values = data.get('equity', [])
+    base_value_raw = data.get('base_value', None)
+
+    if not timestamps or not equity_values or len(timestamps) != len(equity_values):
+        return EquitySeries.empty()
+
+    equity = _equity_values(equity_values)
+
+    # Alpaca sometimes returns `equity` as a delta from `base_value` (especially around resets / some account types).
+    # Detect this and normalize to absolute equity.
+    try:
+        base_value = float(base_value_raw) if base_value_raw is not None else None
+    except (ValueError, TypeError):
+        base_value = None
+
+    interpret_equity_as_delta = False
+    last_val = equity[-1]
+    if base_value is not None and not np.isnan(last_val):
+        # Strong signal: if base_value + last_val matches the live account equity, `equity` is a delta.
+        if account_equity_hint is not None:
+            try:
+                acct_eq = float(account_equity_hint)
+                if acct_eq > 0 and abs((base_value + last_val) - acct_eq) <= max(1.0, acct_eq * 0.01):
+                    interpret_equity_as_delta = True
+            except (ValueError, TypeError):
+                pass
+        # Heuristic fallback: if values are "small" compared to base_value, treat as delta.
+        if not interpret_equity_as_delta:
+            sample = np.abs(equity[:50])
+            sample = sample[~np.isnan(sample)]
+            if sample.size and sample.max() < base_value * 0.5:
+                interpret_equity_as_delta = True
+
+    if interpret_equity_as_delta:
+        equity = equity + base_value
+
+    t = _timestamps_ms(timestamps)
+    baseline_ts_ms = int(baseline_start.timestamp() * 1000)
+    # Only include points >= baseline (unparseable timestamps are -1) with a numeric equity
+    keep = (t >= baseline_ts_ms) & (t >= 0) & ~np.isnan(equity)
+    t, equity = t[keep], equity[keep]
+
+    order = np.argsort(t, kind='stable')
+    return EquitySeries(t[order], equity[order])
+
+
+def equity_at_or_after(points, t0_ms):
+    """
+    Find the equity at the first point with t >= t0_ms (or nearest after).
+    Returns (equity, timestamp_ms) or (None, None) if no point found.
+    """
+    i = int(np.searchsorted(points.t, t0_ms, side='left'))
+    if i >= len(points):
+        return None, None
+    return float(points.equity[i]), int(points.t[i])
+
+
+def equity_at_or_before(points, t0_ms):
+    """
+    Find the equity at the last point with t <= t0_ms (nearest before or at).
+    If no point exists before t0, return the first point.
+    Returns (equity, timestamp_ms) or (None, None) if no points exist.
+    """
+    if not len(points):
+        return None, None
+    i = max(int(np.searchsorted(points.t, t0_ms, side='right')) - 1, 0)
+    return float(points.equity[i]), int(points.t[i])
+
+
+def equity_latest(points):
+    """
+    Get the latest equity point.
+    Returns (equity, timestamp_ms) or (None, None) if no points.
+    """
+    if not len(points):
+        return None, None
+    return float(points.equity[-1]), int(points.t[-1])
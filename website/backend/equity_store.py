@@ -0,0 +1,280 @@
+"""Local SQLite store of account equity history, one series per account.
+
+The performance chart used to call Alpaca's portfolio-history endpoint for
+every timeframe, and the baseline lookup made up to two more calls. The
+EquityStore instead keeps two series per account:
+
+- daily (1D) points, filled once from a one-year history and then refreshed
+  from the newest stored day
+- intraday (5Min, extended hours) points, filled once for the last 29 days
+  (the longest span Alpaca serves intraday) and then appended from the newest
+  stored point
+
+Every timeframe and the baseline lookup are answered by range queries over
+these rows, downsampled on the fly (last point per bucket), without calling
+upstream. Syncs are claimed through rows in the same SQLite file, so only one
+gunicorn worker refreshes a series at a time; on a cold start, workers that
+lose the claim of an empty series wait for the claimant's first fill instead
+of answering from an empty store.
+"""
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+RES_DAILY = '1D'
+RES_INTRADAY = '5Min'
+# Alpaca only serves intraday timeframes for periods shorter than 30 days
+INTRADAY_MAX_DAYS = 29
+# Re-request this much before the newest stored point (overlapping points are replaced)
+SYNC_OVERLAP = {RES_DAILY: timedelta(days=1), RES_INTRADAY: timedelta(minutes=10)}
+# How long a worker may hold a sync claim before another worker may take over
+CLAIM_SEC = 120.0
+# How often a worker waiting for another worker's first fill of a series checks on it
+COLD_START_POLL_SEC = 0.25
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS equity_points (
+    project INTEGER NOT NULL,
+    resolution TEXT NOT NULL,
+    t INTEGER NOT NULL,
+    equity REAL NOT NULL,
+    PRIMARY KEY (project, resolution, t)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS equity_sync (
+    project INTEGER NOT NULL,
+    resolution TEXT NOT NULL,
+    synced_at REAL NOT NULL DEFAULT 0,
+    claimed_until REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (project, resolution)
+);
+"""
+
+
+def to_rfc3339(value):
+    """Format an aware datetime as RFC 3339 UTC (Alpaca start/end parameters)."""
+    return value.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+class EquityStore:
+    """SQLite-backed equity series with incremental portfolio-history sync."""
+
+    def __init__(self, db_path, intraday_sync_sec=60.0, daily_sync_sec=600.0):
+        """
+        Args:
+            db_path: SQLite file shared by all workers on the host.
+            intraday_sync_sec: Minimum seconds between intraday syncs of an account.
+            daily_sync_sec: Minimum seconds between daily syncs of an account.
+        """
+        self.db_path = db_path
+        self.sync_sec = {RES_INTRADAY: intraday_sync_sec, RES_DAILY: daily_sync_sec}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.syncs = 0
+        self.upstream_calls = 0
+        self.last_sync = {}  # (project, resolution) -> {'points': n, 'sec': s}
+        self._connect().executescript(SCHEMA)
+
+    def _connect(self):
+        """Get this thread's connection (reopened after a fork)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _claim(self, conn, project, resolution, force):
+        """Claim one series' sync if it is due and no other worker holds it."""
+        now = time.time()
+        due_before = now if force else now - self.sync_sec[resolution]
+        with conn:
+            conn.execute(
+                'INSERT OR IGNORE INTO equity_sync (project, resolution) VALUES (?, ?)',
+                (project, resolution)
+            )
+            cur = conn.execute(
+                'UPDATE equity_sync SET claimed_until = ? '
+                'WHERE project = ? AND resolution = ? AND claimed_until < ? AND synced_at <= ?',
+                (now + CLAIM_SEC, project, resolution, now, due_before)
+            )
+        return cur.rowcount == 1
+
+    def _sync_state(self, conn, project, resolution):
+        row = conn.execute(
+            'SELECT synced_at, claimed_until FROM equity_sync WHERE project = ? AND resolution = ?',
+            (project, resolution)
+        ).fetchone()
+        return row or (0, 0)
+
+    def _wait_for_claimant(self, conn, project, resolution):
+        """Wait while another worker holds the claim of an empty series.
+
+        Returns:
+            bool: True if the claim was released or expired without a
+            successful sync (the caller should try to take it over), False if
+            the series was filled or synced meanwhile, or was not claimed.
+        """
+        synced_at, claimed_until = self._sync_state(conn, project, resolution)
+        if claimed_until <= time.time():
+            return False
+        while claimed_until > time.time():
+            time.sleep(COLD_START_POLL_SEC)
+            if self.latest_time(project, resolution) is not None:
+                return False
+            now_synced_at, claimed_until = self._sync_state(conn, project, resolution)
+            if now_synced_at != synced_at:
+                return False
+        return True
+
+    def _params(self, project, resolution, now):
+        """Portfolio-history query continuing from the newest stored point."""
+        newest = self.latest_time(project, resolution)
+        if resolution == RES_DAILY:
+            if newest is None:
+                return {'period': '1A', 'timeframe': '1D', 'date_end': now.strftime('%Y-%m-%d'),
+                        'extended_hours': 'false'}
+            start = datetime.fromtimestamp(newest / 1000, tz=timezone.utc) - SYNC_OVERLAP[RES_DAILY]
+            return {'timeframe': '1D', 'start': to_rfc3339(start), 'end': to_rfc3339(now),
+                    'extended_hours': 'false'}
+
+        earliest = now - timedelta(days=INTRADAY_MAX_DAYS)
+        start = earliest
+        if newest is not None:
+            start = max(earliest, datetime.fromtimestamp(newest / 1000, tz=timezone.utc) - SYNC_OVERLAP[RES_INTRADAY])
+        return {'timeframe': RES_INTRADAY, 'start': to_rfc3339(start), 'end': to_rfc3339(now),
+                'extended_hours': 'true'}
+
+    def sync(self, project, fetch_points, force=False):
+        """Append new daily and intraday points for one account.
+
+        Each series is skipped if it was synced recently or another worker is
+        syncing it (unless forced). If another worker is filling a series that
+        has no points yet, this waits for it, and takes the sync over if that
+        worker fails or its claim expires.
+
+        Args:
+            project: Project number (1 or 2).
+            fetch_points: Callable taking portfolio-history query parameters
+                and returning a list of {'t': ms, 'equity': value}; raises on
+                upstream errors.
+            force: Sync even if the intervals have not elapsed.
+
+        Returns:
+            int: Number of points stored (new or replaced).
+        """
+        conn = self._connect()
+        stored = 0
+        for resolution in (RES_DAILY, RES_INTRADAY):
+            claimed = self._claim(conn, project, resolution, force)
+            while not claimed and self.latest_time(project, resolution) is None:
+                if not self._wait_for_claimant(conn, project, resolution):
+                    break
+                claimed = self._claim(conn, project, resolution, True)
+            if not claimed:
+                continue
+            started = time.perf_counter()
+            points = []
+            try:
+                points = fetch_points(self._params(project, resolution, datetime.now(timezone.utc)))
+                with conn:
+                    conn.executemany(
+                        'INSERT OR REPLACE INTO equity_points (project, resolution, t, equity) VALUES (?, ?, ?, ?)',
+                        [(project, resolution, int(p['t']), float(p['equity'])) for p in points]
+                    )
+                    conn.execute(
+                        'UPDATE equity_sync SET synced_at = ?, claimed_until = 0 WHERE project = ? AND resolution = ?',
+                        (time.time(), project, resolution)
+                    )
+                stored += len(points)
+            except Exception:
+                with conn:
+                    conn.execute(
+                        'UPDATE equity_sync SET claimed_until = 0 WHERE project = ? AND resolution = ?',
+                        (project, resolution)
+                    )
+                raise
+            finally:
+                with self._lock:
+                    self.syncs += 1
+                    self.upstream_calls += 1
+                    self.last_sync[(project, resolution)] = {
+                        'points': len(points),
+                        'sec': round(time.perf_counter() - started, 3)
+                    }
+        return stored
+
+    def latest_time(self, project, resolution):
+        """Timestamp (ms) of the newest stored point, or None."""
+        return self._connect().execute(
+            'SELECT MAX(t) FROM equity_points WHERE project = ? AND resolution = ?',
+            (project, resolution)
+        ).fetchone()[0]
+
+    def latest(self, project, resolution=RES_INTRADAY):
+        """Newest stored point.
+
+        Returns:
+            tuple: (equity, timestamp_ms) or (None, None) if the series is empty.
+        """
+        row = self._connect().execute(
+            'SELECT equity, t FROM equity_points WHERE project = ? AND resolution = ? ORDER BY t DESC LIMIT 1',
+            (project, resolution)
+        ).fetchone()
+        return (row[0], row[1]) if row else (None, None)
+
+    def series(self, project, resolution, start_ms, end_ms=None, bucket_ms=None):
+        """Points in [start_ms, end_ms], oldest first.
+
+        Args:
+            project: Project number (1 or 2).
+            resolution: RES_DAILY or RES_INTRADAY.
+            start_ms: Range start (inclusive), epoch ms.
+            end_ms: Range end (inclusive), epoch ms; None for no limit.
+            bucket_ms: Downsample to the last point of each bucket of this
+                many ms (None keeps every point).
+
+        Returns:
+            list of (timestamp_ms, equity)
+        """
+        params = [project, resolution, int(start_ms), int(end_ms) if end_ms is not None else 2 ** 62]
+        where = 'WHERE project = ? AND resolution = ? AND t BETWEEN ? AND ?'
+        if bucket_ms:
+            # SQLite returns the other columns of the row holding MAX(t)
+            sql = f'SELECT MAX(t), equity FROM equity_points {where} GROUP BY t / ? ORDER BY 1'
+            params.append(int(bucket_ms))
+        else:
+            sql = f'SELECT t, equity FROM equity_points {where} ORDER BY t'
+        return self._connect().execute(sql, params).fetchall()
+
+    def first_at_or_after(self, project, resolution, t_ms, min_equity=None):
+        """First point at or after t_ms, optionally with equity above min_equity.
+
+        Returns:
+            tuple: (equity, timestamp_ms) or (None, None) if there is none.
+        """
+        sql = 'SELECT equity, t FROM equity_points WHERE project = ? AND resolution = ? AND t >= ?'
+        params = [project, resolution, int(t_ms)]
+        if min_equity is not None:
+            sql += ' AND equity > ?'
+            params.append(min_equity)
+        row = self._connect().execute(sql + ' ORDER BY t LIMIT 1', params).fetchone()
+        return (row[0], row[1]) if row else (None, None)
+
+    def stats(self):
+        """Counters for the metrics endpoint."""
+        counts = self._connect().execute(
+            'SELECT project, resolution, COUNT(*), MIN(t), MAX(t) FROM equity_points GROUP BY project, resolution'
+        ).fetchall()
+        with self._lock:
+            return {
+                'syncs': self.syncs,
+                'upstreamCalls': self.upstream_calls,
+                'series': {
+                    f'project{p}:{res}': {'points': n, 'firstMs': first, 'lastMs': last}
+                    for p, res, n, first, last in counts
+                },
+                'lastSync': {f'project{p}:{res}': s for (p, res), s in self.last_sync.items()}
+            }
@@ -0,0 +1,110 @@
+"""
+Local stand-in for Alpaca's trade-updates websocket, for testing the
+backend's stream listener without an account.
+
+Speaks the same protocol as wss://paper-api.alpaca.markets/stream
+(authenticate, listen to trade_updates) and accepts any credentials. Every
+--interval seconds it sends a new/fill (or canceled, with --cancel-every)
+event pair for a synthetic order on --symbol to every listening client.
+
+Usage:
+    python fake_trade_stream.py [--port 8765] [--interval 5] [--symbol AAPL] [--cancel-every 3]
+
+then start the backend with:
+    TRADE_STREAM_ENABLED=true TRADE_STREAM_URL=ws://localhost:8765 gunicorn app:app
+"""
+import argparse
+import asyncio
+import json
+import uuid
+from datetime import datetime, timezone
+
+from websockets.asyncio.server import serve
+
+listeners = set()
+
+
+def now_iso():
+    return datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
+
+
+def make_order(symbol, status, qty='1', filled_qty='0', filled_avg_price=None):
+    """Order object as embedded in trade_updates events."""
+    now = now_iso()
+    return {
+        'id': str(uuid.uuid4()),
+        'client_order_id': str(uuid.uuid4()),
+        'created_at': now,
+        'updated_at': now,
+        'submitted_at': now,
+        'filled_at': now if status == 'filled' else None,
+        'asset_class': 'us_equity',
+        'symbol': symbol,
+        'qty': qty,
+        'filled_qty': filled_qty,
+        'filled_avg_price': filled_avg_price,
+        'order_class': 'simple',
+        'order_type': 'market',
+        'type': 'market',
+        'side': 'buy',
+        'time_in_force': 'day',
+        'status': status,
+        'extended_hours': False,
+    }
+
+
+def trade_update(event, order, **extra):
+    return json.dumps({'stream': 'trade_updates', 'data': {'event': event, 'order': order, 'timestamp': now_iso(), **extra}})
+
+
+async def handle(ws):
+    auth = json.loads(await ws.recv())
+    if auth.get('action') not in ('auth', 'authenticate'):
+        await ws.send(json.dumps({'stream': 'authorization', 'data': {'status': 'unauthorized', 'action': 'authenticate'}}))
+        return
+    await ws.send(json.dumps({'stream': 'authorization', 'data': {'status': 'authorized', 'action': 'authenticate'}}))
+    listen = json.loads(await ws.recv())
+    streams = (listen.get('data') or {}).get('streams', [])
+    await ws.send(json.dumps({'stream': 'listening', 'data': {'streams': streams}}))
+    print(f"client listening: {streams}")
+    listeners.add(ws)
+    try:
+        await ws.wait_closed()
+    finally:
+        listeners.discard(ws)
+
+
+async def emit(symbol, interval, cancel_every):
+    n = 0
+    while True:
+        await asyncio.sleep(interval)
+        n += 1
+        order = make_order(symbol, 'new')
+        messages = [trade_update('new', order)]
+        if cancel_every and n % cancel_every == 0:
+            messages.append(trade_update('canceled', {**order, 'status': 'canceled', 'updated_at': now_iso()}))
+        else:
+            filled = {**order, 'status': 'filled', 'filled_qty': '1', 'filled_avg_price': '100.0',
+                      'filled_at': now_iso(), 'updated_at': now_iso()}
+            messages.append(trade_update('fill', filled, price='100.0', qty='1', position_qty=str(n),
+                                         execution_id=str(uuid.uuid4())))
+        for ws in list(listeners):
+            for message in messages:
+                await ws.send(message)
+        print(f"sent {[json.loads(m)['data']['event'] for m in messages]} to {len(listeners)} client(s)")
+
+
+async def main(port, interval, symbol, cancel_every):
+    async with serve(handle, 'localhost', port):
+        print(f"fake trade stream on ws://localhost:{port}")
+        await emit(symbol, interval, cancel_every)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--interval', type=float, default=5.0, help='Seconds between orders')
+    parser.add_argument('--symbol', default='AAPL')
+    parser.add_argument('--cancel-every', type=int, default=0, help='Cancel every Nth order instead of filling it')
+    args = parser.parse_args()
+    asyncio.run(main(args.port, args.interval, args.symbol, args.cancel_every))
@@ -0,0 +1,110 @@
+"""Concurrent fan-out of upstream sub-fetches on a long-lived thread pool.
+
+compute_micro_metrics needs several independent Alpaca calls (histories,
+account, fills). FanOut runs them on one shared executor (instead of creating
+and tearing down a pool per call), waits at most a deadline for the set, and
+reports which sub-fetches did not finish or failed so the caller can return a
+partial result. The latency of every sub-fetch is recorded per name (including
+ones that finish after the deadline), so a slow upstream endpoint shows up in
+the metrics endpoint.
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+
+
+class FanOut:
+    """Shared executor with per-name latency, timeout and error counters."""
+
+    # Latency samples kept per name for percentiles
+    WINDOW = 200
+
+    def __init__(self, max_workers=16, timeout_sec=8.0, name='fanout'):
+        """
+        Args:
+            max_workers: Threads in the shared pool.
+            timeout_sec: Default deadline for a fan-out.
+            name: Thread name prefix.
+        """
+        self.timeout_sec = timeout_sec
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._latencies = {}  # name -> deque of ms
+        self._counts = {}  # name -> {'calls', 'timeouts', 'errors'}
+
+    def _count(self, name, field):
+        with self._lock:
+            counts = self._counts.setdefault(name, {'calls': 0, 'timeouts': 0, 'errors': 0})
+            counts[field] += 1
+
+    def _timed(self, name, fn):
+        started = time.perf_counter()
+        try:
+            return fn()
+        except Exception:
+            self._count(name, 'errors')
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            with self._lock:
+                self._latencies.setdefault(name, deque(maxlen=self.WINDOW)).append(elapsed_ms)
+            self._count(name, 'calls')
+
+    def run(self, tasks, timeout_sec=None):
+        """Run zero-argument callables concurrently and wait for them.
+
+        Args:
+            tasks: dict of name -> zero-argument callable.
+            timeout_sec: Deadline for the whole set (default timeout_sec).
+
+        Returns:
+            tuple: (results, missing) where results maps the name of every
+            sub-fetch that finished in time to its return value, and missing
+            maps every other name to 'timeout' or the error message.
+        """
+        futures = {self._executor.submit(self._timed, name, fn): name for name, fn in tasks.items()}
+        done, not_done = wait(futures, timeout=timeout_sec or self.timeout_sec)
+
+        results, missing = {}, {}
+        for future in not_done:
+            name = futures[future]
+            # Still queued: don't run it at all; running: let it finish in the background
+            future.cancel()
+            self._count(name, 'timeouts')
+            missing[name] = 'timeout'
+        for future in done:
+            name = futures[future]
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                missing[name] = str(e) or e.__class__.__name__
+        return results, missing
+
+    def stats(self):
+        """Latency percentiles and counters per sub-fetch name."""
+        with self._lock:
+            snapshot = {name: (sorted(samples), dict(self._counts.get(name, {})))
+                        for name, samples in self._latencies.items()}
+            for name, counts in self._counts.items():
+                snapshot.setdefault(name, ([], dict(counts)))
+
+        def percentile(latencies, p):
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 1)
+
+        return {
+            'timeoutSec': self.timeout_sec,
+            'subfetches': {
+                name: {
+                    **counts,
+                    'latencyMs': {
+                        'p50': percentile(latencies, 0.50),
+                        'p95': percentile(latencies, 0.95),
+                        'max': round(latencies[-1], 1) if latencies else None
+                    }
+                }
+                for name, (latencies, counts) in sorted(snapshot.items())
+            }
+        }
@@ -0,0 +1,233 @@
+"""Local SQLite ledger of Alpaca fill activities, one per account.
+
+Micro-metrics used to request today's fills, the latest fill and the first
+500 fills since the baseline on every call, so busy periods were silently
+truncated. FillLedger keeps every FILL activity locally and syncs
+incrementally: only activities after the newest stored one are requested,
+following page tokens until the last page. Reads (fills since a time, latest
+fill) are indexed local queries.
+
+Syncs are claimed through a row in the same SQLite file, so only one gunicorn
+worker syncs an account at a time.
+"""
+import os
+import sqlite3
+import threading
+import time
+from datetime import timedelta
+
+from order_ledger import to_iso, from_iso
+
+PAGE_SIZE = 100  # Alpaca maximum for /v2/account/activities
+# Re-request this much before the newest stored fill (duplicates are replaced)
+SYNC_OVERLAP = timedelta(seconds=1)
+# How long a worker may hold a sync claim before another worker may take over
+CLAIM_SEC = 120.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fills (
+    project INTEGER NOT NULL,
+    id TEXT NOT NULL,
+    transaction_time TEXT NOT NULL,
+    symbol TEXT,
+    side TEXT,
+    qty REAL,
+    price REAL,
+    order_id TEXT,
+    PRIMARY KEY (project, id)
+);
+CREATE INDEX IF NOT EXISTS idx_fills_time ON fills (project, transaction_time, id);
+CREATE TABLE IF NOT EXISTS fill_sync (
+    project INTEGER PRIMARY KEY,
+    watermark TEXT,
+    synced_at REAL NOT NULL DEFAULT 0,
+    claimed_until REAL NOT NULL DEFAULT 0
+);
+"""
+
+COLUMNS = ('id', 'transaction_time', 'symbol', 'side', 'qty', 'price', 'order_id')
+
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class FillLedger:
+    """SQLite-backed fill ledger with incremental, fully paginated Alpaca sync."""
+
+    def __init__(self, db_path, sync_interval_sec=15.0):
+        """
+        Args:
+            db_path: SQLite file shared by all workers on the host.
+            sync_interval_sec: Minimum seconds between syncs of an account.
+        """
+        self.db_path = db_path
+        self.sync_interval_sec = sync_interval_sec
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.syncs = 0
+        self.upstream_calls = 0
+        self.last_sync = {}  # project -> {'stored': n, 'pages': n, 'sec': s}
+        self._connect().executescript(SCHEMA)
+
+    def _connect(self):
+        """Get this thread's connection (reopened after a fork)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _claim(self, conn, project, force, interval_sec=None):
+        """Claim this account's sync if it is due and no other worker holds it."""
+        now = time.time()
+        due_before = now if force else now - (interval_sec or self.sync_interval_sec)
+        with conn:
+            conn.execute('INSERT OR IGNORE INTO fill_sync (project) VALUES (?)', (project,))
+            cur = conn.execute(
+                'UPDATE fill_sync SET claimed_until = ? '
+                'WHERE project = ? AND claimed_until < ? AND synced_at <= ?',
+                (now + CLAIM_SEC, project, now, due_before)
+            )
+        return cur.rowcount == 1
+
+    @staticmethod
+    def _to_row(project, fill):
+        """Convert a FILL activity (JSON dict) to a table row."""
+        return (
+            project,
+            str(fill['id']),
+            to_iso(from_iso(fill['transaction_time'])),
+            fill.get('symbol'),
+            (fill.get('side') or '').lower(),
+            _float(fill.get('qty')),
+            _float(fill.get('price')),
+            fill.get('order_id'),
+        )
+
+    def sync(self, project, fetch_page, since, force=False, interval_sec=None):
+        """Fetch fills after the newest stored one, following every page.
+
+        Skipped if the account was synced less than interval_sec ago or
+        another worker is syncing it (unless forced).
+
+        Args:
+            project: Project number (1 or 2).
+            fetch_page: Callable taking /v2/account/activities query
+                parameters and returning a list of activity dicts; raises on
+                upstream errors.
+            since: Start of history fetched on the first sync.
+            force: Sync even if the interval has not elapsed.
+            interval_sec: Minimum seconds since the last sync for this call
+                (default sync_interval_sec).
+
+        Returns:
+            int: Number of fills stored (new or replaced), or 0 if skipped.
+        """
+        conn = self._connect()
+        if not self._claim(conn, project, force, interval_sec):
+            return 0
+
+        started = time.perf_counter()
+        pages = 0
+        stored = 0
+        try:
+            row = conn.execute('SELECT watermark FROM fill_sync WHERE project = ?', (project,)).fetchone()
+            watermark = row[0] if row else None
+            after = (from_iso(watermark) if watermark else since) - SYNC_OVERLAP
+            params = {
+                'activity_types': 'FILL',
+                'direction': 'asc',
+                'page_size': PAGE_SIZE,
+                'after': to_iso(after)
+            }
+            while True:
+                raw = fetch_page(params)
+                pages += 1
+                page = [a for a in raw if a.get('transaction_time')]
+                if page:
+                    rows = [self._to_row(project, fill) for fill in page]
+                    newest = max(r[2] for r in rows)
+                    watermark = max(watermark or newest, newest)
+                    with conn:
+                        conn.executemany(
+                            f"INSERT OR REPLACE INTO fills (project, {', '.join(COLUMNS)}) "
+                            f"VALUES ({', '.join('?' * (len(COLUMNS) + 1))})",
+                            rows
+                        )
+                        conn.execute('UPDATE fill_sync SET watermark = ? WHERE project = ?', (watermark, project))
+                    stored += len(rows)
+                if len(raw) < PAGE_SIZE:
+                    break
+                params['page_token'] = raw[-1]['id']
+
+            with conn:
+                conn.execute(
+                    'UPDATE fill_sync SET synced_at = ?, claimed_until = 0 WHERE project = ?',
+                    (time.time(), project)
+                )
+        except Exception:
+            with conn:
+                conn.execute('UPDATE fill_sync SET claimed_until = 0 WHERE project = ?', (project,))
+            raise
+        finally:
+            with self._lock:
+                self.syncs += 1
+                self.upstream_calls += pages
+                self.last_sync[project] = {
+                    'stored': stored,
+                    'pages': pages,
+                    'sec': round(time.perf_counter() - started, 3)
+                }
+        return stored
+
+    def mark_due(self, project):
+        """Make the account's next sync run regardless of the interval.
+
+        Used for trade-update fill events: the fills are pulled by whichever
+        sync comes next (e.g. the metrics rebuild), once for a burst of events.
+        """
+        conn = self._connect()
+        with conn:
+            conn.execute('UPDATE fill_sync SET synced_at = 0 WHERE project = ?', (project,))
+
+    def _read(self, sql, params):
+        return [dict(zip(COLUMNS, row)) for row in self._connect().execute(sql, params)]
+
+    def fills(self, project, since):
+        """Fills at or after since, oldest first.
+
+        Returns:
+            list of dict: id, transaction_time (ISO, UTC), symbol, side, qty,
+            price, order_id (the fields of Alpaca FILL activities used here).
+        """
+        return self._read(
+            f"SELECT {', '.join(COLUMNS)} FROM fills WHERE project = ? AND transaction_time >= ? "
+            "ORDER BY transaction_time, id",
+            (project, to_iso(since))
+        )
+
+    def latest(self, project, since=None):
+        """Newest fill (at or after since, if given), or None."""
+        rows = self._read(
+            f"SELECT {', '.join(COLUMNS)} FROM fills WHERE project = ? AND transaction_time >= ? "
+            "ORDER BY transaction_time DESC, id DESC LIMIT 1",
+            (project, to_iso(since) if since else '')
+        )
+        return rows[0] if rows else None
+
+    def stats(self):
+        """Counters for the metrics endpoint."""
+        counts = dict(self._connect().execute('SELECT project, COUNT(*) FROM fills GROUP BY project').fetchall())
+        with self._lock:
+            return {
+                'syncs': self.syncs,
+                'upstreamCalls': self.upstream_calls,
+                'fills': {f'project{p}': n for p, n in counts.items()},
+                'lastSync': {f'project{p}': s for p, s in self.last_sync.items()}
+            }
@@ -0,0 +1,531 @@
+"""Local SQLite ledger of Alpaca orders, one per account.
+
+Dashboard endpoints used to pull the latest 1000 orders from Alpaca on every
+request. OrderLedger keeps every order locally and syncs incrementally:
+
+- new orders: only those submitted after the newest stored one are fetched
+  (ascending, following pages to the end)
+- open orders: only orders stored as non-terminal are re-checked, with one
+  call for the account's currently open orders plus a lookup for each stored
+  open order that has since left that list
+
+Reads are indexed queries on fill time with keyset (cursor) pagination, so a
+request costs the same whether the account has a hundred orders or a million.
+
+Matched round trips (FIFO buy/sell pairs per symbol) are derived from the
+filled orders and kept in their own indexed table. Storing a filled order
+marks its symbol dirty; refresh_round_trips re-derives only the dirty
+symbols, so paging round trips is a keyset query as well.
+
+Syncs are claimed through a row in the same SQLite file, so only one gunicorn
+worker syncs an account at a time.
+"""
+import base64
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+
+from alpaca.common.enums import Sort
+from alpaca.trading.enums import QueryOrderStatus
+from alpaca.trading.requests import GetOrdersRequest
+
+PAGE_SIZE = 500  # Alpaca maximum for /v2/orders
+# Re-request this much before the newest stored order (duplicates are replaced)
+SYNC_OVERLAP = timedelta(seconds=1)
+# How long a worker may hold a sync claim before another worker may take over
+CLAIM_SEC = 120.0
+TERMINAL_STATUSES = ('filled', 'canceled', 'expired', 'rejected', 'replaced')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    project INTEGER NOT NULL,
+    id TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    side TEXT,
+    status TEXT,
+    qty REAL,
+    filled_qty REAL,
+    filled_avg_price REAL,
+    submitted_at TEXT,
+    created_at TEXT NOT NULL,
+    filled_at TEXT,
+    fill_time TEXT NOT NULL,
+    PRIMARY KEY (project, id)
+);
+CREATE INDEX IF NOT EXISTS idx_orders_filled
+    ON orders (project, fill_time, id) WHERE filled_qty > 0;
+CREATE INDEX IF NOT EXISTS idx_orders_status ON orders (project, status);
+CREATE INDEX IF NOT EXISTS idx_orders_symbol
+    ON orders (project, symbol, fill_time, id) WHERE filled_qty > 0;
+CREATE TABLE IF NOT EXISTS round_trips (
+    project INTEGER NOT NULL,
+    exit_time TEXT NOT NULL,
+    tie TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    entry_time TEXT NOT NULL,
+    entry_price REAL NOT NULL,
+    exit_price REAL NOT NULL,
+    shares REAL NOT NULL,
+    PRIMARY KEY (project, exit_time, tie)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_round_trips_symbol ON round_trips (project, symbol);
+CREATE TABLE IF NOT EXISTS round_trip_dirty (
+    project INTEGER NOT NULL,
+    symbol TEXT NOT NULL,
+    version INTEGER NOT NULL DEFAULT 1,
+    PRIMARY KEY (project, symbol)
+);
+CREATE TABLE IF NOT EXISTS round_trip_state (
+    project INTEGER PRIMARY KEY,
+    since TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    project INTEGER PRIMARY KEY,
+    watermark TEXT,
+    synced_at REAL NOT NULL DEFAULT 0,
+    claimed_until REAL NOT NULL DEFAULT 0
+);
+"""
+
+COLUMNS = ('id', 'symbol', 'side', 'status', 'qty', 'filled_qty', 'filled_avg_price',
+           'submitted_at', 'created_at', 'filled_at', 'fill_time')
+
+# Read-only stand-in for alpaca Order with the attributes the trade builders use
+LedgerOrder = namedtuple('LedgerOrder', COLUMNS)
+
+
+def to_iso(value):
+    """Format a datetime as UTC ISO-8601 with fixed microseconds (text order = time order)."""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+
+def from_iso(value):
+    """Parse a to_iso() string back to an aware datetime."""
+    if value is None:
+        return None
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+class InvalidCursor(ValueError):
+    """A pagination cursor that was not produced by encode_cursor."""
+
+
+def encode_cursor(sort_key, tie):
+    """Encode a page position as an opaque URL-safe cursor."""
+    raw = f"{sort_key}|{tie}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor from encode_cursor into (sort_key, tie).
+
+    Raises:
+        InvalidCursor: If the cursor is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        sort_key, tie = raw.split('|', 1)
+    except Exception as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor}") from e
+    return sort_key, tie
+
+
+def round_trip_tie(symbol, entry_time, seq=None):
+    """Tie-breaker of a trade's sort position: symbol, entry time (to_iso) and match number."""
+    return f"{symbol}/{entry_time}" if seq is None else f"{symbol}/{entry_time}/{seq:04d}"
+
+
+def match_round_trips(symbol, fills):
+    """Match a symbol's fills into FIFO round trips.
+
+    Args:
+        symbol: Symbol of the fills.
+        fills: (side, filled_qty, filled_avg_price, fill_time) tuples, oldest
+            first; fill_time as to_iso strings.
+
+    Returns:
+        list of (exit_time, tie, symbol, entry_time, entry_price, exit_price, shares)
+    """
+    trips = []
+    buy_stack = []
+    for side, qty, price, fill_time in fills:
+        price = price or 0.0
+        if side == 'buy':
+            buy_stack.append([qty, price, fill_time])
+            continue
+        if side != 'sell':
+            continue
+        remaining = qty
+        while remaining > 0 and buy_stack:
+            lot = buy_stack[0]
+            matched = min(remaining, lot[0])
+            trips.append((fill_time, round_trip_tie(symbol, lot[2], len(trips)), symbol,
+                          lot[2], lot[1], price, matched))
+            lot[0] -= matched
+            if lot[0] <= 0:
+                buy_stack.pop(0)
+            remaining -= matched
+    return trips
+
+
+def _enum_value(value):
+    return value.value if hasattr(value, 'value') else (str(value) if value is not None else None)
+
+
+def _float(value):
+    return float(value) if value not in (None, '') else None
+
+
+class OrderLedger:
+    """SQLite-backed order ledger with incremental Alpaca sync."""
+
+    def __init__(self, db_path, sync_interval_sec=15.0):
+        """
+        Args:
+            db_path: SQLite file shared by all workers on the host.
+            sync_interval_sec: Minimum seconds between syncs of an account.
+        """
+        self.db_path = db_path
+        self.sync_interval_sec = sync_interval_sec
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.syncs = 0
+        self.upstream_calls = 0
+        self.last_sync = {}  # project -> {'new': n, 'rechecked': n, 'calls': n, 'sec': s}
+        self._connect().executescript(SCHEMA)
+
+    def _connect(self):
+        """Get this thread's connection (reopened after a fork)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def _to_row(project, order):
+        """Convert an alpaca Order to a table row."""
+        created_at = to_iso(order.created_at)
+        filled_at = to_iso(order.filled_at)
+        return (
+            project,
+            str(order.id),
+            order.symbol,
+            _enum_value(order.side),
+            _enum_value(order.status),
+            _float(order.qty),
+            _float(order.filled_qty) or 0.0,
+            _float(order.filled_avg_price),
+            to_iso(order.submitted_at) or created_at,
+            created_at,
+            filled_at,
+            filled_at or created_at,
+        )
+
+    def _store(self, conn, project, orders):
+        rows = [self._to_row(project, order) for order in orders]
+        with conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO orders (project, {', '.join(COLUMNS)}) "
+                f"VALUES ({', '.join('?' * (len(COLUMNS) + 1))})",
+                rows
+            )
+            # Round trips of these symbols need re-deriving
+            conn.executemany(
+                'INSERT INTO round_trip_dirty (project, symbol) VALUES (?, ?) '
+                'ON CONFLICT (project, symbol) DO UPDATE SET version = version + 1',
+                {(project, r[2]) for r in rows if (r[6] or 0) > 0}
+            )
+        return rows
+
+    def _claim(self, conn, project, force, interval_sec=None):
+        """Claim this account's sync if it is due and no other worker holds it."""
+        now = time.time()
+        due_before = now if force else now - (interval_sec or self.sync_interval_sec)
+        with conn:
+            conn.execute('INSERT OR IGNORE INTO sync_state (project) VALUES (?)', (project,))
+            cur = conn.execute(
+                'UPDATE sync_state SET claimed_until = ? '
+                'WHERE project = ? AND claimed_until < ? AND synced_at <= ?',
+                (now + CLAIM_SEC, project, now, due_before)
+            )
+        return cur.rowcount == 1
+
+    def sync(self, project, client, since, force=False, interval_sec=None):
+        """Fetch new orders and re-check open ones for one account.
+
+        Skipped if the account was synced less than interval_sec ago or
+        another worker is syncing it (unless forced).
+
+        Args:
+            project: Project number (1 or 2).
+            client: alpaca TradingClient for the account.
+            since: Start of history fetched on the first sync.
+            force: Sync even if the interval has not elapsed.
+            interval_sec: Minimum seconds since the last sync for this call
+                (default sync_interval_sec).
+
+        Returns:
+            int: Number of new or changed orders stored, or 0 if skipped.
+        """
+        conn = self._connect()
+        if not self._claim(conn, project, force, interval_sec):
+            return 0
+
+        started = time.perf_counter()
+        calls = 0
+        stored = 0
+        rechecked = 0
+        try:
+            row = conn.execute('SELECT watermark FROM sync_state WHERE project = ?', (project,)).fetchone()
+            after = from_iso(row[0]) - SYNC_OVERLAP if row and row[0] else since - SYNC_OVERLAP
+            watermark = row[0] if row else None
+
+            # New orders, oldest first, page by page
+            seen = set()
+            while True:
+                page = client.get_orders(GetOrdersRequest(
+                    status=QueryOrderStatus.ALL,
+                    after=after,
+                    direction=Sort.ASC,
+                    limit=PAGE_SIZE,
+                    nested=True
+                ))
+                calls += 1
+                if page:
+                    rows = self._store(conn, project, page)
+                    stored += len(rows)
+                    seen.update(r[1] for r in rows)
+                    newest = max(r[8] for r in rows)
+                    watermark = max(watermark or newest, newest)
+                    with conn:
+                        conn.execute('UPDATE sync_state SET watermark = ? WHERE project = ?', (watermark, project))
+                if len(page) < PAGE_SIZE:
+                    break
+                after = from_iso(newest)
+
+            # Orders we still have as open: refresh them without rescanning history
+            open_ids = [
+                r[0] for r in conn.execute(
+                    f"SELECT id FROM orders WHERE project = ? AND status NOT IN ({', '.join('?' * len(TERMINAL_STATUSES))})",
+                    (project,) + TERMINAL_STATUSES
+                )
+                if r[0] not in seen
+            ]
+            if open_ids:
+                still_open = client.get_orders(GetOrdersRequest(
+                    status=QueryOrderStatus.OPEN, limit=PAGE_SIZE, nested=True
+                ))
+                calls += 1
+                by_id = {str(o.id): o for o in still_open}
+                changed = [by_id[i] for i in open_ids if i in by_id]
+                for order_id in open_ids:
+                    if order_id not in by_id:
+                        changed.append(client.get_order_by_id(order_id))
+                        calls += 1
+                self._store(conn, project, changed)
+                rechecked = len(changed)
+
+            with conn:
+                conn.execute(
+                    'UPDATE sync_state SET synced_at = ?, claimed_until = 0 WHERE project = ?',
+                    (time.time(), project)
+                )
+        except Exception:
+            with conn:
+                conn.execute('UPDATE sync_state SET claimed_until = 0 WHERE project = ?', (project,))
+            raise
+        finally:
+            with self._lock:
+                self.syncs += 1
+                self.upstream_calls += calls
+                self.last_sync[project] = {
+                    'stored': stored,
+                    'rechecked': rechecked,
+                    'calls': calls,
+                    'sec': round(time.perf_counter() - started, 3)
+                }
+        return stored
+
+    def upsert(self, project, orders):
+        """Store orders received outside a sync (e.g. from trade updates).
+
+        The watermark is left alone: the next sync re-fetches anything newer
+        and replaces these rows.
+
+        Returns:
+            int: Number of orders stored.
+        """
+        return len(self._store(self._connect(), project, orders))
+
+    def refresh_round_trips(self, project, since):
+        """Re-derive the round trips of symbols whose filled orders changed.
+
+        Args:
+            project: Project number (1 or 2).
+            since: Only orders filled at or after this datetime are matched;
+                if it differs from the last refresh, every symbol is re-derived.
+
+        Returns:
+            int: Number of symbols re-derived.
+        """
+        conn = self._connect()
+        since_iso = to_iso(since)
+        row = conn.execute('SELECT since FROM round_trip_state WHERE project = ?', (project,)).fetchone()
+        if row is None or row[0] != since_iso:
+            with conn:
+                conn.execute(
+                    'INSERT INTO round_trip_dirty (project, symbol) '
+                    'SELECT DISTINCT project, symbol FROM orders WHERE project = ? AND filled_qty > 0 '
+                    'ON CONFLICT (project, symbol) DO UPDATE SET version = version + 1',
+                    (project,)
+                )
+                conn.execute('DELETE FROM round_trips WHERE project = ?', (project,))
+                conn.execute('INSERT OR REPLACE INTO round_trip_state (project, since) VALUES (?, ?)',
+                             (project, since_iso))
+
+        dirty = conn.execute('SELECT symbol, version FROM round_trip_dirty WHERE project = ?', (project,)).fetchall()
+        for symbol, version in dirty:
+            fills = conn.execute(
+                'SELECT side, filled_qty, filled_avg_price, fill_time FROM orders '
+                'WHERE project = ? AND symbol = ? AND filled_qty > 0 AND fill_time >= ? '
+                'ORDER BY fill_time, id',
+                (project, symbol, since_iso)
+            ).fetchall()
+            with conn:
+                conn.execute('DELETE FROM round_trips WHERE project = ? AND symbol = ?', (project, symbol))
+                conn.executemany(
+                    'INSERT OR REPLACE INTO round_trips (project, exit_time, tie, symbol, entry_time, '
+                    'entry_price, exit_price, shares) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    [(project,) + trip for trip in match_round_trips(symbol, fills)]
+                )
+                # Leave the mark if the symbol changed again meanwhile
+                conn.execute(
+                    'DELETE FROM round_trip_dirty WHERE project = ? AND symbol = ? AND version = ?',
+                    (project, symbol, version)
+                )
+        return len(dirty)
+
+    def page_round_trips(self, project, limit, after=None, exclude_symbols=()):
+        """Round trips newest first, by (exit_time, tie).
+
+        Args:
+            project: Project number (1 or 2).
+            limit: Maximum number of round trips.
+            after: (exit_time, tie) of the previous page's last trade, or None.
+            exclude_symbols: Symbols to leave out.
+
+        Returns:
+            list of (exit_time, tie, symbol, entry_time, entry_price, exit_price, shares)
+        """
+        sql = ('SELECT exit_time, tie, symbol, entry_time, entry_price, exit_price, shares '
+               'FROM round_trips WHERE project = ?')
+        params = [project]
+        if exclude_symbols:
+            sql += f" AND symbol NOT IN ({', '.join('?' * len(exclude_symbols))})"
+            params.extend(exclude_symbols)
+        if after:
+            sql += ' AND (exit_time, tie) < (?, ?)'
+            params.extend(after)
+        sql += ' ORDER BY exit_time DESC, tie DESC LIMIT ?'
+        params.append(limit)
+        return self._connect().execute(sql, params).fetchall()
+
+    def count_round_trips(self, project, exclude_symbols=()):
+        """Number of stored round trips, optionally leaving out some symbols."""
+        sql = 'SELECT COUNT(*) FROM round_trips WHERE project = ?'
+        if exclude_symbols:
+            sql += f" AND symbol NOT IN ({', '.join('?' * len(exclude_symbols))})"
+        return self._connect().execute(sql, [project, *exclude_symbols]).fetchone()[0]
+
+    def latest_fill_time(self, project, symbol, since, side=None):
+        """Fill time of the symbol's newest filled order (optionally of one side), or None."""
+        sql = ('SELECT fill_time FROM orders WHERE project = ? AND symbol = ? AND filled_qty > 0 '
+               'AND fill_time >= ?')
+        params = [project, symbol, to_iso(since)]
+        if side:
+            sql += ' AND side = ?'
+            params.append(side)
+        row = self._connect().execute(sql + ' ORDER BY fill_time DESC LIMIT 1', params).fetchone()
+        return from_iso(row[0]) if row else None
+
+    def _read(self, sql, params):
+        return [
+            LedgerOrder(*(from_iso(v) if c in ('submitted_at', 'created_at', 'filled_at') else v
+                          for c, v in zip(COLUMNS, row)))
+            for row in self._connect().execute(sql, params)
+        ]
+
+    def filled_orders(self, project, since, limit):
+        """Most recent filled (or partially filled) orders, newest first.
+
+        Args:
+            project: Project number (1 or 2).
+            since: Only orders whose fill time is at or after this datetime.
+            limit: Maximum number of orders.
+
+        Returns:
+            list of LedgerOrder
+        """
+        orders, _ = self.page_filled(project, since, limit)
+        return orders
+
+    def page_filled(self, project, since, limit, cursor=None):
+        """One page of filled orders, newest first.
+
+        Args:
+            project: Project number (1 or 2).
+            since: Only orders whose fill time is at or after this datetime.
+            limit: Page size.
+            cursor: nextCursor of the previous page (None for the first).
+
+        Returns:
+            tuple: (list of LedgerOrder, cursor for the next page or None)
+
+        Raises:
+            InvalidCursor: If the cursor is malformed.
+        """
+        sql = (
+            f"SELECT {', '.join(COLUMNS)} FROM orders "
+            "WHERE project = ? AND filled_qty > 0 AND fill_time >= ?"
+        )
+        params = [project, to_iso(since)]
+        if cursor:
+            sql += " AND (fill_time, id) < (?, ?)"
+            params.extend(decode_cursor(cursor))
+        sql += " ORDER BY fill_time DESC, id DESC LIMIT ?"
+        params.append(limit + 1)
+
+        orders = self._read(sql, params)
+        next_cursor = None
+        if len(orders) > limit:
+            orders = orders[:limit]
+            next_cursor = encode_cursor(orders[-1].fill_time, orders[-1].id)
+        return orders, next_cursor
+
+    def count_filled(self, project, since):
+        """Number of filled orders at or after since."""
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM orders WHERE project = ? AND filled_qty > 0 AND fill_time >= ?",
+            (project, to_iso(since))
+        ).fetchone()[0]
+
+    def stats(self):
+        """Counters for the metrics endpoint."""
+        counts = dict(self._connect().execute('SELECT project, COUNT(*) FROM orders GROUP BY project').fetchall())
+        with self._lock:
+            return {
+                'syncs': self.syncs,
+                'upstreamCalls': self.upstream_calls,
+                'orders': {f'project{p}': n for p, n in counts.items()},
+                'lastSync': {f'project{p}': s for p, s in self.last_sync.items()}
+            }
@@ -0,0 +1,191 @@
+"""Background precompute of dashboard JSON payloads.
+
+Endpoints such as /api/algorithms aggregate orders, stats and portfolio
+history on every request. PayloadScheduler rebuilds each registered payload
+on a fixed cadence (faster during market hours) in a background thread and
+stores the serialized JSON with its generation time, so request handlers only
+read the latest bytes.
+
+Payloads are kept in the snapshot store (see snapshot_cache.py). With the
+SQLite store every gunicorn worker runs a scheduler thread, but a rebuild
+only happens in the worker that takes the payload's lease; the others see
+the new generation time and skip it.
+"""
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+
+class PayloadScheduler:
+    """Rebuilds registered payloads in the background."""
+
+    # How often the scheduler thread checks for due payloads
+    TICK_SEC = 1.0
+
+    def __init__(self, store, interval_sec, market_interval_sec, is_market_hours, dumps, lease_sec=120.0):
+        """
+        Args:
+            store: Snapshot store shared with the broker cache.
+            interval_sec: Rebuild cadence outside market hours.
+            market_interval_sec: Rebuild cadence during market hours.
+            is_market_hours: Zero-argument callable returning bool.
+            dumps: Serializer turning a payload into a JSON string.
+            lease_sec: How long a rebuild may hold its lease.
+        """
+        self.store = store
+        self.interval_sec = interval_sec
+        self.market_interval_sec = market_interval_sec
+        self._is_market_hours = is_market_hours
+        self._dumps = dumps
+        self._lease_sec = lease_sec
+        self._builders = {}  # name -> zero-argument callable
+        self._dirty = {}  # name -> time it was marked dirty (rebuilt on the next tick)
+        self._lock = threading.Lock()
+        self._thread_pid = None
+        self.builds = 0
+        self.failures = 0
+        self.last_build_sec = {}  # name -> seconds the last rebuild took
+
+    def register(self, name, builder):
+        """Register a zero-argument payload builder under a name."""
+        self._builders[name] = builder
+
+    def mark_dirty(self, name):
+        """Have the scheduler thread rebuild a payload on its next tick.
+
+        Marks from several events before that tick are coalesced into one
+        rebuild, so callers (e.g. trade-update handlers) never build inline.
+        """
+        with self._lock:
+            self._dirty.setdefault(name, time.time())
+
+    def start(self):
+        """Start this process's scheduler thread (idempotent, fork-aware)."""
+        with self._lock:
+            if self._thread_pid == os.getpid():
+                return
+            self._thread_pid = os.getpid()
+        threading.Thread(target=self._run, name='payload-scheduler', daemon=True).start()
+
+    def current_interval(self):
+        """Rebuild cadence right now, in seconds."""
+        try:
+            market = self._is_market_hours()
+        except Exception:
+            market = False
+        return self.market_interval_sec if market else self.interval_sec
+
+    @staticmethod
+    def _key(name):
+        return ('payload', name)
+
+    def get(self, name):
+        """Latest stored payload.
+
+        Returns:
+            tuple: (json string, generated_at epoch seconds), or None if the
+            payload has not been built yet.
+        """
+        return self.store.read(self._key(name))
+
+    def build(self, name, force=False):
+        """Rebuild one payload if this worker wins its lease.
+
+        Args:
+            name: Registered payload name.
+            force: Rebuild even if the stored payload is not due yet.
+
+        Returns:
+            tuple: (json string, generated_at) of the latest payload after
+            the attempt, or None if none could be built.
+        """
+        key = self._key(name)
+        current = self.store.read(key)
+        if not force and current is not None and time.time() - current[1] < self.current_interval():
+            return current
+        if not self.store.try_lease(key, self._lease_sec):
+            return current
+
+        try:
+            # Another worker may have finished a rebuild just before the lease freed up
+            latest = self.store.read(key)
+            if not force and latest is not None and (current is None or latest[1] != current[1]):
+                return latest
+
+            started = time.perf_counter()
+            body = self._dumps(self._builders[name]())
+            generated_at = time.time()
+            self.store.write(key, body, generated_at)
+            self.builds += 1
+            self.last_build_sec[name] = round(time.perf_counter() - started, 3)
+            return body, generated_at
+        except Exception as e:
+            self.failures += 1
+            print(f"PayloadScheduler: failed to build {name}: {e}")
+            return current
+        finally:
+            self.store.release(key)
+
+    def get_or_build(self, name):
+        """Latest payload, building it on the caller's thread if none exists yet.
+
+        Only needed right after startup, before the first scheduled build.
+
+        Returns:
+            tuple: (json string, generated_at epoch seconds).
+        """
+        stored = self.get(name) or self.build(name)
+        if stored is None:
+            # Another worker holds the lease for the first build; don't wait on it
+            return self.render(name)
+        return stored
+
+    def render(self, name):
+        """Build a payload now without storing it.
+
+        Returns:
+            tuple: (json string, generated_at epoch seconds).
+        """
+        return self._dumps(self._builders[name]()), time.time()
+
+    def _run(self):
+        print(f"PayloadScheduler: started in worker {os.getpid()} ({', '.join(self._builders)})")
+        while True:
+            with self._lock:
+                dirty, self._dirty = self._dirty, {}
+            for name in list(self._builders):
+                marked_at = dirty.get(name)
+                try:
+                    built = self.build(name, force=marked_at is not None)
+                except Exception as e:
+                    print(f"PayloadScheduler: error scheduling {name}: {e}")
+                    built = None
+                if marked_at is not None and (built is None or built[1] < marked_at):
+                    # Lost the lease or failed: keep it dirty for the next tick
+                    with self._lock:
+                        self._dirty.setdefault(name, marked_at)
+            time.sleep(self.TICK_SEC)
+
+    def stats(self):
+        """Generation times and ages of the stored payloads."""
+        now = time.time()
+        payloads = {}
+        for name in self._builders:
+            stored = self.get(name)
+            payloads[name] = {
+                'generatedAt': format_generated_at(stored[1]) if stored else None,
+                'ageSec': round(now - stored[1], 1) if stored else None,
+                'lastBuildSec': self.last_build_sec.get(name)
+            }
+        return {
+            'intervalSec': self.current_interval(),
+            'builds': self.builds,
+            'failures': self.failures,
+            'payloads': payloads
+        }
+
+
+def format_generated_at(generated_at):
+    """Format a generation time (epoch seconds) as ISO UTC with Z."""
+    return datetime.fromtimestamp(generated_at, tz=timezone.utc).isoformat().replace('+00:00', 'Z')
@@ -0,0 +1,147 @@
+"""Batched latest-trade quotes with a short per-symbol cache.
+
+Live equity needs a mark for every open position. QuoteService fetches the
+latest trade for all requested symbols that are not cached in a single
+multi-symbol request, and caches each symbol's price for a few seconds so
+every code path that needs marks shares the same quotes. If a batch request
+fails (e.g. because of one bad symbol), it is split in halves and each half
+is retried, so the other symbols still get quotes.
+"""
+import threading
+import time
+from datetime import datetime
+
+
+def trade_timestamp_ms(trade):
+    """Convert a trade's timestamp (datetime or epoch s/ms) to epoch ms."""
+    ts = getattr(trade, 'timestamp', None)
+    if hasattr(ts, 'timestamp'):
+        return int(ts.timestamp() * 1000)
+    if isinstance(ts, (int, float)):
+        return int(ts * 1000) if ts < 10000000000 else int(ts)
+    return int(datetime.now().timestamp() * 1000)
+
+
+class QuoteService:
+    """Per-symbol latest-trade cache filled by batched upstream requests."""
+
+    def __init__(self, fetch_trades, ttl_sec=5.0, max_split_requests=12):
+        """
+        Args:
+            fetch_trades: Callable taking a list of symbols and returning a
+                dict of symbol -> trade (objects with price and timestamp).
+            ttl_sec: Seconds a cached quote is reused.
+            max_split_requests: Most retry requests one get_latest call makes
+                for halves of failed batches (12 isolates one bad symbol
+                among 64); bounds the cost when upstream is down.
+        """
+        self._fetch_trades = fetch_trades
+        self.ttl_sec = ttl_sec
+        self.max_split_requests = max_split_requests
+        self._lock = threading.Lock()
+        # One batch at a time, so concurrent callers don't fetch the same symbols
+        self._fetch_lock = threading.Lock()
+        self._quotes = {}  # symbol -> (price, timestamp_ms, fetched_at)
+        self.calls = 0
+        self.upstream_requests = 0
+        self.failed_requests = 0
+        self.symbols_fetched = 0
+        self.hits = 0
+        self.last_call_upstream = 0
+
+    def _cached(self, symbols):
+        """Split symbols into ({symbol: (price, ts_ms)} fresh, [missing])."""
+        now = time.monotonic()
+        found, missing = {}, []
+        with self._lock:
+            for symbol in symbols:
+                entry = self._quotes.get(symbol)
+                if entry is not None and now - entry[2] < self.ttl_sec:
+                    found[symbol] = (entry[0], entry[1])
+                else:
+                    missing.append(symbol)
+        return found, missing
+
+    def _fetch(self, symbols, budget):
+        """Fetch trades for symbols, bisecting a batch that fails.
+
+        Args:
+            symbols: Symbols to fetch.
+            budget: One-element list holding the split requests still allowed
+                (shared across the recursion).
+
+        Returns:
+            tuple: (dict of symbol -> trade, requests made, requests failed)
+        """
+        try:
+            return self._fetch_trades(symbols) or {}, 1, 0
+        except Exception as e:
+            if len(symbols) == 1 or budget[0] < 2:
+                print(f"QuoteService: error fetching latest trades for {len(symbols)} symbols: {e}")
+                return {}, 1, 1
+        budget[0] -= 2
+        mid = len(symbols) // 2
+        trades, requests, failed = {}, 1, 1
+        for half in (symbols[:mid], symbols[mid:]):
+            half_trades, half_requests, half_failed = self._fetch(half, budget)
+            trades.update(half_trades)
+            requests += half_requests
+            failed += half_failed
+        return trades, requests, failed
+
+    def get_latest(self, symbols):
+        """Latest trade price and time for each symbol.
+
+        Args:
+            symbols: Symbols to quote.
+
+        Returns:
+            dict: symbol -> (price, timestamp_ms). Symbols without a trade
+            (or whose fetch failed) are omitted; callers fall back to the
+            position's current_price.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        quotes, missing = self._cached(symbols)
+        upstream = failed = 0
+
+        if missing:
+            with self._fetch_lock:
+                # Another caller may have fetched them while we waited
+                fetched, missing = self._cached(missing)
+                quotes.update(fetched)
+                if missing:
+                    trades, upstream, failed = self._fetch(missing, [self.max_split_requests])
+                    now = time.monotonic()
+                    with self._lock:
+                        for symbol in missing:
+                            trade = trades.get(symbol)
+                            if not trade:
+                                continue
+                            quote = (float(trade.price), trade_timestamp_ms(trade))
+                            self._quotes[symbol] = quote + (now,)
+                            quotes[symbol] = quote
+
+        with self._lock:
+            self.calls += 1
+            self.upstream_requests += upstream
+            self.failed_requests += failed
+            self.symbols_fetched += len(missing) if upstream else 0
+            self.hits += len(symbols) - (len(missing) if upstream else 0)
+            self.last_call_upstream = upstream
+        return quotes
+
+    def stats(self):
+        """Counters for the metrics endpoint."""
+        with self._lock:
+            return {
+                'ttlSec': self.ttl_sec,
+                'calls': self.calls,
+                'upstreamRequests': self.upstream_requests,
+                # Per get_latest call (a live-equity request may make more than one)
+                'upstreamPerGetLatest': round(self.upstream_requests / self.calls, 3) if self.calls else None,
+                'failedRequests': self.failed_requests,
+                'lastCallUpstream': self.last_call_upstream,
+                'symbolsFetched': self.symbols_fetched,
+                'symbolHits': self.hits,
+                'cachedSymbols': len(self._quotes)
+            }
@@ -0,0 +1,443 @@
+"""Shared broker snapshot cache with single-flight loading.
+
+Dashboard endpoints read the same Alpaca data (orders, positions, account,
+portfolio history) several times per page load. SnapshotCache keeps one copy
+of each snapshot per key, with a TTL chosen by the caller:
+
+- fresh (younger than the TTL): served from the cache
+- stale (past the TTL but within the stale window): served immediately while
+  a single background thread refreshes it
+- missing or too old: loaded on the calling thread; concurrent requests for
+  the same key wait for that one in-flight fetch instead of calling Alpaca
+
+Snapshots live in a store. MemoryStore keeps them in this process;
+SQLiteStore keeps them in a WAL-mode SQLite file so every gunicorn worker on
+the host shares one copy. With SQLiteStore, refreshes are coordinated by
+lease rows: the worker that takes a key's lease refreshes it, the others
+serve the stale copy or wait for the new one to appear.
+
+Keys are tuples whose first element is the snapshot kind ('positions',
+'account', ...), used to break down upstream call counts; the second is the
+account (project) number. Loaders signal failure by returning None or
+raising; failures are never cached and the last good value keeps being
+served if there is one.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+
+# Upstream loads are counted over this trailing window; older records are pruned
+UPSTREAM_WINDOW_SEC = 60.0
+# How often a SQLite store deletes upstream records older than the window
+UPSTREAM_PRUNE_SEC = 10.0
+
+
+class MemoryStore:
+    """In-process snapshot store (one copy per worker)."""
+
+    shared = False
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}  # key -> (value, fetched_at)
+        self._upstream = deque()  # (time, kind) of each upstream load
+
+    def read(self, key):
+        """Return (value, fetched_at) or None."""
+        return self._entries.get(key)
+
+    def write(self, key, value, fetched_at):
+        self._entries[key] = (value, fetched_at)
+
+    def try_lease(self, key, lease_sec):
+        """Take the refresh lease for a key (in-process flights already
+        guarantee a single loader, so this always succeeds)."""
+        return True
+
+    def release(self, key):
+        pass
+
+    def delete(self, kind=None, project=None):
+        """Drop snapshots matching kind/project; returns the number dropped."""
+        with self._lock:
+            keys = [
+                key for key in self._entries
+                if (kind is None or key[0] == kind)
+                and (project is None or (len(key) > 1 and key[1] == project))
+            ]
+            for key in keys:
+                self._entries.pop(key, None)
+        return len(keys)
+
+    def count(self):
+        return len(self._entries)
+
+    def record_upstream(self, kind, at):
+        with self._lock:
+            self._upstream.append((at, kind))
+            while self._upstream[0][0] <= at - UPSTREAM_WINDOW_SEC:
+                self._upstream.popleft()
+
+    def upstream_since(self, since):
+        """Return {kind: count} of upstream loads after `since`."""
+        with self._lock:
+            while self._upstream and self._upstream[0][0] <= since:
+                self._upstream.popleft()
+            per_kind = {}
+            for _, kind in self._upstream:
+                per_kind[kind] = per_kind.get(kind, 0) + 1
+        return per_kind
+
+
+class SQLiteStore:
+    """Snapshot store in a WAL-mode SQLite file shared by all workers.
+
+    Values are stored as JSON, never pickled (unpickling a file other local
+    users might write would run their code), so they must be JSON-serializable;
+    rows that don't decode are treated as missing. Each process keeps the last
+    value it decoded per key and reuses it while the row's fetched_at is
+    unchanged, so a hit costs one indexed lookup rather than a full decode.
+    """
+
+    shared = True
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS snapshots (
+        key TEXT PRIMARY KEY,
+        kind TEXT NOT NULL,
+        project TEXT,
+        fetched_at REAL NOT NULL,
+        value TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS leases (
+        key TEXT PRIMARY KEY,
+        owner TEXT NOT NULL,
+        expires REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS upstream_calls (
+        at REAL NOT NULL,
+        kind TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_upstream_calls_at ON upstream_calls (at);
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._decoded = {}  # key -> (fetched_at, value) last decoded here
+        self._pruned_at = 0.0  # last time this process pruned upstream_calls
+        self._connect().executescript(self.SCHEMA)
+
+    def _connect(self):
+        """Get this thread's connection (reopened after a fork)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def _owner():
+        return f"{os.getpid()}:{threading.get_ident()}"
+
+    def read(self, key):
+        """Return (value, fetched_at) or None."""
+        skey = repr(key)
+        conn = self._connect()
+        row = conn.execute('SELECT fetched_at FROM snapshots WHERE key = ?', (skey,)).fetchone()
+        if row is None:
+            return None
+        fetched_at = row[0]
+        decoded = self._decoded.get(skey)
+        if decoded is not None and decoded[0] == fetched_at:
+            return decoded[1], fetched_at
+
+        row = conn.execute('SELECT fetched_at, value FROM snapshots WHERE key = ?', (skey,)).fetchone()
+        if row is None:
+            return None
+        try:
+            value = json.loads(row[1])
+        except ValueError:
+            # Not written as JSON (e.g. a pickle from an older version)
+            return None
+        self._decoded[skey] = (row[0], value)
+        return value, row[0]
+
+    def write(self, key, value, fetched_at):
+        skey = repr(key)
+        project = str(key[1]) if len(key) > 1 else None
+        self._connect().execute(
+            'INSERT OR REPLACE INTO snapshots (key, kind, project, fetched_at, value) VALUES (?, ?, ?, ?, ?)',
+            (skey, key[0], project, fetched_at, json.dumps(value))
+        )
+        self._decoded[skey] = (fetched_at, value)
+
+    def try_lease(self, key, lease_sec):
+        """Atomically take the refresh lease for a key if it is free or expired."""
+        now = time.time()
+        cur = self._connect().execute(
+            'INSERT INTO leases (key, owner, expires) VALUES (?, ?, ?) '
+            'ON CONFLICT(key) DO UPDATE SET owner = excluded.owner, expires = excluded.expires '
+            'WHERE leases.expires < ?',
+            (repr(key), self._owner(), now + lease_sec, now)
+        )
+        return cur.rowcount == 1
+
+    def release(self, key):
+        self._connect().execute(
+            'DELETE FROM leases WHERE key = ? AND owner = ?',
+            (repr(key), self._owner())
+        )
+
+    def delete(self, kind=None, project=None):
+        """Drop snapshots matching kind/project; returns the number dropped."""
+        sql = 'DELETE FROM snapshots WHERE 1 = 1'
+        params = []
+        if kind is not None:
+            sql += ' AND kind = ?'
+            params.append(kind)
+        if project is not None:
+            sql += ' AND project = ?'
+            params.append(str(project))
+        return self._connect().execute(sql, params).rowcount
+
+    def count(self):
+        return self._connect().execute('SELECT COUNT(*) FROM snapshots').fetchone()[0]
+
+    def record_upstream(self, kind, at):
+        conn = self._connect()
+        conn.execute('INSERT INTO upstream_calls (at, kind) VALUES (?, ?)', (at, kind))
+        # Keep the table bounded even if nobody reads the stats
+        if at - self._pruned_at >= UPSTREAM_PRUNE_SEC:
+            self._pruned_at = at
+            conn.execute('DELETE FROM upstream_calls WHERE at <= ?', (at - UPSTREAM_WINDOW_SEC,))
+
+    def upstream_since(self, since):
+        """Return {kind: count} of upstream loads (all workers) after `since`."""
+        conn = self._connect()
+        conn.execute('DELETE FROM upstream_calls WHERE at <= ?', (since,))
+        rows = conn.execute(
+            'SELECT kind, COUNT(*) FROM upstream_calls WHERE at > ? GROUP BY kind', (since,)
+        )
+        return dict(rows.fetchall())
+
+
+class _Flight:
+    """One in-flight load that other requests can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SnapshotCache:
+    """Thread-safe TTL cache with single-flight and stale-while-refresh."""
+
+    # How often a worker that lost the lease checks for the new snapshot
+    POLL_SEC = 0.05
+
+    def __init__(self, store=None, stale_sec=120.0, wait_timeout=30.0):
+        """
+        Args:
+            store: MemoryStore (default) or SQLiteStore.
+            stale_sec: How long past its TTL a snapshot may still be served
+                while it is refreshed in the background.
+            wait_timeout: Maximum seconds a request waits for another
+                request's (or worker's) in-flight load; also the lease length.
+        """
+        self.store = store or MemoryStore()
+        self._stale_sec = stale_sec
+        self._wait_timeout = wait_timeout
+        self._lock = threading.Lock()
+        self._inflight = {}  # key -> _Flight
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.joined = 0
+        self.errors = 0
+
+    def get(self, key, loader, ttl):
+        """Get a snapshot, loading it at most once at a time per key.
+
+        Args:
+            key: Tuple key; key[0] is the snapshot kind.
+            loader: Zero-argument callable that fetches the snapshot.
+            ttl: Seconds the snapshot is considered fresh.
+
+        Returns:
+            The snapshot, the last good snapshot if the load failed, or None.
+
+        Raises:
+            Exception: The loader's exception, if it raised and no earlier
+                snapshot exists.
+        """
+        entry = self.store.read(key)
+        stale = False
+        refresh = None
+        with self._lock:
+            if entry is not None:
+                age = time.time() - entry[1]
+                if age < ttl:
+                    self.hits += 1
+                    return entry[0]
+                if age < ttl + self._stale_sec:
+                    stale = True
+                    self.stale_hits += 1
+                    if key not in self._inflight:
+                        refresh = self._inflight[key] = _Flight()
+
+            if not stale:
+                flight = self._inflight.get(key)
+                owner = flight is None
+                if owner:
+                    self.misses += 1
+                    flight = self._inflight[key] = _Flight()
+                else:
+                    self.joined += 1
+
+        if stale:
+            # Serve the stale copy; refresh it in the background unless this
+            # process or another worker is already doing so
+            if refresh is not None:
+                try:
+                    leased = self.store.try_lease(key, self._wait_timeout)
+                except Exception as e:
+                    print(f"SnapshotCache: lease failed for {key}: {e}")
+                    leased = False
+                if leased:
+                    threading.Thread(
+                        target=self._load,
+                        args=(key, loader, refresh, entry[1]),
+                        name=f"snapshot-refresh-{key[0]}",
+                        daemon=True
+                    ).start()
+                else:
+                    self._finish(key, refresh, entry[0])
+            return entry[0]
+
+        if owner:
+            try:
+                self._load_or_wait(key, loader, flight, entry)
+            except Exception as e:
+                # Store failure: release waiters instead of leaving a dead flight
+                flight.error = e
+                self._finish(key, flight, None)
+        elif not flight.done.wait(self._wait_timeout):
+            print(f"SnapshotCache: timed out waiting for in-flight load of {key}")
+
+        if flight.error is not None and flight.value is None:
+            raise flight.error
+        return flight.value
+
+    def _load_or_wait(self, key, loader, flight, entry):
+        """Load a missing snapshot, or wait for the worker holding its lease."""
+        seen_at = entry[1] if entry is not None else None
+        deadline = time.monotonic() + self._wait_timeout
+        while not self.store.try_lease(key, self._wait_timeout):
+            newer = self.store.read(key)
+            if newer is not None and newer[1] != seen_at:
+                self._finish(key, flight, newer[0])
+                return
+            if time.monotonic() >= deadline:
+                print(f"SnapshotCache: timed out waiting for another worker to load {key}")
+                self._finish(key, flight, entry[0] if entry is not None else None)
+                return
+            time.sleep(self.POLL_SEC)
+        self._load(key, loader, flight, seen_at)
+
+    def _load(self, key, loader, flight, seen_at):
+        """Run the loader (lease held), store a good result and release waiters.
+
+        seen_at is the fetched_at of the snapshot the caller found (None if
+        missing); if another worker stored a newer one before this worker
+        got the lease, that one is used instead of calling upstream again.
+        """
+        try:
+            current = self.store.read(key)
+            if current is not None and current[1] != seen_at:
+                self.store.release(key)
+                self._finish(key, flight, current[0])
+                return
+        except Exception as e:
+            print(f"SnapshotCache: store read failed for {key}: {e}")
+
+        try:
+            self.store.record_upstream(key[0], time.time())
+            value = loader()
+        except Exception as e:
+            print(f"SnapshotCache: load failed for {key}: {e}")
+            value = None
+            flight.error = e
+
+        if value is None:
+            with self._lock:
+                self.errors += 1
+        try:
+            if value is not None:
+                self.store.write(key, value, time.time())
+            else:
+                # Keep serving the last good snapshot
+                entry = self.store.read(key)
+                if entry is not None:
+                    value = entry[0]
+            self.store.release(key)
+        except Exception as e:
+            # The lease expires on its own if it could not be released
+            print(f"SnapshotCache: store update failed for {key}: {e}")
+        self._finish(key, flight, value)
+
+    def _finish(self, key, flight, value):
+        """Publish a flight's result and wake its waiters."""
+        with self._lock:
+            flight.value = value
+            self._inflight.pop(key, None)
+        flight.done.set()
+
+    def invalidate(self, kind=None, project=None):
+        """Drop cached snapshots, optionally only one kind and/or account.
+
+        Args:
+            kind: Snapshot kind (key[0]) to drop, or None for all kinds.
+            project: Account (key[1]) to drop, or None for all accounts.
+
+        Returns:
+            int: Number of snapshots dropped.
+        """
+        return self.store.delete(kind, project)
+
+    def stats(self):
+        """Counters for the metrics endpoint.
+
+        Hit counts are for this worker; snapshot and upstream call counts
+        cover every worker sharing the store.
+
+        Returns:
+            dict: hit/miss counts, hit ratio, snapshot count and upstream
+            loads in the last UPSTREAM_WINDOW_SEC seconds (total and per kind).
+        """
+        per_kind = self.store.upstream_since(time.time() - UPSTREAM_WINDOW_SEC)
+        with self._lock:
+            served = self.hits + self.stale_hits + self.joined
+            requests_total = served + self.misses
+            return {
+                'backend': 'sqlite' if self.store.shared else 'memory',
+                'worker': os.getpid(),
+                'hits': self.hits,
+                'staleHits': self.stale_hits,
+                'misses': self.misses,
+                'joined': self.joined,
+                'errors': self.errors,
+                'hitRatio': round(served / requests_total, 4) if requests_total else None,
+                'snapshots': self.store.count(),
+                'upstreamCallsPerMinute': {
+                    'total': sum(per_kind.values()),
+                    'byKind': per_kind
+                }
+            }
@@ -0,0 +1,202 @@
+"""Optional listener for Alpaca's trade-updates websocket, one per account.
+
+Without it, the backend only learns about fills and cancels by polling: the
+order ledger re-syncs every ORDER_SYNC_SEC and cached payloads are rebuilt on
+their own cadence whether anything changed or not. TradeUpdateListener keeps
+a websocket to the account's trade_updates stream and hands every order event
+to a callback, which updates the ledger from the event and invalidates only
+what the event made stale.
+
+One listener per account runs on the host: the worker holding an exclusive
+lock file keeps the connection, the others retry the lock periodically (and
+take over if that worker exits). While connected, the listener writes a
+heartbeat into the shared snapshot store so every worker can tell whether the
+stream is up (stream_connected) and fall back to polling when it is not.
+
+The stream URL is configurable, so the listener can be pointed at a local
+fake stream (see fake_trade_stream.py).
+"""
+import asyncio
+import fcntl
+import json
+import os
+import threading
+import time
+
+from websockets.asyncio.client import connect
+
+STREAM_URLS = {
+    True: 'wss://paper-api.alpaca.markets/stream',
+    False: 'wss://api.alpaca.markets/stream',
+}
+# Events that change an order's state (others, e.g. new/pending_new, are only counted)
+ORDER_EVENTS = ('fill', 'partial_fill', 'canceled', 'expired', 'rejected', 'replaced', 'done_for_day')
+# How often a connected listener refreshes its heartbeat
+HEARTBEAT_SEC = 10.0
+# A heartbeat older than this means the stream is down
+STALE_SEC = 3 * HEARTBEAT_SEC
+# How often a worker without the lock retries it
+LEADER_RETRY_SEC = 30.0
+HANDSHAKE_TIMEOUT_SEC = 10.0
+
+
+def status_key(project):
+    """Snapshot store key of an account's stream heartbeat."""
+    return ('trade_stream', project)
+
+
+def stream_connected(store, project):
+    """Whether a listener on this host has a live stream for the account."""
+    stored = store.read(status_key(project))
+    return bool(stored and stored[0] and time.time() - stored[1] < STALE_SEC)
+
+
+class TradeUpdateListener:
+    """Background websocket client for one account's trade_updates stream."""
+
+    def __init__(self, project, url, api_key, secret_key, on_update, on_connect, store, lock_path,
+                 reconnect_max_sec=60.0):
+        """
+        Args:
+            project: Project number (1 or 2).
+            url: Stream URL (STREAM_URLS, or a local fake stream).
+            api_key: Alpaca API key of the account.
+            secret_key: Alpaca secret key of the account.
+            on_update: Callable taking the data dict of one order event.
+            on_connect: Zero-argument callable run after every (re)connect,
+                to catch up on events missed while disconnected.
+            store: Snapshot store for the heartbeat.
+            lock_path: Lock file electing the host's listener for the account.
+            reconnect_max_sec: Upper bound of the reconnect backoff.
+        """
+        self.project = project
+        self.url = url
+        self.api_key = api_key
+        self.secret_key = secret_key
+        self._on_update = on_update
+        self._on_connect = on_connect
+        self.store = store
+        self.lock_path = lock_path
+        self.reconnect_max_sec = reconnect_max_sec
+        self._lock = threading.Lock()
+        self._thread_pid = None
+        self._lock_fd = None
+        self._heartbeat_at = 0.0
+        self.leader = False
+        self.connected = False
+        self.connects = 0
+        self.events = 0
+        self.handled = 0
+        self.failures = 0
+        self.last_event_at = None
+        self.last_error = None
+
+    def start(self):
+        """Start this process's listener thread (idempotent, fork-aware)."""
+        with self._lock:
+            if self._thread_pid == os.getpid():
+                return
+            self._thread_pid = os.getpid()
+        threading.Thread(target=self._run, name=f'trade-stream-{self.project}', daemon=True).start()
+
+    def _acquire(self):
+        """Take the host-wide lock for this account (held until the process exits)."""
+        fd = os.open(self.lock_path, os.O_CREAT | os.O_RDWR, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        return True
+
+    def _run(self):
+        while not self._acquire():
+            time.sleep(LEADER_RETRY_SEC)
+        self.leader = True
+        print(f"TradeUpdateListener (Project {self.project}): listening in worker {os.getpid()} ({self.url})")
+        asyncio.run(self._listen_forever())
+
+    def _set_connected(self, connected):
+        """Record the connection state and refresh the shared heartbeat if due."""
+        now = time.time()
+        if connected == self.connected and (not connected or now - self._heartbeat_at < HEARTBEAT_SEC):
+            return
+        self.connected = connected
+        self._heartbeat_at = now
+        try:
+            self.store.write(status_key(self.project), connected, now)
+        except Exception as e:
+            print(f"TradeUpdateListener (Project {self.project}): error writing heartbeat: {e}")
+
+    async def _listen_forever(self):
+        retries = 0
+        while True:
+            try:
+                async with connect(self.url, open_timeout=HANDSHAKE_TIMEOUT_SEC) as ws:
+                    await self._handshake(ws)
+                    retries = 0
+                    self.connects += 1
+                    self._set_connected(True)
+                    await self._call(self._on_connect)
+                    await self._consume(ws)
+            except Exception as e:
+                self.last_error = str(e) or e.__class__.__name__
+                print(f"TradeUpdateListener (Project {self.project}): stream unavailable, polling instead: {self.last_error}")
+            self._set_connected(False)
+            retries += 1
+            await asyncio.sleep(min(self.reconnect_max_sec, 2 ** (retries - 1)))
+
+    async def _handshake(self, ws):
+        await ws.send(json.dumps({
+            'action': 'authenticate',
+            'data': {'key_id': self.api_key, 'secret_key': self.secret_key}
+        }))
+        reply = json.loads(await asyncio.wait_for(ws.recv(), HANDSHAKE_TIMEOUT_SEC))
+        if (reply.get('data') or {}).get('status') != 'authorized':
+            raise ConnectionError(f"authentication failed: {reply}")
+        await ws.send(json.dumps({'action': 'listen', 'data': {'streams': ['trade_updates']}}))
+
+    async def _consume(self, ws):
+        while True:
+            try:
+                raw = await asyncio.wait_for(ws.recv(), HEARTBEAT_SEC)
+            except asyncio.TimeoutError:
+                self._set_connected(True)
+                continue
+            self._set_connected(True)
+
+            message = json.loads(raw)
+            if message.get('stream') != 'trade_updates':
+                continue
+            data = message.get('data') or {}
+            with self._lock:
+                self.events += 1
+                self.last_event_at = time.time()
+            if data.get('event') in ORDER_EVENTS:
+                await self._call(self._on_update, data)
+
+    async def _call(self, fn, *args):
+        """Run a callback off the event loop; errors are counted, not raised."""
+        try:
+            await asyncio.to_thread(fn, *args)
+            with self._lock:
+                self.handled += 1
+        except Exception as e:
+            with self._lock:
+                self.failures += 1
+            print(f"TradeUpdateListener (Project {self.project}): error handling stream event: {e}")
+
+    def stats(self):
+        """Counters for the metrics endpoint (this worker's listener)."""
+        with self._lock:
+            return {
+                'leader': self.leader,
+                'connected': self.connected,
+                'connects': self.connects,
+                'events': self.events,
+                'handled': self.handled,
+                'failures': self.failures,
+                'lastEventAgeSec': round(time.time() - self.last_event_at, 1) if self.last_event_at else None,
+                'lastError': self.last_error
+            }
@@ -309,8 +309,8 @@ function AlgoCard({ algorithm, metricsMap = {}, metricsLoaded = false }) {
       </div>
       
       <div className="chart-trades-section">
-        <ReturnsChart algorithmName={algorithm.name} />
-        <RecentTrades algorithmName={algorithm.name} />
+        <ReturnsChart algorithmName={algorithm.name} initialPerformance={algorithm.performance} />
+        <RecentTrades algorithmName={algorithm.name} initialTrades={algorithm.trades} />
       </div>
     </div>
   )
@@ -1,12 +1,14 @@
-import React, { useState, useEffect } from 'react'
+import React, { useState, useEffect, useRef } from 'react'
 import { getTrades } from '../../services/api'
 import LoadingSpinner from './LoadingSpinner'
 import './RecentTrades.css'
 
-function RecentTrades({ algorithmName }) {
+function RecentTrades({ algorithmName, initialTrades = null }) {
   const [trades, setTrades] = useState([])
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState(null)
+  // Trades preloaded by the dashboard request, used for the first render
+  const preloadedRef = useRef(initialTrades)
   
   // Check if this is crypto algorithm
   const isCrypto = algorithmName.toLowerCase().includes('crypto')
@@ -21,7 +23,9 @@ function RecentTrades({ algorithmName }) {
   const fetchTrades = async () => {
     try {
       setLoading(true)
-      const tradesData = await getTrades(algorithmName, 5)
+      const preloaded = preloadedRef.current
+      preloadedRef.current = null
+      const tradesData = preloaded || await getTrades(algorithmName, 5)
       const fetchedTrades = tradesData.trades || []
       
       // Log trade dates for debugging
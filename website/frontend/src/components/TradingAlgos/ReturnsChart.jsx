@@ -5,7 +5,7 @@ import TimeframeSelector from './TimeframeSelector'
 import LoadingSpinner from './LoadingSpinner'
 import './ReturnsChart.css'
 
-function ReturnsChart({ algorithmName }) {
+function ReturnsChart({ algorithmName, initialPerformance = null }) {
   const [timeframe, setTimeframe] = useState('day')
   const [data, setData] = useState([])
   const [loading, setLoading] = useState(true)
@@ -13,6 +13,8 @@ function ReturnsChart({ algorithmName }) {
   const [chartDimensions, setChartDimensions] = useState({ width: 0, height: 0 })
   const [cursorX, setCursorX] = useState(null)
   const chartContainerRef = useRef(null)
+  // Performance preloaded by the dashboard request, used once for its timeframe
+  const preloadedRef = useRef(initialPerformance)
 
   useEffect(() => {
     fetchPerformanceData()
@@ -166,7 +168,11 @@ function ReturnsChart({ algorithmName }) {
   const fetchPerformanceData = async () => {
     try {
       setLoading(true)
-      const performanceData = await getPerformance(algorithmName, timeframe)
+      const preloaded = preloadedRef.current
+      preloadedRef.current = null
+      const performanceData = preloaded && preloaded.timeframe === timeframe
+        ? preloaded
+        : await getPerformance(algorithmName, timeframe)
       
       // Step 1: Get raw data
       const raw = performanceData.data || []
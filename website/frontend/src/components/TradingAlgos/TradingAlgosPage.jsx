@@ -1,5 +1,5 @@
 import React, { useState, useEffect, useCallback, useRef } from 'react'
-import { getAlgorithms, getAlpacaMetrics } from '../../services/api'
+import { getDashboard } from '../../services/api'
 import AlgoCard from './AlgoCard'
 import LoadingSpinner from './LoadingSpinner'
 import './TradingAlgosPage.css'
@@ -39,14 +39,20 @@ function TradingAlgosPage() {
       setError(null)
       setLoadingMessage('Initializing...')
       
-      // First, fetch main algorithm data (fast)
+      // One request for the whole page: algorithms with metrics, day performance and recent trades
       setLoadingMessage('Fetching trading algorithms...')
       // #region agent log
-      fetch('http://127.0.0.1:7245/ingest/9d64e218-9bd1-44d8-aab6-5e10b2f6ec39',{method:'POST',headers:{'Content-Type':'application/json'},body:JSON.stringify({location:'TradingAlgosPage.jsx:31',message:'BEFORE getAlgorithms',data:{timestamp:Date.now()},timestamp:Date.now(),sessionId:'debug-session',runId:'run1',hypothesisId:'A,B'})}).catch(()=>{});
+      fetch('http://127.0.0.1:7245/ingest/9d64e218-9bd1-44d8-aab6-5e10b2f6ec39',{method:'POST',headers:{'Content-Type':'application/json'},body:JSON.stringify({location:'TradingAlgosPage.jsx:31',message:'BEFORE getDashboard',data:{timestamp:Date.now()},timestamp:Date.now(),sessionId:'debug-session',runId:'run1',hypothesisId:'A,B'})}).catch(()=>{});
       // #endregion
-      const data = await getAlgorithms()
+      const dashboard = await getDashboard({
+        timeframe: 'day',
+        tradesLimit: 5,
+        // Fields the cards never read
+        exclude: ['performance.algorithm', 'trades.algorithm', 'trades.total', 'trades.nextCursor', 'metrics.missing']
+      })
+      const data = dashboard?.algorithms
       // #region agent log
-      fetch('http://127.0.0.1:7245/ingest/9d64e218-9bd1-44d8-aab6-5e10b2f6ec39',{method:'POST',headers:{'Content-Type':'application/json'},body:JSON.stringify({location:'TradingAlgosPage.jsx:32',message:'AFTER getAlgorithms',data:{dataType:Array.isArray(data)?'array':'other',dataLength:Array.isArray(data)?data.length:'N/A',hasData:!!data},timestamp:Date.now(),sessionId:'debug-session',runId:'run1',hypothesisId:'A,B'})}).catch(()=>{});
+      fetch('http://127.0.0.1:7245/ingest/9d64e218-9bd1-44d8-aab6-5e10b2f6ec39',{method:'POST',headers:{'Content-Type':'application/json'},body:JSON.stringify({location:'TradingAlgosPage.jsx:32',message:'AFTER getDashboard',data:{dataType:Array.isArray(data)?'array':'other',dataLength:Array.isArray(data)?data.length:'N/A',hasData:!!data},timestamp:Date.now(),sessionId:'debug-session',runId:'run1',hypothesisId:'A,B'})}).catch(()=>{});
       // #endregion
       
       // Check if we got valid data
@@ -69,29 +75,16 @@ function TradingAlgosPage() {
       
       setLoadingMessage('Analyzing portfolio performance...')
       setAlgorithms(data)
+      // Micro-metrics come with each algorithm (null if they failed; the card shows dashes)
+      setMetricsMap(Object.fromEntries(data.map(algo => [algo.project, algo.metrics || {}])))
       // #region agent log
       fetch('http://127.0.0.1:7245/ingest/9d64e218-9bd1-44d8-aab6-5e10b2f6ec39',{method:'POST',headers:{'Content-Type':'application/json'},body:JSON.stringify({location:'TradingAlgosPage.jsx:36',message:'BEFORE setLoading(false)',data:{algorithmsSet:data.length},timestamp:Date.now(),sessionId:'debug-session',runId:'run1',hypothesisId:'C'})}).catch(()=>{});
       // #endregion
-      setLoading(false) // Show page immediately
+      setLoading(false)
       // #region agent log
       fetch('http://127.0.0.1:7245/ingest/9d64e218-9bd1-44d8-aab6-5e10b2f6ec39',{method:'POST',headers:{'Content-Type':'application/json'},body:JSON.stringify({location:'TradingAlgosPage.jsx:37',message:'AFTER setLoading(false)',data:{timestamp:Date.now()},timestamp:Date.now(),sessionId:'debug-session',runId:'run1',hypothesisId:'C'})}).catch(()=>{});
       // #endregion
       
-      // Then fetch micro-metrics in background (slower, but non-blocking)
-      Promise.all([
-        getAlpacaMetrics(1).catch(() => ({})),
-        getAlpacaMetrics(2).catch(() => ({})),
-        getAlpacaMetrics(3).catch(() => ({}))
-      ]).then(([metrics1, metrics2, metrics3]) => {
-        setMetricsMap({
-          1: metrics1,
-          2: metrics2,
-          3: metrics3
-        })
-      }).catch(err => {
-        console.error('Error fetching micro-metrics:', err)
-        // Silently fail - micro-metrics will show dashes
-      })
     } catch (err) {
       // #region agent log
       fetch('http://127.0.0.1:7245/ingest/9d64e218-9bd1-44d8-aab6-5e10b2f6ec39',{method:'POST',headers:{'Content-Type':'application/json'},body:JSON.stringify({location:'TradingAlgosPage.jsx:57',message:'CATCH block',data:{errorMessage:err?.message,errorName:err?.name,errorStack:err?.stack?.substring(0,200),responseStatus:err?.response?.status,responseData:err?.response?.data},timestamp:Date.now(),sessionId:'debug-session',runId:'run1',hypothesisId:'A,D'})}).catch(()=>{});
@@ -16,6 +16,25 @@ const encodeAlgorithmName = (name) => {
   return encodeURIComponent(name.replace(/\s+/g, '_'))
 }
 
+// Everything the trading page needs in one request: each algorithm with its micro-metrics,
+// performance for one timeframe and recent trades. exclude lists fields to leave out
+// ('trades', or 'section.field' such as 'trades.total'); excluded sections aren't built.
+export const getDashboard = async ({ timeframe = 'day', tradesLimit = 5, exclude = [] } = {}) => {
+  try {
+    const response = await api.get('/dashboard', {
+      params: {
+        timeframe,
+        trades_limit: tradesLimit,
+        ...(exclude.length > 0 ? { exclude: exclude.join(',') } : {})
+      }
+    })
+    return response.data
+  } catch (error) {
+    console.error('API Error fetching dashboard:', error)
+    throw error
+  }
+}
+
 export const getAlgorithms = async () => {
   try {
     console.log('Fetching algorithms from:', `${api.defaults.baseURL}/algorithms`)